@@ -1,11 +1,23 @@
-from flask import Flask, render_template, session, redirect, url_for
+from flask import Flask, render_template, session, redirect, url_for, jsonify
 from config import Config
-from models import db
+from models import db, User
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+import schema
 import os
+import time
 
-def create_app():
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=5000')
+    cursor.close()
+
+def create_app(config_class=Config):
+    started = time.perf_counter()
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
     
     # Initialize extensions
     db.init_app(app)
@@ -13,22 +25,70 @@ def create_app():
     # Initialize config
     Config.init_app(app)
     
+    # Take the client address from the trusted proxies' X-Forwarded-For
+    if app.config.get('PROXY_FIX_X_FOR'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    
     # Register blueprints
     from routes.auth import auth_bp
     from routes.boards import boards_bp
     from routes.lists import lists_bp
     from routes.cards import cards_bp
     from routes.users import users_bp
+    from routes.jobs import jobs_bp
+    from routes.batch import batch_bp
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(boards_bp, url_prefix='/api/boards')
     app.register_blueprint(lists_bp, url_prefix='/api/lists')
     app.register_blueprint(cards_bp, url_prefix='/api/cards')
     app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
     
-    # Create database tables
     with app.app_context():
-        db.create_all()
+        if app.config.get('SQLITE_WAL') and db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', set_sqlite_pragmas)
+        # Deployments create the schema once with `flask init-db`, not on every worker start
+        if app.config.get('AUTO_CREATE_SCHEMA'):
+            schema.ensure_schema()
+    
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables and add the columns and indexes an older database lacks."""
+        schema.ensure_schema(force=True)
+        print(f'Database ready at {db.engine.url.render_as_string(hide_password=True)}')
+    
+    # Request timers, SQL counters, /metrics and sampled profiling
+    import instrumentation
+    instrumentation.init_app(app)
+    
+    # Read-heavy GETs on read replicas, with read-your-writes stickiness
+    import replicas
+    replicas.init_app(app)
+    
+    # Flag N+1 lazy loads per request
+    import n_plus_one
+    n_plus_one.init_app(app)
+    
+    # Login rate limiting
+    import passwords
+    passwords.init_app(app)
+    
+    # Server-side sessions and the per-process user cache
+    import sessions
+    sessions.init_app(app)
+    
+    # Background jobs and the periodic purge of soft-deleted items
+    import jobs
+    import purge
+    jobs.init_app(app)
+    purge.init_app(app)
+    
+    # Card badge counters and their repair command
+    import card_counters
+    card_counters.init_app(app)
     
     # Main routes
     @app.route('/')
@@ -49,8 +109,28 @@ def create_app():
             return redirect(url_for('auth.login'))
         return render_template('profile.html')
     
+    # Probes for load balancers and orchestrators
+    @app.route('/healthz')
+    def healthz():
+        """Liveness: the process is serving requests"""
+        return jsonify({'status': 'ok'}), 200
+    
+    @app.route('/readyz')
+    def readyz():
+        """Readiness: the database answers and the schema exists"""
+        try:
+            db.session.execute(db.select(User.id).limit(1))
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'status': 'unavailable', 'error': e.__class__.__name__}), 503
+        return jsonify({'status': 'ready', 'startup_seconds': app.extensions['startup_seconds']}), 200
+    
+    app.extensions['startup_seconds'] = round(time.perf_counter() - started, 4)
     return app
 
 if __name__ == '__main__':
+    # Development server; production runs `gunicorn -c gunicorn.conf.py wsgi:app`
     app = create_app()
+    with app.app_context():
+        schema.ensure_schema()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,191 @@
+"""ASGI entry point: read-heavy endpoints on an async engine, everything else through WSGI.
+
+    pip install uvicorn aiosqlite asgiref
+    uvicorn --factory asgi:create_asgi_app --port 5000
+
+Requests to ASYNC_ENDPOINTS run the blueprints' own view functions inside
+AsyncSession.run_sync, so their queries wait on the event loop instead of
+holding a thread. Their session is loaded and saved the same way. Any other
+request goes to the Flask app on asgiref's thread pool, exactly as under a
+WSGI server.
+"""
+import asyncio
+import io
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from werkzeug.exceptions import HTTPException
+from config import Config
+from models import db
+from sessions import SQLStore, ServerSession, ServerSessionInterface, _key
+
+# Endpoints that only read, and are requested often enough to matter
+ASYNC_ENDPOINTS = {
+    'boards.get_boards',
+    'boards.get_board',
+    'boards.get_board_activities',
+    'users.get_my_tasks',
+    'users.get_calendar_tasks',
+}
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+def async_database_url(app):
+    """ASYNC_DATABASE_URI, or the app's database URL with its async driver"""
+    if app.config.get('ASYNC_DATABASE_URI'):
+        return app.config['ASYNC_DATABASE_URI']
+    with app.app_context():
+        url = db.engine.url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver known for {backend}; set ASYNC_DATABASE_URI')
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise ValueError('An in-memory SQLite database cannot be shared with an async engine')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def _environ(scope):
+    """A WSGI environ for a bodiless ASGI HTTP request"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+class AsyncApp:
+    """ASGI application wrapping a Flask app"""
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        concurrency = app.config['ASYNC_DB_CONCURRENCY']
+        # aiosqlite defaults to NullPool, which would open a connection (and a thread) per request
+        self.engine = create_async_engine(async_database_url(app), poolclass=AsyncAdaptedQueuePool,
+                                          pool_size=concurrency, max_overflow=0)
+        if self.engine.dialect.name == 'sqlite' and app.config.get('SQLITE_WAL'):
+            from app import set_sqlite_pragmas
+            event.listen(self.engine.sync_engine, 'connect', set_sqlite_pragmas)
+        if 'metrics' in app.extensions:
+            import instrumentation
+            instrumentation.instrument_engine(self.engine.sync_engine)
+        # Requests beyond this wait here instead of queueing inside the pool
+        self.db_slots = asyncio.Semaphore(concurrency)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            environ = _environ(scope)
+            try:
+                endpoint, view_args = self.app.url_map.bind_to_environ(environ).match()
+            except HTTPException:
+                endpoint = None
+            if endpoint in ASYNC_ENDPOINTS:
+                return await self.handle(environ, send)
+        return await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def aclose(self):
+        await self.engine.dispose()
+
+    async def open_session(self, environ):
+        """Load the user's session without blocking the event loop"""
+        interface = self.app.session_interface
+        request = self.app.request_class(environ)
+        if isinstance(interface, ServerSessionInterface) and isinstance(interface.store, SQLStore):
+            sid = request.cookies.get(interface.get_cookie_name(self.app))
+            if not sid:
+                return interface.session_class()
+            async with self.engine.connect() as conn:
+                row = (await conn.execute(SQLStore.record_query(_key(sid)))).first()
+            return interface.session_from_record(sid, tuple(row) if row else None)
+        return await asyncio.to_thread(interface.open_session, self.app, request)
+
+    async def save_session(self, session):
+        """Run the store writes save_session queued on the session without blocking the event loop"""
+        if not session.writes:
+            return
+        store = self.app.session_interface.store
+        if isinstance(store, SQLStore):
+            async with self.engine.begin() as conn:
+                for method, args in session.writes:
+                    await conn.run_sync(getattr(SQLStore, f'{method}_with'), *args)
+            return
+
+        def write():
+            with self.app.app_context():
+                for method, args in session.writes:
+                    getattr(store, method)(*args)
+
+        await asyncio.to_thread(write)
+
+    async def handle(self, environ, send):
+        session = await self.open_session(environ)
+        if isinstance(session, ServerSession):
+            session.writes = []
+        async with self.db_slots:
+            async with AsyncSession(self.engine, expire_on_commit=False) as db_session:
+                status, headers, body = await db_session.run_sync(self.dispatch, environ, session)
+            if isinstance(session, ServerSession):
+                await self.save_session(session)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if environ['REQUEST_METHOD'] == 'HEAD' else body})
+
+    def dispatch(self, sync_session, environ, session):
+        """Run the Flask request as wsgi_app would, with db.session bound to the async engine
+
+        Called inside a greenlet by run_sync: every query the view makes,
+        lazy loads included, is awaited on the event loop. The session's
+        store writes are only queued here; handle runs them afterwards.
+        """
+        ctx = self.app.request_context(environ)
+        ctx.session = session
+        error = None
+        try:
+            ctx.push()
+            db.session.registry.set(sync_session)
+            try:
+                response = self.app.full_dispatch_request()
+            except Exception as e:
+                error = e
+                response = self.app.handle_exception(e)
+            body = response.get_data()
+            headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                       for name, value in response.headers.to_wsgi_list()]
+            response.close()
+            return response.status_code, headers, body
+        finally:
+            ctx.pop(error)
+
+def create_asgi_app(config_class=Config):
+    from app import create_app
+
+    return AsyncApp(create_app(config_class))
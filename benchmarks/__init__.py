@@ -0,0 +1,5 @@
+"""Benchmarks for Boardify's hot paths.
+
+Run the suite with `python -m pytest benchmarks`, and the scripts with
+`python -m benchmarks.<name>`.
+"""
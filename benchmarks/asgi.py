@@ -0,0 +1,170 @@
+"""Compare the WSGI server with the ASGI mode (asgi.py) under many concurrent connections.
+
+Each mode serves the same generated SQLite file from a child process.
+Clients hammer the read-heavy endpoints; the report shows requests per
+second, latency and the server's resident memory per open connection.
+
+    pip install uvicorn aiosqlite asgiref
+    python -m benchmarks.asgi --clients 10,50,200 --duration 10
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.datagen import PASSWORD, SCALES, generate, make_config
+from benchmarks.load import percentile
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _rss(pid):
+    """Resident memory of a process in bytes (Linux)"""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+def serve(mode, db_path, port):
+    """Run in the child process: serve the app until killed"""
+    from app import create_app
+
+    config = make_config(db_path)
+    config.INSTRUMENTATION_ENABLED = False
+    app = create_app(config)
+    if mode == 'wsgi':
+        import logging
+        from werkzeug.serving import make_server
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+    else:
+        import uvicorn
+        from asgi import AsyncApp
+
+        uvicorn.run(AsyncApp(app), host='127.0.0.1', port=port, log_level='warning', lifespan='on')
+
+def _request(port, path, cookie=None, method='GET', body=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    headers = {'Content-Type': 'application/json'}
+    if cookie:
+        headers['Cookie'] = cookie
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response
+
+def _wait_until_up(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('server exited during startup')
+        try:
+            _request(port, '/auth/me')
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('server did not come up')
+
+def run(mode, db_path, data, clients, duration):
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, '-m', 'benchmarks.asgi', '--serve', mode,
+                                '--db', db_path, '--port', str(port)])
+    try:
+        _wait_until_up(port, process)
+        owner = data.board_owner[data.largest_board()]
+        response = _request(port, '/auth/login', method='POST',
+                            body=f'{{"username": "{data.username(owner)}", "password": "{PASSWORD}"}}')
+        cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+        paths = [f'/api/boards/{data.largest_board()}?card_limit=20', '/api/boards',
+                 f'/api/boards/{data.largest_board()}/activities', '/api/users/me/tasks']
+        for path in paths:
+            _request(port, path, cookie)
+        idle_rss = peak_rss = _rss(process.pid)
+
+        latencies, errors, lock = [], [0], threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def client(index):
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            n = index
+            while time.perf_counter() < deadline:
+                path = paths[n % len(paths)]
+                n += 1
+                start = time.perf_counter()
+                try:
+                    conn.request('GET', path, headers={'Cookie': cookie})
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status != 200 or response.getheader('Connection', '').lower() == 'close':
+                        conn.close()
+                        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                    if response.status != 200:
+                        raise OSError(response.status)
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                    with lock:
+                        errors[0] += 1
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+            conn.close()
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            peak_rss = max(peak_rss, _rss(process.pid))
+            time.sleep(0.1)
+        for thread in threads:
+            thread.join()
+        return latencies, errors[0], idle_rss, peak_rss
+    finally:
+        process.terminate()
+        process.wait()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', default='10,50,200', help='comma-separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per run')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--serve', choices=('wsgi', 'asgi'), help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        return serve(args.serve, args.db, args.port)
+
+    from app import create_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'asgi.db')
+        with create_app(make_config(db_path)).app_context():
+            data = generate(0, args.scale)
+
+        print(f"{'mode':<6} {'clients':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'errors':>7} "
+              f"{'idle RSS':>9} {'peak RSS':>9} {'per conn':>9}")
+        for clients in (int(c) for c in args.clients.split(',')):
+            for mode in ('wsgi', 'asgi'):
+                latencies, errors, idle, peak = run(mode, db_path, data, clients, args.duration)
+                if not latencies:
+                    print(f'{mode:<6} {clients:>7}  no successful requests, {errors} errors')
+                    continue
+                print(f'{mode:<6} {clients:>7} {len(latencies) / args.duration:>8.1f} '
+                      f'{statistics.median(latencies) * 1000:>7.1f}ms {percentile(latencies, 0.95) * 1000:>7.1f}ms '
+                      f'{errors:>7} {idle / 2**20:>7.1f}MB {peak / 2**20:>7.1f}MB '
+                      f'{(peak - idle) / clients / 1024:>7.0f}KB')
+
+if __name__ == '__main__':
+    main()
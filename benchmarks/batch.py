@@ -0,0 +1,87 @@
+"""Benchmark the card modal's round trips: separate requests vs one POST /api/batch.
+
+Each flow changes a card, then refreshes the card and, as the board page
+used to, the whole board. `--rtt` adds that many ms of network latency to
+every HTTP request; on localhost a round trip costs next to nothing.
+
+- separate: the change, GET the card, GET the board, one request each
+- batched: the same three calls as one atomic batch
+- batched-card: the change and GET the card, as board.js sends them now
+
+    python -m benchmarks.batch --rounds 200 --rtt 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from benchmarks.datagen import generate, make_config
+from benchmarks.load import Client, percentile, serve
+
+FLOWS = ('add_checklist_item', 'toggle_checklist_item')
+MODES = ('separate', 'batched', 'batched-card')
+
+def flow_calls(flow, board_id, card_id, item_id, i):
+    """The (method, path, body) calls one run of a flow makes"""
+    if flow == 'add_checklist_item':
+        change = ('POST', f'/api/cards/{card_id}/checklist', {'title': f'Step {i}'})
+    else:
+        change = ('PUT', f'/api/cards/{card_id}/checklist/{item_id}', {'completed': i % 2 == 0})
+    return [change, ('GET', f'/api/cards/{card_id}', None), ('GET', f'/api/boards/{board_id}?card_limit=50', None)]
+
+def run_flow(client, mode, calls, rtt):
+    """Make the calls the way `mode` does; returns how many round trips that took"""
+    if mode == 'separate':
+        for method, path, body in calls:
+            time.sleep(rtt)
+            client.request(method, path, body)
+        return len(calls)
+
+    if mode == 'batched-card':
+        calls = calls[:2]
+    time.sleep(rtt)
+    result = client.request('POST', '/api/batch', {
+        'atomic': True,
+        'requests': [{'method': method, 'path': path, 'body': body} for method, path, body in calls],
+    })
+    assert result['committed'], result['responses']
+    return 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=100, help='runs of each flow per mode')
+    parser.add_argument('--rtt', type=float, default=20, help='ms of latency added to each request')
+    parser.add_argument('--scale', default='small')
+    args = parser.parse_args(argv)
+
+    from app import create_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, 'batch.db')))
+        with app.app_context():
+            data = generate(0, args.scale)
+        server, base_url = serve(app)
+
+        board_id = data.largest_board()
+        card_id = data.card_ids[data.list_ids[board_id][0]][0]
+        client = Client(base_url, data.username(data.board_owner[board_id]), None)
+        client.login_only()
+        item_id = client.request('POST', f'/api/cards/{card_id}/checklist', {'title': 'Toggle me'})['id']
+
+        print(f'{args.rounds} runs per flow, {args.rtt:.0f}ms added per request, {args.scale} dataset')
+        print(f"  {'flow':<24} {'mode':<14} {'requests':>8} {'p50':>9} {'p95':>9}")
+        for flow in FLOWS:
+            for mode in MODES:
+                latencies, trips = [], 0
+                for i in range(args.rounds):
+                    calls = flow_calls(flow, board_id, card_id, item_id, i)
+                    start = time.perf_counter()
+                    trips = run_flow(client, mode, calls, args.rtt / 1000)
+                    latencies.append(time.perf_counter() - start)
+                print(f'  {flow:<24} {mode:<14} {trips:>8} {statistics.median(latencies) * 1000:>7.1f}ms '
+                      f'{percentile(latencies, 0.95) * 1000:>7.1f}ms')
+
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
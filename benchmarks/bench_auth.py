@@ -0,0 +1,11 @@
+def bench_login(benchmark, bench_env, dataset):
+    app, data = bench_env
+    client = app.test_client()
+    credentials = {'username': data.username(data.user_ids[0]), 'password': 'benchpass'}
+
+    response = benchmark(client.post, '/auth/login', json=credentials)
+    assert response.status_code == 200
+
+def bench_me(benchmark, owner_client):
+    response = benchmark(owner_client.get, '/auth/me')
+    assert response.status_code == 200
@@ -0,0 +1,53 @@
+def bench_list_boards(benchmark, owner_client):
+    response = benchmark(owner_client.get, '/api/boards')
+    assert response.status_code == 200
+
+def bench_list_boards_page(benchmark, owner_client):
+    response = benchmark(owner_client.get, '/api/boards?limit=20&summary=1')
+    assert response.status_code == 200
+
+def bench_get_board_full(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    response = benchmark(owner_client.get, f'/api/boards/{board_id}')
+    assert response.status_code == 200
+
+def bench_get_board_paged(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    response = benchmark(owner_client.get, f'/api/boards/{board_id}?card_limit=20')
+    assert response.status_code == 200
+
+def bench_filter_board_overdue(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    response = benchmark(owner_client.get, f'/api/boards/{board_id}/cards?due_before=now&completed=false&card_limit=20')
+    assert response.status_code == 200
+
+def bench_filter_board_text(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    response = benchmark(owner_client.get, f'/api/boards/{board_id}/cards?q=card&card_limit=20')
+    assert response.status_code == 200
+
+def bench_board_members(benchmark, owner_client, dataset):
+    response = benchmark(owner_client.get, f'/api/boards/{dataset.largest_board()}/members')
+    assert response.status_code == 200
+
+def bench_board_activities(benchmark, owner_client, dataset):
+    response = benchmark(owner_client.get, f'/api/boards/{dataset.largest_board()}/activities')
+    assert response.status_code == 200
+
+def bench_archived_cards(benchmark, owner_client, dataset):
+    response = benchmark(owner_client.get, f'/api/boards/{dataset.largest_board()}/archived?type=cards')
+    assert response.status_code == 200
+
+def bench_export_board(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    response = benchmark(lambda: owner_client.get(f'/api/boards/{board_id}/export').data)
+    assert response
+
+def bench_create_board(benchmark, owner_client):
+    response = benchmark(owner_client.post, '/api/boards', json={'title': 'Bench board'})
+    assert response.status_code == 201
+
+def bench_copy_board(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    response = benchmark(owner_client.post, f'/api/boards/{board_id}/copy', json={'title': 'Bench copy'})
+    assert response.status_code == 201
@@ -0,0 +1,86 @@
+import itertools
+
+def _card(dataset, list_index=0, card_index=0):
+    list_id = dataset.list_ids[dataset.largest_board()][list_index]
+    return dataset.card_ids[list_id][card_index]
+
+def bench_get_card(benchmark, owner_client, dataset):
+    response = benchmark(owner_client.get, f'/api/cards/{_card(dataset)}')
+    assert response.status_code == 200
+
+def bench_create_card(benchmark, owner_client, dataset):
+    list_id = dataset.list_ids[dataset.largest_board()][0]
+    response = benchmark(owner_client.post, '/api/cards', json={'title': 'Bench card', 'list_id': list_id})
+    assert response.status_code == 201
+
+def bench_update_card(benchmark, owner_client, dataset):
+    card_id = _card(dataset, card_index=1)
+    titles = itertools.cycle(['Renamed', 'Renamed again'])
+    response = benchmark(lambda: owner_client.put(f'/api/cards/{card_id}', json={'title': next(titles)}))
+    assert response.status_code == 200
+
+def bench_move_card(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    card_id = _card(dataset, card_index=2)
+    targets = itertools.cycle([dataset.list_ids[board_id][1], dataset.list_ids[board_id][0]])
+    response = benchmark(lambda: owner_client.put(f'/api/cards/{card_id}', json={'list_id': next(targets)}))
+    assert response.status_code == 200
+
+def bench_add_checklist_item(benchmark, owner_client, dataset):
+    card_id = _card(dataset, card_index=3)
+    response = benchmark(owner_client.post, f'/api/cards/{card_id}/checklist', json={'title': 'Bench step'})
+    assert response.status_code == 201
+
+def bench_toggle_checklist_item(benchmark, owner_client, dataset):
+    card_id = _card(dataset, card_index=4)
+    item_id = owner_client.post(f'/api/cards/{card_id}/checklist', json={'title': 'Toggle me'}).get_json()['id']
+    states = itertools.cycle([True, False])
+    response = benchmark(lambda: owner_client.put(f'/api/cards/{card_id}/checklist/{item_id}',
+                                                  json={'completed': next(states)}))
+    assert response.status_code == 200
+
+def bench_assign_and_unassign(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    card_id = _card(dataset, card_index=5)
+    user_id = dataset.board_members[board_id][-1]
+
+    def toggle():
+        response = owner_client.post(f'/api/cards/{card_id}/assignments', json={'user_id': user_id})
+        data = response.get_json()
+        if response.status_code == 201:
+            owner_client.delete(f"/api/cards/{card_id}/assignments/{data['id']}")
+        return response
+
+    response = benchmark(toggle)
+    assert response.status_code in (201, 400)
+
+def _fifty_cards(dataset):
+    board_id = dataset.largest_board()
+    return [card_id for list_id in dataset.list_ids[board_id] for card_id in dataset.card_ids[list_id]][-50:]
+
+def bench_assign_50_cards_one_by_one(benchmark, owner_client, dataset):
+    card_ids = _fifty_cards(dataset)
+    user_id = dataset.board_members[dataset.largest_board()][-1]
+
+    def toggle():
+        for card_id in card_ids:
+            response = owner_client.post(f'/api/cards/{card_id}/assignments', json={'user_id': user_id})
+            if response.status_code == 201:
+                owner_client.delete(f"/api/cards/{card_id}/assignments/{response.get_json()['id']}")
+        return response
+
+    response = benchmark(toggle)
+    assert response.status_code in (201, 400)
+
+def bench_bulk_assign_50_cards(benchmark, owner_client, dataset):
+    card_ids = _fifty_cards(dataset)
+    user_id = dataset.board_members[dataset.largest_board()][-1]
+
+    def toggle():
+        body = {'card_ids': card_ids, 'user_id': user_id}
+        response = owner_client.post('/api/cards/bulk', json=dict(body, action='assign'))
+        owner_client.post('/api/cards/bulk', json=dict(body, action='unassign'))
+        return response
+
+    response = benchmark(toggle)
+    assert response.status_code == 200
@@ -0,0 +1,11 @@
+import io
+
+def bench_job_status(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    export = owner_client.get(f'/api/boards/{board_id}/export').data
+    job = owner_client.post('/api/boards/import', data={'file': (io.BytesIO(export), 'bench.ndjson')},
+                            content_type='multipart/form-data').get_json()
+
+    response = benchmark(owner_client.get, f"/api/jobs/{job['id']}")
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'succeeded'
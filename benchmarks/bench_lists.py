@@ -0,0 +1,27 @@
+import itertools
+
+def bench_list_cards_page(benchmark, owner_client, dataset):
+    list_id = dataset.list_ids[dataset.largest_board()][0]
+    response = benchmark(owner_client.get, f'/api/lists/{list_id}/cards?limit=50')
+    assert response.status_code == 200
+
+def bench_create_list(benchmark, owner_client, dataset):
+    board_id = dataset.largest_board()
+    response = benchmark(owner_client.post, '/api/lists', json={'title': 'Bench list', 'board_id': board_id})
+    assert response.status_code == 201
+
+def bench_rename_list(benchmark, owner_client, dataset):
+    list_id = dataset.list_ids[dataset.largest_board()][1]
+    names = itertools.cycle(['Doing', 'In progress'])
+    response = benchmark(lambda: owner_client.put(f'/api/lists/{list_id}', json={'title': next(names)}))
+    assert response.status_code == 200
+
+def bench_archive_and_unarchive_list(benchmark, owner_client, dataset):
+    list_id = dataset.list_ids[dataset.largest_board()][-1]
+
+    def toggle():
+        owner_client.post(f'/api/lists/{list_id}/archive')
+        return owner_client.post(f'/api/lists/{list_id}/unarchive')
+
+    response = benchmark(toggle)
+    assert response.status_code == 200
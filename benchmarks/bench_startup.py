@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+from sqlalchemy.engine import make_url
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _database_path(app):
+    return make_url(app.config['SQLALCHEMY_DATABASE_URI']).database
+
+def bench_create_app(benchmark, bench_env):
+    from app import create_app
+    from benchmarks.datagen import make_config
+    from models import db
+
+    def build():
+        app = create_app(make_config(_database_path(bench_env[0])))
+        with app.app_context():
+            db.engine.dispose()
+        return app
+
+    app = benchmark(build)
+    assert 'boards' in app.blueprints
+
+def bench_process_start(benchmark, bench_env):
+    """A fresh interpreter importing wsgi: imports, create_app and warm-up"""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{_database_path(bench_env[0])}', PYTHONPATH=ROOT)
+    benchmark.min_rounds, benchmark.min_time = 3, 0
+    result = benchmark(subprocess.run, [sys.executable, '-c', 'import wsgi'], cwd=ROOT, env=env, capture_output=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,11 @@
+def bench_my_tasks(benchmark, owner_client):
+    response = benchmark(owner_client.get, '/api/users/me/tasks')
+    assert response.status_code == 200
+
+def bench_calendar(benchmark, owner_client):
+    response = benchmark(owner_client.get, '/api/users/me/calendar?month=6&year=2024')
+    assert response.status_code == 200
+
+def bench_search_users(benchmark, owner_client):
+    response = benchmark(owner_client.get, '/api/users/search?q=user1')
+    assert response.status_code == 200
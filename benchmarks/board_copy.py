@@ -0,0 +1,119 @@
+"""Benchmark copying a large board.
+
+Compares the set-based copy behind POST /api/boards/<id>/copy with a naive
+ORM copy that adds one object per row, which is roughly what copying through
+the public card API costs minus the HTTP overhead.
+
+    python -m benchmarks.board_copy --cards 5000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from config import Config
+
+def make_config(db_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        PURGE_INTERVAL = 0
+    return BenchConfig
+
+def seed_board(cards, lists=5, checklist_per_card=3):
+    """Create one board with `cards` cards spread over `lists` lists"""
+    from models import db, User, Board, List, Card, ChecklistItem
+
+    owner = User(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(owner)
+    db.session.flush()
+
+    board = Board(title='Sprint', owner_id=owner.id)
+    db.session.add(board)
+    db.session.flush()
+
+    list_ids = []
+    for i in range(lists):
+        lst = List(title=f'List {i}', board_id=board.id, position=i)
+        db.session.add(lst)
+        db.session.flush()
+        list_ids.append(lst.id)
+
+    db.session.execute(db.insert(Card), [
+        {'title': f'Card {i}', 'description': 'x' * 200, 'list_id': list_ids[i % lists], 'position': i}
+        for i in range(cards)
+    ])
+    card_ids = db.session.execute(db.select(Card.id)).scalars().all()
+    db.session.execute(db.insert(ChecklistItem), [
+        {'card_id': card_id, 'title': f'Item {j}', 'position': j}
+        for card_id in card_ids for j in range(checklist_per_card)
+    ])
+    db.session.commit()
+    return board, owner
+
+def naive_copy(source, owner_id):
+    """Copy row by row through the ORM, flushing for every new id"""
+    from models import db, Board, List, Card, ChecklistItem
+
+    board = Board(title='Naive copy', owner_id=owner_id)
+    db.session.add(board)
+    db.session.flush()
+    for lst in source.active_lists:
+        new_list = List(title=lst.title, board_id=board.id, position=lst.position)
+        db.session.add(new_list)
+        db.session.flush()
+        for card in lst.active_cards:
+            new_card = Card(title=card.title, description=card.description, list_id=new_list.id,
+                            position=card.position, due_date=card.due_date, completed=card.completed)
+            db.session.add(new_card)
+            db.session.flush()
+            for item in card.checklists:
+                db.session.add(ChecklistItem(card_id=new_card.id, title=item.title,
+                                             completed=item.completed, position=item.position))
+    db.session.commit()
+    return board
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from models import db
+    from board_copy import copy_board
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, 'bench.db')))
+        with app.app_context():
+            source, owner = seed_board(args.cards)
+
+            def set_based():
+                copy_board(source, owner.id, 'Set-based copy')
+                db.session.commit()
+
+            def orm():
+                naive_copy(source, owner.id)
+                db.session.expire_all()
+
+            results = {
+                'set-based copy': timed(set_based, args.repeat),
+                'naive ORM copy': timed(orm, args.repeat),
+            }
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f'Copying a board with {args.cards} cards ({args.repeat} runs)')
+    for name, samples in results.items():
+        print(f'  {name:<16} median {statistics.median(samples) * 1000:9.1f} ms'
+              f'   min {min(samples) * 1000:9.1f} ms')
+
+if __name__ == '__main__':
+    main()
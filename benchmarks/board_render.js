@@ -0,0 +1,231 @@
+// Render-time benchmark for static/js/board_render.js, run under Node with a
+// stub DOM that counts mutations.
+//
+//     node benchmarks/board_render.js --lists 8 --cards 2000 --long 10000 --rounds 20
+//
+// "full" renders the board into an empty container, which is what every
+// loadBoard() cost before keyed rendering. The other cases patch an already
+// rendered board, and each one is checked against a full render of the same
+// state. The last section drives one windowed column of --long cards:
+// scrolling it, and placing the drop indicator the way each dragover does.
+
+class Node {
+    constructor(tag) {
+        this.tagName = tag;
+        this.parentNode = null;
+        this.firstChild = this.lastChild = null;
+        this.previousSibling = this.nextSibling = null;
+        this.attributes = {};
+        this.dataset = {};
+        this.className = '';
+        this.text = '';
+        this.scrollTop = 0;
+    }
+
+    set textContent(value) {
+        while (this.firstChild) this.removeChild(this.firstChild);
+        this.text = String(value);
+        stats.mutations++;
+    }
+
+    setAttribute(name, value) {
+        this.attributes[name] = String(value);
+    }
+
+    appendChild(child) {
+        return this.insertBefore(child, null);
+    }
+
+    insertBefore(child, ref) {
+        if (child.parentNode) child.parentNode.removeChild(child, false);
+        child.parentNode = this;
+        child.nextSibling = ref;
+        child.previousSibling = ref ? ref.previousSibling : this.lastChild;
+        if (child.previousSibling) child.previousSibling.nextSibling = child; else this.firstChild = child;
+        if (ref) ref.previousSibling = child; else this.lastChild = child;
+        stats.mutations++;
+        return child;
+    }
+
+    removeChild(child, count = true) {
+        if (child.previousSibling) child.previousSibling.nextSibling = child.nextSibling; else this.firstChild = child.nextSibling;
+        if (child.nextSibling) child.nextSibling.previousSibling = child.previousSibling; else this.lastChild = child.previousSibling;
+        child.parentNode = child.previousSibling = child.nextSibling = null;
+        if (count) stats.mutations++;
+        return child;
+    }
+
+    serialize() {
+        let out = `<${this.tagName} ${this.className} ${JSON.stringify(this.dataset)} ${JSON.stringify(this.attributes)}>${this.text}`;
+        for (let child = this.firstChild; child; child = child.nextSibling) out += child.serialize();
+        return out + `</${this.tagName}>`;
+    }
+}
+
+const stats = { mutations: 0 };
+global.document = { createElement: tag => new Node(tag) };
+
+const { createBoardRenderer } = require('../static/js/board_render.js');
+
+// A 600px tall column, and cards as tall as the renderer guesses, so a
+// patched board and a fresh one agree on every offset
+const OPTIONS = {
+    viewport: container => ({ top: container.scrollTop, height: 600 }),
+    measure: el => (el.firstChild.nextSibling ? 76 : 48),
+};
+const renderer = container => createBoardRenderer(container, OPTIONS);
+
+function option(name, fallback) {
+    const index = process.argv.indexOf(`--${name}`);
+    return index === -1 ? fallback : Number(process.argv[index + 1]);
+}
+
+function syntheticBoard(listCount, cardCount) {
+    const lists = [];
+    let id = 0;
+    for (let l = 0; l < listCount; l++) {
+        lists.push({ id: l + 1, title: `List ${l}`, cards: [], next_cursor: null });
+    }
+    for (let c = 0; c < cardCount; c++) {
+        id++;
+        lists[c % listCount].cards.push({
+            id,
+            title: `Card ${id} with a reasonably long title`,
+            due_date: c % 3 === 0 ? new Date(Date.UTC(2024, c % 12, 1 + (c % 28))).toISOString() : null,
+            completed: c % 5 === 0,
+            assignee_ids: c % 4 === 0 ? [1, 2] : [],
+            attachment_count: c % 10 === 0 ? 1 : 0,
+            checklist_total: c % 2 === 0 ? 4 : 0,
+            checklist_done: c % 2 === 0 ? c % 5 : 0,
+        });
+    }
+    return lists;
+}
+
+const clone = lists => JSON.parse(JSON.stringify(lists));
+
+function measure(rounds, prepare, run) {
+    const times = [];
+    let mutations = 0;
+    for (let i = 0; i < rounds; i++) {
+        const state = prepare(i);
+        stats.mutations = 0;
+        const start = process.hrtime.bigint();
+        run(state);
+        times.push(Number(process.hrtime.bigint() - start) / 1e6);
+        mutations = stats.mutations;
+    }
+    times.sort((a, b) => a - b);
+    return { median: times[Math.floor(times.length / 2)], fastest: times[0], mutations };
+}
+
+function fresh(lists, scrollTop = 0) {
+    const container = new Node('div');
+    const board = renderer(container);
+    board.render(lists);
+    if (scrollTop) {
+        board.listElements.get(lists[0].id).parts.cards.scrollTop = scrollTop;
+        board.scrollList(lists[0].id);
+    }
+    return container.serialize();
+}
+
+// Patch cases: each turns the board state into the next one
+const CASES = {
+    'badge change': (lists, i) => {
+        const card = lists[i % lists.length].cards[0];
+        card.checklist_done = (card.checklist_done + 1) % 5;
+        card.checklist_total = 5;
+    },
+    'card moved': (lists, i) => {
+        const from = lists[i % lists.length];
+        const to = lists[(i + 1) % lists.length];
+        to.cards.splice(1, 0, from.cards.shift());
+    },
+    'card reordered': (lists, i) => {
+        const cards = lists[i % lists.length].cards;
+        cards.splice(10, 0, cards.shift());
+    },
+    'page appended': (lists, i) => {
+        const list = lists[i % lists.length];
+        const start = 1e6 + i * 50;
+        for (let c = 0; c < 50; c++) {
+            list.cards.push({ id: start + c, title: `Paged card ${c}`, assignee_ids: [], attachment_count: 0,
+                              checklist_total: 0, checklist_done: 0 });
+        }
+    },
+    'unchanged reload': () => {},
+};
+
+function main() {
+    const listCount = option('lists', 8);
+    const cardCount = option('cards', 2000);
+    const rounds = option('rounds', 20);
+    const board = syntheticBoard(listCount, cardCount);
+
+    console.log(`${listCount} lists, ${cardCount} cards, ${rounds} rounds`);
+    console.log(`  ${'case'.padEnd(18)} ${'median'.padStart(9)} ${'fastest'.padStart(9)} ${'DOM mutations'.padStart(14)}`);
+
+    report('full', measure(rounds, () => clone(board), lists => renderer(new Node('div')).render(lists)));
+
+    for (const [name, change] of Object.entries(CASES)) {
+        let container, rendered, lists;
+        const result = measure(rounds, i => {
+            container = new Node('div');
+            rendered = renderer(container);
+            lists = clone(board);
+            rendered.render(lists);
+            lists = clone(lists);
+            change(lists, i);
+            return lists;
+        }, next => rendered.render(next));
+        if (container.serialize() !== fresh(lists)) {
+            throw new Error(`${name}: patched DOM differs from a full render`);
+        }
+        report(name, result);
+    }
+
+    longColumn(option('long', 10000), rounds);
+}
+
+function longColumn(cardCount, rounds) {
+    const lists = syntheticBoard(1, cardCount);
+    const listId = lists[0].id;
+    console.log(`one column of ${cardCount} cards`);
+
+    let container, column;
+    const mount = () => {
+        container = new Node('div');
+        column = renderer(container);
+        column.render(lists);
+        return column.listElements.get(listId).parts.cards;
+    };
+    report('full', measure(rounds, () => null, mount));
+
+    let scrollTop = 0;
+    const scroll = measure(rounds, i => {
+        const cards = mount();
+        scrollTop = (i + 1) * 997;
+        cards.scrollTop = scrollTop;
+        return cards;
+    }, () => column.scrollList(listId));
+    if (container.serialize() !== fresh(lists, scrollTop)) {
+        throw new Error('scroll: patched DOM differs from a full render');
+    }
+    report('scroll', scroll);
+
+    mount();
+    const height = column.listElements.get(listId).offsets[cardCount];
+    report('1000 dragovers', measure(rounds, () => null, () => {
+        for (let y = 0; y < height; y += height / 1000) {
+            column.showDropIndicator(listId, column.dropIndex(listId, y));
+        }
+    }));
+}
+
+function report(name, result) {
+    console.log(`  ${name.padEnd(18)} ${result.median.toFixed(3).padStart(8)}ms ${result.fastest.toFixed(3).padStart(8)}ms ` +
+                `${String(result.mutations).padStart(14)}`);
+}
+
+main();
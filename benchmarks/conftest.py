@@ -0,0 +1,103 @@
+import os
+import pytest
+from benchmarks import harness
+from benchmarks.datagen import PASSWORD, generate, make_config
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-scale', default='small', help='datagen scale: tiny, small, medium or large')
+    group.addoption('--bench-seed', type=int, default=0)
+    group.addoption('--bench-baseline', default=BASELINE_PATH, help='baseline file to compare against')
+    group.addoption('--bench-save', default=None, help='write this run to a baseline file')
+    group.addoption('--bench-threshold', type=float, default=0.25,
+                    help='slowdown (0.25 = 25%%) that counts as a regression')
+    group.addoption('--bench-fail', action='store_true', help='exit non-zero on regressions')
+
+def _option(config, name, default=None):
+    # Options are only registered when benchmarks/ is the rootdir
+    try:
+        return config.getoption(name)
+    except ValueError:
+        return default
+
+_results = []
+
+@pytest.fixture(scope='session')
+def bench_env(tmp_path_factory, pytestconfig):
+    """An app on a SQLite file seeded with the synthetic dataset"""
+    from app import create_app
+    from models import db
+
+    db_path = tmp_path_factory.mktemp('bench') / 'bench.db'
+    app = create_app(make_config(str(db_path)))
+    with app.app_context():
+        data = generate(_option(pytestconfig, '--bench-seed', 0), _option(pytestconfig, '--bench-scale', 'small'))
+    yield app, data
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture(scope='session')
+def dataset(bench_env):
+    return bench_env[1]
+
+@pytest.fixture(scope='session')
+def client_for(bench_env):
+    """Logged-in test clients, one per user, created on first use"""
+    app, data = bench_env
+    clients = {}
+
+    def get(user_id):
+        if user_id not in clients:
+            client = app.test_client()
+            response = client.post('/auth/login', json={'username': data.username(user_id), 'password': PASSWORD})
+            assert response.status_code == 200
+            clients[user_id] = client
+        return clients[user_id]
+    return get
+
+@pytest.fixture(scope='session')
+def owner_client(client_for, dataset):
+    """A client for the owner of the largest board"""
+    return client_for(dataset.board_owner[dataset.largest_board()])
+
+@pytest.fixture
+def benchmark(request):
+    bench = harness.Benchmark(request.node.name)
+    yield bench
+    if bench.result is not None:
+        _results.append(bench.result)
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if not _results:
+        return
+    save_path = _option(config, '--bench-save')
+    if save_path:
+        harness.save(save_path, _results, _option(config, '--bench-scale', 'small'),
+                     _option(config, '--bench-seed', 0))
+
+    baseline = harness.load(_option(config, '--bench-baseline', BASELINE_PATH))
+    lines, regressions = harness.compare(_results, baseline, _option(config, '--bench-threshold', 0.25))
+    config._bench_report = (lines, regressions, baseline)
+    if regressions and _option(config, '--bench-fail', False) and session.exitstatus == 0:
+        session.exitstatus = 1
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    report = getattr(config, '_bench_report', None)
+    if report is None:
+        return
+    lines, regressions, baseline = report
+    terminalreporter.section('benchmarks')
+    if baseline is None:
+        terminalreporter.write_line('No baseline file; run with --bench-save benchmarks/baselines.json to create one')
+    elif baseline.get('scale') != _option(config, '--bench-scale', 'small'):
+        terminalreporter.write_line(f"Baseline was recorded at scale {baseline.get('scale')}; timings will not compare")
+    elif baseline.get('environment') != harness.environment():
+        terminalreporter.write_line(f"Baseline recorded on {baseline.get('environment')}; timings may not compare")
+    for line in lines:
+        terminalreporter.write_line(line)
+    if regressions:
+        terminalreporter.write_line(f'{len(regressions)} benchmark(s) regressed: {", ".join(regressions)}')
@@ -0,0 +1,113 @@
+"""Benchmark concurrent read-modify-write cycles on a few hot cards.
+
+Each client loops: read a card, increment the counter kept in its
+description, write it back after `--think` ms (client latency, an
+edit in progress). The same workload runs three ways:
+
+- blind: PUT without a version, last writer wins (updates get lost)
+- locked: a lock per card held from the read to the write, as a
+  pessimistic lock across the request would be
+- optimistic: PUT with expected_version, retrying from the 409 body
+
+    python -m benchmarks.contention --clients 8 --cards 8 --think 50 --duration 10
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+from benchmarks.datagen import generate, make_config
+from benchmarks.load import Client, percentile, serve
+
+MODES = ('blind', 'locked', 'optimistic')
+
+def increment(client, card_id, mode, locks, think):
+    """One read-modify-write; returns how many 409s it took"""
+    if mode == 'locked':
+        with locks[card_id]:
+            return increment(client, card_id, 'blind', locks, think)
+
+    card = client.request('GET', f'/api/cards/{card_id}')
+    time.sleep(think)
+    conflicts = 0
+    while True:
+        body = {'description': str(int(card['description']) + 1)}
+        if mode == 'optimistic':
+            body['expected_version'] = card['version']
+        try:
+            client.request('PUT', f'/api/cards/{card_id}', body)
+            return conflicts
+        except urllib.error.HTTPError as e:
+            if e.code != 409:
+                raise
+            conflicts += 1
+            card = json.loads(e.read())['current']
+
+def run(mode, clients, cards, duration, scale, think):
+    from app import create_app
+    from models import db, Card
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, 'contention.db')))
+        with app.app_context():
+            data = generate(0, scale)
+            board_id = data.largest_board()
+            card_ids = [card_id for list_id in data.list_ids[board_id] for card_id in data.card_ids[list_id]][:cards]
+            db.session.execute(db.update(Card).where(Card.id.in_(card_ids)).values(description='0'))
+            db.session.commit()
+        server, base_url = serve(app)
+
+        members = data.board_members[board_id]
+        workers = [Client(base_url, data.username(members[i % len(members)]), None) for i in range(clients)]
+        for worker in workers:
+            worker.login_only()
+
+        locks = {card_id: threading.Lock() for card_id in card_ids}
+        latencies, conflicts, lock = [], [0], threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def drive(worker, offset):
+            i = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                retried = increment(worker, card_ids[i % len(card_ids)], mode, locks, think)
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+                    conflicts[0] += retried
+                i += 1
+
+        threads = [threading.Thread(target=drive, args=(worker, i)) for i, worker in enumerate(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server.shutdown()
+
+        with app.app_context():
+            total = sum(int(card.description) for card in Card.query.filter(Card.id.in_(card_ids)))
+
+    return latencies, conflicts[0], len(latencies) - total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--cards', type=int, default=8, help='hot cards shared by all clients')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--think', type=float, default=50, help='ms between reading a card and writing it')
+    parser.add_argument('--scale', default='tiny')
+    parser.add_argument('--mode', choices=MODES, action='append', help='default: all of them')
+    args = parser.parse_args(argv)
+
+    print(f'{args.clients} clients incrementing {args.cards} card(s) for {args.duration:.0f}s, '
+          f'{args.think:.0f}ms between read and write')
+    for mode in args.mode or MODES:
+        latencies, conflicts, lost = run(mode, args.clients, args.cards, args.duration, args.scale, args.think / 1000)
+        print(f'  {mode:<10} {len(latencies) / args.duration:7.1f} increments/s'
+              f'   p50 {statistics.median(latencies) * 1000:7.1f}ms   p95 {percentile(latencies, 0.95) * 1000:7.1f}ms'
+              f'   409s {conflicts:5d}   lost {lost}')
+
+if __name__ == '__main__':
+    main()
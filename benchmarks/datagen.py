@@ -0,0 +1,175 @@
+"""Deterministic synthetic data for benchmarks and load tests.
+
+The same seed and scale always produce the same rows with the same ids, so
+benchmark runs on different branches measure the same workload.
+
+    python -m benchmarks.datagen --db /tmp/bench.db --scale medium
+"""
+import argparse
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+
+# Every generated user logs in with this password
+PASSWORD = 'benchpass'
+
+# Fixed clock so timestamps do not depend on when the data was generated
+EPOCH = datetime(2024, 1, 1, 9, 0, 0)
+
+SCALES = {
+    'tiny': dict(users=5, boards=3, lists_per_board=4, cards_per_list=10, activities_per_board=20),
+    'small': dict(users=20, boards=10, lists_per_board=5, cards_per_list=40, activities_per_board=100),
+    'medium': dict(users=200, boards=100, lists_per_board=6, cards_per_list=80, activities_per_board=300),
+    'large': dict(users=1000, boards=500, lists_per_board=8, cards_per_list=150, activities_per_board=500),
+}
+
+WORDS = ('design', 'review', 'deploy', 'fix', 'spec', 'api', 'login', 'search', 'report', 'invoice',
+         'mobile', 'cache', 'export', 'billing', 'onboarding', 'metrics', 'docs', 'release', 'audit', 'sync')
+
+ACTIONS = (('created', 'card'), ('updated', 'card'), ('moved', 'card'), ('assigned', 'card'),
+           ('created', 'list'), ('updated', 'board'))
+
+@dataclass
+class Dataset:
+    """Ids of the generated rows, for picking benchmark targets"""
+    seed: int
+    scale: str
+    user_ids: list = field(default_factory=list)
+    board_ids: list = field(default_factory=list)
+    board_owner: dict = field(default_factory=dict)  # board id -> owner id
+    board_members: dict = field(default_factory=dict)  # board id -> member ids, owner included
+    list_ids: dict = field(default_factory=dict)  # board id -> list ids
+    card_ids: dict = field(default_factory=dict)  # list id -> card ids
+    counts: dict = field(default_factory=dict)
+
+    def username(self, user_id):
+        return f'user{user_id}'
+
+    def largest_board(self):
+        return max(self.board_ids, key=lambda b: sum(len(self.card_ids[l]) for l in self.list_ids[b]))
+
+def _title(rng, words=3):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+def generate(seed=0, scale='small', **overrides):
+    """Insert a synthetic workspace into the current app's database
+
+    Rows are written with explicit ids through executemany, one statement per
+    table and chunk, so even the large scale loads in seconds. Expects an
+    empty database. Returns a Dataset describing what was created.
+    """
+    import card_counters
+    from models import (db, User, Board, BoardMember, List, Card, CardAssignment,
+                        ChecklistItem, Attachment, Activity)
+
+    params = dict(SCALES[scale], **overrides)
+    rng = random.Random(seed)
+    data = Dataset(seed=seed, scale=scale)
+    rows = {name: [] for name in ('users', 'boards', 'members', 'lists', 'cards',
+                                  'assignments', 'checklists', 'attachments', 'activities')}
+
+    # One hash for everyone: scrypt per user would dominate generation time
+    password_hash = generate_password_hash(PASSWORD)
+    for user_id in range(1, params['users'] + 1):
+        rows['users'].append({'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+                              'password_hash': password_hash, 'created_at': EPOCH})
+        data.user_ids.append(user_id)
+
+    list_id = card_id = 0
+    for board_id in range(1, params['boards'] + 1):
+        owner_id = data.user_ids[(board_id - 1) % len(data.user_ids)]
+        created = EPOCH + timedelta(days=board_id)
+        rows['boards'].append({'id': board_id, 'title': f'{_title(rng, 2)} board', 'description': _title(rng, 8),
+                               'owner_id': owner_id, 'is_template': False, 'created_at': created,
+                               'updated_at': created,
+                               'last_activity_at': created + timedelta(minutes=max(params['activities_per_board'] - 1, 0))})
+        others = [u for u in data.user_ids if u != owner_id]
+        members = rng.sample(others, min(len(others), rng.randint(2, 6)))
+        for user_id in members:
+            rows['members'].append({'board_id': board_id, 'user_id': user_id, 'role': 'member', 'joined_at': created})
+        data.board_ids.append(board_id)
+        data.board_owner[board_id] = owner_id
+        data.board_members[board_id] = [owner_id] + members
+        data.list_ids[board_id] = []
+
+        for position in range(params['lists_per_board']):
+            list_id += 1
+            rows['lists'].append({'id': list_id, 'title': _title(rng, 1), 'board_id': board_id,
+                                  'position': position, 'created_at': created})
+            data.list_ids[board_id].append(list_id)
+            data.card_ids[list_id] = []
+
+            for card_position in range(params['cards_per_list']):
+                card_id += 1
+                card_created = created + timedelta(minutes=card_id)
+                due = EPOCH + timedelta(days=rng.randint(0, 365)) if rng.random() < 0.4 else None
+                rows['cards'].append({'id': card_id, 'title': _title(rng), 'description': _title(rng, 20),
+                                      'list_id': list_id, 'position': card_position, 'due_date': due,
+                                      'completed': rng.random() < 0.3, 'created_at': card_created,
+                                      'updated_at': card_created})
+                data.card_ids[list_id].append(card_id)
+
+                for user_id in rng.sample(data.board_members[board_id], rng.randint(0, 2)):
+                    rows['assignments'].append({'card_id': card_id, 'user_id': user_id, 'assigned_at': card_created})
+                for item_position in range(rng.choice((0, 0, 2, 3, 5))):
+                    rows['checklists'].append({'card_id': card_id, 'title': _title(rng, 2),
+                                               'completed': rng.random() < 0.5, 'position': item_position,
+                                               'created_at': card_created})
+                if rng.random() < 0.1:
+                    rows['attachments'].append({'card_id': card_id, 'filename': f'{rng.choice(WORDS)}.pdf',
+                                                'filepath': f'bench_{card_id}.pdf',
+                                                'file_size': rng.randint(1000, 500000),
+                                                'uploaded_at': card_created})
+
+        for i in range(params['activities_per_board']):
+            action, entity_type = rng.choice(ACTIONS)
+            rows['activities'].append({'board_id': board_id, 'user_id': rng.choice(data.board_members[board_id]),
+                                       'action': action, 'entity_type': entity_type,
+                                       'entity_id': rng.randint(1, max(card_id, 1)),
+                                       'description': f'{action} {entity_type} {_title(rng, 2)}',
+                                       'created_at': created + timedelta(minutes=i)})
+
+    tables = (('users', User), ('boards', Board), ('members', BoardMember), ('lists', List), ('cards', Card),
+              ('assignments', CardAssignment), ('checklists', ChecklistItem), ('attachments', Attachment),
+              ('activities', Activity))
+    for name, model in tables:
+        for start in range(0, len(rows[name]), 5000):
+            db.session.execute(db.insert(model), rows[name][start:start + 5000])
+        data.counts[name] = len(rows[name])
+    db.session.commit()
+    card_counters.repair()
+    return data
+
+def make_config(db_path, base=None):
+    """A config pointing at a SQLite file, with background threads off"""
+    from config import Config
+
+    class BenchConfig(base or Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        TESTING = True
+        PURGE_INTERVAL = 0
+        JOBS_EMBEDDED_WORKERS = 0
+        RUN_JOBS_INLINE = True
+        N_PLUS_ONE_MODE = 'off'
+        AUTO_CREATE_SCHEMA = True
+    return BenchConfig
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', required=True, help='SQLite file to create')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from app import create_app
+
+    app = create_app(make_config(args.db))
+    with app.app_context():
+        data = generate(args.seed, args.scale)
+    print(f'Generated {args.scale} dataset (seed {args.seed}) in {args.db}')
+    for name, count in data.counts.items():
+        print(f'  {name:<12} {count:>9}')
+
+if __name__ == '__main__':
+    main()
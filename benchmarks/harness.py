@@ -0,0 +1,106 @@
+"""Timing, baselines and regression reports for the benchmark suite."""
+import json
+import platform
+import statistics
+import time
+
+class Result:
+    def __init__(self, name, samples):
+        self.name = name
+        self.samples = samples
+
+    @property
+    def median(self):
+        return statistics.median(self.samples)
+
+    @property
+    def minimum(self):
+        return min(self.samples)
+
+    @property
+    def stddev(self):
+        return statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+    def to_dict(self):
+        return {'median': self.median, 'min': self.minimum, 'stddev': self.stddev, 'rounds': len(self.samples)}
+
+class Benchmark:
+    """Callable timer in the style of pytest-benchmark's `benchmark` fixture
+
+    benchmark(fn, *args) runs fn once to warm up, then repeatedly until both
+    `min_rounds` and `min_time` are reached (or `max_time` runs out), and
+    returns the last return value so the test can assert on it. Slow,
+    whole-process benchmarks can lower the rounds and turn off the warm-up.
+    """
+
+    def __init__(self, name, min_rounds=10, min_time=0.5, max_time=5.0, max_rounds=1000, warmup=True):
+        self.name = name
+        self.warmup = warmup
+        self.min_rounds = min_rounds
+        self.min_time = min_time
+        self.max_time = max_time
+        self.max_rounds = max_rounds
+        self.result = None
+
+    def __call__(self, fn, *args, **kwargs):
+        if self.warmup:
+            fn(*args, **kwargs)
+        samples = []
+        started = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            value = fn(*args, **kwargs)
+            samples.append(time.perf_counter() - start)
+
+            elapsed = time.perf_counter() - started
+            if len(samples) >= self.max_rounds or elapsed >= self.max_time:
+                break
+            if len(samples) >= self.min_rounds and elapsed >= self.min_time:
+                break
+        self.result = Result(self.name, samples)
+        return value
+
+def environment():
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'system': platform.system()}
+
+def save(path, results, scale, seed):
+    with open(path, 'w') as f:
+        json.dump({
+            'environment': environment(),
+            'scale': scale,
+            'seed': seed,
+            'results': {r.name: r.to_dict() for r in sorted(results, key=lambda r: r.name)},
+        }, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def compare(results, baseline, threshold):
+    """Return report lines and the names of benchmarks that slowed down past `threshold`
+
+    Runs are compared on their fastest round: noise on a busy machine only
+    ever adds time, so the minimum is far more repeatable than the median.
+    """
+    lines = [f"{'benchmark (fastest round)':<44} {'baseline':>10} {'current':>10} {'change':>8}"]
+    regressions = []
+    known = baseline['results'] if baseline else {}
+    for result in sorted(results, key=lambda r: r.name):
+        current = result.minimum * 1000
+        base = known.get(result.name)
+        if base is None:
+            lines.append(f'{result.name:<44} {"-":>10} {current:>8.2f}ms {"new":>8}')
+            continue
+        change = result.minimum / base['min'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSED'
+            regressions.append(result.name)
+        elif change < -threshold:
+            flag = '  improved'
+        lines.append(f"{result.name:<44} {base['min'] * 1000:>8.2f}ms {current:>8.2f}ms {change:>+7.0%}{flag}")
+    return lines, regressions
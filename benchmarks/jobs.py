@@ -0,0 +1,94 @@
+"""Benchmark the job queue on SQLite in WAL mode.
+
+Measures enqueue throughput (one commit per job, and batched commits) and
+dequeue throughput of a worker pool running a no-op handler, in thread and
+process mode.
+
+    python -m benchmarks.jobs --jobs 2000 --concurrency 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from config import Config
+
+def make_config(db_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        PURGE_INTERVAL = 0
+        JOBS_PRUNE_INTERVAL = 0
+        JOBS_EMBEDDED_WORKERS = 0
+    return BenchConfig
+
+def enqueue_jobs(count, commit_every):
+    import jobs
+    from models import db
+
+    start = time.perf_counter()
+    for i in range(count):
+        jobs.enqueue('bench_noop', {'n': i})
+        if (i + 1) % commit_every == 0:
+            db.session.commit()
+    db.session.commit()
+    return time.perf_counter() - start
+
+def drain(app, concurrency, mode):
+    import jobs
+
+    worker = jobs.Worker(app, concurrency=concurrency, mode=mode, poll_interval=0.01, burst=True)
+    start = time.perf_counter()
+    worker.start()
+    worker.join()
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--batch', type=int, default=100, help='jobs per commit in the batched enqueue run')
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from models import db
+    import jobs
+
+    @jobs.handler('bench_noop')
+    def noop(job_id, n):
+        return None
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, 'bench.db')))
+        with app.app_context():
+            mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+
+            elapsed = enqueue_jobs(args.jobs, 1)
+            rows.append(('enqueue, commit per job', args.jobs, elapsed))
+            db.session.remove()
+
+        for concurrency in (1, args.concurrency):
+            elapsed = drain(app, concurrency, 'thread')
+            rows.append((f'dequeue, {concurrency} thread(s)', args.jobs, elapsed))
+            with app.app_context():
+                enqueue_jobs(args.jobs, args.batch)
+                db.session.remove()
+
+        with app.app_context():
+            # Worker processes are forked; drop pooled connections first
+            db.session.remove()
+            db.engine.dispose()
+        elapsed = drain(app, args.concurrency, 'process')
+        rows.append((f'dequeue, {args.concurrency} process(es)', args.jobs, elapsed))
+
+        with app.app_context():
+            elapsed = enqueue_jobs(args.jobs, args.batch)
+            rows.append((f'enqueue, commit per {args.batch}', args.jobs, elapsed))
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f'Job queue on SQLite (journal_mode={mode})')
+    for name, count, elapsed in rows:
+        print(f'  {name:<28} {count / elapsed:9.0f} jobs/s   ({elapsed * 1000:8.1f} ms for {count})')
+
+if __name__ == '__main__':
+    main()
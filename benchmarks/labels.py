@@ -0,0 +1,129 @@
+"""Benchmark label filters on a large board: bitmask tests vs a card_labels join table.
+
+Builds one board with `--cards` cards spread over `--lists` lists and
+`--labels` labels, each card carrying about `--per-card` of them. The same
+labels are also written to a card_labels(card_id, label_id) table indexed
+both ways, the layout a join-based design would use. Each filter is timed
+as a plain count both ways, then through the query GET
+/api/boards/<id>/cards runs, which pages the first 50 matches of every list.
+
+    python -m benchmarks.labels --cards 1000000 --rounds 5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from benchmarks.datagen import make_config
+
+CHUNK = 50000
+
+# (name, labels required, labels excluded), as label bits
+FILTERS = [
+    ('A', [0], []),
+    ('A and B', [0, 1], []),
+    ('A and B, not C', [0, 1], [2]),
+    ('A, not B or C', [0], [1, 2]),
+]
+
+def populate(db, board_id, list_ids, label_count, per_card, card_count, seed):
+    """Insert the cards, their label masks and the equivalent card_labels rows in chunks"""
+    import labels
+    rng = random.Random(seed)
+    conn = db.session.connection()
+    conn.exec_driver_sql('CREATE TABLE card_labels (card_id INTEGER NOT NULL, label_id INTEGER NOT NULL)')
+    first_id = 1
+    while first_id <= card_count:
+        cards, links = [], []
+        for card_id in range(first_id, min(first_id + CHUNK, card_count + 1)):
+            # Skewed so low bits are common and high ones rare, as real label use is
+            bits = {min(int(rng.expovariate(3 / label_count)), label_count - 1) for _ in range(per_card)}
+            cards.append((card_id, f'Card {card_id}', list_ids[card_id % len(list_ids)], card_id,
+                          labels.mask_of(bits)))
+            links.extend((card_id, bit) for bit in bits)
+        conn.exec_driver_sql(
+            "INSERT INTO cards (id, title, list_id, position, completed, version, checklist_total, checklist_done, "
+            "attachment_count, assignee_ids, label_mask, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 0, 1, 0, 0, 0, '', ?, datetime('now'), datetime('now'))", cards)
+        conn.exec_driver_sql('INSERT INTO card_labels (card_id, label_id) VALUES (?, ?)', links)
+        first_id += CHUNK
+    conn.exec_driver_sql('CREATE INDEX ix_card_labels_label_card ON card_labels (label_id, card_id)')
+    conn.exec_driver_sql('CREATE UNIQUE INDEX ix_card_labels_card_label ON card_labels (card_id, label_id)')
+    conn.exec_driver_sql('ANALYZE')
+    db.session.commit()
+
+def join_count(db, board_id, wanted, unwanted):
+    """Count the matches through card_labels, one EXISTS per label"""
+    clauses = [f'EXISTS (SELECT 1 FROM card_labels l WHERE l.card_id = c.id AND l.label_id = {bit})'
+               for bit in wanted]
+    clauses += [f'NOT EXISTS (SELECT 1 FROM card_labels l WHERE l.card_id = c.id AND l.label_id = {bit})'
+                for bit in unwanted]
+    return db.session.execute(db.text(
+        'SELECT count(*) FROM cards c JOIN lists ON lists.id = c.list_id '
+        f"WHERE lists.board_id = {board_id} AND c.archived_at IS NULL AND c.deleted_at IS NULL AND "
+        + ' AND '.join(clauses)
+    )).scalar()
+
+def mask_count(db, board_id, filters):
+    """Count the matches with the bitmask conditions the endpoint uses"""
+    import card_filters
+    from models import Card, List
+    return db.session.execute(
+        db.select(db.func.count(Card.id)).join(List, List.id == Card.list_id)
+        .where(*card_filters.conditions(board_id, filters))
+    ).scalar()
+
+def timed(rounds, run):
+    """Median seconds of `rounds` calls, and the last result"""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=1000000)
+    parser.add_argument('--lists', type=int, default=20)
+    parser.add_argument('--labels', type=int, default=32)
+    parser.add_argument('--per-card', type=int, default=3, help='label draws per card (duplicates collapse)')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from models import db, User, Board, List, Label
+    import card_filters
+    import labels
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, 'labels.db')))
+        with app.app_context():
+            user = User(username='labels', email='labels@example.com', password_hash='-')
+            board = Board(title='Labels', owner=user)
+            db.session.add_all([user, board] + [Label(board=board, name=f'label {bit}', bit=bit)
+                                                for bit in range(args.labels)])
+            lists = [List(title=f'List {i}', board=board, position=i) for i in range(args.lists)]
+            db.session.add_all(lists)
+            db.session.commit()
+
+            start = time.perf_counter()
+            populate(db, board.id, [lst.id for lst in lists], args.labels, args.per_card, args.cards, args.seed)
+            print(f'{args.cards} cards, {args.lists} lists, {args.labels} labels, '
+                  f'built in {time.perf_counter() - start:.1f}s')
+            print(f"  {'filter':<16} {'matches':>9} {'join count':>11} {'mask count':>11} {'endpoint':>9}")
+
+            for name, wanted, unwanted in FILTERS:
+                filters = {'labels': (labels.mask_of(wanted), labels.mask_of(unwanted))}
+                join_time, join_matches = timed(args.rounds, lambda: join_count(db, board.id, wanted, unwanted))
+                mask_time, mask_matches = timed(args.rounds, lambda: mask_count(db, board.id, filters))
+                page_time, _ = timed(args.rounds, lambda: card_filters.matching_cards(board.id, filters, 50))
+                db.session.rollback()
+                assert join_matches == mask_matches, (name, join_matches, mask_matches)
+                print(f'  {name:<16} {mask_matches:>9} {join_time * 1000:>9.0f}ms {mask_time * 1000:>9.0f}ms '
+                      f'{page_time * 1000:>7.0f}ms')
+
+if __name__ == '__main__':
+    main()
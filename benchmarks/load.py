@@ -0,0 +1,199 @@
+"""Multi-client load driver with a mixed, board-heavy workload.
+
+Without --url it generates a dataset into a temporary SQLite file and serves
+the app on a local threaded server. Each client logs in as a different
+generated user and picks operations by weight until the duration is up.
+
+    python -m benchmarks.load --clients 8 --duration 30 --scale small
+    python -m benchmarks.load --url http://127.0.0.1:5000 --clients 8   # against a running server seeded by datagen
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from benchmarks.datagen import PASSWORD, SCALES, generate, make_config
+
+# (operation, weight): reads dominate, as on a real board
+WORKLOAD = (
+    ('list_boards', 15),
+    ('get_board', 25),
+    ('get_board_paged', 10),
+    ('list_cards_page', 5),
+    ('my_tasks', 8),
+    ('calendar', 4),
+    ('activities', 5),
+    ('create_card', 8),
+    ('update_card', 8),
+    ('move_card', 4),
+    ('add_checklist_item', 4),
+    ('toggle_checklist_item', 4),
+)
+
+class Client:
+    def __init__(self, base_url, username, rng):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.rng = rng
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.boards = {}  # board id -> {list id: [card ids]}
+        self.checklist_items = []  # (card id, item id)
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        with self.opener.open(req, timeout=30) as response:
+            payload = response.read()
+        return json.loads(payload) if payload else None
+
+    def login_only(self):
+        self.request('POST', '/auth/login', {'username': self.username, 'password': PASSWORD})
+
+    def login(self):
+        self.login_only()
+        for board in self.request('GET', '/api/boards'):
+            detail = self.request('GET', f"/api/boards/{board['id']}?card_limit=50")
+            self.boards[board['id']] = {lst['id']: [c['id'] for c in lst['cards']] for lst in detail['lists']}
+        self.boards = {board_id: lists for board_id, lists in self.boards.items() if lists}
+
+    def _pick(self):
+        board_id = self.rng.choice(list(self.boards))
+        lists = self.boards[board_id]
+        list_id = self.rng.choice(list(lists))
+        return board_id, list_id, lists[list_id]
+
+    def run(self, operation):
+        board_id, list_id, card_ids = self._pick()
+        card_id = self.rng.choice(card_ids) if card_ids else None
+
+        if operation == 'list_boards':
+            self.request('GET', '/api/boards')
+        elif operation == 'get_board':
+            self.request('GET', f'/api/boards/{board_id}')
+        elif operation == 'get_board_paged':
+            self.request('GET', f'/api/boards/{board_id}?card_limit=20')
+        elif operation == 'list_cards_page':
+            self.request('GET', f'/api/lists/{list_id}/cards?limit=50')
+        elif operation == 'my_tasks':
+            self.request('GET', '/api/users/me/tasks')
+        elif operation == 'calendar':
+            self.request('GET', f'/api/users/me/calendar?month={self.rng.randint(1, 12)}&year=2024')
+        elif operation == 'activities':
+            self.request('GET', f'/api/boards/{board_id}/activities')
+        elif operation == 'create_card':
+            card = self.request('POST', '/api/cards', {'title': 'Load test card', 'list_id': list_id})
+            card_ids.append(card['id'])
+        elif operation == 'update_card' and card_id:
+            self.request('PUT', f'/api/cards/{card_id}', {'description': f'Edited at {time.time():.0f}'})
+        elif operation == 'move_card' and card_id:
+            target = self.rng.choice(list(self.boards[board_id]))
+            self.request('PUT', f'/api/cards/{card_id}', {'list_id': target})
+            if target != list_id:
+                card_ids.remove(card_id)
+                self.boards[board_id][target].append(card_id)
+        elif operation == 'add_checklist_item' and card_id:
+            item = self.request('POST', f'/api/cards/{card_id}/checklist', {'title': 'Load test step'})
+            self.checklist_items.append((card_id, item['id']))
+        elif operation == 'toggle_checklist_item' and self.checklist_items:
+            item_card_id, item_id = self.rng.choice(self.checklist_items)
+            self.request('PUT', f'/api/cards/{item_card_id}/checklist/{item_id}',
+                         {'completed': self.rng.random() < 0.5})
+        else:
+            return None
+        return operation
+
+def drive(client, deadline, samples, errors, lock):
+    operations = [name for name, _ in WORKLOAD]
+    weights = [weight for _, weight in WORKLOAD]
+    while time.perf_counter() < deadline:
+        operation = client.rng.choices(operations, weights)[0]
+        start = time.perf_counter()
+        try:
+            done = client.run(operation)
+        except (urllib.error.URLError, OSError, ValueError, KeyError) as e:
+            with lock:
+                errors[operation] = errors.get(operation, 0) + 1
+                if errors[operation] == 1:
+                    print(f'  {operation} failed: {e}')
+            continue
+        if done:
+            with lock:
+                samples.setdefault(done, []).append(time.perf_counter() - start)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def report(samples, errors, elapsed, clients):
+    total = sum(len(v) for v in samples.values())
+    print(f'{clients} clients, {elapsed:.1f}s: {total} requests, {total / elapsed:.1f} req/s, '
+          f'{sum(errors.values())} errors')
+    print(f"  {'operation':<24} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, _ in WORKLOAD:
+        values = samples.get(name)
+        if not values:
+            continue
+        print(f'  {name:<24} {len(values):>7} {statistics.median(values) * 1000:>7.1f}ms '
+              f'{percentile(values, 0.95) * 1000:>7.1f}ms {percentile(values, 0.99) * 1000:>7.1f}ms')
+
+def serve(app):
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='target a running server instead of starting one')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help='seconds')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            base_url = args.url
+            user_count = SCALES[args.scale]['users']
+        else:
+            from app import create_app
+
+            app = create_app(make_config(os.path.join(tmp, 'load.db')))
+            with app.app_context():
+                user_count = len(generate(args.seed, args.scale).user_ids)
+            server, base_url = serve(app)
+
+        users = rng.sample(range(1, user_count + 1), min(args.clients, user_count))
+        clients = [Client(base_url, f'user{user_id}', random.Random(args.seed + user_id)) for user_id in users]
+        for client in clients:
+            client.login()
+        clients = [client for client in clients if client.boards]
+
+        samples, errors, lock = {}, {}, threading.Lock()
+        start = time.perf_counter()
+        deadline = start + args.duration
+        threads = [threading.Thread(target=drive, args=(client, deadline, samples, errors, lock))
+                   for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report(samples, errors, time.perf_counter() - start, len(clients))
+
+        if server is not None:
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
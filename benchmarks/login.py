@@ -0,0 +1,89 @@
+"""Benchmark login throughput under concurrency, and what a login burst does to board reads.
+
+Runs the same burst with hashing on the request threads and in the process
+pool: `--clients` threads log in repeatedly while one reader keeps loading
+a board.
+
+    python -m benchmarks.login --clients 16 --duration 10 --workers 2
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from benchmarks.datagen import generate, make_config
+from benchmarks.load import Client, percentile, serve
+
+def run(mode_workers, clients, duration, scale):
+    from app import create_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class LoginConfig(make_config(os.path.join(tmp, 'login.db'))):
+            PASSWORD_HASH_WORKERS = mode_workers
+            PASSWORD_HASH_QUEUE = clients
+            LOGIN_MAX_ATTEMPTS = 10 ** 9
+            LOGIN_MAX_ATTEMPTS_PER_IP = 10 ** 9
+
+        app = create_app(LoginConfig)
+        with app.app_context():
+            data = generate(0, scale)
+        server, base_url = serve(app)
+
+        reader = Client(base_url, data.username(data.board_owner[data.largest_board()]), None)
+        reader.login()
+        board_id = data.largest_board()
+
+        logins, reads, busy = [], [], [0]
+        deadline = time.perf_counter() + duration
+
+        def log_in(user_id):
+            client = Client(base_url, data.username(user_id), None)
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    client.login_only()
+                except Exception:
+                    busy[0] += 1
+                    continue
+                logins.append(time.perf_counter() - start)
+
+        def read():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                reader.request('GET', f'/api/boards/{board_id}?card_limit=20')
+                reads.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=log_in, args=(data.user_ids[i % len(data.user_ids)],))
+                   for i in range(clients)]
+        threads.append(threading.Thread(target=read))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server.shutdown()
+
+        import passwords
+        passwords._pool.shutdown()
+
+    return logins, reads, busy[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=2, help='process pool size for the pooled run')
+    parser.add_argument('--scale', default='tiny')
+    args = parser.parse_args(argv)
+
+    print(f'{args.clients} clients logging in for {args.duration:.0f}s on {os.cpu_count()} CPU(s)')
+    for label, workers in (('request thread', 0), (f'pool of {args.workers}', args.workers)):
+        logins, reads, rejected = run(workers, args.clients, args.duration, args.scale)
+        print(f'  hashing on {label}:')
+        print(f'    logins      {len(logins) / args.duration:7.1f}/s   p50 {statistics.median(logins) * 1000:7.1f}ms'
+              f'   p95 {percentile(logins, 0.95) * 1000:7.1f}ms   rejected {rejected}')
+        print(f'    board reads {len(reads) / args.duration:7.1f}/s   p50 {statistics.median(reads) * 1000:7.1f}ms'
+              f'   p95 {percentile(reads, 0.95) * 1000:7.1f}ms')
+
+if __name__ == '__main__':
+    main()
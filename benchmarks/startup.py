@@ -0,0 +1,108 @@
+"""Measure cold start: interpreter + imports + create_app + warm-up, then the first request.
+
+Each round runs in a fresh interpreter against a prepared SQLite file, so
+module caches and the page cache of .pyc files are the only things shared.
+With --gunicorn it also times `gunicorn -c gunicorn.conf.py wsgi:app`
+from launch until /readyz answers.
+
+    python -m benchmarks.startup --rounds 10 --target-ms 1500
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter
+CHILD = """
+import json, time
+started = time.perf_counter()
+import wsgi
+loaded = time.perf_counter()
+client = wsgi.app.test_client()
+assert client.get('/readyz').status_code == 200
+assert client.get('/auth/login').status_code == 200
+done = time.perf_counter()
+print(json.dumps({"load": loaded - started, "first_request": done - loaded}))
+"""
+
+def _env(db_path):
+    return dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', PYTHONPATH=ROOT)
+
+def cold_start(db_path):
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=_env(db_path),
+                            capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - started
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings['total'] = total
+    return timings
+
+def gunicorn_start(db_path):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    env = dict(_env(db_path), PORT=str(port), HOST='127.0.0.1', GUNICORN_ACCESS_LOG='/dev/null')
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    try:
+        while time.perf_counter() - started < 60:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/readyz', timeout=5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError('gunicorn did not become ready')
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--target-ms', type=float, default=1500,
+                        help='fail if the median cold start plus first request exceeds this')
+    parser.add_argument('--gunicorn', action='store_true', help='also time a gunicorn launch until ready')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'startup.db')
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'init-db'], cwd=ROOT, env=_env(db_path),
+                       check=True, capture_output=True)
+
+        cold_start(db_path)  # warm the .pyc and page caches once
+        rounds = [cold_start(db_path) for _ in range(args.rounds)]
+        print(f'Cold start over {args.rounds} rounds (median / min):')
+        for key, label in (('load', 'imports + create_app + warm-up'), ('first_request', 'first requests'),
+                           ('total', 'process start to first response')):
+            values = [r[key] * 1000 for r in rounds]
+            print(f'  {label:<34} {statistics.median(values):8.1f}ms {min(values):8.1f}ms')
+
+        if args.gunicorn:
+            if shutil.which('gunicorn') is None:
+                print('  gunicorn is not installed; skipping')
+            else:
+                launches = [gunicorn_start(db_path) * 1000 for _ in range(max(1, args.rounds // 3))]
+                print(f"  {'gunicorn launch until /readyz':<34} {statistics.median(launches):8.1f}ms "
+                      f'{min(launches):8.1f}ms')
+
+        median_total = statistics.median(r['total'] for r in rounds) * 1000
+        if median_total > args.target_ms:
+            print(f'Cold start {median_total:.0f}ms exceeds the {args.target_ms:.0f}ms target')
+            sys.exit(1)
+        print(f'Within the {args.target_ms:.0f}ms target')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+from datetime import datetime
+from models import db, Board, BoardMember, List, Card, CardAssignment, ChecklistItem, Label
+
+def _reserve_ids(model):
+    """Return the id after which new rows of `model` can be numbered
+
+    Must run after the transaction holds the write lock (SQLite takes it on
+    the first INSERT); on PostgreSQL the table is locked so no concurrent
+    insert can draw an id from the sequence in the meantime.
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(db.text(f'LOCK TABLE {model.__tablename__} IN EXCLUSIVE MODE'))
+    return db.session.execute(db.select(db.func.coalesce(db.func.max(model.id), 0))).scalar()
+
+def _sync_sequence(model):
+    """Move a PostgreSQL id sequence past ids that were assigned explicitly"""
+    if db.session.get_bind().dialect.name != 'postgresql':
+        return
+    table = model.__tablename__
+    db.session.execute(db.text(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+    ))
+
+def _id_map(base, id_column, order_by=None):
+    """Number source rows base+1, base+2, ... in id order"""
+    return (db.literal(base) + db.func.row_number().over(order_by=order_by or id_column)).label('new_id')
+
+def copy_board(source, owner_id, title, as_template=False, include_cards=True, include_assignments=False):
+    """Copy a board's labels, active lists, cards and checklists with INSERT ... SELECT
+
+    New ids are assigned as max(id) + row_number() over the source rows, so
+    every child statement can remap its foreign keys by recomputing the same
+    numbering in a subquery instead of round-tripping ids through Python.
+    Assignments (and the board members they rely on) are copied only when
+    asked for. Nothing is committed; the caller owns the transaction.
+
+    Returns the new board and a dict of row counts.
+    """
+    now = datetime.utcnow()
+    counts = {'lists': 0, 'cards': 0, 'checklist_items': 0, 'assignments': 0}
+
+    board = Board(
+        title=title,
+        description=source.description,
+        owner_id=owner_id,
+        is_template=as_template
+    )
+    db.session.add(board)
+    db.session.flush()
+
+    # Labels keep their bits, so the cards' label masks carry over unchanged
+    db.session.execute(db.insert(Label).from_select(
+        ['board_id', 'name', 'color', 'bit', 'created_at'],
+        db.select(db.literal(board.id), Label.name, Label.color, Label.bit, db.literal(now))
+        .where(Label.board_id == source.id)
+    ))
+
+    list_base = _reserve_ids(List)
+    list_map = db.select(
+        List.id.label('old_id'),
+        _id_map(list_base, List.id)
+    ).where(
+        List.board_id == source.id,
+        List.archived_at.is_(None),
+        List.deleted_at.is_(None)
+    ).subquery('list_map')
+
+    result = db.session.execute(db.insert(List).from_select(
+        ['id', 'title', 'board_id', 'position', 'created_at'],
+        db.select(
+            list_map.c.new_id, List.title, db.literal(board.id), List.position, db.literal(now)
+        ).join(list_map, list_map.c.old_id == List.id)
+    ))
+    counts['lists'] = result.rowcount
+    _sync_sequence(List)
+
+    if include_cards:
+        card_base = _reserve_ids(Card)
+        card_map = db.select(
+            Card.id.label('old_id'),
+            _id_map(card_base, Card.id),
+            list_map.c.new_id.label('new_list_id')
+        ).join(list_map, list_map.c.old_id == Card.list_id)\
+            .where(Card.archived_at.is_(None), Card.deleted_at.is_(None))\
+            .subquery('card_map')
+
+        # Checklists are copied whole and attachments never, so the counters carry over as they are
+        result = db.session.execute(db.insert(Card).from_select(
+            ['id', 'title', 'description', 'list_id', 'position', 'due_date', 'completed',
+             'created_at', 'updated_at', 'checklist_total', 'checklist_done', 'attachment_count', 'assignee_ids',
+             'label_mask'],
+            db.select(
+                card_map.c.new_id, Card.title, Card.description, card_map.c.new_list_id,
+                Card.position, Card.due_date, Card.completed, db.literal(now), db.literal(now),
+                Card.checklist_total, Card.checklist_done, db.literal(0),
+                Card.assignee_ids if include_assignments else db.literal(''),
+                Card.label_mask
+            ).join(card_map, card_map.c.old_id == Card.id)
+        ))
+        counts['cards'] = result.rowcount
+        _sync_sequence(Card)
+
+        result = db.session.execute(db.insert(ChecklistItem).from_select(
+            ['card_id', 'title', 'completed', 'position', 'created_at'],
+            db.select(
+                card_map.c.new_id, ChecklistItem.title, ChecklistItem.completed,
+                ChecklistItem.position, db.literal(now)
+            ).join(card_map, card_map.c.old_id == ChecklistItem.card_id)
+        ))
+        counts['checklist_items'] = result.rowcount
+
+        if include_assignments:
+            db.session.execute(db.insert(BoardMember).from_select(
+                ['board_id', 'user_id', 'role', 'joined_at'],
+                db.select(
+                    db.literal(board.id), BoardMember.user_id, BoardMember.role, db.literal(now)
+                ).where(BoardMember.board_id == source.id, BoardMember.user_id != owner_id)
+            ))
+            if source.owner_id != owner_id:
+                db.session.add(BoardMember(board_id=board.id, user_id=source.owner_id, role='member'))
+
+            result = db.session.execute(db.insert(CardAssignment).from_select(
+                ['card_id', 'user_id', 'assigned_at'],
+                db.select(
+                    card_map.c.new_id, CardAssignment.user_id, db.literal(now)
+                ).join(card_map, card_map.c.old_id == CardAssignment.card_id)
+            ))
+            counts['assignments'] = result.rowcount
+
+    return board, counts
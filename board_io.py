@@ -0,0 +1,267 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from models import db, Board, List, Card, ChecklistItem
+import card_counters
+import jobs
+
+# Rows fetched per round trip when exporting and inserted per statement when importing
+BATCH_SIZE = 500
+
+CSV_FIELDS = ['record_type', 'id', 'list_id', 'card_id', 'title', 'description',
+              'position', 'due_date', 'completed', 'archived_at']
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+def _parse_datetime(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes')
+
+def _stream(statement, batch_size):
+    """Run a Core select and yield its rows in server-side batches"""
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield from partition
+
+def iter_board_records(board, batch_size=BATCH_SIZE):
+    """Yield a board as flat records: the board, its lists, cards, then checklist items
+
+    Only plain column tuples are fetched, batch by batch, so memory does
+    not grow with the size of the board. Deleted lists and cards are left
+    out; archived ones are kept so an export is a complete backup.
+    """
+    yield {'record_type': 'board', 'id': board.id, 'title': board.title,
+           'description': board.description}
+
+    live_lists = db.select(List.id).where(List.board_id == board.id, List.deleted_at.is_(None))
+
+    lists = db.select(List.id, List.title, List.position, List.archived_at)\
+        .where(List.id.in_(live_lists))\
+        .order_by(List.position, List.id)
+    for row in _stream(lists, batch_size):
+        yield {'record_type': 'list', 'id': row.id, 'title': row.title,
+               'position': row.position, 'archived_at': _iso(row.archived_at)}
+
+    live_cards = db.select(Card.id).where(Card.list_id.in_(live_lists), Card.deleted_at.is_(None))
+
+    cards = db.select(Card.id, Card.list_id, Card.title, Card.description, Card.position,
+                      Card.due_date, Card.completed, Card.archived_at)\
+        .where(Card.id.in_(live_cards))\
+        .order_by(Card.list_id, Card.position, Card.id)
+    for row in _stream(cards, batch_size):
+        yield {'record_type': 'card', 'id': row.id, 'list_id': row.list_id, 'title': row.title,
+               'description': row.description, 'position': row.position,
+               'due_date': _iso(row.due_date), 'completed': bool(row.completed),
+               'archived_at': _iso(row.archived_at)}
+
+    items = db.select(ChecklistItem.id, ChecklistItem.card_id, ChecklistItem.title,
+                      ChecklistItem.position, ChecklistItem.completed)\
+        .where(ChecklistItem.card_id.in_(live_cards))\
+        .order_by(ChecklistItem.card_id, ChecklistItem.position, ChecklistItem.id)
+    for row in _stream(items, batch_size):
+        yield {'record_type': 'checklist_item', 'id': row.id, 'card_id': row.card_id,
+               'title': row.title, 'position': row.position, 'completed': bool(row.completed)}
+
+def export_ndjson(records):
+    """Serialize records as JSON Lines"""
+    for record in records:
+        yield json.dumps(record) + '\n'
+
+def export_csv(records, batch_size=BATCH_SIZE):
+    """Serialize records as CSV, flushing the buffer every `batch_size` rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for i, record in enumerate(records, 1):
+        writer.writerow(record)
+        if i % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def read_records(lines, fmt):
+    """Parse records lazily from an iterable of text lines"""
+    if fmt == 'csv':
+        for row in csv.DictReader(lines):
+            yield {key: (value if value != '' else None) for key, value in row.items()}
+        return
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            raise ValueError(f'Line {line_number} is not valid JSON')
+
+class _Importer:
+    """Buffer parsed records and insert them in chunks, remapping source ids"""
+
+    def __init__(self, owner_id, title, batch_size):
+        self.owner_id = owner_id
+        self.title = title
+        self.batch_size = batch_size
+        self.board = None
+        self.board_id = None
+        self.list_ids = {}
+        self.card_ids = {}
+        self.pending = {'list': [], 'card': [], 'checklist_item': []}
+        self.counts = {'lists': 0, 'cards': 0, 'checklist_items': 0}
+
+    def add(self, record):
+        record_type = record.get('record_type') or record.get('type')
+        if record_type == 'board':
+            self._create_board(record)
+            return
+        if record_type not in self.pending:
+            raise ValueError(f'Unknown record type: {record_type}')
+        if self.board is None:
+            self._create_board({})
+
+        # Parents must be written before children can be remapped
+        if record_type == 'card':
+            self._flush('list')
+        elif record_type == 'checklist_item':
+            self._flush('list')
+            self._flush('card')
+
+        self.pending[record_type].append(record)
+        if len(self.pending[record_type]) >= self.batch_size:
+            self._flush(record_type)
+
+    def finish(self):
+        if self.board is None:
+            self._create_board({})
+        for record_type in ('list', 'card', 'checklist_item'):
+            self._flush(record_type)
+        return self.board, self.counts
+
+    def _create_board(self, record):
+        if self.board is not None:
+            raise ValueError('File contains more than one board')
+        self.board = Board(
+            title=self.title or record.get('title') or 'Imported board',
+            description=record.get('description') or '',
+            owner_id=self.owner_id
+        )
+        db.session.add(self.board)
+        db.session.flush()
+        self.board_id = self.board.id
+
+    def _insert(self, model, source_ids, rows):
+        """Insert rows with one executemany and return their new ids in order"""
+        result = db.session.execute(
+            db.insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows
+        )
+        return dict(zip(source_ids, result.scalars().all()))
+
+    def _flush(self, record_type):
+        records = self.pending[record_type]
+        if not records:
+            return
+        self.pending[record_type] = []
+        now = datetime.utcnow()
+
+        if record_type == 'list':
+            rows = [{
+                'title': r.get('title') or 'Untitled list',
+                'board_id': self.board_id,
+                'position': int(r.get('position') or 0),
+                'archived_at': _parse_datetime(r.get('archived_at')),
+                'created_at': now,
+            } for r in records]
+            self.list_ids.update(self._insert(List, [str(r.get('id')) for r in records], rows))
+            self.counts['lists'] += len(rows)
+
+        elif record_type == 'card':
+            rows = []
+            for r in records:
+                list_id = self.list_ids.get(str(r.get('list_id')))
+                if list_id is None:
+                    raise ValueError(f"Card {r.get('id')} references unknown list {r.get('list_id')}")
+                rows.append({
+                    'title': r.get('title') or 'Untitled card',
+                    'description': r.get('description') or '',
+                    'list_id': list_id,
+                    'position': int(r.get('position') or 0),
+                    'due_date': _parse_datetime(r.get('due_date')),
+                    'completed': _parse_bool(r.get('completed') or False),
+                    'archived_at': _parse_datetime(r.get('archived_at')),
+                    'created_at': now,
+                    'updated_at': now,
+                })
+            self.card_ids.update(self._insert(Card, [str(r.get('id')) for r in records], rows))
+            self.counts['cards'] += len(rows)
+
+        else:
+            rows = []
+            for r in records:
+                card_id = self.card_ids.get(str(r.get('card_id')))
+                if card_id is None:
+                    raise ValueError(f"Checklist item {r.get('id')} references unknown card {r.get('card_id')}")
+                rows.append({
+                    'card_id': card_id,
+                    'title': r.get('title') or 'Untitled item',
+                    'position': int(r.get('position') or 0),
+                    'completed': _parse_bool(r.get('completed') or False),
+                    'created_at': now,
+                })
+            db.session.execute(db.insert(ChecklistItem), rows)
+            card_counters.recount({row['card_id'] for row in rows})
+            self.counts['checklist_items'] += len(rows)
+
+@jobs.handler('board_import', max_attempts=1)
+def run_import(job_id, path, fmt, owner_id, title=None, batch_size=BATCH_SIZE):
+    """Import a board file, committing every batch and reporting progress on the job
+
+    The file is read line by line, so only the current batch of records and
+    the source-to-new id maps are held in memory. A failed import leaves its
+    partial board soft-deleted for the purger to clean up. Returns the new
+    board id and row counts.
+    """
+    importer = _Importer(owner_id, title, batch_size)
+    size = os.path.getsize(path) or 1
+    last_progress = 0
+
+    try:
+        with open(path, 'rb') as f:
+            lines = (raw.decode('utf-8-sig') for raw in f)
+            for i, record in enumerate(read_records(lines, fmt), 1):
+                importer.add(record)
+                if i % batch_size == 0:
+                    progress = min(99, int(f.tell() * 100 / size))
+                    jobs.report_progress(job_id, progress if progress != last_progress else None)
+                    last_progress = progress
+                    db.session.commit()
+
+        board, counts = importer.finish()
+        db.session.commit()
+        return dict(counts, board_id=importer.board_id)
+    except Exception:
+        db.session.rollback()
+        if importer.board_id is not None:
+            db.session.execute(
+                db.update(Board).where(Board.id == importer.board_id).values(deleted_at=datetime.utcnow())
+            )
+            db.session.commit()
+        raise
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
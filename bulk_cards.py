@@ -0,0 +1,97 @@
+from datetime import datetime
+from models import db, Board, BoardMember, List, Card, CardAssignment
+import card_counters
+
+def load_cards(card_ids, user_id):
+    """The live cards among `card_ids`, each with its board and whether the user can reach it
+
+    One query, whatever the number of cards or boards. Rows carry id, title,
+    list_id, completed, board_id and has_access.
+    """
+    member = db.exists().where(BoardMember.board_id == Board.id, BoardMember.user_id == user_id)
+    return db.session.execute(
+        db.select(Card.id, Card.title, Card.list_id, Card.completed, List.board_id,
+                  db.or_(Board.owner_id == user_id, member).label('has_access'))
+        .join(List, List.id == Card.list_id)
+        .join(Board, Board.id == List.board_id)
+        .where(
+            Card.id.in_(card_ids),
+            Card.deleted_at.is_(None),
+            List.deleted_at.is_(None),
+            Board.deleted_at.is_(None)
+        )
+        .order_by(Card.id)
+    ).all()
+
+def _update(cards, **values):
+    """One UPDATE for all the cards, bumping their versions as single edits do"""
+    if cards:
+        db.session.execute(
+            db.update(Card).where(Card.id.in_([card.id for card in cards]))
+            .values(version=Card.version + 1, **values),
+            execution_options={'synchronize_session': False}
+        )
+
+def assign(cards, user_id):
+    """Assign a user to every card not assigned to them yet; returns the cards changed"""
+    assigned = set(db.session.execute(
+        db.select(CardAssignment.card_id)
+        .where(CardAssignment.user_id == user_id, CardAssignment.card_id.in_([card.id for card in cards]))
+    ).scalars())
+    changed = [card for card in cards if card.id not in assigned]
+    if changed:
+        db.session.execute(db.insert(CardAssignment), [{'card_id': card.id, 'user_id': user_id} for card in changed])
+        card_counters.refresh_assignees_of([card.id for card in changed])
+    return changed
+
+def unassign(cards, user_id):
+    """Remove a user from every card they are assigned to; returns the cards changed"""
+    assigned = set(db.session.execute(
+        db.select(CardAssignment.card_id)
+        .where(CardAssignment.user_id == user_id, CardAssignment.card_id.in_([card.id for card in cards]))
+    ).scalars())
+    changed = [card for card in cards if card.id in assigned]
+    if changed:
+        db.session.execute(
+            db.delete(CardAssignment)
+            .where(CardAssignment.user_id == user_id, CardAssignment.card_id.in_(assigned)),
+            execution_options={'synchronize_session': False}
+        )
+        card_counters.refresh_assignees_of(assigned)
+    return changed
+
+def set_completed(cards, completed):
+    """Complete or reopen the cards not already in that state; returns the cards changed"""
+    changed = [card for card in cards if bool(card.completed) != completed]
+    _update(changed, completed=completed)
+    return changed
+
+def set_due_date(cards, due_date):
+    """Give every card the same due date, or none; returns the cards changed"""
+    _update(cards, due_date=due_date, updated_at=datetime.utcnow())
+    return cards
+
+def move(cards, list_obj):
+    """Append the cards not already in `list_obj` to its end, in the order given; returns the cards changed"""
+    changed = [card for card in cards if card.list_id != list_obj.id]
+    if not changed:
+        return changed
+
+    last = db.session.execute(
+        db.select(db.func.max(Card.position)).where(Card.list_id == list_obj.id)
+    ).scalar()
+    start = 0 if last is None else last + 1
+
+    table = Card.__table__
+    db.session.execute(
+        table.update().where(table.c.id == db.bindparam('card_id'))
+        .values(list_id=list_obj.id, position=db.bindparam('new_position'), version=table.c.version + 1,
+                updated_at=datetime.utcnow()),
+        [{'card_id': card.id, 'new_position': start + i} for i, card in enumerate(changed)]
+    )
+    return changed
+
+def soft_delete(cards, deleted_at):
+    """Tombstone all the cards at once; each can be restored on its own"""
+    _update(cards, deleted_at=deleted_at)
+    return cards
@@ -0,0 +1,155 @@
+"""Badge counters stored on each card: checklist progress, attachments and assignees
+
+The write paths update them in the same transaction as the child rows they
+count. `flask repair-card-counters` recomputes them from the child tables,
+for rows written by bulk tools; `flask init-db` does the same for cards
+from before the columns existed.
+"""
+import click
+from sqlalchemy import inspect
+from sqlalchemy.sql import ClauseElement
+from models import db, Card, CardAssignment, Attachment, ChecklistItem
+import schema
+
+# Cards recomputed per grouped query and commit
+BATCH_SIZE = 1000
+
+COUNTERS = ('checklist_total', 'checklist_done', 'attachment_count', 'assignee_ids')
+
+def adjust(card, **deltas):
+    """Shift counters by SQL increments, so concurrent writers cannot lose an update"""
+    state = inspect(card).dict
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        pending = state.get(name)
+        base = pending if isinstance(pending, ClauseElement) else getattr(Card, name)
+        setattr(card, name, base + delta)
+
+def recount_done(card):
+    """Set checklist_done from the items themselves, after one statement changed many of them"""
+    card.checklist_done = db.select(db.func.count(ChecklistItem.id))\
+        .where(ChecklistItem.card_id == card.id, ChecklistItem.completed).scalar_subquery()
+
+def refresh_assignees(card):
+    """Rebuild the assignee list from the assignments table with the card row locked
+
+    The lock queues concurrent (un)assignments of the same card, so each one
+    reads the others' committed rows. FOR NO KEY UPDATE does not conflict
+    with the key-share lock the assignment insert takes on the card.
+    """
+    db.session.flush()
+    # SQLite has no row locks and already lets one writer in at a time
+    if db.session.get_bind().dialect.name != 'sqlite':
+        db.session.execute(db.select(Card.id).where(Card.id == card.id).with_for_update(key_share=True))
+    user_ids = db.session.execute(
+        db.select(CardAssignment.user_id).where(CardAssignment.card_id == card.id).order_by(CardAssignment.id)
+    ).scalars()
+    card.assignee_ids = ','.join(str(user_id) for user_id in user_ids)
+
+def refresh_assignees_of(card_ids):
+    """refresh_assignees for many cards: lock them in id order, then one read and one write"""
+    card_ids = sorted(card_ids)
+    db.session.flush()
+    if db.session.get_bind().dialect.name != 'sqlite':
+        db.session.execute(
+            db.select(Card.id).where(Card.id.in_(card_ids)).order_by(Card.id).with_for_update(key_share=True)
+        )
+    user_ids = {card_id: [] for card_id in card_ids}
+    assignments = db.session.execute(
+        db.select(CardAssignment.card_id, CardAssignment.user_id)
+        .where(CardAssignment.card_id.in_(card_ids))
+        .order_by(CardAssignment.card_id, CardAssignment.id)
+    )
+    for card_id, user_id in assignments:
+        user_ids[card_id].append(str(user_id))
+
+    table = Card.__table__
+    db.session.execute(
+        table.update().where(table.c.id == db.bindparam('card_id')).values(assignee_ids=db.bindparam('ids')),
+        [{'card_id': card_id, 'ids': ','.join(ids)} for card_id, ids in user_ids.items()]
+    )
+
+def compute(card_ids):
+    """The correct counters of some cards, from one grouped query per child table"""
+    values = {card_id: {'checklist_total': 0, 'checklist_done': 0, 'attachment_count': 0, 'assignee_ids': []}
+              for card_id in card_ids}
+
+    checklists = db.session.execute(
+        db.select(ChecklistItem.card_id, db.func.count(ChecklistItem.id),
+                  db.func.sum(db.case((ChecklistItem.completed, 1), else_=0)))
+        .where(ChecklistItem.card_id.in_(card_ids))
+        .group_by(ChecklistItem.card_id)
+    )
+    for card_id, total, done in checklists:
+        values[card_id]['checklist_total'] = total
+        values[card_id]['checklist_done'] = done or 0
+
+    attachments = db.session.execute(
+        db.select(Attachment.card_id, db.func.count(Attachment.id))
+        .where(Attachment.card_id.in_(card_ids))
+        .group_by(Attachment.card_id)
+    )
+    for card_id, count in attachments:
+        values[card_id]['attachment_count'] = count
+
+    assignments = db.session.execute(
+        db.select(CardAssignment.card_id, CardAssignment.user_id)
+        .where(CardAssignment.card_id.in_(card_ids))
+        .order_by(CardAssignment.card_id, CardAssignment.id)
+    )
+    for card_id, user_id in assignments:
+        values[card_id]['assignee_ids'].append(str(user_id))
+
+    for counters in values.values():
+        counters['assignee_ids'] = ','.join(counters['assignee_ids'])
+    return values
+
+def _write(rows):
+    """Store recomputed counters without touching updated_at"""
+    table = Card.__table__
+    db.session.execute(
+        table.update().where(table.c.id == db.bindparam('card_id'))
+        .values({**{name: db.bindparam(name) for name in COUNTERS}, 'updated_at': table.c.updated_at}),
+        rows
+    )
+
+def recount(card_ids):
+    """Recompute and store the counters of some cards; nothing is committed"""
+    card_ids = list(card_ids)
+    if card_ids:
+        _write([dict(counters, card_id=card_id) for card_id, counters in compute(card_ids).items()])
+
+def repair(batch_size=BATCH_SIZE):
+    """Recompute every card's counters, committing per batch; returns how many were wrong"""
+    repaired = 0
+    last_id = 0
+    columns = [getattr(Card, name) for name in COUNTERS]
+    while True:
+        rows = db.session.execute(
+            db.select(Card.id, *columns).where(Card.id > last_id).order_by(Card.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return repaired
+        last_id = rows[-1].id
+        correct = compute([row.id for row in rows])
+        stale = [dict(correct[row.id], card_id=row.id) for row in rows
+                 if tuple(row[1:]) != tuple(correct[row.id][name] for name in COUNTERS)]
+        if stale:
+            _write(stale)
+            repaired += len(stale)
+        db.session.commit()
+
+@schema.backfill('cards', *COUNTERS)
+def fill_counters():
+    """Count the children of cards that predate the counter columns"""
+    repair()
+
+def init_app(app):
+    """Register the repair CLI command"""
+    @app.cli.command('repair-card-counters')
+    @click.option('--batch-size', default=BATCH_SIZE, show_default=True, help='Cards recomputed per query.')
+    def repair_command(batch_size):
+        """Recompute card badge counters from checklists, attachments and assignments."""
+        repaired = repair(batch_size)
+        print(f'Repaired counters on {repaired} cards')
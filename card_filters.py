@@ -0,0 +1,207 @@
+"""Board card filters: parse query-string expressions and compile them to SQL
+
+Each parameter of GET /api/boards/<id>/cards is a small expression:
+
+- assignee: comma-separated user ids, `me` or `none`; a card matches any of them
+- due_before, due_after: an ISO date or datetime, or `now`, `today`,
+  `tomorrow` or an offset such as `7d`, `-2w` or `+12h` from now
+- completed: true or false
+- q: words that must all appear in the title; "quoted phrases" stay whole
+- labels: comma-separated label ids the card must all have; `-id` excludes one
+
+The compiled conditions only narrow the board's active cards, so the
+database walks the per-list index and the assignment and due date indexes
+rather than every card of the board. Labels are bit tests on the card row.
+"""
+import re
+from datetime import datetime, timedelta
+from models import db, List, Card, CardAssignment
+import labels
+
+# Words and phrases a single q may hold
+MAX_TERMS = 10
+
+RELATIVE = re.compile(r'^([+-]?\d{1,4})([hdw])$')
+UNITS = {'h': 'hours', 'd': 'days', 'w': 'weeks'}
+TERM = re.compile(r'"([^"]*)"|(\S+)')
+TRUE = ('true', '1', 'yes')
+FALSE = ('false', '0', 'no')
+
+def parse_assignee(value, user_id):
+    """User ids from 'me', 'none' and numbers; None in the result stands for unassigned"""
+    ids = []
+    for part in value.split(','):
+        part = part.strip().lower()
+        if part == 'me':
+            ids.append(user_id)
+        elif part == 'none':
+            ids.append(None)
+        elif part.isdigit():
+            ids.append(int(part))
+        else:
+            raise ValueError(f'Invalid assignee: {part!r}')
+    return list(dict.fromkeys(ids))
+
+def parse_when(value, now):
+    """A naive UTC datetime from an ISO date, a keyword or an offset from now"""
+    value = value.strip().lower()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if value == 'now':
+        return now
+    if value == 'today':
+        return today
+    if value == 'tomorrow':
+        return today + timedelta(days=1)
+    match = RELATIVE.match(value)
+    if match:
+        return now + timedelta(**{UNITS[match.group(2)]: int(match.group(1))})
+    try:
+        when = datetime.fromisoformat(value.upper().replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'Invalid date: {value!r}')
+    if when.tzinfo is not None:
+        when = (when - when.utcoffset()).replace(tzinfo=None)
+    return when
+
+def parse_terms(value):
+    """Lowercased words and quoted phrases of a text query"""
+    terms = [(phrase or word).strip().lower() for phrase, word in TERM.findall(value)]
+    terms = [term for term in terms if term]
+    if len(terms) > MAX_TERMS:
+        raise ValueError(f'At most {MAX_TERMS} search terms')
+    return terms
+
+def parse_labels(value, board):
+    """Masks of the labels a card must have and must not have, from ids on `board`"""
+    bits = {label.id: label.bit for label in board.labels}
+    wanted, unwanted = [], []
+    for part in value.split(','):
+        part = part.strip()
+        exclude = part.startswith('-')
+        label_id = part[1:] if exclude else part
+        if not label_id.isdigit() or int(label_id) not in bits:
+            raise ValueError(f'Unknown label: {part!r}')
+        (unwanted if exclude else wanted).append(bits[int(label_id)])
+    return labels.mask_of(wanted), labels.mask_of(unwanted)
+
+def parse(args, user_id, now=None, board=None):
+    """The filters in a request's query string; raises ValueError on a malformed one
+
+    Label filters need the `board` whose label ids they name.
+    """
+    now = now or datetime.utcnow()
+    filters = {}
+    if args.get('assignee'):
+        filters['assignee'] = parse_assignee(args['assignee'], user_id)
+    for name in ('due_before', 'due_after'):
+        if args.get(name):
+            filters[name] = parse_when(args[name], now)
+    if args.get('completed'):
+        completed = args['completed'].strip().lower()
+        if completed not in TRUE + FALSE:
+            raise ValueError('completed must be true or false')
+        filters['completed'] = completed in TRUE
+    if args.get('q'):
+        terms = parse_terms(args['q'])
+        if terms:
+            filters['q'] = terms
+    if args.get('labels'):
+        filters['labels'] = parse_labels(args['labels'], board)
+    return filters
+
+def escape_like(term):
+    """A term with LIKE wildcards taken literally"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def conditions(board_id, filters):
+    """WHERE clauses selecting the active cards of a board that match the filters"""
+    clauses = [
+        List.board_id == board_id,
+        List.archived_at.is_(None),
+        List.deleted_at.is_(None),
+        Card.archived_at.is_(None),
+        Card.deleted_at.is_(None),
+    ]
+
+    if 'assignee' in filters:
+        user_ids = [user_id for user_id in filters['assignee'] if user_id is not None]
+        either = []
+        if user_ids:
+            either.append(db.exists().where(CardAssignment.card_id == Card.id,
+                                            CardAssignment.user_id.in_(user_ids)))
+        # The assignee counter is empty exactly when the card has no assignments
+        if None in filters['assignee']:
+            either.append(Card.assignee_ids == '')
+        clauses.append(db.or_(*either))
+
+    if 'due_before' in filters:
+        clauses.append(Card.due_date < filters['due_before'])
+    if 'due_after' in filters:
+        clauses.append(Card.due_date >= filters['due_after'])
+
+    if filters.get('completed') is True:
+        clauses.append(Card.completed.is_(True))
+    elif filters.get('completed') is False:
+        clauses.append(db.or_(Card.completed.is_(False), Card.completed.is_(None)))
+
+    # Bitwise tests on the card row: no join, whatever the number of labels
+    if 'labels' in filters:
+        wanted, unwanted = filters['labels']
+        if wanted:
+            clauses.append(labels.has_all(wanted))
+        if unwanted:
+            clauses.append(labels.has_none(unwanted))
+
+    for term in filters.get('q', ()):
+        clauses.append(Card.title.ilike(f'%{escape_like(term)}%', escape='\\'))
+
+    return clauses
+
+def matching_cards(board_id, filters, limit, list_id=None, after=None):
+    """The first `limit` matching cards of every list, each list's match count, and the lists with more
+
+    A window over the matches ranks and counts them per list. `list_id`
+    and a decoded `after` cursor continue a single list; the cursor only
+    moves the page, and one more query keeps the count of every match.
+    """
+    columns = [
+        Card.id.label('card_id'),
+        db.func.row_number().over(partition_by=Card.list_id, order_by=(Card.position, Card.id)).label('rank'),
+        db.func.count().over(partition_by=Card.list_id).label('total'),
+    ]
+    if after is not None:
+        # Matches up to and including the cursor card, which the page skips
+        position, card_id = after
+        passed = db.or_(Card.position < position, db.and_(Card.position == position, Card.id <= card_id))
+        columns.append(db.func.sum(db.case((passed, 1), else_=0)).over(partition_by=Card.list_id).label('passed'))
+    clauses = conditions(board_id, filters)
+    if list_id is not None:
+        clauses.append(Card.list_id == list_id)
+    ranked = db.select(*columns).join(List, List.id == Card.list_id).where(*clauses).subquery()
+
+    if after is None:
+        page = ranked.c.rank <= limit
+    else:
+        page = db.and_(ranked.c.rank > ranked.c.passed, ranked.c.rank <= ranked.c.passed + limit)
+    rows = db.session.execute(
+        db.select(Card, ranked.c.rank, ranked.c.total)
+        .join(ranked, ranked.c.card_id == Card.id)
+        .where(page)
+        .order_by(Card.list_id, Card.position, Card.id)
+    ).all()
+
+    cards_by_list, counts, more = {}, {}, set()
+    for card, rank, total in rows:
+        cards_by_list.setdefault(card.list_id, []).append(card)
+        counts[card.list_id] = total
+        if rank < total:
+            more.add(card.list_id)
+        else:
+            more.discard(card.list_id)
+    if after is not None:
+        # A cursor at a list's last match leaves no row on the page to carry its count
+        counts = dict(db.session.execute(
+            db.select(Card.list_id, db.func.count()).join(List, List.id == Card.list_id)
+            .where(*clauses).group_by(Card.list_id)
+        ).all())
+    return cards_by_list, counts, more
@@ -0,0 +1,61 @@
+"""Optimistic concurrency for boards, lists, cards and checklist items
+
+Each of these rows carries a `version` that every PUT bumps. A client that
+sends the version it last read, as `expected_version` in the body or as
+`If-Match: "<version>"`, only gets its write applied if nobody else wrote
+in between; otherwise it gets 409 with the current entity. The check and
+the write are one `UPDATE ... WHERE id = ? AND version = ?`, so no lock is
+held between reading the row and writing it.
+"""
+from flask import jsonify, request
+from models import db
+
+class InvalidVersion(ValueError):
+    pass
+
+def expected_version(data):
+    """The version a write is conditional on, or None for an unconditional write"""
+    if data and data.get('expected_version') is not None:
+        value = data['expected_version']
+    elif request.if_match and not request.if_match.star_tag:
+        tags = request.if_match.as_set()
+        if len(tags) != 1:
+            raise InvalidVersion('If-Match must name exactly one version')
+        value = tags.pop()
+    else:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidVersion('Invalid expected version')
+
+def conditional_update(entity, values, expected=None):
+    """Write `values` and bump the version in one UPDATE; False if the row has moved past `expected`
+
+    On success the entity in the session holds the row as written.
+    """
+    model = type(entity)
+    stmt = db.update(model).where(model.id == entity.id).values(dict(values, version=model.version + 1))
+    if expected is not None:
+        stmt = stmt.where(model.version == expected)
+    options = {'synchronize_session': False}
+    if db.session.get_bind().dialect.update_returning:
+        updated = db.session.execute(stmt.returning(model), execution_options=dict(options, populate_existing=True))
+        return updated.scalars().first() is not None
+    if db.session.execute(stmt, execution_options=options).rowcount != 1:
+        return False
+    db.session.refresh(entity)
+    return True
+
+def conflict(entity, name):
+    """409 carrying the entity as it is now, for the client to merge against"""
+    db.session.rollback()
+    response = jsonify({'error': f'This {name} was changed by someone else', 'current': entity.to_dict()})
+    response.set_etag(str(entity.version))
+    return response, 409
+
+def tagged(entity, status=200):
+    """The entity as JSON, with its version as the ETag"""
+    response = jsonify(entity.to_dict())
+    response.set_etag(str(entity.version))
+    return response, status
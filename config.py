@@ -13,13 +13,85 @@ class Config:
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND') or 'sql'  # 'sql', 'file' or 'cookie' (signed cookies, no revocation)
+    SESSION_FILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'sessions')
+    SESSION_TOUCH_INTERVAL = 60  # seconds between batched writes of sliding expiry
+    SESSION_PRUNE_INTERVAL = 3600  # seconds between jobs removing expired sessions
+    SESSION_USER_CACHE_SIZE = 1024  # user records cached per process
+    SESSION_USER_CACHE_TTL = 60  # seconds a cached user record is trusted
     
     # File upload configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'xls', 'xlsx', 'zip'}
     
+    # Password hashing runs in a process pool so logins cannot starve request threads
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'  # changing this rehashes each password on its next login
+    PASSWORD_HASH_WORKERS = 2  # 0 hashes on the request thread
+    PASSWORD_HASH_QUEUE = 16  # hashes allowed to wait for a worker before logins get 503
+    PASSWORD_HASH_TIMEOUT = 10  # seconds
+    
+    # Failed logins allowed per window before 429
+    LOGIN_MAX_ATTEMPTS = 5  # per username
+    LOGIN_MAX_ATTEMPTS_PER_IP = 20
+    LOGIN_ATTEMPT_WINDOW = 300  # seconds
+    
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted; without this
+    # every client behind a proxy shares its address, and with it the per-IP login limit
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR') or 0)
+    
+    # Soft delete configuration
+    SOFT_DELETE_UNDO_WINDOW = timedelta(minutes=5)
+    PURGE_INTERVAL = 60  # seconds between purge jobs, 0 disables them
+    PURGE_BATCH_SIZE = 500  # rows hard-deleted per statement
+    
+    # Background job queue
+    JOBS_EMBEDDED_WORKERS = 1  # worker threads inside the web process, 0 when running `flask jobs worker`
+    JOBS_POLL_INTERVAL = 1.0  # seconds a worker sleeps when the queue is empty
+    JOBS_LEASE_SECONDS = 300  # a running job is handed to another worker if not renewed within this
+    JOBS_RETRY_BASE_DELAY = 10  # seconds before the first retry, doubled on each attempt
+    JOBS_RETRY_MAX_DELAY = 3600
+    JOBS_RETENTION = timedelta(days=7)  # finished jobs are pruned after this
+    JOBS_PRUNE_INTERVAL = 3600
+    RUN_JOBS_INLINE = False  # run jobs on the request thread right after enqueueing, e.g. in tests
+    
+    # Instrumentation: Server-Timing header and Prometheus metrics at /metrics
+    INSTRUMENTATION_ENABLED = True
+    METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None  # bearer token scrapers must send; unset serves /metrics in debug mode only
+    
+    # Sampled request profiling: None, 'cprofile' or 'pyinstrument'
+    PROFILE_MODE = os.environ.get('PROFILE_MODE') or None
+    PROFILE_SAMPLE_RATE = 0.05  # fraction of requests profiled
+    PROFILE_THRESHOLD_MS = 250  # only requests slower than this are written out
+    PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+    
+    # N+1 detection: 'warn' logs repeated lazy loads with a stack trace, 'raise' fails the request;
+    # unset means 'warn' in debug mode and off otherwise
+    N_PLUS_ONE_MODE = os.environ.get('N_PLUS_ONE_MODE') or None
+    N_PLUS_ONE_THRESHOLD = 5  # identical lazy loads allowed per request
+    
+    # Async serving mode (asgi.py): read-heavy endpoints on an async engine
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL') or None  # defaults to the database above with an async driver
+    ASYNC_DB_CONCURRENCY = 10  # queries in flight at once; other async requests wait their turn
+    
+    # Read replicas (replicas.py): read-heavy GETs query these, everything else the primary
+    REPLICA_DATABASE_URIS = [url for url in (os.environ.get('DATABASE_REPLICA_URLS') or '').split(',') if url]
+    REPLICA_ENGINE_OPTIONS = {'pool_size': 5, 'max_overflow': 5, 'pool_recycle': 1800, 'pool_pre_ping': True}
+    REPLICA_STICKY_SECONDS = 5  # a client reads from the primary this long after its last write
+    REPLICA_STICKY_COOKIE = 'boardify_primary'
+    REPLICA_RETRY_SECONDS = 30  # a replica that failed to connect is skipped this long
+    
+    # Batched API calls: POST /api/batch runs this many sub-requests at most
+    BATCH_MAX_REQUESTS = 20
+    
+    # Create missing tables in create_app; off in production, where `flask init-db` does it once
+    AUTO_CREATE_SCHEMA = False
+    
+    # SQLite write-ahead logging lets workers write while requests read
+    SQLITE_WAL = True
+    
     # Ensure upload folder exists
     @staticmethod
     def init_app(app):
-        os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -0,0 +1,58 @@
+"""Gunicorn settings: gunicorn -c gunicorn.conf.py wsgi:app
+
+Every value can be overridden through the environment (WEB_CONCURRENCY,
+GUNICORN_THREADS, PORT, ...) or on the command line.
+
+Reloading:
+    kill -HUP <master>     re-read this file and replace the workers gracefully;
+                           with preload_app the application code is *not* reloaded
+    kill -USR2 <master>    start a new master with new code next to the old one,
+    kill -QUIT <old>       then stop the old master once the new one is ready
+"""
+import multiprocessing
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+
+# Import and warm the app once in the master; workers fork from it
+preload_app = True
+
+# SQLite admits one writer at a time: extra processes only queue on its lock,
+# so keep a couple of processes and serve concurrency with threads.
+# A client/server database can use the usual 2 * CPUs + 1.
+_sqlite = (os.environ.get('DATABASE_URL') or 'sqlite').startswith('sqlite')
+workers = int(os.environ.get('WEB_CONCURRENCY') or (2 if _sqlite else multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS') or (4 if _sqlite else 2))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))  # in-flight requests get this long on reload
+keepalive = 5
+
+# Recycle workers now and then so slow leaks cannot accumulate; jitter keeps them from restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+def when_ready(server):
+    import wsgi
+
+    server.log.info('App preloaded in %.0f ms', wsgi.app.extensions['startup_seconds'] * 1000)
+
+def post_fork(server, worker):
+    import wsgi
+    from models import db
+
+    # Never share pooled database connections across processes
+    with wsgi.app.app_context():
+        db.engine.dispose(close=False)
+        if 'replicas' in wsgi.app.extensions:
+            wsgi.app.extensions['replicas'].dispose(close=False)
+
+def worker_exit(server, worker):
+    import jobs
+
+    # Let embedded job workers finish their current job rather than dying mid-lease
+    jobs.stop_embedded_worker(timeout=graceful_timeout)
@@ -0,0 +1,266 @@
+import functools
+import hmac
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from flask import Response, g, has_app_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from models import db
+
+class Histogram:
+    """A Prometheus-style cumulative histogram keyed by label values"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            items = sorted(self.series.items())
+        for labels, series in items:
+            label_text = ','.join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[len(self.buckets)]}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {series[-1]:.6f}')
+            lines.append(f'{self.name}_count{{{label_text}}} {series[len(self.buckets)]}')
+        return lines
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self.lock:
+            items = sorted(self.series.items())
+        for labels, value in items:
+            label_text = ','.join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            lines.append(f'{self.name}{{{label_text}}} {value}')
+        return lines
+
+class Metrics:
+    """Per-process request metrics; each worker process reports its own"""
+
+    def __init__(self, buckets):
+        self.requests = Counter('boardify_requests_total', 'HTTP requests handled.',
+                                ('blueprint', 'method', 'status'))
+        self.latency = Histogram('boardify_request_duration_seconds', 'Request latency.',
+                                 ('blueprint',), buckets)
+        self.db_time = Histogram('boardify_request_db_seconds', 'Time spent in SQL per request.',
+                                 ('blueprint',), buckets)
+        self.db_statements = Histogram('boardify_request_db_statements', 'SQL statements per request.',
+                                       ('blueprint',), (1, 2, 5, 10, 20, 50, 100, 250))
+        self.serialize_time = Histogram('boardify_request_serialize_seconds',
+                                        'Time spent in to_dict and JSON encoding per request.',
+                                        ('blueprint',), buckets)
+
+    def observe(self, blueprint, method, status, timing, total):
+        self.requests.inc((blueprint, method, str(status)))
+        self.latency.observe((blueprint,), total)
+        self.db_time.observe((blueprint,), timing['db_time'])
+        self.db_statements.observe((blueprint,), timing['db_count'])
+        self.serialize_time.observe((blueprint,), timing['serialize_time'] + timing['json_time'])
+
+    def render(self):
+        lines = []
+        for metric in (self.requests, self.latency, self.db_time, self.db_statements, self.serialize_time):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+def _timing():
+    """The current request's timers, or None outside an instrumented request"""
+    return g.get('_timing') if has_app_context() else None
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Adds JSON encoding time to the request timers"""
+
+    def dumps(self, obj, **kwargs):
+        timing = _timing()
+        if timing is None:
+            return super().dumps(obj, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            timing['json_time'] += time.perf_counter() - start
+
+def _timed_to_dict(to_dict):
+    """Wrap a model's to_dict; nested calls are counted once, by the outermost"""
+    @functools.wraps(to_dict)
+    def wrapper(self, *args, **kwargs):
+        timing = _timing()
+        if timing is None or timing['serialize_depth']:
+            return to_dict(self, *args, **kwargs)
+        timing['serialize_depth'] += 1
+        start = time.perf_counter()
+        try:
+            return to_dict(self, *args, **kwargs)
+        finally:
+            timing['serialize_depth'] -= 1
+            timing['serialize_time'] += time.perf_counter() - start
+    wrapper._instrumented = True
+    return wrapper
+
+def instrument_models():
+    for mapper in db.Model.registry.mappers:
+        cls = mapper.class_
+        to_dict = cls.__dict__.get('to_dict')
+        if to_dict is not None and not getattr(to_dict, '_instrumented', False):
+            cls.to_dict = _timed_to_dict(to_dict)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _timing() is not None:
+        conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _timing()
+    starts = conn.info.get('_query_start')
+    if timing is None or not starts:
+        return
+    timing['db_time'] += time.perf_counter() - starts.pop()
+    timing['db_count'] += 1
+
+class _Profiler:
+    """Wraps cProfile or pyinstrument behind start/stop/save"""
+
+    def __init__(self, mode):
+        self.mode = mode
+        if mode == 'pyinstrument':
+            from pyinstrument import Profiler
+            self.profiler = Profiler()
+        else:
+            import cProfile
+            self.profiler = cProfile.Profile()
+
+    def start(self):
+        if self.mode == 'pyinstrument':
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.mode == 'pyinstrument':
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+
+    def save(self, path_without_ext):
+        if self.mode == 'pyinstrument':
+            path = path_without_ext + '.html'
+            with open(path, 'w') as f:
+                f.write(self.profiler.output_html())
+        else:
+            path = path_without_ext + '.prof'
+            self.profiler.dump_stats(path)
+        return path
+
+def _profile_mode(app):
+    """The configured profiler, falling back to cProfile if pyinstrument is missing"""
+    mode = app.config.get('PROFILE_MODE')
+    if mode == 'pyinstrument':
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            app.logger.warning('pyinstrument is not installed; profiling with cProfile instead')
+            return 'cprofile'
+    return mode
+
+def instrument_engine(engine):
+    """Count statements and SQL time of `engine` into the request timers"""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def init_app(app):
+    """Hook request timers, SQL counters, metrics and sampled profiling into the app"""
+    if not app.config.get('INSTRUMENTATION_ENABLED', True):
+        return
+
+    metrics = Metrics(app.config['METRICS_BUCKETS'])
+    app.extensions['metrics'] = metrics
+    app.json = TimedJSONProvider(app)
+    instrument_models()
+
+    with app.app_context():
+        instrument_engine(db.engine)
+
+    profile_mode = _profile_mode(app)
+
+    @app.before_request
+    def start_timers():
+        g._timing = {
+            'start': time.perf_counter(),
+            'db_count': 0,
+            'db_time': 0.0,
+            'serialize_time': 0.0,
+            'serialize_depth': 0,
+            'json_time': 0.0,
+        }
+        if profile_mode and random.random() < app.config['PROFILE_SAMPLE_RATE']:
+            g._profiler = _Profiler(profile_mode)
+            g._profiler.start()
+
+    @app.after_request
+    def record_timers(response):
+        timing = g.pop('_timing', None)
+        if timing is None:
+            return response
+        total = time.perf_counter() - timing['start']
+
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler.stop()
+            if total * 1000 >= app.config['PROFILE_THRESHOLD_MS']:
+                os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+                name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{request.endpoint or 'unknown'}_{total * 1000:.0f}ms"
+                path = profiler.save(os.path.join(app.config['PROFILE_DIR'], name))
+                app.logger.info('Wrote profile for slow request %s %s to %s', request.method, request.path, path)
+
+        if request.endpoint != 'metrics':
+            metrics.observe(request.blueprint or 'app', request.method, response.status_code, timing, total)
+
+        response.headers['Server-Timing'] = ', '.join([
+            f"db;dur={timing['db_time'] * 1000:.1f};desc=\"{timing['db_count']} queries\"",
+            f"serialize;dur={timing['serialize_time'] * 1000:.1f}",
+            f"json;dur={timing['json_time'] * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        token = app.config.get('METRICS_TOKEN')
+        if not token:
+            # Without a token the endpoint only exists in debug mode
+            if not app.debug:
+                return Response('Not Found', status=404, mimetype='text/plain')
+        elif not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+            return Response('Forbidden', status=403, mimetype='text/plain')
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,370 @@
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Job
+
+# kind -> Handler; filled by the @handler decorator when modules are imported
+_handlers = {}
+
+class Handler:
+    def __init__(self, kind, fn, max_attempts, every):
+        self.kind = kind
+        self.fn = fn
+        self.max_attempts = max_attempts
+        self.every = every  # config key holding a period in seconds, for periodic jobs
+
+def handler(kind, max_attempts=3, every=None):
+    """Register a function as the handler for jobs of `kind`
+
+    The function is called as fn(job_id, **payload) inside an app context and
+    owns its own commits. Its return value is stored as the job result. Pass
+    `every='CONFIG_KEY'` to have workers enqueue the job periodically.
+    """
+    def decorator(fn):
+        _handlers[kind] = Handler(kind, fn, max_attempts, every)
+        return fn
+    return decorator
+
+def enqueue(kind, payload=None, user_id=None, idempotency_key=None, run_at=None, max_attempts=None):
+    """Add a job to the queue and return it; the caller commits
+
+    A job with the same idempotency key is returned instead of creating a
+    duplicate. The insert uses ON CONFLICT DO NOTHING so concurrent callers
+    racing on one key cannot both get through.
+    """
+    if kind not in _handlers:
+        raise ValueError(f'No handler registered for job kind {kind!r}')
+
+    values = {
+        'kind': kind,
+        'user_id': user_id,
+        'payload': json.dumps(payload or {}),
+        'idempotency_key': idempotency_key,
+        'run_at': run_at or datetime.utcnow(),
+        'max_attempts': max_attempts or _handlers[kind].max_attempts,
+    }
+
+    if idempotency_key is None:
+        job = Job(**values)
+        db.session.add(job)
+        db.session.flush()
+        return job
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        job_id = db.session.execute(
+            insert(Job).values(**values)
+            .on_conflict_do_nothing(index_elements=['idempotency_key'])
+            .returning(Job.id)
+        ).scalar()
+        if job_id is not None:
+            return db.session.get(Job, job_id)
+        return Job.query.filter_by(idempotency_key=idempotency_key).one()
+
+    job = Job.query.filter_by(idempotency_key=idempotency_key).first()
+    if job is None:
+        job = Job(**values)
+        db.session.add(job)
+        db.session.flush()
+    return job
+
+def _lease_until(now=None):
+    return (now or datetime.utcnow()) + timedelta(seconds=current_app.config['JOBS_LEASE_SECONDS'])
+
+def report_progress(job_id, progress=None):
+    """Record progress and extend the lease of a running job; the caller commits"""
+    values = {'lease_expires_at': _lease_until(), 'updated_at': datetime.utcnow()}
+    if progress is not None:
+        values['progress'] = progress
+    db.session.execute(db.update(Job).where(Job.id == job_id, Job.status == 'running').values(**values))
+
+def claim(worker_id, job_id=None, now=None):
+    """Lease the next runnable job to `worker_id` and return its id, or None
+
+    Runnable means queued and due, or running with an expired lease (its
+    worker died). Picking and leasing is a single UPDATE ... WHERE id = (SELECT
+    ...), which SQLite serializes and PostgreSQL guards with SKIP LOCKED, so
+    two workers never get the same job.
+    """
+    now = now or datetime.utcnow()
+    runnable = db.or_(
+        db.and_(Job.status == 'queued', Job.run_at <= now),
+        db.and_(Job.status == 'running', Job.lease_expires_at < now)
+    )
+    next_job = db.select(Job.id).where(runnable)
+    if job_id is not None:
+        next_job = next_job.where(Job.id == job_id)
+    next_job = next_job.order_by(Job.run_at, Job.id).limit(1).with_for_update(skip_locked=True)
+
+    claimed = db.session.execute(
+        db.update(Job)
+        .where(Job.id == next_job.scalar_subquery(), runnable)
+        .values(
+            status='running',
+            locked_by=worker_id,
+            lease_expires_at=_lease_until(now),
+            attempts=Job.attempts + 1,
+            updated_at=now
+        )
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    db.session.commit()
+    return claimed
+
+def _finish(job_id, worker_id, **values):
+    """Update a job only if this worker still holds its lease"""
+    values.setdefault('locked_by', None)
+    values.setdefault('lease_expires_at', None)
+    result = db.session.execute(
+        db.update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == 'running')
+        .values(updated_at=datetime.utcnow(), **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base, ... capped at JOBS_RETRY_MAX_DELAY"""
+    base = current_app.config['JOBS_RETRY_BASE_DELAY']
+    return min(base * 2 ** (attempts - 1), current_app.config['JOBS_RETRY_MAX_DELAY'])
+
+def execute(job_id, worker_id):
+    """Run a claimed job and record its outcome; returns True on success"""
+    job = db.session.get(Job, job_id)
+    kind, attempts, max_attempts = job.kind, job.attempts, job.max_attempts
+    payload = json.loads(job.payload or '{}')
+
+    entry = _handlers.get(kind)
+    if entry is None:
+        _finish(job_id, worker_id, status='failed', error=f'No handler registered for job kind {kind!r}')
+        return False
+
+    if attempts > max_attempts:
+        # Claimed again after a lease expired on its last attempt
+        _finish(job_id, worker_id, status='failed', error='Lease expired on the final attempt')
+        return False
+
+    try:
+        result = entry.fn(job_id, **payload)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Job %s (%s) failed on attempt %s', job_id, kind, attempts)
+        if attempts < max_attempts:
+            _finish(job_id, worker_id, status='queued', error=str(e),
+                    run_at=datetime.utcnow() + timedelta(seconds=retry_delay(attempts)))
+        else:
+            _finish(job_id, worker_id, status='failed', error=str(e))
+        return False
+
+    _finish(job_id, worker_id, status='succeeded', progress=100, error=None,
+            result=json.dumps(result) if result is not None else None)
+    return True
+
+def run_job(job_id, worker_id='inline'):
+    """Claim and run one specific job on the current thread"""
+    if claim(worker_id, job_id=job_id) is None:
+        return False
+    return execute(job_id, worker_id)
+
+def run_if_inline(job):
+    """Run a just-committed job right away when RUN_JOBS_INLINE is set"""
+    if current_app.config.get('RUN_JOBS_INLINE'):
+        run_job(job.id)
+        db.session.refresh(job)
+
+def work_off(worker_id='inline', limit=None):
+    """Run due jobs on the current thread until the queue is empty; returns the count run"""
+    count = 0
+    while limit is None or count < limit:
+        job_id = claim(worker_id)
+        if job_id is None:
+            break
+        execute(job_id, worker_id)
+        db.session.remove()
+        count += 1
+    return count
+
+def schedule_periodic(now=None):
+    """Enqueue periodic jobs that are due
+
+    The idempotency key names the time slot, so any number of workers can
+    call this and each slot still gets exactly one job.
+    """
+    now = now or time.time()
+    for entry in _handlers.values():
+        interval = entry.every and current_app.config.get(entry.every)
+        if not interval:
+            continue
+        enqueue(entry.kind, idempotency_key=f'{entry.kind}:{int(now // interval)}')
+    db.session.commit()
+
+def _work_loop(app, worker_id, stop, poll_interval, burst=False):
+    with app.app_context():
+        next_schedule = 0
+        while not stop.is_set():
+            try:
+                if time.time() >= next_schedule:
+                    schedule_periodic()
+                    next_schedule = time.time() + poll_interval * 10
+                job_id = claim(worker_id)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('Job worker %s could not poll the queue', worker_id)
+                stop.wait(poll_interval)
+                continue
+
+            if job_id is None:
+                db.session.remove()
+                if burst:
+                    break
+                stop.wait(poll_interval)
+                continue
+
+            try:
+                execute(job_id, worker_id)
+            except Exception:
+                # The job keeps its lease and is handed out again once that expires
+                db.session.rollback()
+                app.logger.exception('Job worker %s could not record job %s', worker_id, job_id)
+                continue
+            finally:
+                db.session.remove()
+
+def _process_main(app, worker_id, stop, poll_interval, burst):
+    # The parent handles Ctrl-C and tells children to stop through `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    with app.app_context():
+        # Connections inherited across fork must not be reused
+        db.engine.dispose(close=False)
+    _work_loop(app, worker_id, stop, poll_interval, burst)
+
+class Worker:
+    """A pool of threads or processes pulling jobs from the queue"""
+
+    def __init__(self, app, concurrency=1, mode='thread', poll_interval=None, burst=False):
+        if mode not in ('thread', 'process'):
+            raise ValueError('mode must be thread or process')
+        self.app = app
+        self.concurrency = concurrency
+        self.mode = mode
+        self.poll_interval = poll_interval or app.config['JOBS_POLL_INTERVAL']
+        self.burst = burst
+        self.name = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.runners = []
+
+        if mode == 'process':
+            context = multiprocessing.get_context('fork')
+            self.stop_event = context.Event()
+            self._runner_class = context.Process
+            self._target = _process_main
+        else:
+            self.stop_event = threading.Event()
+            self._runner_class = threading.Thread
+            self._target = _work_loop
+
+    def start(self):
+        for i in range(self.concurrency):
+            worker_id = f'{self.name}/{i}'
+            runner = self._runner_class(
+                target=self._target,
+                args=(self.app, worker_id, self.stop_event, self.poll_interval, self.burst),
+                name=f'job-worker-{i}',
+                daemon=True
+            )
+            runner.start()
+            self.runners.append(runner)
+        return self
+
+    def join(self, timeout=None):
+        for runner in self.runners:
+            runner.join(timeout)
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        self.join(timeout)
+
+    def run(self):
+        """Start the pool and block until it finishes or is interrupted"""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop_event.set())
+        self.start()
+        try:
+            while any(runner.is_alive() for runner in self.runners) and not self.stop_event.is_set():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        self.stop()
+
+_embedded = {'worker': None}
+_embedded_lock = threading.Lock()
+
+def start_embedded_worker(app):
+    """Run a small thread pool inside the web process, started on first request
+
+    Starting lazily keeps CLI commands (including `flask jobs worker`) from
+    spawning a second pool. Set JOBS_EMBEDDED_WORKERS = 0 when running
+    dedicated workers.
+    """
+    threads = app.config.get('JOBS_EMBEDDED_WORKERS')
+    if not threads or app.config.get('TESTING') or app.config.get('RUN_JOBS_INLINE'):
+        return None
+    with _embedded_lock:
+        if _embedded['worker'] is None:
+            _embedded['worker'] = Worker(app, concurrency=threads).start()
+    return _embedded['worker']
+
+def stop_embedded_worker(timeout=None):
+    """Stop the embedded pool after its current jobs, e.g. when a server worker exits"""
+    with _embedded_lock:
+        worker, _embedded['worker'] = _embedded['worker'], None
+    if worker is not None:
+        worker.stop(timeout=timeout)
+
+def prune_jobs(older_than=None):
+    """Delete finished jobs past the retention period"""
+    cutoff = datetime.utcnow() - (older_than or current_app.config['JOBS_RETENTION'])
+    result = db.session.execute(
+        db.delete(Job).where(Job.status.in_(['succeeded', 'failed']), Job.updated_at < cutoff)
+    )
+    db.session.commit()
+    return result.rowcount
+
+@handler('prune_jobs', max_attempts=1, every='JOBS_PRUNE_INTERVAL')
+def prune_jobs_job(job_id):
+    return {'deleted': prune_jobs()}
+
+jobs_cli = AppGroup('jobs', help='Background job queue.')
+
+@jobs_cli.command('worker')
+@click.option('--concurrency', '-c', default=2, show_default=True, help='Number of threads or processes.')
+@click.option('--mode', type=click.Choice(['thread', 'process']), default='thread', show_default=True)
+@click.option('--poll-interval', type=float, default=None, help='Seconds to sleep when the queue is empty.')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+def worker_command(concurrency, mode, poll_interval, burst):
+    """Run a job worker pool."""
+    app = current_app._get_current_object()
+    worker = Worker(app, concurrency=concurrency, mode=mode, poll_interval=poll_interval, burst=burst)
+    click.echo(f'Worker {worker.name} running {concurrency} {mode}(s)')
+    worker.run()
+
+def init_app(app):
+    """Register the jobs CLI and the embedded worker"""
+    app.cli.add_command(jobs_cli)
+
+    @app.before_request
+    def ensure_embedded_worker():
+        if _embedded['worker'] is None:
+            start_embedded_worker(app)
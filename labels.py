@@ -0,0 +1,90 @@
+"""Board labels and the per-card bitmask that holds them
+
+Every label of a board owns one bit, so a card's labels are one BIGINT and
+"label A and B but not C" is `mask & AB = AB AND mask & C = 0` on the card
+row itself. Masks are kept as signed 64-bit values, the way SQLite and
+PostgreSQL store BIGINT; bit 63 is the sign bit.
+"""
+from sqlalchemy.exc import IntegrityError
+from models import db, Board, Label, List, Card
+
+MAX_LABELS = 64
+
+COLOR_LENGTH = 7
+
+def bit_value(bit):
+    """The signed 64-bit value with only `bit` set"""
+    return -(1 << 63) if bit == 63 else 1 << bit
+
+def mask_of(bits):
+    """The signed 64-bit mask with the given bits set"""
+    mask = 0
+    for bit in set(bits):
+        mask |= 1 << bit
+    return mask - (1 << 64) if mask >> 63 else mask
+
+def has_all(mask):
+    """SQL condition: the card has every label in `mask`"""
+    return Card.label_mask.op('&')(mask) == mask
+
+def has_none(mask):
+    """SQL condition: the card has none of the labels in `mask`"""
+    return Card.label_mask.op('&')(mask) == 0
+
+# Tries at a free bit before giving up to a concurrent create
+CREATE_ATTEMPTS = 3
+
+def free_bit(board_id):
+    """The lowest bit no label of the board uses, or None when all 64 are taken"""
+    used = set(db.session.execute(db.select(Label.bit).where(Label.board_id == board_id)).scalars())
+    return next((bit for bit in range(MAX_LABELS) if bit not in used), None)
+
+def create(board_id, name, color):
+    """Add a label on the lowest free bit and flush it; None when the board has no bit left
+
+    The board row is locked where the database has row locks, so concurrent
+    creates queue up. SQLite has none, so a create that loses the race for
+    a bit hits the (board_id, bit) constraint, rolls back and tries the next
+    free bit. Raises IntegrityError if every attempt loses.
+    """
+    for attempt in range(CREATE_ATTEMPTS):
+        if db.session.get_bind().dialect.name != 'sqlite':
+            db.session.execute(db.select(Board.id).where(Board.id == board_id).with_for_update())
+        bit = free_bit(board_id)
+        if bit is None:
+            return None
+        label = Label(board_id=board_id, name=name, color=color, bit=bit)
+        db.session.add(label)
+        try:
+            db.session.flush()
+            return label
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == CREATE_ATTEMPTS - 1:
+                raise
+
+def valid_color(color):
+    """Whether a color is a #rrggbb hex string"""
+    return isinstance(color, str) and len(color) == COLOR_LENGTH and color[0] == '#' and \
+        all(c in '0123456789abcdefABCDEF' for c in color[1:])
+
+def clear_bit(board_id, bit):
+    """Take a label off every card of a board in one UPDATE, archived and deleted cards included"""
+    board_lists = db.select(List.id).where(List.board_id == board_id)
+    db.session.execute(
+        db.update(Card)
+        .where(Card.list_id.in_(board_lists), has_all(bit_value(bit)))
+        .values(label_mask=Card.label_mask.op('&')(~bit_value(bit))),
+        execution_options={'synchronize_session': False}
+    )
+
+def set_bit(card_id, bit, on):
+    """Add or remove one label on a card as a bitwise UPDATE, so concurrent label edits all land"""
+    value = bit_value(bit)
+    mask = Card.label_mask.op('|')(value) if on else Card.label_mask.op('&')(~value)
+    condition = has_none(value) if on else has_all(value)
+    return db.session.execute(
+        db.update(Card).where(Card.id == card_id, condition)
+        .values(label_mask=mask, version=Card.version + 1),
+        execution_options={'synchronize_session': False}
+    ).rowcount
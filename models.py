@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+import json
+import passwords
+import replicas
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': replicas.RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -20,10 +22,10 @@ class User(db.Model):
     activities = db.relationship('Activity', backref='user', lazy=True)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return passwords.verify_password(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -41,12 +43,21 @@ class Board(db.Model):
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    is_template = db.Column(db.Boolean, default=False)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by log_activity at most once per ACTIVITY_RESOLUTION; the dashboard sorts on it
+    last_activity_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    version = db.Column(db.Integer, default=1, nullable=False)  # bumped by every PUT; see concurrency.py
     
     # Relationships
     lists = db.relationship('List', backref='board', lazy=True, cascade='all, delete-orphan', order_by='List.position')
+    active_lists = db.relationship('List', lazy=True, viewonly=True, order_by='List.position',
+                                   primaryjoin='and_(List.board_id == Board.id, List.archived_at.is_(None), '
+                                               'List.deleted_at.is_(None))')
     members = db.relationship('BoardMember', backref='board', lazy=True, cascade='all, delete-orphan')
+    labels = db.relationship('Label', backref='board', lazy=True, cascade='all, delete-orphan', order_by='Label.bit')
     activities = db.relationship('Activity', backref='board', lazy=True, cascade='all, delete-orphan', order_by='Activity.created_at.desc()')
     
     def to_dict(self, include_lists=False):
@@ -55,11 +66,14 @@ class Board(db.Model):
             'title': self.title,
             'description': self.description,
             'owner_id': self.owner_id,
+            'is_template': bool(self.is_template),
             'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'updated_at': self.updated_at.isoformat(),
+            'last_activity_at': self.last_activity_at.isoformat(),
+            'version': self.version
         }
         if include_lists:
-            data['lists'] = [lst.to_dict(include_cards=True) for lst in self.lists]
+            data['lists'] = [lst.to_dict(include_cards=True) for lst in self.active_lists]
         return data
 
 
@@ -86,17 +100,64 @@ class BoardMember(db.Model):
         }
 
 
+def mask_bits(mask):
+    """The bit numbers set in a label mask, lowest first; bit 63 makes the stored value negative"""
+    mask = (mask or 0) & 0xFFFFFFFFFFFFFFFF
+    bits = []
+    while mask:
+        low = mask & -mask
+        bits.append(low.bit_length() - 1)
+        mask ^= low
+    return bits
+
+
+class Label(db.Model):
+    __tablename__ = 'labels'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    board_id = db.Column(db.Integer, db.ForeignKey('boards.id'), nullable=False)
+    name = db.Column(db.String(50), nullable=False)
+    color = db.Column(db.String(7), nullable=False, default='#61bd4f')
+    bit = db.Column(db.Integer, nullable=False)  # this label's bit in Card.label_mask, 0-63
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Each label of a board owns one bit of its cards' label masks
+    __table_args__ = (db.UniqueConstraint('board_id', 'bit', name='_board_bit_uc'),)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'board_id': self.board_id,
+            'name': self.name,
+            'color': self.color,
+            'bit': self.bit
+        }
+
+
 class List(db.Model):
     __tablename__ = 'lists'
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
-    board_id = db.Column(db.Integer, db.ForeignKey('boards.id'), nullable=False)
+    board_id = db.Column(db.Integer, db.ForeignKey('boards.id'), nullable=False, index=True)
     position = db.Column(db.Integer, default=0)
+    archived_at = db.Column(db.DateTime, nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    version = db.Column(db.Integer, default=1, nullable=False)
+    
+    # Archived and deleted lists stay out of the board snapshot index
+    __table_args__ = (
+        db.Index('ix_lists_active_board_position', 'board_id', 'position',
+                 sqlite_where=db.text('archived_at IS NULL AND deleted_at IS NULL'),
+                 postgresql_where=db.text('archived_at IS NULL AND deleted_at IS NULL')),
+    )
     
     # Relationships
     cards = db.relationship('Card', backref='list', lazy=True, cascade='all, delete-orphan', order_by='Card.position')
+    active_cards = db.relationship('Card', lazy=True, viewonly=True, order_by='Card.position',
+                                   primaryjoin='and_(Card.list_id == List.id, Card.archived_at.is_(None), '
+                                               'Card.deleted_at.is_(None))')
     
     def to_dict(self, include_cards=False):
         data = {
@@ -104,10 +165,12 @@ class List(db.Model):
             'title': self.title,
             'board_id': self.board_id,
             'position': self.position,
-            'created_at': self.created_at.isoformat()
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None,
+            'created_at': self.created_at.isoformat(),
+            'version': self.version
         }
         if include_cards:
-            data['cards'] = [card.to_dict() for card in self.cards]
+            data['cards'] = [card.to_dict(compact=True) for card in self.active_cards]
         return data
 
 
@@ -121,16 +184,42 @@ class Card(db.Model):
     position = db.Column(db.Integer, default=0)
     due_date = db.Column(db.DateTime, nullable=True)
     completed = db.Column(db.Boolean, default=False)
+    archived_at = db.Column(db.DateTime, nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, default=1, nullable=False)
+    
+    # Badge counters kept by the write paths in card_counters.py, so the board
+    # view never loads checklist items, attachments or assignments
+    checklist_total = db.Column(db.Integer, default=0, nullable=False)
+    checklist_done = db.Column(db.Integer, default=0, nullable=False)
+    attachment_count = db.Column(db.Integer, default=0, nullable=False)
+    assignee_ids = db.Column(db.Text, default='', nullable=False)  # comma-separated user ids in assignment order
+    # One bit per board label (see Label.bit), so label filters are bitwise tests instead of joins
+    label_mask = db.Column(db.BigInteger, default=0, nullable=False)
+    
+    # Keyset pagination walks the active cards of a list in (position, id) order;
+    # archived and deleted cards are left out of the index so they never weigh on board loads
+    __table_args__ = (
+        db.Index('ix_cards_active_list_position', 'list_id', 'position', 'id',
+                 sqlite_where=db.text('archived_at IS NULL AND deleted_at IS NULL'),
+                 postgresql_where=db.text('archived_at IS NULL AND deleted_at IS NULL')),
+        db.Index('ix_cards_list_archived', 'list_id', 'archived_at'),
+        # Due date filters (overdue, due this week) range over one list's active cards
+        db.Index('ix_cards_active_list_due', 'list_id', 'due_date',
+                 sqlite_where=db.text('archived_at IS NULL AND deleted_at IS NULL'),
+                 postgresql_where=db.text('archived_at IS NULL AND deleted_at IS NULL')),
+    )
     
     # Relationships
     assignments = db.relationship('CardAssignment', backref='card', lazy=True, cascade='all, delete-orphan')
     attachments = db.relationship('Attachment', backref='card', lazy=True, cascade='all, delete-orphan')
-    checklists = db.relationship('ChecklistItem', backref='card', lazy=True, cascade='all, delete-orphan')
+    checklists = db.relationship('ChecklistItem', backref='card', lazy=True, cascade='all, delete-orphan',
+                                 order_by='[ChecklistItem.position, ChecklistItem.id]')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, compact=False):
+        data = {
             'id': self.id,
             'title': self.title,
             'description': self.description,
@@ -138,12 +227,22 @@ class Card(db.Model):
             'position': self.position,
             'due_date': self.due_date.isoformat() if self.due_date else None,
             'completed': self.completed,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'assignments': [a.to_dict() for a in self.assignments],
-            'attachments': [att.to_dict() for att in self.attachments],
-            'checklists': [item.to_dict() for item in self.checklists]
+            'checklist_total': self.checklist_total,
+            'checklist_done': self.checklist_done,
+            'attachment_count': self.attachment_count,
+            'assignee_ids': [int(user_id) for user_id in (self.assignee_ids or '').split(',') if user_id],
+            'label_bits': mask_bits(self.label_mask),
+            'version': self.version
         }
+        # Collections go with the card itself; board and list views only show the badges
+        if not compact:
+            data['assignments'] = [a.to_dict() for a in self.assignments]
+            data['attachments'] = [att.to_dict() for att in self.attachments]
+            data['checklists'] = [item.to_dict() for item in self.checklists]
+        return data
 
 
 class CardAssignment(db.Model):
@@ -154,8 +253,11 @@ class CardAssignment(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Unique constraint to prevent duplicate assignments
-    __table_args__ = (db.UniqueConstraint('card_id', 'user_id', name='_card_user_uc'),)
+    # Unique constraint to prevent duplicate assignments; the index serves "cards assigned to me"
+    __table_args__ = (
+        db.UniqueConstraint('card_id', 'user_id', name='_card_user_uc'),
+        db.Index('ix_card_assignments_user_card', 'user_id', 'card_id'),
+    )
     
     def to_dict(self):
         return {
@@ -171,7 +273,7 @@ class Attachment(db.Model):
     __tablename__ = 'attachments'
     
     id = db.Column(db.Integer, primary_key=True)
-    card_id = db.Column(db.Integer, db.ForeignKey('cards.id'), nullable=False)
+    card_id = db.Column(db.Integer, db.ForeignKey('cards.id'), nullable=False, index=True)
     filename = db.Column(db.String(255), nullable=False)
     filepath = db.Column(db.String(500), nullable=False)
     file_size = db.Column(db.Integer)
@@ -192,11 +294,12 @@ class ChecklistItem(db.Model):
     __tablename__ = 'checklist_items'
     
     id = db.Column(db.Integer, primary_key=True)
-    card_id = db.Column(db.Integer, db.ForeignKey('cards.id'), nullable=False)
+    card_id = db.Column(db.Integer, db.ForeignKey('cards.id'), nullable=False, index=True)
     title = db.Column(db.String(200), nullable=False)
     completed = db.Column(db.Boolean, default=False)
     position = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    version = db.Column(db.Integer, default=1, nullable=False)
     
     def to_dict(self):
         return {
@@ -205,7 +308,8 @@ class ChecklistItem(db.Model):
             'title': self.title,
             'completed': self.completed,
             'position': self.position,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at.isoformat(),
+            'version': self.version
         }
 
 
@@ -265,3 +369,52 @@ class Notification(db.Model):
             'is_read': self.is_read,
             'created_at': self.created_at.isoformat()
         }
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_claim', 'status', 'run_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    kind = db.Column(db.String(50), nullable=False)  # board_import, purge_tombstones, etc.
+    payload = db.Column(db.Text)  # JSON keyword arguments for the handler
+    status = db.Column(db.String(20), default='queued')  # queued, running, succeeded, failed
+    progress = db.Column(db.Integer, default=0)  # percent
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=3, nullable=False)
+    idempotency_key = db.Column(db.String(200), unique=True)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = db.Column(db.String(100))
+    lease_expires_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+
+class UserSession(db.Model):
+    __tablename__ = 'sessions'
+    
+    id = db.Column(db.String(64), primary_key=True)  # sha256 of the cookie value
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+    data = db.Column(db.Text, nullable=False)  # JSON
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
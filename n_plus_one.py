@@ -0,0 +1,107 @@
+import contextvars
+import os
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+class NPlusOneError(RuntimeError):
+    """Raised when one lazy load repeats more often than the threshold allows"""
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_scope = contextvars.ContextVar('n_plus_one_scope', default=None)
+
+class Scope:
+    """Lazy loads seen during one request or `detect()` block"""
+
+    def __init__(self, threshold, mode):
+        self.threshold = threshold
+        self.mode = mode  # 'raise' or 'warn'
+        self.counts = Counter()
+        self.reported = set()
+
+    def violations(self):
+        return {key: count for key, count in self.counts.items() if count > self.threshold}
+
+def _app_stack():
+    """The current stack trimmed to this project's frames"""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(_PROJECT_ROOT)
+        and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames))
+
+def _current_scope():
+    scope = _scope.get()
+    if scope is None and has_app_context():
+        scope = g.get('_n_plus_one')
+    return scope
+
+def _on_orm_execute(orm_execute_state):
+    scope = _current_scope()
+    if scope is None or not orm_execute_state.is_select:
+        return
+    state = orm_execute_state.lazy_loaded_from
+    if state is None:
+        return
+
+    # Same relationship from different parents: identical SQL, different parameters
+    key = (state.class_.__name__, str(orm_execute_state.statement))
+    scope.counts[key] += 1
+    count = scope.counts[key]
+    if count <= scope.threshold or key in scope.reported:
+        return
+
+    scope.reported.add(key)
+    message = (
+        f'N+1 query: lazy load from {key[0]} ran {count} times '
+        f'(threshold {scope.threshold}):\n{key[1]}\n'
+        'Add selectinload()/joinedload() to the query that loaded the parents.'
+    )
+    if scope.mode == 'raise':
+        raise NPlusOneError(message)
+    logger = current_app.logger if has_app_context() else None
+    if logger:
+        logger.warning('%s\n%s', message, _app_stack())
+
+_listening = {'on': False}
+
+def _listen():
+    if not _listening['on']:
+        event.listen(Session, 'do_orm_execute', _on_orm_execute)
+        _listening['on'] = True
+
+@contextmanager
+def detect(threshold=None, mode='raise'):
+    """Watch lazy loads inside the block, e.g. around a function under test"""
+    _listen()
+    if threshold is None:
+        threshold = current_app.config.get('N_PLUS_ONE_THRESHOLD', 5) if has_app_context() else 5
+    scope = Scope(threshold, mode)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+def _mode(app):
+    """N_PLUS_ONE_MODE, defaulting to warnings in debug mode and off otherwise"""
+    mode = app.config.get('N_PLUS_ONE_MODE')
+    if mode is None:
+        return 'warn' if app.debug else None
+    return mode if mode in ('warn', 'raise') else None
+
+def init_app(app):
+    """Check every request for repeated lazy loads"""
+    _listen()
+
+    @app.before_request
+    def start_n_plus_one_scope():
+        mode = _mode(app)
+        if mode:
+            g._n_plus_one = Scope(app.config.get('N_PLUS_ONE_THRESHOLD', 5), mode)
@@ -0,0 +1,145 @@
+import functools
+import threading
+import time
+from collections import deque
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULTS = {
+    'PASSWORD_HASH_METHOD': 'scrypt:32768:8:1',
+    'PASSWORD_HASH_WORKERS': 0,
+    'PASSWORD_HASH_QUEUE': 16,
+    'PASSWORD_HASH_TIMEOUT': 10,
+}
+
+class PasswordHasherBusy(Exception):
+    """More hashes are waiting than PASSWORD_HASH_QUEUE allows, or one outran PASSWORD_HASH_TIMEOUT"""
+
+def _config(key):
+    if has_app_context():
+        return current_app.config.get(key, DEFAULTS[key])
+    return DEFAULTS[key]
+
+class _Pool:
+    """A lazily started process pool with a bounded number of waiting jobs"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.slots = None
+        self.size = 0
+
+    def get(self, workers, queue):
+        with self.lock:
+            if self.executor is None or self.size != workers:
+                if self.executor is not None:
+                    self.executor.shutdown(wait=False)
+                # Only pulled in once a pool is actually wanted
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # spawn: forking a threaded web server can copy held locks into the child
+                self.executor = ProcessPoolExecutor(max_workers=workers,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+                self.slots = threading.BoundedSemaphore(workers + queue)
+                self.size = workers
+            return self.executor, self.slots
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+_pool = _Pool()
+
+def _run(fn, *args):
+    """Run a hashing function in the pool, or inline when the pool is disabled"""
+    workers = _config('PASSWORD_HASH_WORKERS')
+    if not workers:
+        return fn(*args)
+
+    executor, slots = _pool.get(workers, _config('PASSWORD_HASH_QUEUE'))
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    # The slot is held until the hash is done, not until this caller stops waiting,
+    # so abandoned hashes still count against PASSWORD_HASH_QUEUE
+    future.add_done_callback(lambda future: slots.release())
+
+    from concurrent.futures import TimeoutError as FutureTimeout
+    try:
+        return future.result(timeout=_config('PASSWORD_HASH_TIMEOUT'))
+    except FutureTimeout:
+        raise PasswordHasherBusy()
+
+def hash_password(password):
+    return _run(generate_password_hash, password, _config('PASSWORD_HASH_METHOD'))
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+@functools.lru_cache(maxsize=8)
+def _canonical_method(method):
+    """The method prefix Werkzeug writes for `method`, with its default parameters filled in"""
+    return generate_password_hash('', method).split('$', 1)[0]
+
+def needs_rehash(password_hash):
+    """True if the hash was made with other parameters than PASSWORD_HASH_METHOD"""
+    return password_hash.split('$', 1)[0] != _canonical_method(_config('PASSWORD_HASH_METHOD'))
+
+class LoginRateLimiter:
+    """Sliding-window count of failed logins per username and per client IP
+
+    Kept in process memory, so with several worker processes each enforces
+    its own limit.
+    """
+
+    def __init__(self, max_per_user, max_per_ip, window):
+        self.limits = {'user': max_per_user, 'ip': max_per_ip}
+        self.window = window
+        self.failures = {}  # (kind, value) -> deque of timestamps
+        self.lock = threading.Lock()
+
+    def _recent(self, key, now):
+        attempts = self.failures.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self.failures[key]
+            return None
+        return attempts
+
+    def retry_after(self, username, ip, now=None):
+        """Seconds until another attempt is allowed, or 0"""
+        now = now or time.monotonic()
+        wait = 0
+        with self.lock:
+            for kind, value in (('user', username.lower()), ('ip', ip)):
+                attempts = self._recent((kind, value), now)
+                if attempts and len(attempts) >= self.limits[kind]:
+                    wait = max(wait, attempts[0] + self.window - now)
+        return int(wait) + 1 if wait else 0
+
+    def record_failure(self, username, ip, now=None):
+        now = now or time.monotonic()
+        with self.lock:
+            for key in (('user', username.lower()), ('ip', ip)):
+                self.failures.setdefault(key, deque()).append(now)
+
+    def reset(self, username):
+        with self.lock:
+            self.failures.pop(('user', username.lower()), None)
+
+def init_app(app):
+    """Attach the login rate limiter"""
+    app.extensions['login_limiter'] = LoginRateLimiter(
+        app.config['LOGIN_MAX_ATTEMPTS'],
+        app.config['LOGIN_MAX_ATTEMPTS_PER_IP'],
+        app.config['LOGIN_ATTEMPT_WINDOW']
+    )
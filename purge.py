@@ -0,0 +1,125 @@
+import os
+from datetime import datetime
+from flask import current_app
+from models import (
+    db, Board, BoardMember, List, Card, CardAssignment, Attachment, ChecklistItem, Activity, Notification, Label
+)
+import jobs
+
+def _cutoff(now=None):
+    """Tombstones older than this have passed their undo window"""
+    now = now or datetime.utcnow()
+    return now - current_app.config['SOFT_DELETE_UNDO_WINDOW']
+
+def _dead_boards(cutoff):
+    return db.select(Board.id).where(Board.deleted_at < cutoff)
+
+def _dead_lists(cutoff):
+    return db.select(List.id).where(db.or_(
+        List.deleted_at < cutoff,
+        List.board_id.in_(_dead_boards(cutoff))
+    ))
+
+def _dead_cards(cutoff):
+    return db.select(Card.id).where(db.or_(
+        Card.deleted_at < cutoff,
+        Card.list_id.in_(_dead_lists(cutoff))
+    ))
+
+def _next_ids(query, batch_size):
+    return db.session.execute(query.limit(batch_size)).scalars().all()
+
+def _remove_files(filepaths):
+    """Remove attachment blobs whose rows are already gone"""
+    for filepath in filepaths:
+        path = os.path.join(current_app.config['UPLOAD_FOLDER'], filepath)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            current_app.logger.warning('Could not remove attachment file %s', path)
+
+def _purge_cards(card_ids):
+    filepaths = db.session.execute(
+        db.select(Attachment.filepath).where(Attachment.card_id.in_(card_ids))
+    ).scalars().all()
+
+    db.session.execute(db.delete(ChecklistItem).where(ChecklistItem.card_id.in_(card_ids)))
+    db.session.execute(db.delete(Attachment).where(Attachment.card_id.in_(card_ids)))
+    db.session.execute(db.delete(CardAssignment).where(CardAssignment.card_id.in_(card_ids)))
+    db.session.execute(
+        db.update(Notification)
+        .where(Notification.related_card_id.in_(card_ids))
+        .values(related_card_id=None)
+    )
+    db.session.execute(db.delete(Card).where(Card.id.in_(card_ids)))
+    db.session.commit()
+
+    # Files go only after the rows are committed, so a failed purge never leaves dangling rows
+    _remove_files(filepaths)
+
+def _purge_boards(board_ids):
+    db.session.execute(db.delete(Activity).where(Activity.board_id.in_(board_ids)))
+    db.session.execute(db.delete(BoardMember).where(BoardMember.board_id.in_(board_ids)))
+    db.session.execute(db.delete(Label).where(Label.board_id.in_(board_ids)))
+    db.session.execute(
+        db.update(Notification)
+        .where(Notification.related_board_id.in_(board_ids))
+        .values(related_board_id=None)
+    )
+    db.session.execute(db.delete(Board).where(Board.id.in_(board_ids)))
+    db.session.commit()
+
+def purge_tombstones(batch_size=None, now=None):
+    """Hard-delete soft-deleted boards, lists and cards past their undo window
+
+    Rows are removed bottom-up in chunks of `batch_size` with set-based
+    DELETEs, committing after every chunk so the write lock is never held
+    for long. Returns the number of boards, lists and cards removed.
+    """
+    batch_size = batch_size or current_app.config['PURGE_BATCH_SIZE']
+    cutoff = _cutoff(now)
+    purged = {'boards': 0, 'lists': 0, 'cards': 0}
+
+    while True:
+        card_ids = _next_ids(_dead_cards(cutoff), batch_size)
+        if not card_ids:
+            break
+        _purge_cards(card_ids)
+        purged['cards'] += len(card_ids)
+
+    while True:
+        list_ids = _next_ids(_dead_lists(cutoff), batch_size)
+        if not list_ids:
+            break
+        db.session.execute(db.delete(List).where(List.id.in_(list_ids)))
+        db.session.commit()
+        purged['lists'] += len(list_ids)
+
+    while True:
+        board_ids = _next_ids(_dead_boards(cutoff), batch_size)
+        if not board_ids:
+            break
+        _purge_boards(board_ids)
+        purged['boards'] += len(board_ids)
+
+    return purged
+
+@jobs.handler('purge_tombstones', max_attempts=1, every='PURGE_INTERVAL')
+def purge_job(job_id):
+    """Periodic job run by the job workers"""
+    return purge_tombstones()
+
+@jobs.handler('remove_files')
+def remove_files_job(job_id, filepaths):
+    """Remove attachment blobs off the request path"""
+    _remove_files(filepaths)
+
+def init_app(app):
+    """Register the purge CLI command"""
+    @app.cli.command('purge-tombstones')
+    def purge_command():
+        """Hard-delete soft-deleted items whose undo window has passed."""
+        purged = purge_tombstones()
+        print(f"Purged {purged['boards']} boards, {purged['lists']} lists, {purged['cards']} cards")
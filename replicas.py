@@ -0,0 +1,135 @@
+"""Read replicas: GETs to read-heavy endpoints query a replica, everything else the primary.
+
+    REPLICA_DATABASE_URIS = ['postgresql://replica-1/boardify', 'postgresql://replica-2/boardify']
+
+Each request to REPLICA_ENDPOINTS picks one replica for all its SELECTs.
+The first write in a request moves the rest of it to the primary, and any
+write or non-GET request pins the client to the primary for
+REPLICA_STICKY_SECONDS with a cookie, so users always read their own
+writes even while the replicas lag. Sessions, jobs and CLI commands run
+outside these requests and always use the primary.
+"""
+import os
+import random
+import time
+import sqlalchemy as sa
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+# Endpoints that only read, and can show data a moment old
+REPLICA_ENDPOINTS = {
+    'boards.get_boards',
+    'boards.get_board',
+    'boards.get_board_activities',
+    'users.get_my_tasks',
+    'users.get_calendar_tasks',
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+class RoutingSession(Session):
+    """db.session: SELECTs go to the request's replica, if it was given one"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if getattr(clause, 'is_dml', False):
+                _wrote()
+            elif not self._flushing and getattr(clause, 'is_select', False):
+                replica = g.get('replica')
+                if replica is not None:
+                    return replica
+        if bind is None and isinstance(self.bind, sa.engine.Connection):
+            # Joined to an outer transaction, as an atomic batch is
+            return self.bind
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@sa.event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    if has_request_context():
+        _wrote()
+
+def _wrote():
+    """Read from the primary for the rest of the request, and pin the client to it"""
+    g.replica = None
+    g.db_wrote = True
+
+class ReplicaSet:
+    """The replica engines, skipping any that recently failed to connect"""
+
+    def __init__(self, engines, retry_seconds):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self.down_until = {}  # engine -> monotonic time it may be tried again
+        for engine in engines:
+            sa.event.listen(engine, 'handle_error', self.on_error)
+
+    def on_error(self, context):
+        # No connection means connecting failed; either way the replica sits out a while
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def pick(self):
+        """A random healthy replica, or None to use the primary"""
+        now = time.monotonic()
+        healthy = [engine for engine in self.engines if self.down_until.get(engine, 0) <= now]
+        return random.choice(healthy) if healthy else None
+
+    def mark_down(self, engine):
+        self.down_until[engine] = time.monotonic() + self.retry_seconds
+
+    def dispose(self, close=True):
+        for engine in self.engines:
+            engine.dispose(close=close)
+
+def _read_only_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA query_only = ON')
+    cursor.execute('PRAGMA busy_timeout = 5000')
+    cursor.close()
+
+def make_engine(app, url):
+    """An engine for one replica, with the REPLICA_ENGINE_OPTIONS pool settings"""
+    url = sa.engine.make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            raise ValueError('An in-memory SQLite database cannot be a replica')
+        # Relative paths resolve against the instance folder, as they do for the primary
+        if not os.path.isabs(url.database):
+            url = url.set(database=os.path.join(app.instance_path, url.database))
+    engine = sa.create_engine(url, **app.config['REPLICA_ENGINE_OPTIONS'])
+    if url.get_backend_name() == 'sqlite':
+        sa.event.listen(engine, 'connect', _read_only_sqlite)
+    return engine
+
+def init_app(app):
+    """Route reads of REPLICA_ENDPOINTS to REPLICA_DATABASE_URIS, if any are configured"""
+    urls = app.config.get('REPLICA_DATABASE_URIS')
+    if not urls:
+        return
+
+    replicas = ReplicaSet([make_engine(app, url) for url in urls], app.config['REPLICA_RETRY_SECONDS'])
+    app.extensions['replicas'] = replicas
+    if 'metrics' in app.extensions:
+        import instrumentation
+        for engine in replicas.engines:
+            instrumentation.instrument_engine(engine)
+
+    cookie = app.config['REPLICA_STICKY_COOKIE']
+
+    @app.before_request
+    def choose_replica():
+        if (request.method in ('GET', 'HEAD') and request.endpoint in REPLICA_ENDPOINTS
+                and cookie not in request.cookies):
+            g.replica = replicas.pick()
+
+    @app.after_request
+    def stick_to_primary(response):
+        if request.method not in SAFE_METHODS or g.get('db_wrote'):
+            response.set_cookie(
+                cookie, '1',
+                max_age=app.config['REPLICA_STICKY_SECONDS'],
+                httponly=True,
+                secure=app.config['SESSION_COOKIE_SECURE'],
+                samesite=app.config['SESSION_COOKIE_SAMESITE'],
+            )
+        return response
@@ -1,5 +1,7 @@
-from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for
+from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for, current_app
 from models import db, User
+from passwords import PasswordHasherBusy, needs_rehash
+from sessions import current_user, revoke_user_sessions
 from functools import wraps
 
 auth_bp = Blueprint('auth', __name__)
@@ -35,7 +37,10 @@ def register():
         username=data['username'],
         email=data['email']
     )
-    user.set_password(data['password'])
+    try:
+        user.set_password(data['password'])
+    except PasswordHasherBusy:
+        return jsonify({'error': 'Server busy, try again shortly'}), 503
     
     db.session.add(user)
     db.session.commit()
@@ -53,12 +58,34 @@ def login():
     if not data or not data.get('username') or not data.get('password'):
         return jsonify({'error': 'Missing username or password'}), 400
     
+    # Throttle before hashing so guessing cannot burn CPU
+    limiter = current_app.extensions['login_limiter']
+    retry_after = limiter.retry_after(data['username'], request.remote_addr)
+    if retry_after:
+        return jsonify({'error': 'Too many login attempts, try again later'}), 429, {'Retry-After': str(retry_after)}
+    
     # Find user
     user = User.query.filter_by(username=data['username']).first()
     
-    if not user or not user.check_password(data['password']):
+    try:
+        valid = user is not None and user.check_password(data['password'])
+    except PasswordHasherBusy:
+        return jsonify({'error': 'Server busy, try again shortly'}), 503, {'Retry-After': '1'}
+    
+    if not valid:
+        limiter.record_failure(data['username'], request.remote_addr)
         return jsonify({'error': 'Invalid username or password'}), 401
     
+    limiter.reset(data['username'])
+    
+    # Upgrade hashes made with old parameters while we have the plain password
+    if needs_rehash(user.password_hash):
+        try:
+            user.set_password(data['password'])
+            db.session.commit()
+        except PasswordHasherBusy:
+            pass
+    
     # Create session
     session['user_id'] = user.id
     session['username'] = user.username
@@ -71,10 +98,18 @@ def logout():
     session.clear()
     return jsonify({'message': 'Logout successful'}), 200
 
+@auth_bp.route('/logout-all', methods=['POST'])
+@login_required
+def logout_all():
+    """End every session of the current user, on all devices"""
+    revoked = revoke_user_sessions(session['user_id'])
+    session.clear()
+    return jsonify({'message': 'Logged out everywhere', 'sessions': revoked}), 200
+
 @auth_bp.route('/me', methods=['GET'])
 @login_required
 def get_current_user():
-    user = User.query.get(session['user_id'])
+    user = current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
-    return jsonify(user.to_dict()), 200
+    return jsonify(user), 200
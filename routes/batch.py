@@ -0,0 +1,145 @@
+from flask import Blueprint, request, jsonify, session, current_app, g
+from models import db
+from routes.auth import login_required
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+import n_plus_one
+
+batch_bp = Blueprint('batch', __name__)
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Response headers handed back with each sub-response
+RESPONSE_HEADERS = ('ETag', 'Location')
+
+@batch_bp.route('', methods=['POST'])
+@login_required
+def run_batch():
+    """Run several API requests in one round trip"""
+    data = request.get_json(silent=True)
+    
+    if not data or not isinstance(data.get('requests'), list) or not data['requests']:
+        return jsonify({'error': 'requests must be a non-empty list'}), 400
+    
+    limit = current_app.config['BATCH_MAX_REQUESTS']
+    if len(data['requests']) > limit:
+        return jsonify({'error': f'At most {limit} requests per batch'}), 400
+    
+    for sub in data['requests']:
+        error = invalid_subrequest(sub)
+        if error:
+            return jsonify({'error': error}), 400
+    
+    atomic = bool(data.get('atomic'))
+    committed = True
+    responses = []
+    
+    # Sub-requests share one answer per board to the access check
+    g.board_access = {}
+    
+    if atomic:
+        # Views still call commit(); joined to this outer transaction, that only releases a savepoint
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        if connection.dialect.name == 'sqlite' and not connection.connection.dbapi_connection.in_transaction:
+            # pysqlite only opens a transaction before DML, so a released SAVEPOINT would commit
+            connection.exec_driver_sql('BEGIN')
+        outer_session = db.session.registry()
+        db.session.registry.set(
+            db.session.session_factory(bind=connection, join_transaction_mode='create_savepoint')
+        )
+    
+    try:
+        for sub in data['requests']:
+            status, headers, body = dispatch(sub)
+            responses.append({'status': status, 'headers': headers, 'body': body})
+            if atomic and status >= 400:
+                committed = False
+                break
+    
+        if atomic:
+            db.session.close()
+            if committed:
+                transaction.commit()
+            else:
+                transaction.rollback()
+    finally:
+        if atomic:
+            db.session.close()
+            db.session.registry.set(outer_session)
+            connection.close()
+    
+    return jsonify({'atomic': atomic, 'committed': committed, 'responses': responses}), 200
+
+def invalid_subrequest(sub):
+    """Why a sub-request cannot be run, or None"""
+    if not isinstance(sub, dict) or not isinstance(sub.get('path'), str):
+        return 'Each request needs a path'
+    if not sub['path'].startswith('/api/') or sub['path'].startswith('/api/batch'):
+        return f"Cannot batch {sub['path']}"
+    if str(sub.get('method', 'GET')).upper() not in BATCH_METHODS:
+        return f"Cannot batch method {sub.get('method')}"
+    if not isinstance(sub.get('headers', {}), dict):
+        return 'headers must be an object'
+    return None
+
+def dispatch(sub):
+    """Run one sub-request through the app's views; returns (status, headers, body)
+
+    Only the view runs: before_request and after_request hooks stay with the
+    batch request itself, whose `g` every sub-request shares. That is safe
+    because each hook is either per connection or handled here:
+    - timing and profiling cover the whole batch, as one request
+    - the N+1 scope is swapped in per sub-request below
+    - replica choice: /api/batch is not a replica endpoint, so every
+      sub-request reads the primary and sees the writes before it, and
+      the batch's own after_request pins the client to the primary
+    - the embedded job worker was started by the batch request
+    - login throttling lives in /auth/ views, which cannot be batched
+    """
+    method = str(sub.get('method', 'GET')).upper()
+    builder = EnvironBuilder(
+        path=sub['path'],
+        base_url=request.host_url,
+        method=method,
+        headers={str(k): str(v) for k, v in sub.get('headers', {}).items()},
+        json=sub.get('body'),
+        environ_base={'REMOTE_ADDR': request.remote_addr},
+    )
+    
+    # The nested context reuses this app context, so db.session and g are shared;
+    # it gets the caller's session instead of reading the cookie again
+    ctx = current_app.request_context(builder.get_environ())
+    ctx.session = session._get_current_object()
+    
+    # Repeated lazy loads are counted per sub-request, as for separate requests
+    scope = g.get('_n_plus_one')
+    if scope is not None:
+        g._n_plus_one = n_plus_one.Scope(scope.threshold, scope.mode)
+    
+    try:
+        with ctx:
+            try:
+                rv = current_app.dispatch_request()
+            except HTTPException as e:
+                rv = current_app.handle_user_exception(e)
+            except Exception:
+                # A crashing view fails its own sub-request, not the calls already applied
+                current_app.logger.exception('Batched %s %s failed', method, sub['path'])
+                db.session.rollback()
+                rv = jsonify({'error': 'Internal server error'}), 500
+            response = current_app.make_response(rv)
+            body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+    
+            # Drop whatever the view left uncommitted, as the end of a request would
+            db.session.rollback()
+    
+            # Membership, ownership and deletion all change through the boards API
+            if request.blueprint == 'boards' and method != 'GET':
+                g.board_access.clear()
+    finally:
+        if scope is not None:
+            g._n_plus_one = scope
+    
+    headers = {name: response.headers[name] for name in RESPONSE_HEADERS if name in response.headers}
+    return response.status_code, headers, body
@@ -1,10 +1,35 @@
-from flask import Blueprint, request, jsonify, session
-from models import db, Board, BoardMember, User, Activity, Notification
+from flask import Blueprint, request, jsonify, session, current_app, g, Response, stream_with_context, url_for
+from models import db, Board, BoardMember, User, Activity, Notification, List, Card, Label
 from routes.auth import login_required
-from datetime import datetime
+from board_copy import copy_board
+import board_io
+import card_filters
+import labels
+import concurrency
+import jobs
+import schema
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from werkzeug.utils import secure_filename
+from datetime import datetime, timedelta
+import os
+import uuid
 
 boards_bp = Blueprint('boards', __name__)
 
+# Per-list card paging for large boards
+DEFAULT_CARD_PAGE_SIZE = 50
+MAX_CARD_PAGE_SIZE = 500
+
+# Dashboard paging
+DEFAULT_BOARD_PAGE_SIZE = 50
+MAX_BOARD_PAGE_SIZE = 200
+
+# A board's last_activity_at is only rewritten once it is this stale, so a
+# busy board does not take a row write on every card edit
+ACTIVITY_RESOLUTION = timedelta(minutes=1)
+
 def log_activity(board_id, user_id, action, entity_type, entity_id, description):
     """Helper function to log activities"""
     activity = Activity(
@@ -16,38 +41,256 @@ def log_activity(board_id, user_id, action, entity_type, entity_id, description)
         description=description
     )
     db.session.add(activity)
+    touch_board(board_id)
+
+def touch_board(board_id):
+    """Move a board to the top of its members' dashboards"""
+    now = datetime.utcnow()
+    board = db.session.get(Board, board_id)  # usually already loaded by the access check
+    if board is None or board.last_activity_at > now - ACTIVITY_RESOLUTION:
+        return
+    db.session.execute(
+        db.update(Board).where(Board.id == board_id)
+        .values(last_activity_at=now, updated_at=Board.updated_at),
+        execution_options={'synchronize_session': False}
+    )
+    set_committed_value(board, 'last_activity_at', now)
+
+@schema.backfill('boards', 'last_activity_at')
+def date_last_activity():
+    """Date boards from before last_activity_at by their latest activity, else their last edit"""
+    latest = db.select(db.func.max(Activity.created_at)).where(Activity.board_id == Board.id).scalar_subquery()
+    db.session.execute(
+        db.update(Board)
+        .values(last_activity_at=db.func.coalesce(latest, Board.updated_at, Board.created_at, datetime.utcnow()),
+                updated_at=Board.updated_at),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+
+def get_live_board(board_id):
+    """Get a board unless it has been soft deleted"""
+    board = Board.query.get(board_id)
+    if not board or board.deleted_at is not None:
+        return None
+    return board
+
+def get_live_list(list_id):
+    """Get a list unless it or its board has been soft deleted"""
+    list_obj = List.query.get(list_id)
+    if not list_obj or list_obj.deleted_at is not None:
+        return None
+    if list_obj.board.deleted_at is not None:
+        return None
+    return list_obj
+
+def get_live_card(card_id):
+    """Get a card and its list unless either has been soft deleted"""
+    card = Card.query.get(card_id)
+    if not card or card.deleted_at is not None:
+        return None, None
+    list_obj = get_live_list(card.list_id)
+    if not list_obj:
+        return None, None
+    return card, list_obj
+
+def soft_delete(entity):
+    """Tombstone a board, list or card and report how long it can be restored"""
+    entity.deleted_at = datetime.utcnow()
+    return entity.deleted_at + current_app.config['SOFT_DELETE_UNDO_WINDOW']
+
+def can_restore(entity):
+    """A tombstoned entity can be restored until its undo window closes"""
+    if entity.deleted_at is None:
+        return False
+    window = current_app.config['SOFT_DELETE_UNDO_WINDOW']
+    return datetime.utcnow() <= entity.deleted_at + window
 
 def check_board_access(board_id, user_id):
     """Check if user has access to board"""
-    board = Board.query.get(board_id)
-    if not board:
-        return None, False
+    # Within a batch the answer is shared by its sub-requests
+    shared = g.get('board_access')
+    if shared is not None and (board_id, user_id) in shared:
+        return shared[(board_id, user_id)]
     
-    # Owner has access
-    if board.owner_id == user_id:
-        return board, True
+    board = get_live_board(board_id)
+    if not board:
+        access = None, False
+    elif board.owner_id == user_id:
+        # Owner has access
+        access = board, True
+    else:
+        # Check if user is a member
+        member = BoardMember.query.filter_by(board_id=board_id, user_id=user_id).first()
+        access = board, member is not None
+    
+    if shared is not None:
+        shared[(board_id, user_id)] = access
+    return access
+
+def clamp_card_limit(limit):
+    """Keep a requested card page size within sane bounds"""
+    if limit is None:
+        return DEFAULT_CARD_PAGE_SIZE
+    return max(1, min(limit, MAX_CARD_PAGE_SIZE))
+
+def encode_card_cursor(card):
+    """Build the continuation cursor pointing just after a card"""
+    return f"{card.position}:{card.id}"
+
+def decode_card_cursor(cursor):
+    """Parse a cursor into (position, card_id)
+
+    Both halves are required: positions can tie, and only the id says
+    which of the tied cards the previous page ended on.
+    """
+    if cursor is None or cursor == '':
+        return None
+    position, _, card_id = str(cursor).partition(':')
+    try:
+        return int(position), int(card_id)
+    except ValueError:
+        raise ValueError('Invalid cursor')
+
+def cards_after(query, after):
+    """Restrict a card query to the cards ranked after a decoded cursor"""
+    if after is None:
+        return query
+    position, card_id = after
+    return query.filter(db.or_(
+        Card.position > position,
+        db.and_(Card.position == position, Card.id > card_id)
+    ))
+
+def get_list_card_counts(board_id):
+    """Count the cards of every list on a board with one grouped query"""
+    rows = db.session.query(Card.list_id, db.func.count(Card.id))\
+        .join(List, List.id == Card.list_id)\
+        .filter(List.board_id == board_id, Card.archived_at.is_(None), Card.deleted_at.is_(None))\
+        .group_by(Card.list_id)\
+        .all()
+    return dict(rows)
+
+def get_first_cards(board_id, limit):
+    """Load the first `limit` cards of every list on a board in one query"""
+    ranked = db.session.query(
+        Card.id.label('card_id'),
+        db.func.row_number().over(
+            partition_by=Card.list_id,
+            order_by=(Card.position, Card.id)
+        ).label('rank')
+    ).join(List, List.id == Card.list_id)\
+        .filter(List.board_id == board_id, Card.archived_at.is_(None), Card.deleted_at.is_(None))\
+        .subquery()
+    
+    cards = Card.query.join(ranked, ranked.c.card_id == Card.id)\
+        .filter(ranked.c.rank <= limit)\
+        .order_by(Card.list_id, Card.position, Card.id)\
+        .all()
     
-    # Check if user is a member
-    member = BoardMember.query.filter_by(board_id=board_id, user_id=user_id).first()
-    return board, member is not None
+    cards_by_list = {}
+    for card in cards:
+        cards_by_list.setdefault(card.list_id, []).append(card)
+    return cards_by_list
+
+def serialize_board_page(board, card_limit):
+    """Serialize a board with at most `card_limit` cards per list"""
+    counts = get_list_card_counts(board.id)
+    cards_by_list = get_first_cards(board.id, card_limit)
+    
+    data = board.to_dict()
+    data['labels'] = [label.to_dict() for label in board.labels]
+    data['lists'] = []
+    for lst in board.active_lists:
+        cards = cards_by_list.get(lst.id, [])
+        total = counts.get(lst.id, 0)
+        list_data = lst.to_dict()
+        list_data['cards'] = [card.to_dict(compact=True) for card in cards]
+        list_data['card_count'] = total
+        list_data['next_cursor'] = encode_card_cursor(cards[-1]) if len(cards) < total else None
+        data['lists'].append(list_data)
+    return data
 
 @boards_bp.route('', methods=['GET'])
 @login_required
 def get_boards():
-    """Get all boards for current user"""
+    """Get the current user's boards, most recently active first
+
+    With `limit` the response is one page, `{'boards': [...], 'next_cursor': ...}`;
+    pass the cursor back as `after`. `summary=1` adds open, overdue and member
+    counts to each board.
+    """
     user_id = session['user_id']
     
-    # Get owned boards
-    owned_boards = Board.query.filter_by(owner_id=user_id).all()
-    
-    # Get boards where user is a member
-    memberships = BoardMember.query.filter_by(user_id=user_id).all()
-    member_boards = [membership.board for membership in memberships]
-    
-    # Combine and remove duplicates
-    all_boards = {board.id: board for board in owned_boards + member_boards}
-    
-    return jsonify([board.to_dict() for board in all_boards.values()]), 200
+    # Owned and member boards in one query
+    is_member = db.select(BoardMember.id)\
+        .where(BoardMember.board_id == Board.id, BoardMember.user_id == user_id)\
+        .exists()
+    query = Board.query.filter(Board.deleted_at.is_(None))\
+        .filter(db.or_(Board.owner_id == user_id, is_member))\
+        .order_by(Board.last_activity_at.desc(), Board.id.desc())
+    
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, min(limit, MAX_BOARD_PAGE_SIZE))
+        after = request.args.get('after')
+        if after:
+            last_activity_at, _, board_id = after.rpartition('|')
+            try:
+                last_activity_at = datetime.fromisoformat(last_activity_at)
+                board_id = int(board_id)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.filter(db.or_(
+                Board.last_activity_at < last_activity_at,
+                db.and_(Board.last_activity_at == last_activity_at, Board.id < board_id)
+            ))
+        query = query.limit(limit + 1)
+    
+    boards = query.all()
+    has_more = limit is not None and len(boards) > limit
+    boards = boards[:limit]
+    
+    boards_data = [board.to_dict() for board in boards]
+    if request.args.get('summary', type=int):
+        summaries = board_summaries([board.id for board in boards])
+        for board_data in boards_data:
+            board_data['summary'] = summaries[board_data['id']]
+    
+    if limit is None:
+        return jsonify(boards_data), 200
+    
+    next_cursor = None
+    if has_more:
+        last = boards[-1]
+        next_cursor = f"{last.last_activity_at.isoformat()}|{last.id}"
+    
+    return jsonify({'boards': boards_data, 'next_cursor': next_cursor}), 200
+
+def board_summaries(board_ids):
+    """Incomplete card, overdue card and member counts for some boards, from one grouped query"""
+    if not board_ids:
+        return {}
+    now = datetime.utcnow()
+    member_count = db.select(db.func.count(BoardMember.id))\
+        .where(BoardMember.board_id == Board.id)\
+        .scalar_subquery()
+    is_open = db.and_(Card.id.isnot(None), db.not_(db.func.coalesce(Card.completed, False)))
+    rows = db.session.execute(
+        db.select(Board.id,
+                  db.func.sum(db.case((is_open, 1), else_=0)),
+                  db.func.sum(db.case((db.and_(is_open, Card.due_date < now), 1), else_=0)),
+                  member_count)
+        .outerjoin(List, db.and_(List.board_id == Board.id,
+                                 List.archived_at.is_(None), List.deleted_at.is_(None)))
+        .outerjoin(Card, db.and_(Card.list_id == List.id,
+                                 Card.archived_at.is_(None), Card.deleted_at.is_(None)))
+        .where(Board.id.in_(board_ids))
+        .group_by(Board.id)
+    )
+    return {board_id: {'open_cards': open_cards or 0, 'overdue_cards': overdue_cards or 0,
+                       'members': members + 1}  # the owner is not a BoardMember row
+            for board_id, open_cards, overdue_cards, members in rows}
 
 @boards_bp.route('', methods=['POST'])
 @login_required
@@ -94,7 +337,65 @@ def get_board(board_id):
     if not has_access:
         return jsonify({'error': 'Access denied'}), 403
     
-    return jsonify(board.to_dict(include_lists=True)), 200
+    # Large boards ask for a bounded number of cards per list
+    card_limit = request.args.get('card_limit', type=int)
+    if card_limit is not None:
+        return jsonify(serialize_board_page(board, clamp_card_limit(card_limit))), 200
+    
+    # Reload the board with its lists and cards in a handful of queries; cards carry
+    # badge counters, so their checklists, attachments and assignments stay unloaded
+    board = db.session.execute(
+        db.select(Board).where(Board.id == board_id).options(
+            selectinload(Board.active_lists).selectinload(List.active_cards),
+            selectinload(Board.labels)
+        ).execution_options(populate_existing=True)
+    ).scalar_one()
+    
+    # Cards carry label bits only; the label set comes once with the board
+    data = board.to_dict(include_lists=True)
+    data['labels'] = [label.to_dict() for label in board.labels]
+    
+    return jsonify(data), 200
+
+@boards_bp.route('/<int:board_id>/cards', methods=['GET'])
+@login_required
+def filter_board_cards(board_id):
+    """Get the board's cards matching filters, grouped by list like a board page
+
+    Filters are the query parameters described in card_filters.py. Every active
+    list is returned, with at most `card_limit` matching cards and its match
+    count. `list_id` with `after` continues one list from its `next_cursor`.
+    """
+    user_id = session['user_id']
+    board, has_access = check_board_access(board_id, user_id)
+    
+    if not board:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    try:
+        filters = card_filters.parse(request.args, user_id, board=board)
+        after = decode_card_cursor(request.args.get('after'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    list_id = request.args.get('list_id', type=int)
+    card_limit = clamp_card_limit(request.args.get('card_limit', type=int))
+    cards_by_list, counts, more = card_filters.matching_cards(board_id, filters, card_limit, list_id, after)
+    
+    lists = board.active_lists if list_id is None else [lst for lst in board.active_lists if lst.id == list_id]
+    data = {'board_id': board_id, 'lists': []}
+    for lst in lists:
+        cards = cards_by_list.get(lst.id, [])
+        list_data = lst.to_dict()
+        list_data['cards'] = [card.to_dict(compact=True) for card in cards]
+        list_data['card_count'] = counts.get(lst.id, 0)
+        list_data['next_cursor'] = encode_card_cursor(cards[-1]) if lst.id in more else None
+        data['lists'].append(list_data)
+    
+    return jsonify(data), 200
 
 @boards_bp.route('/<int:board_id>', methods=['PUT'])
 @login_required
@@ -111,9 +412,28 @@ def update_board(board_id):
     
     data = request.get_json()
     
+    try:
+        expected = concurrency.expected_version(data)
+    except concurrency.InvalidVersion as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if expected is not None and expected != board.version:
+        return concurrency.conflict(board, 'board')
+    
+    values = {}
+    old_title = board.title
+    
+    if 'title' in data:
+        values['title'] = data['title']
+    
+    if 'description' in data:
+        values['description'] = data['description']
+    
+    values['updated_at'] = datetime.utcnow()
+    if not concurrency.conditional_update(board, values, expected):
+        return concurrency.conflict(board, 'board')
+    
     if 'title' in data:
-        old_title = board.title
-        board.title = data['title']
         log_activity(
             board_id,
             user_id,
@@ -123,20 +443,20 @@ def update_board(board_id):
             f"renamed board from '{old_title}' to '{board.title}'"
         )
     
-    if 'description' in data:
-        board.description = data['description']
-    
-    board.updated_at = datetime.utcnow()
     db.session.commit()
     
-    return jsonify(board.to_dict()), 200
+    return concurrency.tagged(board)
 
 @boards_bp.route('/<int:board_id>', methods=['DELETE'])
 @login_required
 def delete_board(board_id):
-    """Delete a board (owner only)"""
+    """Delete a board (owner only)
+    
+    The board is only tombstoned here; its lists, cards and files are purged
+    in the background once the undo window has passed.
+    """
     user_id = session['user_id']
-    board = Board.query.get(board_id)
+    board = get_live_board(board_id)
     
     if not board:
         return jsonify({'error': 'Board not found'}), 404
@@ -144,10 +464,76 @@ def delete_board(board_id):
     if board.owner_id != user_id:
         return jsonify({'error': 'Only the owner can delete the board'}), 403
     
-    db.session.delete(board)
+    undo_until = soft_delete(board)
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Board deleted successfully',
+        'undo_until': undo_until.isoformat()
+    }), 200
+
+@boards_bp.route('/<int:board_id>/restore', methods=['POST'])
+@login_required
+def restore_board(board_id):
+    """Undo a board deletion (owner only)"""
+    user_id = session['user_id']
+    board = Board.query.get(board_id)
+    
+    if not board or board.deleted_at is None:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if board.owner_id != user_id:
+        return jsonify({'error': 'Only the owner can restore the board'}), 403
+    
+    if not can_restore(board):
+        return jsonify({'error': 'Undo window has expired'}), 410
+    
+    board.deleted_at = None
     db.session.commit()
     
-    return jsonify({'message': 'Board deleted successfully'}), 200
+    return jsonify(board.to_dict()), 200
+
+@boards_bp.route('/<int:board_id>/copy', methods=['POST'])
+@login_required
+def copy_board_route(board_id):
+    """Copy a board, or instantiate a template, in a single transaction"""
+    user_id = session['user_id']
+    source, has_access = check_board_access(board_id, user_id)
+    
+    if not source:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    
+    # Copying a template gives a regular board with the template's name by default
+    default_title = source.title if source.is_template else f"Copy of {source.title}"
+    title = data.get('title') or default_title
+    
+    board, counts = copy_board(
+        source,
+        user_id,
+        title,
+        as_template=bool(data.get('as_template', False)),
+        include_cards=bool(data.get('include_cards', True)),
+        include_assignments=bool(data.get('include_assignments', False))
+    )
+    
+    log_activity(
+        board.id,
+        user_id,
+        'copied',
+        'board',
+        board.id,
+        f"created board from '{source.title}' with {counts['lists']} lists and {counts['cards']} cards"
+    )
+    db.session.commit()
+    
+    data = board.to_dict()
+    data['copied'] = counts
+    return jsonify(data), 201
 
 @boards_bp.route('/<int:board_id>/members', methods=['GET'])
 @login_required
@@ -162,7 +548,8 @@ def get_board_members(board_id):
     if not has_access:
         return jsonify({'error': 'Access denied'}), 403
     
-    members = BoardMember.query.filter_by(board_id=board_id).all()
+    members = BoardMember.query.filter_by(board_id=board_id)\
+        .options(joinedload(BoardMember.user)).all()
     
     # Include owner
     owner = User.query.get(board.owner_id)
@@ -181,7 +568,7 @@ def get_board_members(board_id):
 def invite_member(board_id):
     """Invite a user to a board"""
     user_id = session['user_id']
-    board = Board.query.get(board_id)
+    board = get_live_board(board_id)
     
     if not board:
         return jsonify({'error': 'Board not found'}), 404
@@ -242,7 +629,7 @@ def invite_member(board_id):
 def remove_member(board_id, member_id):
     """Remove a member from a board"""
     user_id = session['user_id']
-    board = Board.query.get(board_id)
+    board = get_live_board(board_id)
     
     if not board:
         return jsonify({'error': 'Board not found'}), 404
@@ -273,6 +660,132 @@ def remove_member(board_id, member_id):
     
     return jsonify({'message': 'Member removed successfully'}), 200
 
+@boards_bp.route('/<int:board_id>/labels', methods=['GET'])
+@login_required
+def get_board_labels(board_id):
+    """Get the labels of a board"""
+    user_id = session['user_id']
+    board, has_access = check_board_access(board_id, user_id)
+    
+    if not board:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify([label.to_dict() for label in board.labels]), 200
+
+@boards_bp.route('/<int:board_id>/labels', methods=['POST'])
+@login_required
+def create_label(board_id):
+    """Create a label on a board, giving it the lowest free bit of the card label masks"""
+    user_id = session['user_id']
+    board, has_access = check_board_access(board_id, user_id)
+    
+    if not board:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    name = data.get('name')
+    color = data.get('color', '#61bd4f')
+    
+    if not isinstance(name, str) or not name.strip():
+        return jsonify({'error': 'Name is required'}), 400
+    
+    if not labels.valid_color(color):
+        return jsonify({'error': 'color must be a #rrggbb hex string'}), 400
+    
+    try:
+        label = labels.create(board_id, name.strip()[:50], color)
+    except IntegrityError:
+        return jsonify({'error': 'Labels are being created concurrently, try again'}), 409
+    
+    if label is None:
+        return jsonify({'error': f'A board has at most {labels.MAX_LABELS} labels'}), 409
+    
+    log_activity(
+        board_id,
+        user_id,
+        'created',
+        'label',
+        label.id,
+        f"created label '{label.name}'"
+    )
+    db.session.commit()
+    
+    return jsonify(label.to_dict()), 201
+
+@boards_bp.route('/<int:board_id>/labels/<int:label_id>', methods=['PUT'])
+@login_required
+def update_label(board_id, label_id):
+    """Rename or recolor a label; its cards keep it"""
+    user_id = session['user_id']
+    board, has_access = check_board_access(board_id, user_id)
+    
+    if not board:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    label = db.session.get(Label, label_id)
+    
+    if not label or label.board_id != board_id:
+        return jsonify({'error': 'Label not found'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    
+    if 'name' in data:
+        if not isinstance(data['name'], str) or not data['name'].strip():
+            return jsonify({'error': 'Name is required'}), 400
+        label.name = data['name'].strip()[:50]
+    
+    if 'color' in data:
+        if not labels.valid_color(data['color']):
+            return jsonify({'error': 'color must be a #rrggbb hex string'}), 400
+        label.color = data['color']
+    
+    db.session.commit()
+    
+    return jsonify(label.to_dict()), 200
+
+@boards_bp.route('/<int:board_id>/labels/<int:label_id>', methods=['DELETE'])
+@login_required
+def delete_label(board_id, label_id):
+    """Delete a label and clear its bit from every card of the board"""
+    user_id = session['user_id']
+    board, has_access = check_board_access(board_id, user_id)
+    
+    if not board:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    label = db.session.get(Label, label_id)
+    
+    if not label or label.board_id != board_id:
+        return jsonify({'error': 'Label not found'}), 404
+    
+    # The bit is cleared before it is freed, so a new label never inherits old cards
+    labels.clear_bit(board_id, label.bit)
+    db.session.delete(label)
+    
+    log_activity(
+        board_id,
+        user_id,
+        'deleted',
+        'label',
+        label_id,
+        f"deleted label '{label.name}'"
+    )
+    db.session.commit()
+    
+    return jsonify({'message': 'Label deleted successfully'}), 200
+
 @boards_bp.route('/<int:board_id>/activities', methods=['GET'])
 @login_required
 def get_board_activities(board_id):
@@ -288,8 +801,132 @@ def get_board_activities(board_id):
     
     # Get recent activities (limit to 50)
     activities = Activity.query.filter_by(board_id=board_id)\
+        .options(joinedload(Activity.user))\
         .order_by(Activity.created_at.desc())\
         .limit(50)\
         .all()
     
     return jsonify([activity.to_dict() for activity in activities]), 200
+
+@boards_bp.route('/<int:board_id>/archived', methods=['GET'])
+@login_required
+def get_archived_items(board_id):
+    """Browse archived cards or lists of a board, most recently archived first"""
+    user_id = session['user_id']
+    board, has_access = check_board_access(board_id, user_id)
+    
+    if not board:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    item_type = request.args.get('type', 'cards')
+    if item_type not in ('cards', 'lists'):
+        return jsonify({'error': 'type must be cards or lists'}), 400
+    
+    limit = clamp_card_limit(request.args.get('limit', type=int))
+    
+    if item_type == 'cards':
+        model = Card
+        query = Card.query.join(List, List.id == Card.list_id)\
+            .filter(List.board_id == board_id, Card.archived_at.isnot(None))\
+            .filter(Card.deleted_at.is_(None), List.deleted_at.is_(None))
+    else:
+        model = List
+        query = List.query.filter(List.board_id == board_id, List.archived_at.isnot(None))\
+            .filter(List.deleted_at.is_(None))
+    
+    # Keyset on (archived_at, id), newest first
+    after = request.args.get('after')
+    if after:
+        archived_at, _, item_id = after.rpartition('|')
+        try:
+            archived_at = datetime.fromisoformat(archived_at)
+            item_id = int(item_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(db.or_(
+            model.archived_at < archived_at,
+            db.and_(model.archived_at == archived_at, model.id < item_id)
+        ))
+    
+    items = query.order_by(model.archived_at.desc(), model.id.desc()).limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = f"{last.archived_at.isoformat()}|{last.id}"
+    
+    return jsonify({
+        'type': item_type,
+        'items': [item.to_dict(compact=True) if model is Card else item.to_dict() for item in items],
+        'next_cursor': next_cursor
+    }), 200
+
+@boards_bp.route('/<int:board_id>/export', methods=['GET'])
+@login_required
+def export_board(board_id):
+    """Stream a board as JSON Lines or CSV"""
+    user_id = session['user_id']
+    board, has_access = check_board_access(board_id, user_id)
+    
+    if not board:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in board_io.FORMATS:
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    
+    records = board_io.iter_board_records(board)
+    body = board_io.export_csv(records) if fmt == 'csv' else board_io.export_ndjson(records)
+    filename = secure_filename(board.title) or f'board-{board_id}'
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=board_io.FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{fmt}"'}
+    )
+
+@boards_bp.route('/import', methods=['POST'])
+@login_required
+def import_board():
+    """Import a board from an uploaded JSON Lines or CSV file; poll the returned job URL for progress"""
+    user_id = session['user_id']
+    
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    fmt = request.form.get('format') or file.filename.rsplit('.', 1)[-1].lower()
+    if fmt in ('jsonl', 'json'):
+        fmt = 'ndjson'
+    if fmt not in board_io.FORMATS:
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    
+    # The upload stream dies with the request, so park the file for the worker
+    import_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'imports')
+    os.makedirs(import_dir, exist_ok=True)
+    path = os.path.join(import_dir, f'{uuid.uuid4().hex}.{fmt}')
+    file.save(path)
+    
+    job = jobs.enqueue('board_import', {
+        'path': path,
+        'fmt': fmt,
+        'owner_id': user_id,
+        'title': request.form.get('title')
+    }, user_id=user_id)
+    db.session.commit()
+    jobs.run_if_inline(job)
+    
+    status_url = url_for('jobs.get_job', job_id=job.id)
+    return jsonify({**job.to_dict(), 'status_url': status_url}), 202, {'Location': status_url}
@@ -1,18 +1,48 @@
-from flask import Blueprint, request, jsonify, session
-from models import db, Card, List, CardAssignment, Attachment, ChecklistItem, User
+from flask import Blueprint, request, jsonify, session, current_app
+from models import db, Card, List, CardAssignment, Attachment, ChecklistItem, User, Label
 from routes.auth import login_required
-from routes.boards import check_board_access, log_activity
+from routes.boards import (
+    check_board_access, log_activity, get_live_card, get_live_list, soft_delete, can_restore
+)
 from werkzeug.utils import secure_filename
+from collections import defaultdict
 from datetime import datetime
 import os
+import re
+import bulk_cards
+import card_counters
+import concurrency
+import jobs
+import labels
 from config import Config
 
 cards_bp = Blueprint('cards', __name__)
 
+# Cards one bulk request may change
+MAX_BULK_CARDS = 500
+
+BULK_ACTIONS = ('assign', 'unassign', 'complete', 'due_date', 'move', 'delete')
+
+# Checklist items one request may add
+MAX_BULK_CHECKLIST_ITEMS = 200
+
+# Bullet, number and checkbox markers in front of a pasted checklist line
+CHECKLIST_MARKER = re.compile(r'^\s*(?:[-*+\u2022]|\d+[.)])?\s*(?:\[([ xX])\])?\s*')
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
+def checklist_lines(text):
+    """Checklist items from pasted text: one per line, with '[x]' marking an item done"""
+    items = []
+    for line in text.splitlines():
+        marker = CHECKLIST_MARKER.match(line)
+        title = line[marker.end():].strip()
+        if title:
+            items.append({'title': title[:200], 'completed': marker.group(1) in ('x', 'X')})
+    return items
+
 @cards_bp.route('', methods=['POST'])
 @login_required
 def create_card():
@@ -23,7 +53,7 @@ def create_card():
     if not data or not data.get('title') or not data.get('list_id'):
         return jsonify({'error': 'Title and list_id are required'}), 400
     
-    list_obj = List.query.get(data['list_id'])
+    list_obj = get_live_list(data['list_id'])
     
     if not list_obj:
         return jsonify({'error': 'List not found'}), 404
@@ -70,35 +100,139 @@ def create_card():
     
     return jsonify(card.to_dict()), 201
 
+@cards_bp.route('/bulk', methods=['POST'])
+@login_required
+def bulk_update_cards():
+    """Assign, unassign, complete, set the due date of, move or delete many cards at once"""
+    data = request.get_json(silent=True) or {}
+    user_id = session['user_id']
+    action = data.get('action')
+    card_ids = data.get('card_ids')
+    
+    if action not in BULK_ACTIONS:
+        return jsonify({'error': f"action must be one of {', '.join(BULK_ACTIONS)}"}), 400
+    
+    if (not isinstance(card_ids, list) or not card_ids
+            or not all(isinstance(card_id, int) and not isinstance(card_id, bool) for card_id in card_ids)):
+        return jsonify({'error': 'card_ids must be a non-empty list of ids'}), 400
+    
+    # Keep the caller's order, which is the order moved cards land in
+    card_ids = list(dict.fromkeys(card_ids))
+    if len(card_ids) > MAX_BULK_CARDS:
+        return jsonify({'error': f'At most {MAX_BULK_CARDS} cards per request'}), 400
+    
+    # One query checks that every card is live and on a board the user can reach
+    rows = {card.id: card for card in bulk_cards.load_cards(card_ids, user_id)}
+    missing = [card_id for card_id in card_ids if card_id not in rows]
+    if missing:
+        return jsonify({'error': 'Cards not found', 'card_ids': missing}), 404
+    
+    if not all(card.has_access for card in rows.values()):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    cards = [rows[card_id] for card_id in card_ids]
+    response = {'action': action}
+    
+    if action in ('assign', 'unassign'):
+        target = User.query.get(data.get('user_id')) if data.get('user_id') else None
+        if not target:
+            return jsonify({'error': 'User not found'}), 404
+        
+        if action == 'assign':
+            changed = bulk_cards.assign(cards, target.id)
+            logged, describe = 'assigned', lambda named: f"assigned {target.username} to {named}"
+        else:
+            changed = bulk_cards.unassign(cards, target.id)
+            logged, describe = 'unassigned', lambda named: f"unassigned {target.username} from {named}"
+    
+    elif action == 'complete':
+        completed = data.get('completed', True)
+        if not isinstance(completed, bool):
+            return jsonify({'error': 'completed must be true or false'}), 400
+        
+        changed = bulk_cards.set_completed(cards, completed)
+        logged = 'completed' if completed else 'reopened'
+        describe = lambda named: f"{logged} {named}"
+    
+    elif action == 'due_date':
+        if 'due_date' not in data:
+            return jsonify({'error': 'due_date is required'}), 400
+        
+        due_date = None
+        if data['due_date']:
+            try:
+                due_date = datetime.fromisoformat(str(data['due_date']).replace('Z', '+00:00'))
+            except ValueError:
+                return jsonify({'error': 'Invalid due_date'}), 400
+        
+        changed = bulk_cards.set_due_date(cards, due_date)
+        logged = 'updated'
+        if due_date:
+            describe = lambda named: f"set the due date of {named} to {due_date.date().isoformat()}"
+        else:
+            describe = lambda named: f"cleared the due date of {named}"
+    
+    elif action == 'move':
+        list_obj = get_live_list(data.get('list_id')) if data.get('list_id') else None
+        if not list_obj:
+            return jsonify({'error': 'List not found'}), 404
+        
+        if any(card.board_id != list_obj.board_id for card in cards):
+            return jsonify({'error': 'Cards can only move to a list on their own board'}), 400
+        
+        changed = bulk_cards.move(cards, list_obj)
+        logged, describe = 'moved', lambda named: f"moved {named} to '{list_obj.title}'"
+    
+    else:
+        deleted_at = datetime.utcnow()
+        changed = bulk_cards.soft_delete(cards, deleted_at)
+        logged, describe = 'deleted', lambda named: f"deleted {named}"
+        response['undo_until'] = (deleted_at + current_app.config['SOFT_DELETE_UNDO_WINDOW']).isoformat()
+    
+    # One activity entry per board rather than one per card
+    by_board = defaultdict(list)
+    for card in changed:
+        by_board[card.board_id].append(card)
+    
+    for board_id, board_cards in by_board.items():
+        if len(board_cards) == 1:
+            entity_id, named = board_cards[0].id, f"card '{board_cards[0].title}'"
+        else:
+            entity_id, named = None, f"{len(board_cards)} cards"
+        log_activity(board_id, user_id, logged, 'card', entity_id, describe(named))
+    
+    db.session.commit()
+    
+    response['card_ids'] = [card.id for card in changed]
+    return jsonify(response), 200
+
 @cards_bp.route('/<int:card_id>', methods=['GET'])
 @login_required
 def get_card(card_id):
     """Get a specific card"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
         return jsonify({'error': 'Access denied'}), 403
     
-    return jsonify(card.to_dict()), 200
+    return concurrency.tagged(card)
 
 @cards_bp.route('/<int:card_id>', methods=['PUT'])
 @login_required
 def update_card(card_id):
     """Update a card"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -106,74 +240,90 @@ def update_card(card_id):
     
     data = request.get_json()
     
+    try:
+        expected = concurrency.expected_version(data)
+    except concurrency.InvalidVersion as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if expected is not None and expected != card.version:
+        return concurrency.conflict(card, 'card')
+    
+    values = {}
+    
     if 'title' in data:
-        card.title = data['title']
+        values['title'] = data['title']
     
     if 'description' in data:
-        card.description = data['description']
+        values['description'] = data['description']
     
     if 'position' in data:
-        card.position = data['position']
+        values['position'] = data['position']
     
     if 'completed' in data:
-        card.completed = data['completed']
-        status = 'completed' if card.completed else 'reopened'
-        log_activity(
-            list_obj.board_id,
-            user_id,
-            status,
-            'card',
-            card_id,
-            f"{status} card '{card.title}'"
-        )
+        values['completed'] = data['completed']
     
     if 'due_date' in data:
         if data['due_date']:
             try:
-                card.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
+                values['due_date'] = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
             except:
                 pass
         else:
-            card.due_date = None
+            values['due_date'] = None
     
     # Handle list change (moving card between lists)
+    old_list = new_list = None
     if 'list_id' in data and data['list_id'] != card.list_id:
-        old_list = List.query.get(card.list_id)
-        new_list = List.query.get(data['list_id'])
+        new_list = get_live_list(data['list_id'])
         
         if new_list and new_list.board_id == list_obj.board_id:
-            card.list_id = data['list_id']
+            old_list = List.query.get(card.list_id)
+            values['list_id'] = data['list_id']
             
             # Reset position to end of new list
             max_position = db.session.query(db.func.max(Card.position))\
                 .filter_by(list_id=data['list_id']).scalar() or -1
-            card.position = max_position + 1
-            
-            log_activity(
-                list_obj.board_id,
-                user_id,
-                'moved',
-                'card',
-                card_id,
-                f"moved card '{card.title}' from '{old_list.title}' to '{new_list.title}'"
-            )
-    
-    card.updated_at = datetime.utcnow()
+            values['position'] = max_position + 1
+    
+    values['updated_at'] = datetime.utcnow()
+    if not concurrency.conditional_update(card, values, expected):
+        return concurrency.conflict(card, 'card')
+    
+    if 'completed' in data:
+        status = 'completed' if card.completed else 'reopened'
+        log_activity(
+            list_obj.board_id,
+            user_id,
+            status,
+            'card',
+            card_id,
+            f"{status} card '{card.title}'"
+        )
+    
+    if old_list is not None:
+        log_activity(
+            list_obj.board_id,
+            user_id,
+            'moved',
+            'card',
+            card_id,
+            f"moved card '{card.title}' from '{old_list.title}' to '{new_list.title}'"
+        )
+    
     db.session.commit()
     
-    return jsonify(card.to_dict()), 200
+    return concurrency.tagged(card)
 
 @cards_bp.route('/<int:card_id>', methods=['DELETE'])
 @login_required
 def delete_card(card_id):
     """Delete a card"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -189,22 +339,60 @@ def delete_card(card_id):
         f"deleted card '{card.title}' from list '{list_obj.title}'"
     )
     
-    db.session.delete(card)
+    undo_until = soft_delete(card)
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Card deleted successfully',
+        'undo_until': undo_until.isoformat()
+    }), 200
+
+@cards_bp.route('/<int:card_id>/restore', methods=['POST'])
+@login_required
+def restore_card(card_id):
+    """Undo a card deletion"""
+    user_id = session['user_id']
+    card = Card.query.get(card_id)
+    
+    if not card or card.deleted_at is None:
+        return jsonify({'error': 'Card not found'}), 404
+    
+    list_obj = get_live_list(card.list_id)
+    
+    if not list_obj:
+        return jsonify({'error': 'List not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if not can_restore(card):
+        return jsonify({'error': 'Undo window has expired'}), 410
+    
+    card.deleted_at = None
+    log_activity(
+        list_obj.board_id,
+        user_id,
+        'restored',
+        'card',
+        card_id,
+        f"restored deleted card '{card.title}'"
+    )
     db.session.commit()
     
-    return jsonify({'message': 'Card deleted successfully'}), 200
+    return jsonify(card.to_dict()), 200
 
 @cards_bp.route('/<int:card_id>/assignments', methods=['POST'])
 @login_required
 def assign_user(card_id):
     """Assign a user to a card"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -235,6 +423,7 @@ def assign_user(card_id):
     )
     
     db.session.add(assignment)
+    card_counters.refresh_assignees(card)
     
     # Log activity
     log_activity(
@@ -255,12 +444,11 @@ def assign_user(card_id):
 def unassign_user(card_id, assignment_id):
     """Remove a user assignment from a card"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -273,6 +461,7 @@ def unassign_user(card_id, assignment_id):
     
     unassigned_user = assignment.user
     db.session.delete(assignment)
+    card_counters.refresh_assignees(card)
     
     # Log activity
     log_activity(
@@ -294,12 +483,11 @@ def upload_attachment(card_id):
     """Upload a file attachment to a card"""
     user_id = session['user_id']
     
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -319,7 +507,7 @@ def upload_attachment(card_id):
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         filename = f"{timestamp}_{filename}"
         
-        filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
         
         attachment = Attachment(
@@ -330,6 +518,7 @@ def upload_attachment(card_id):
         )
         
         db.session.add(attachment)
+        card_counters.adjust(card, attachment_count=1)
         
         # Log activity
         log_activity(
@@ -352,12 +541,11 @@ def upload_attachment(card_id):
 def delete_attachment(card_id, attachment_id):
     """Delete an attachment"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -368,13 +556,12 @@ def delete_attachment(card_id, attachment_id):
     if not attachment or attachment.card_id != card_id:
         return jsonify({'error': 'Attachment not found'}), 404
     
-    # Delete file from filesystem
-    filepath = os.path.join(Config.UPLOAD_FOLDER, attachment.filepath)
-    if os.path.exists(filepath):
-        os.remove(filepath)
-    
+    # The file is removed by a job once the row is gone
+    job = jobs.enqueue('remove_files', {'filepaths': [attachment.filepath]}, user_id=user_id)
     db.session.delete(attachment)
+    card_counters.adjust(card, attachment_count=-1)
     db.session.commit()
+    jobs.run_if_inline(job)
     
     return jsonify({'message': 'Attachment deleted successfully'}), 200
 
@@ -383,12 +570,11 @@ def delete_attachment(card_id, attachment_id):
 def add_checklist_item(card_id):
     """Add a checklist item to a card"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -399,32 +585,158 @@ def add_checklist_item(card_id):
     if not data or not data.get('title'):
         return jsonify({'error': 'Title is required'}), 400
     
-    # Get next position
-    max_position = db.session.query(db.func.max(ChecklistItem.position))\
-        .filter_by(card_id=card_id).scalar() or -1
-    
     item = ChecklistItem(
         card_id=card_id,
         title=data['title'],
-        position=max_position + 1
+        position=next_checklist_position(card_id)
     )
     
     db.session.add(item)
+    card_counters.adjust(card, checklist_total=1)
     db.session.commit()
     
     return jsonify(item.to_dict()), 201
 
+def next_checklist_position(card_id):
+    """The position after a card's last checklist item"""
+    last = db.session.query(db.func.max(ChecklistItem.position)).filter_by(card_id=card_id).scalar()
+    return 0 if last is None else last + 1
+
+@cards_bp.route('/<int:card_id>/checklist/bulk', methods=['POST'])
+@login_required
+def add_checklist_items(card_id):
+    """Add many checklist items to a card, from a list of titles or pasted text"""
+    user_id = session['user_id']
+    card, list_obj = get_live_card(card_id)
+    
+    if not card:
+        return jsonify({'error': 'Card not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    
+    if isinstance(data.get('text'), str):
+        items = checklist_lines(data['text'])
+    elif isinstance(data.get('titles'), list) and all(isinstance(title, str) for title in data['titles']):
+        items = [{'title': title.strip(), 'completed': False} for title in data['titles'] if title.strip()]
+    else:
+        return jsonify({'error': 'titles or text is required'}), 400
+    
+    if not items:
+        return jsonify({'error': 'No checklist items given'}), 400
+    
+    if len(items) > MAX_BULK_CHECKLIST_ITEMS:
+        return jsonify({'error': f'At most {MAX_BULK_CHECKLIST_ITEMS} items per request'}), 400
+    
+    start = next_checklist_position(card_id)
+    rows = [dict(item, card_id=card_id, position=start + i) for i, item in enumerate(items)]
+    
+    # One executemany INSERT, handing back the new rows where the database can
+    if db.session.get_bind().dialect.insert_executemany_returning:
+        created = db.session.execute(db.insert(ChecklistItem).returning(ChecklistItem), rows).scalars().all()
+    else:
+        db.session.execute(db.insert(ChecklistItem), rows)
+        created = ChecklistItem.query.filter(ChecklistItem.card_id == card_id, ChecklistItem.position >= start)\
+            .order_by(ChecklistItem.position).all()
+    
+    card_counters.adjust(
+        card,
+        checklist_total=len(items),
+        checklist_done=sum(item['completed'] for item in items)
+    )
+    result = [item.to_dict() for item in created]
+    db.session.commit()
+    
+    return jsonify({'items': result}), 201
+
+@cards_bp.route('/<int:card_id>/checklist/order', methods=['PUT'])
+@login_required
+def reorder_checklist_items(card_id):
+    """Put all of a card's checklist items in the order given"""
+    user_id = session['user_id']
+    card, list_obj = get_live_card(card_id)
+    
+    if not card:
+        return jsonify({'error': 'Card not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    item_ids = data.get('item_ids')
+    
+    if (not isinstance(item_ids, list) or len(set(item_ids)) != len(item_ids)
+            or not all(isinstance(item_id, int) and not isinstance(item_id, bool) for item_id in item_ids)):
+        return jsonify({'error': 'item_ids must be a list of distinct ids'}), 400
+    
+    # An order built before someone added or removed an item is refused rather than half applied
+    current = set(db.session.execute(
+        db.select(ChecklistItem.id).where(ChecklistItem.card_id == card_id)
+    ).scalars())
+    if set(item_ids) != current:
+        return jsonify({'error': 'item_ids must list every checklist item of the card'}), 409
+    
+    # Positions are not versioned, so reordering never makes a pending toggle conflict
+    if item_ids:
+        db.session.execute(
+            db.update(ChecklistItem)
+            .where(ChecklistItem.card_id == card_id, ChecklistItem.id.in_(item_ids))
+            .values(position=db.case({item_id: i for i, item_id in enumerate(item_ids)}, value=ChecklistItem.id)),
+            execution_options={'synchronize_session': False}
+        )
+    db.session.commit()
+    
+    return jsonify({'item_ids': item_ids}), 200
+
+@cards_bp.route('/<int:card_id>/checklist/complete', methods=['POST'])
+@login_required
+def complete_checklist_items(card_id):
+    """Complete every checklist item of a card, or reopen them all with completed false"""
+    user_id = session['user_id']
+    card, list_obj = get_live_card(card_id)
+    
+    if not card:
+        return jsonify({'error': 'Card not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    completed = data.get('completed', True)
+    
+    if not isinstance(completed, bool):
+        return jsonify({'error': 'completed must be true or false'}), 400
+    
+    updated = db.session.execute(
+        db.update(ChecklistItem)
+        .where(ChecklistItem.card_id == card_id, ChecklistItem.completed.is_not(completed))
+        .values(completed=completed, version=ChecklistItem.version + 1),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    card_counters.recount_done(card)
+    db.session.commit()
+    
+    return jsonify({'updated': updated, 'checklist_done': card.checklist_done,
+                    'checklist_total': card.checklist_total}), 200
+
 @cards_bp.route('/<int:card_id>/checklist/<int:item_id>', methods=['PUT'])
 @login_required
 def update_checklist_item(card_id, item_id):
     """Update a checklist item"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -437,27 +749,47 @@ def update_checklist_item(card_id, item_id):
     
     data = request.get_json()
     
+    try:
+        expected = concurrency.expected_version(data)
+    except concurrency.InvalidVersion as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if expected is not None and expected != item.version:
+        return concurrency.conflict(item, 'checklist item')
+    
+    values = {}
+    
     if 'title' in data:
-        item.title = data['title']
+        values['title'] = data['title']
+    
+    if 'completed' in data:
+        values['completed'] = data['completed']
+        # The counter delta comes from the value read here, so the write
+        # must land on that same version even if the client sent none
+        if expected is None:
+            expected = item.version
+        done_delta = bool(data['completed']) - bool(item.completed)
+    
+    if not concurrency.conditional_update(item, values, expected):
+        return concurrency.conflict(item, 'checklist item')
     
     if 'completed' in data:
-        item.completed = data['completed']
+        card_counters.adjust(card, checklist_done=done_delta)
     
     db.session.commit()
     
-    return jsonify(item.to_dict()), 200
+    return concurrency.tagged(item)
 
 @cards_bp.route('/<int:card_id>/checklist/<int:item_id>', methods=['DELETE'])
 @login_required
 def delete_checklist_item(card_id, item_id):
     """Delete a checklist item"""
     user_id = session['user_id']
-    card = Card.query.get(card_id)
+    card, list_obj = get_live_card(card_id)
     
     if not card:
         return jsonify({'error': 'Card not found'}), 404
     
-    list_obj = List.query.get(card.list_id)
     board, has_access = check_board_access(list_obj.board_id, user_id)
     
     if not has_access:
@@ -469,6 +801,94 @@ def delete_checklist_item(card_id, item_id):
         return jsonify({'error': 'Checklist item not found'}), 404
     
     db.session.delete(item)
+    card_counters.adjust(card, checklist_total=-1, checklist_done=-int(bool(item.completed)))
     db.session.commit()
     
     return jsonify({'message': 'Checklist item deleted successfully'}), 200
+
+@cards_bp.route('/<int:card_id>/labels/<int:label_id>', methods=['POST', 'DELETE'])
+@login_required
+def set_card_label(card_id, label_id):
+    """Put a board label on a card with POST, or take it off with DELETE"""
+    user_id = session['user_id']
+    card, list_obj = get_live_card(card_id)
+    
+    if not card:
+        return jsonify({'error': 'Card not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    label = db.session.get(Label, label_id)
+    
+    if not label or label.board_id != list_obj.board_id:
+        return jsonify({'error': 'Label not found'}), 404
+    
+    # A bitwise UPDATE, so two people labelling the same card at once both land
+    labels.set_bit(card_id, label.bit, request.method == 'POST')
+    db.session.commit()
+    
+    return jsonify(card.to_dict()), 200
+
+@cards_bp.route('/<int:card_id>/archive', methods=['POST'])
+@login_required
+def archive_card(card_id):
+    """Archive a card, hiding it from the board"""
+    user_id = session['user_id']
+    card, list_obj = get_live_card(card_id)
+    
+    if not card:
+        return jsonify({'error': 'Card not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if card.archived_at is None:
+        card.archived_at = datetime.utcnow()
+        log_activity(
+            list_obj.board_id,
+            user_id,
+            'archived',
+            'card',
+            card_id,
+            f"archived card '{card.title}'"
+        )
+        db.session.commit()
+    
+    return jsonify(card.to_dict()), 200
+
+@cards_bp.route('/<int:card_id>/unarchive', methods=['POST'])
+@login_required
+def unarchive_card(card_id):
+    """Bring an archived card back into its list"""
+    user_id = session['user_id']
+    card, list_obj = get_live_card(card_id)
+    
+    if not card:
+        return jsonify({'error': 'Card not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if list_obj.archived_at is not None:
+        return jsonify({'error': 'Unarchive the list first'}), 400
+    
+    if card.archived_at is not None:
+        card.archived_at = None
+        log_activity(
+            list_obj.board_id,
+            user_id,
+            'unarchived',
+            'card',
+            card_id,
+            f"restored card '{card.title}' from the archive"
+        )
+        db.session.commit()
+    
+    return jsonify(card.to_dict()), 200
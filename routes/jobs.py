@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify, session
+from models import Job
+from routes.auth import login_required
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    """Get the status of a background job"""
+    job = Job.query.get(job_id)
+    
+    if not job or job.user_id != session['user_id']:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job.to_dict()), 200
@@ -1,7 +1,12 @@
 from flask import Blueprint, request, jsonify, session
-from models import db, List, Board, BoardMember, Activity
+from datetime import datetime
+from models import db, List, Board, BoardMember, Activity, Card
 from routes.auth import login_required
-from routes.boards import check_board_access, log_activity
+from routes.boards import (
+    check_board_access, log_activity, get_live_list, soft_delete, can_restore,
+    clamp_card_limit, decode_card_cursor, encode_card_cursor, cards_after
+)
+import concurrency
 
 lists_bp = Blueprint('lists', __name__)
 
@@ -55,7 +60,7 @@ def create_list():
 def update_list(list_id):
     """Update a list"""
     user_id = session['user_id']
-    list_obj = List.query.get(list_id)
+    list_obj = get_live_list(list_id)
     
     if not list_obj:
         return jsonify({'error': 'List not found'}), 404
@@ -67,9 +72,27 @@ def update_list(list_id):
     
     data = request.get_json()
     
+    try:
+        expected = concurrency.expected_version(data)
+    except concurrency.InvalidVersion as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if expected is not None and expected != list_obj.version:
+        return concurrency.conflict(list_obj, 'list')
+    
+    values = {}
+    old_title = list_obj.title
+    
+    if 'title' in data:
+        values['title'] = data['title']
+    
+    if 'position' in data:
+        values['position'] = data['position']
+    
+    if not concurrency.conditional_update(list_obj, values, expected):
+        return concurrency.conflict(list_obj, 'list')
+    
     if 'title' in data:
-        old_title = list_obj.title
-        list_obj.title = data['title']
         log_activity(
             list_obj.board_id,
             user_id,
@@ -79,19 +102,16 @@ def update_list(list_id):
             f"renamed list from '{old_title}' to '{list_obj.title}'"
         )
     
-    if 'position' in data:
-        list_obj.position = data['position']
-    
     db.session.commit()
     
-    return jsonify(list_obj.to_dict()), 200
+    return concurrency.tagged(list_obj)
 
 @lists_bp.route('/<int:list_id>', methods=['DELETE'])
 @login_required
 def delete_list(list_id):
     """Delete a list"""
     user_id = session['user_id']
-    list_obj = List.query.get(list_id)
+    list_obj = get_live_list(list_id)
     
     if not list_obj:
         return jsonify({'error': 'List not found'}), 404
@@ -111,7 +131,176 @@ def delete_list(list_id):
         f"deleted list '{list_obj.title}'"
     )
     
-    db.session.delete(list_obj)
+    # Cards stay untouched; the purger removes them with the list
+    undo_until = soft_delete(list_obj)
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'List deleted successfully',
+        'undo_until': undo_until.isoformat()
+    }), 200
+
+@lists_bp.route('/<int:list_id>/restore', methods=['POST'])
+@login_required
+def restore_list(list_id):
+    """Undo a list deletion"""
+    user_id = session['user_id']
+    list_obj = List.query.get(list_id)
+    
+    if not list_obj or list_obj.deleted_at is None:
+        return jsonify({'error': 'List not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not board:
+        return jsonify({'error': 'Board not found'}), 404
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if not can_restore(list_obj):
+        return jsonify({'error': 'Undo window has expired'}), 410
+    
+    list_obj.deleted_at = None
+    log_activity(
+        list_obj.board_id,
+        user_id,
+        'restored',
+        'list',
+        list_id,
+        f"restored deleted list '{list_obj.title}'"
+    )
+    db.session.commit()
+    
+    return jsonify(list_obj.to_dict()), 200
+
+@lists_bp.route('/<int:list_id>/cards', methods=['GET'])
+@login_required
+def get_list_cards(list_id):
+    """Get the next page of cards in a list, ordered by position"""
+    user_id = session['user_id']
+    list_obj = get_live_list(list_id)
+    
+    if not list_obj:
+        return jsonify({'error': 'List not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    try:
+        after = decode_card_cursor(request.args.get('after'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    limit = clamp_card_limit(request.args.get('limit', type=int))
+    
+    # Fetch one extra row to learn whether another page exists
+    query = cards_after(Card.query.filter_by(list_id=list_id, archived_at=None, deleted_at=None), after)
+    cards = query.order_by(Card.position, Card.id)\
+        .limit(limit + 1)\
+        .all()
+    
+    has_more = len(cards) > limit
+    cards = cards[:limit]
+    
+    return jsonify({
+        'list_id': list_id,
+        'cards': [card.to_dict(compact=True) for card in cards],
+        'next_cursor': encode_card_cursor(cards[-1]) if has_more else None
+    }), 200
+
+@lists_bp.route('/<int:list_id>/archive', methods=['POST'])
+@login_required
+def archive_list(list_id):
+    """Archive a list, hiding it and its cards from the board"""
+    user_id = session['user_id']
+    list_obj = get_live_list(list_id)
+    
+    if not list_obj:
+        return jsonify({'error': 'List not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if list_obj.archived_at is None:
+        list_obj.archived_at = datetime.utcnow()
+        log_activity(
+            list_obj.board_id,
+            user_id,
+            'archived',
+            'list',
+            list_id,
+            f"archived list '{list_obj.title}'"
+        )
+        db.session.commit()
+    
+    return jsonify(list_obj.to_dict()), 200
+
+@lists_bp.route('/<int:list_id>/unarchive', methods=['POST'])
+@login_required
+def unarchive_list(list_id):
+    """Bring an archived list back onto the board"""
+    user_id = session['user_id']
+    list_obj = get_live_list(list_id)
+    
+    if not list_obj:
+        return jsonify({'error': 'List not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if list_obj.archived_at is not None:
+        list_obj.archived_at = None
+        log_activity(
+            list_obj.board_id,
+            user_id,
+            'unarchived',
+            'list',
+            list_id,
+            f"restored list '{list_obj.title}' from the archive"
+        )
+        db.session.commit()
+    
+    return jsonify(list_obj.to_dict()), 200
+
+@lists_bp.route('/<int:list_id>/archive-completed', methods=['POST'])
+@login_required
+def archive_completed_cards(list_id):
+    """Archive every completed card in a list with a single UPDATE"""
+    user_id = session['user_id']
+    list_obj = get_live_list(list_id)
+    
+    if not list_obj:
+        return jsonify({'error': 'List not found'}), 404
+    
+    board, has_access = check_board_access(list_obj.board_id, user_id)
+    
+    if not has_access:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    archived = Card.query.filter(
+        Card.list_id == list_id,
+        Card.completed.is_(True),
+        Card.archived_at.is_(None),
+        Card.deleted_at.is_(None)
+    ).update({Card.archived_at: datetime.utcnow()}, synchronize_session=False)
+    
+    if archived:
+        log_activity(
+            list_obj.board_id,
+            user_id,
+            'archived',
+            'list',
+            list_id,
+            f"archived {archived} completed card{'s' if archived != 1 else ''} from list '{list_obj.title}'"
+        )
+    
     db.session.commit()
     
-    return jsonify({'message': 'List deleted successfully'}), 200
+    return jsonify({'archived': archived}), 200
@@ -1,10 +1,26 @@
 from flask import Blueprint, request, jsonify, session
-from models import db, User, Card, CardAssignment
+from models import db, User, Card, CardAssignment, List
 from routes.auth import login_required
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 
 users_bp = Blueprint('users', __name__)
 
+def is_hidden(card):
+    """A card is hidden if it, its list or its board has been archived or deleted"""
+    if card.archived_at is not None or card.deleted_at is not None:
+        return True
+    list_obj = card.list
+    if list_obj is None:
+        return False
+    if list_obj.archived_at is not None or list_obj.deleted_at is not None:
+        return True
+    return list_obj.board is not None and list_obj.board.deleted_at is not None
+
+def assigned_card_options():
+    """Load each assignment's card with its list and board in the same query"""
+    return [joinedload(CardAssignment.card).joinedload(Card.list).joinedload(List.board)]
+
 @users_bp.route('/search', methods=['GET'])
 @login_required
 def search_users():
@@ -25,13 +41,14 @@ def get_my_tasks():
     user_id = session['user_id']
     
     # Get all card assignments for the user
-    assignments = CardAssignment.query.filter_by(user_id=user_id).all()
+    assignments = CardAssignment.query.filter_by(user_id=user_id)\
+        .options(*assigned_card_options()).all()
     
     tasks = []
     for assignment in assignments:
         card = assignment.card
-        if card:
-            task_data = card.to_dict()
+        if card and not is_hidden(card):
+            task_data = card.to_dict(compact=True)
             task_data['list'] = card.list.to_dict() if card.list else None
             task_data['board'] = card.list.board.to_dict() if card.list and card.list.board else None
             tasks.append(task_data)
@@ -52,12 +69,13 @@ def get_calendar_tasks():
     year = request.args.get('year', datetime.utcnow().year, type=int)
     
     # Get all assignments for the user
-    assignments = CardAssignment.query.filter_by(user_id=user_id).all()
+    assignments = CardAssignment.query.filter_by(user_id=user_id)\
+        .options(*assigned_card_options()).all()
     
     calendar_tasks = []
     for assignment in assignments:
         card = assignment.card
-        if card and card.due_date:
+        if card and card.due_date and not is_hidden(card):
             # Filter by month and year
             if card.due_date.month == month and card.due_date.year == year:
                 task_data = {
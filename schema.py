@@ -0,0 +1,107 @@
+import functools
+import zlib
+from sqlalchemy import inspect
+from models import db
+
+# Functions that fill columns added to tables which already hold rows, {(table, column): fn}
+_backfills = {}
+
+def backfill(table, *columns):
+    """Register a function that fills `columns` of `table` after an upgrade adds them
+
+    A column is added with its model default when that is a constant, or
+    NULL otherwise; the function runs once, in the app context, after every
+    missing column and index exists.
+    """
+    def decorator(fn):
+        for column in columns:
+            _backfills[(table, column)] = fn
+        return fn
+    return decorator
+
+@functools.lru_cache(maxsize=1)
+def schema_version():
+    """A 31-bit fingerprint of the tables, columns and indexes the models declare"""
+    parts = []
+    for table in sorted(db.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        for column in table.columns:
+            parts.append(f'{column.name} {column.type!r} {column.nullable} {column.primary_key}')
+        parts.extend(sorted(index.name for index in table.indexes))
+    return zlib.crc32('\n'.join(parts).encode()) & 0x7fffffff or 1
+
+def stored_version():
+    """The version stamped on the database, or None where the backend has no place for it"""
+    if db.engine.dialect.name != 'sqlite':
+        return None
+    with db.engine.connect() as conn:
+        return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+def missing(conn):
+    """The tables, columns and indexes the models declare that the database lacks"""
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    tables, columns, indexes = [], [], []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            tables.append(table)
+            continue
+        names = {column['name'] for column in inspector.get_columns(table.name)}
+        columns.extend(column for column in table.columns if column.name not in names)
+        names = {index['name'] for index in inspector.get_indexes(table.name)}
+        indexes.extend(index for index in table.indexes if index.name not in names)
+    return tables, columns, indexes
+
+def _add_column(conn, column):
+    """ALTER TABLE ADD COLUMN, with a constant model default filling the existing rows"""
+    preparer = conn.dialect.identifier_preparer
+    ddl = f'{preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}'
+    if column.default is not None and column.default.is_scalar:
+        default = db.literal(column.default.arg, column.type)\
+            .compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True})
+        ddl += f' DEFAULT {default}'
+        # NOT NULL needs a default for the rows already there, so per-row defaults stay nullable
+        if not column.nullable:
+            ddl += ' NOT NULL'
+    conn.exec_driver_sql(f'ALTER TABLE {preparer.format_table(column.table)} ADD COLUMN {ddl}')
+
+def upgrade():
+    """Add the tables, columns and indexes the database lacks, then run their backfills
+
+    Returns the (table, column) pairs added to existing tables.
+    """
+    with db.engine.begin() as conn:
+        tables, columns, indexes = missing(conn)
+        db.metadata.create_all(conn, tables=tables)
+        for column in columns:
+            _add_column(conn, column)
+        for index in indexes:
+            index.create(conn)
+    added = [(column.table.name, column.name) for column in columns]
+    for fn in dict.fromkeys(_backfills[key] for key in added if key in _backfills):
+        fn()
+    return added
+
+def ensure_schema(force=False):
+    """Upgrade the schema unless the database is already stamped with the current version
+
+    The stamp lives in SQLite's PRAGMA user_version, so an up-to-date
+    database costs one query instead of a table check per model. Other
+    backends run the upgrade every time. A database that still differs
+    from the models afterwards is never stamped: RuntimeError says what is
+    missing. Returns True if the upgrade ran.
+    """
+    version = schema_version()
+    if not force and stored_version() == version:
+        return False
+    upgrade()
+    with db.engine.connect() as conn:
+        tables, columns, indexes = missing(conn)
+    left = [table.name for table in tables] + [f'{column.table.name}.{column.name}' for column in columns] + \
+        [index.name for index in indexes]
+    if left:
+        raise RuntimeError(f"Database schema is missing {', '.join(left)}; not marking it current")
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(f'PRAGMA user_version = {version}')
+    return True
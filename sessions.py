@@ -0,0 +1,373 @@
+import glob
+import hashlib
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app, session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+from models import db, User, UserSession
+import jobs
+
+_serializer = TaggedJSONSerializer()
+
+def _key(sid):
+    """Stores see a hash of the cookie value, so a leaked store cannot be replayed"""
+    return hashlib.sha256(sid.encode()).hexdigest()
+
+class SessionStore(ABC):
+    """Where server-side sessions live
+
+    Keys are hashes of the session cookie; `data` is the serialized session.
+    A cache such as Redis fits the same six methods: load is GET, save is
+    SET with an expiry, touch is EXPIRE, and delete_user needs a per-user set
+    of keys kept next to the sessions.
+    """
+
+    @abstractmethod
+    def load(self, key):
+        """Return (user_id, data, expires_at) or None"""
+
+    @abstractmethod
+    def save(self, key, user_id, data, expires_at):
+        """Store a session, replacing any with the same key"""
+
+    @abstractmethod
+    def touch(self, expiries):
+        """Push back the expiry of many sessions at once, {key: expires_at}"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove one session if it exists"""
+
+    @abstractmethod
+    def delete_user(self, user_id):
+        """Remove every session of a user; returns how many went"""
+
+    @abstractmethod
+    def prune(self, now):
+        """Remove expired sessions; returns how many went"""
+
+class SQLStore(SessionStore):
+    """Sessions in the `sessions` table of the app database
+
+    Writes go through their own connection so they never commit, or wait
+    on, whatever the request left in db.session.
+    """
+
+    @staticmethod
+    def record_query(key):
+        return db.select(UserSession.user_id, UserSession.data, UserSession.expires_at).where(UserSession.id == key)
+
+    def load(self, key):
+        with db.engine.connect() as conn:
+            row = conn.execute(self.record_query(key)).first()
+        return tuple(row) if row else None
+
+    # The writes on a given connection, so the ASGI app can run them on its async engine
+
+    @staticmethod
+    def save_with(conn, key, user_id, data, expires_at):
+        updated = conn.execute(
+            db.update(UserSession).where(UserSession.id == key)
+            .values(user_id=user_id, data=data, expires_at=expires_at)
+        ).rowcount
+        if not updated:
+            conn.execute(db.insert(UserSession).values(
+                id=key, user_id=user_id, data=data, expires_at=expires_at, created_at=datetime.utcnow()
+            ))
+
+    @staticmethod
+    def touch_with(conn, expiries):
+        conn.execute(
+            db.update(UserSession).where(UserSession.id == db.bindparam('key'))
+            .values(expires_at=db.bindparam('expires')),
+            [{'key': key, 'expires': expires} for key, expires in expiries.items()]
+        )
+
+    @staticmethod
+    def delete_with(conn, key):
+        conn.execute(db.delete(UserSession).where(UserSession.id == key))
+
+    def save(self, key, user_id, data, expires_at):
+        with db.engine.begin() as conn:
+            self.save_with(conn, key, user_id, data, expires_at)
+
+    def touch(self, expiries):
+        with db.engine.begin() as conn:
+            self.touch_with(conn, expiries)
+
+    def delete(self, key):
+        with db.engine.begin() as conn:
+            self.delete_with(conn, key)
+
+    def delete_user(self, user_id):
+        with db.engine.begin() as conn:
+            return conn.execute(db.delete(UserSession).where(UserSession.user_id == user_id)).rowcount
+
+    def prune(self, now):
+        with db.engine.begin() as conn:
+            return conn.execute(db.delete(UserSession).where(UserSession.expires_at <= now)).rowcount
+
+class FileStore(SessionStore):
+    """One JSON file per session, for single-host deployments without a shared database
+
+    The file's mtime holds the expiry, so a touch is a single utime call.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.session')
+
+    def load(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                record = json.load(f)
+            expires = os.stat(path).st_mtime
+        except (FileNotFoundError, ValueError):
+            return None
+        return record['user_id'], record['data'], datetime.utcfromtimestamp(expires)
+
+    def save(self, key, user_id, data, expires_at):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'user_id': user_id, 'data': data}, f)
+        self._set_expiry(tmp, expires_at)
+        os.replace(tmp, self._path(key))
+
+    def _set_expiry(self, path, expires_at):
+        timestamp = (expires_at - datetime(1970, 1, 1)).total_seconds()
+        os.utime(path, (timestamp, timestamp))
+
+    def touch(self, expiries):
+        for key, expires_at in expiries.items():
+            try:
+                self._set_expiry(self._path(key), expires_at)
+            except FileNotFoundError:
+                pass
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _remove_where(self, predicate):
+        removed = 0
+        for path in glob.glob(os.path.join(self.directory, '*.session')):
+            try:
+                if predicate(path):
+                    os.remove(path)
+                    removed += 1
+            except (FileNotFoundError, ValueError):
+                pass
+        return removed
+
+    def delete_user(self, user_id):
+        def owned(path):
+            with open(path) as f:
+                return json.load(f)['user_id'] == user_id
+        return self._remove_where(owned)
+
+    def prune(self, now):
+        cutoff = (now - datetime(1970, 1, 1)).total_seconds()
+        return self._remove_where(lambda path: os.stat(path).st_mtime <= cutoff)
+
+class ServerSession(SecureCookieSession):
+    def __init__(self, initial=None, sid=None, user_id=None, expires_at=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.loaded_user_id = user_id
+        self.expires_at = expires_at
+        # A list makes save_session queue its store writes here for the caller to run
+        self.writes = None
+
+class ServerSessionInterface(SessionInterface):
+    """Keep session data server-side; the cookie only carries a random id
+
+    Expiry slides: every request pushes it PERMANENT_SESSION_LIFETIME into
+    the future. Those pushes are buffered and written in one batch at most
+    every SESSION_TOUCH_INTERVAL seconds, so reads stay read-only.
+    """
+
+    session_class = ServerSession
+
+    def __init__(self, store, touch_interval):
+        self.store = store
+        self.touch_interval = touch_interval
+        self.pending = {}  # key -> new expiry, written on the next flush
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return self.session_class()
+        return self.session_from_record(sid, self.store.load(_key(sid)))
+
+    def session_from_record(self, sid, record):
+        """Build the session for a store record, or an empty one if it is missing or expired"""
+        if record is None:
+            return self.session_class()
+        user_id, data, expires_at = record
+        if expires_at <= datetime.utcnow():
+            return self.session_class()
+        try:
+            initial = _serializer.loads(data)
+        except ValueError:
+            return self.session_class()
+        return self.session_class(initial, sid=sid, user_id=user_id, expires_at=expires_at)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.sid is not None:
+                self.write(session, 'delete', _key(session.sid))
+                response.delete_cookie(name, domain=domain, path=path)
+            self.flush(session=session)
+            return
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        now = datetime.utcnow()
+        expires_at = now + app.permanent_session_lifetime
+        user_id = session.get('user_id')
+
+        if session.sid is None or session.modified or user_id != session.loaded_user_id:
+            # A new id whenever the user changes, so a pre-login id cannot be fixed on a victim
+            if session.sid is not None and user_id != session.loaded_user_id:
+                self.write(session, 'delete', _key(session.sid))
+                session.sid = None
+            session.sid = session.sid or secrets.token_urlsafe(32)
+            self.write(session, 'save', _key(session.sid), user_id, _serializer.dumps(dict(session)), expires_at)
+        elif session.expires_at - app.permanent_session_lifetime + timedelta(seconds=self.touch_interval) <= now:
+            with self.lock:
+                self.pending[_key(session.sid)] = expires_at
+        else:
+            self.flush(session=session)
+            return
+
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        self.flush(session=session)
+
+    def write(self, session, method, *args):
+        """Run a store write, or queue it on a session whose caller runs its own writes"""
+        if session is None or session.writes is None:
+            getattr(self.store, method)(*args)
+        else:
+            session.writes.append((method, args))
+
+    def flush(self, force=False, session=None):
+        """Write buffered expiry updates if SESSION_TOUCH_INTERVAL has passed"""
+        with self.lock:
+            if not self.pending or not force and time.monotonic() - self.flushed_at < self.touch_interval:
+                return
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+        self.write(session, 'touch', pending)
+
+class UserCache:
+    """A small per-process LRU of user records, as plain dicts
+
+    Entries live for `ttl` seconds so changes made by other processes show
+    up without any cross-process invalidation.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # user id -> (loaded at, dict)
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, user_id, user):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic(), user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def forget(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+def current_user():
+    """The logged-in user as a dict, from the process cache when possible"""
+    user_id = session.get('user_id')
+    if user_id is None:
+        return None
+    cache = current_app.extensions['user_cache']
+    user = cache.get(user_id)
+    if user is None:
+        record = db.session.get(User, user_id)
+        if record is None:
+            return None
+        user = record.to_dict()
+        cache.put(user_id, user)
+    return user
+
+def forget_user(user_id):
+    """Drop a user from this process's cache after changing their record"""
+    current_app.extensions['user_cache'].forget(user_id)
+
+def revoke_user_sessions(user_id):
+    """Log a user out everywhere; returns the number of sessions removed"""
+    interface = current_app.session_interface
+    if not isinstance(interface, ServerSessionInterface):
+        return 0
+    return interface.store.delete_user(user_id)
+
+def make_store(app):
+    backend = app.config['SESSION_BACKEND']
+    if backend == 'sql':
+        return SQLStore()
+    if backend == 'file':
+        return FileStore(app.config['SESSION_FILE_DIR'])
+    raise ValueError(f'Unknown SESSION_BACKEND {backend!r}')
+
+@jobs.handler('prune_sessions', max_attempts=1, every='SESSION_PRUNE_INTERVAL')
+def prune_sessions(job_id):
+    interface = current_app.session_interface
+    if not isinstance(interface, ServerSessionInterface):
+        return {'deleted': 0}
+    return {'deleted': interface.store.prune(datetime.utcnow())}
+
+def init_app(app):
+    """Install the server-side session interface and the user cache"""
+    app.extensions['user_cache'] = UserCache(app.config['SESSION_USER_CACHE_SIZE'],
+                                             app.config['SESSION_USER_CACHE_TTL'])
+    if app.config['SESSION_BACKEND'] == 'cookie':
+        return
+    app.session_interface = ServerSessionInterface(make_store(app), app.config['SESSION_TOUCH_INTERVAL'])
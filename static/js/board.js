@@ -4,13 +4,28 @@ const boardId = window.location.pathname.split('/').pop();
 let boardData = null;
 let currentCard = null;
 let draggedCard = null;
+let draggedCardId = null;
+
+// Cards fetched per list on load and on each scroll page
+const CARD_PAGE_SIZE = 50;
+const loadingLists = new Set();
+
+// Query string of the active card filter, empty for the whole board
+let cardFilter = '';
 
 // Load board data
 async function loadBoard() {
     try {
-        boardData = await apiRequest(`/api/boards/${boardId}`);
+        if (cardFilter && boardData) {
+            // Filtering fetches only the matching cards, grouped by list like the board
+            const filtered = await apiRequest(`/api/boards/${boardId}/cards?${cardFilter}&card_limit=${CARD_PAGE_SIZE}`);
+            boardData.lists = filtered.lists;
+        } else {
+            boardData = await apiRequest(`/api/boards/${boardId}?card_limit=${CARD_PAGE_SIZE}`);
+        }
         console.log('Board data loaded:', boardData);
         document.getElementById('boardTitle').textContent = boardData.title;
+        renderLabelFilters();
         
         // Always render lists (even if empty array)
         renderLists();
@@ -22,223 +37,242 @@ async function loadBoard() {
     }
 }
 
-// Render lists
+const listsContainer = document.getElementById('listsContainer');
+const boardRenderer = createBoardRenderer(listsContainer, {
+    measure: el => el.offsetHeight,
+    viewport: container => ({ top: container.scrollTop, height: container.clientHeight }),
+    labels: () => boardData.labels
+});
+
+// Render lists, patching only what changed since the last render
 function renderLists() {
-    const container = document.getElementById('listsContainer');
-    
-    if (!boardData.lists || boardData.lists.length === 0) {
-        container.innerHTML = '';
-        return;
-    }
-    
-    container.innerHTML = boardData.lists.map(list => `
-        <div class="list" data-list-id="${list.id}">
-            <div class="list-header">
-                <h3 class="list-title">${escapeHtml(list.title)}</h3>
-                <div class="list-actions">
-                    <button class="btn-icon delete-list" data-list-id="${list.id}" title="Delete list">×</button>
-                </div>
-            </div>
-            <div class="cards-container" data-list-id="${list.id}">
-                ${renderCards(list.cards || [])}
-            </div>
-            <button class="add-card-btn" data-list-id="${list.id}">+ Add a card</button>
-            <div class="add-card-form" data-list-id="${list.id}" style="display: none;">
-                <textarea placeholder="Enter card title..."></textarea>
-                <div class="add-card-actions">
-                    <button class="btn btn-primary save-card">Add Card</button>
-                    <button class="btn btn-secondary cancel-card">Cancel</button>
-                </div>
-            </div>
-        </div>
-    `).join('');
+    boardRenderer.render(boardData.lists || []);
     
-    setupListEventListeners();
-    setupDragAndDrop();
+    // Short first pages may not scroll at all
+    listsContainer.querySelectorAll('.cards-container').forEach(container => {
+        if (container.dataset.nextCursor && container.scrollHeight <= container.clientHeight) {
+            loadMoreCards(container);
+        }
+    });
 }
 
-// Render cards
-function renderCards(cards) {
-    return cards.map(card => {
-        const badges = [];
-        
-        if (card.due_date) {
-            const dueDate = new Date(card.due_date);
-            const now = new Date();
-            const isOverdue = dueDate < now && !card.completed;
-            const isDueSoon = (dueDate - now) < 86400000 && !card.completed; // 24 hours
-            
-            badges.push(`
-                <span class="badge ${card.completed ? 'completed' : isOverdue ? 'overdue' : isDueSoon ? 'due-soon' : ''}">
-                    Due: ${dueDate.toLocaleDateString()}
-                </span>
-            `);
+// Show a card's new state on the board without reloading the board
+function updateBoardCard(card) {
+    for (const list of boardData.lists || []) {
+        const existing = (list.cards || []).find(c => c.id === card.id);
+        if (existing) {
+            Object.assign(existing, card);
+            renderLists();
+            break;
         }
-        
-        if (card.assignments && card.assignments.length > 0) {
-            badges.push(`<span class="badge">Assigned: ${card.assignments.length}</span>`);
-        }
-        
-        if (card.attachments && card.attachments.length > 0) {
-            badges.push(`<span class="badge">Attachments: ${card.attachments.length}</span>`);
+    }
+    loadActivities();
+}
+
+async function loadMoreCards(container) {
+    const listId = container.dataset.listId;
+    const cursor = container.dataset.nextCursor;
+    
+    if (!cursor || loadingLists.has(listId)) return;
+    
+    loadingLists.add(listId);
+    try {
+        let page;
+        if (cardFilter) {
+            const filtered = await apiRequest(
+                `/api/boards/${boardId}/cards?${cardFilter}&list_id=${listId}` +
+                `&after=${encodeURIComponent(cursor)}&card_limit=${CARD_PAGE_SIZE}`
+            );
+            page = filtered.lists[0] || { cards: [], next_cursor: null };
+        } else {
+            page = await apiRequest(
+                `/api/lists/${listId}/cards?after=${encodeURIComponent(cursor)}&limit=${CARD_PAGE_SIZE}`
+            );
         }
         
-        if (card.checklists && card.checklists.length > 0) {
-            const completed = card.checklists.filter(c => c.completed).length;
-            badges.push(`<span class="badge">Checklist: ${completed}/${card.checklists.length}</span>`);
+        const list = boardData.lists.find(l => String(l.id) === listId);
+        if (list) {
+            list.cards = (list.cards || []).concat(page.cards);
+            list.next_cursor = page.next_cursor;
+            renderLists();
         }
-        
-        return `
-            <div class="card" draggable="true" data-card-id="${card.id}">
-                <div class="card-title">${escapeHtml(card.title)}</div>
-                ${badges.length > 0 ? `<div class="card-badges">${badges.join('')}</div>` : ''}
-            </div>
-        `;
-    }).join('');
+    } catch (error) {
+        showNotification(error.message, 'error');
+    } finally {
+        loadingLists.delete(listId);
+    }
 }
 
-// Setup list event listeners
-function setupListEventListeners() {
-    // Add card buttons
-    document.querySelectorAll('.add-card-btn').forEach(btn => {
-        btn.addEventListener('click', (e) => {
-            const listId = e.target.dataset.listId;
-            e.target.style.display = 'none';
-            document.querySelector(`.add-card-form[data-list-id="${listId}"]`).style.display = 'block';
-            document.querySelector(`.add-card-form[data-list-id="${listId}"] textarea`).focus();
+// Re-window a scrolled list once per frame, and fetch more cards near its
+// end; scroll does not bubble, so this listens in the capture phase
+const scrolledLists = new Set();
+listsContainer.addEventListener('scroll', (e) => {
+    const container = e.target;
+    if (!container.classList || !container.classList.contains('cards-container')) return;
+    
+    const listId = parseInt(container.dataset.listId);
+    if (!scrolledLists.has(listId)) {
+        scrolledLists.add(listId);
+        requestAnimationFrame(() => {
+            scrolledLists.delete(listId);
+            boardRenderer.scrollList(listId);
         });
-    });
-    
-    // Save card
-    document.querySelectorAll('.save-card').forEach(btn => {
-        btn.addEventListener('click', async (e) => {
-            const form = e.target.closest('.add-card-form');
-            const listId = form.dataset.listId;
-            const textarea = form.querySelector('textarea');
-            const title = textarea.value.trim();
-            
-            if (!title) return;
-            
-            try {
-                await apiRequest('/api/cards', {
-                    method: 'POST',
-                    body: JSON.stringify({ title, list_id: parseInt(listId) })
-                });
-                
-                textarea.value = '';
-                form.style.display = 'none';
-                document.querySelector(`.add-card-btn[data-list-id="${listId}"]`).style.display = 'block';
-                
-                await loadBoard();
-                showNotification('Card added', 'success');
-            } catch (error) {
-                showNotification(error.message, 'error');
-            }
-        });
-    });
-    
-    // Cancel card
-    document.querySelectorAll('.cancel-card').forEach(btn => {
-        btn.addEventListener('click', (e) => {
-            const form = e.target.closest('.add-card-form');
-            const listId = form.dataset.listId;
-            form.querySelector('textarea').value = '';
-            form.style.display = 'none';
-            document.querySelector(`.add-card-btn[data-list-id="${listId}"]`).style.display = 'block';
-        });
-    });
+    }
     
-    // Delete list
-    document.querySelectorAll('.delete-list').forEach(btn => {
-        btn.addEventListener('click', async (e) => {
-            const listId = e.target.dataset.listId;
-            if (!confirm('Delete this list and all its cards?')) return;
-            
-            try {
-                await apiRequest(`/api/lists/${listId}`, { method: 'DELETE' });
-                await loadBoard();
-                showNotification('List deleted', 'success');
-            } catch (error) {
-                showNotification(error.message, 'error');
-            }
-        });
-    });
+    const remaining = container.scrollHeight - container.scrollTop - container.clientHeight;
+    if (remaining < 200) {
+        loadMoreCards(container);
+    }
+}, true);
+
+// List and card clicks, delegated so re-renders never re-bind listeners
+listsContainer.addEventListener('click', (e) => {
+    const card = e.target.closest('.card');
+    if (card) {
+        openCardModal(card.dataset.cardId);
+        return;
+    }
     
-    // Open card modal
-    document.querySelectorAll('.card').forEach(card => {
-        card.addEventListener('click', () => {
-            openCardModal(card.dataset.cardId);
-        });
-    });
+    const button = e.target.closest('button');
+    if (!button) return;
+    const listId = button.closest('.list').dataset.listId;
+    
+    if (button.classList.contains('add-card-btn')) {
+        showAddCardForm(listId, true);
+    } else if (button.classList.contains('save-card')) {
+        saveNewCard(listId);
+    } else if (button.classList.contains('cancel-card')) {
+        showAddCardForm(listId, false);
+    } else if (button.classList.contains('delete-list')) {
+        deleteList(listId);
+    } else if (button.classList.contains('archive-list')) {
+        archiveList(listId);
+    } else if (button.classList.contains('archive-completed')) {
+        archiveCompleted(listId);
+    }
+});
+
+function showAddCardForm(listId, visible) {
+    const list = boardRenderer.listElements.get(parseInt(listId));
+    const form = list.querySelector('.add-card-form');
+    list.querySelector('.add-card-btn').style.display = visible ? 'none' : 'block';
+    form.style.display = visible ? 'block' : 'none';
+    if (visible) {
+        form.querySelector('textarea').focus();
+    } else {
+        form.querySelector('textarea').value = '';
+    }
 }
 
-// Setup drag and drop
-function setupDragAndDrop() {
-    const cards = document.querySelectorAll('.card');
-    const containers = document.querySelectorAll('.cards-container');
+async function saveNewCard(listId) {
+    const list = boardRenderer.listElements.get(parseInt(listId));
+    const title = list.querySelector('.add-card-form textarea').value.trim();
     
-    cards.forEach(card => {
-        card.addEventListener('dragstart', (e) => {
-            draggedCard = card;
-            card.classList.add('dragging');
-            e.dataTransfer.effectAllowed = 'move';
-        });
-        
-        card.addEventListener('dragend', () => {
-            card.classList.remove('dragging');
-            draggedCard = null;
-        });
-    });
+    if (!title) return;
     
-    containers.forEach(container => {
-        container.addEventListener('dragover', (e) => {
-            e.preventDefault();
-            const afterElement = getDragAfterElement(container, e.clientY);
-            if (draggedCard) {
-                if (afterElement == null) {
-                    container.appendChild(draggedCard);
-                } else {
-                    container.insertBefore(draggedCard, afterElement);
-                }
-            }
+    try {
+        await apiRequest('/api/cards', {
+            method: 'POST',
+            body: JSON.stringify({ title, list_id: parseInt(listId) })
         });
         
-        container.addEventListener('drop', async (e) => {
-            e.preventDefault();
-            if (!draggedCard) return;
-            
-            const newListId = container.dataset.listId;
-            const cardId = draggedCard.dataset.cardId;
-            
-            try {
-                await apiRequest(`/api/cards/${cardId}`, {
-                    method: 'PUT',
-                    body: JSON.stringify({ list_id: parseInt(newListId) })
-                });
-                
-                await loadBoard();
-            } catch (error) {
-                showNotification(error.message, 'error');
-                await loadBoard(); // Reload to reset
-            }
+        showAddCardForm(listId, false);
+        await loadBoard();
+        showNotification('Card added', 'success');
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+}
+
+async function deleteList(listId) {
+    if (!confirm('Delete this list and all its cards?')) return;
+    
+    try {
+        await apiRequest(`/api/lists/${listId}`, { method: 'DELETE' });
+        await loadBoard();
+        showUndoNotification('List deleted', async () => {
+            await apiRequest(`/api/lists/${listId}/restore`, { method: 'POST' });
+            await loadBoard();
         });
-    });
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+}
+
+async function archiveList(listId) {
+    try {
+        await apiRequest(`/api/lists/${listId}/archive`, { method: 'POST' });
+        await loadBoard();
+        showNotification('List archived', 'success');
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+}
+
+// Archive completed cards in a list
+async function archiveCompleted(listId) {
+    try {
+        const result = await apiRequest(`/api/lists/${listId}/archive-completed`, { method: 'POST' });
+        await loadBoard();
+        showNotification(`Archived ${result.archived} completed card(s)`, 'success');
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+}
+
+// Drag and drop, delegated like the clicks. Cards stay where they are while
+// dragging; an indicator placed from the renderer's cached card offsets
+// shows the target, so dragover reads no card layout at all
+listsContainer.addEventListener('dragstart', (e) => {
+    const card = e.target.closest('.card');
+    if (!card) return;
+    draggedCard = card;
+    draggedCardId = card.dataset.cardId;
+    card.classList.add('dragging');
+    e.dataTransfer.effectAllowed = 'move';
+});
+
+listsContainer.addEventListener('dragend', endDrag);
+
+// A windowed list may unmount the dragged card, so the drop cleans up too
+function endDrag() {
+    if (draggedCard) draggedCard.classList.remove('dragging');
+    boardRenderer.hideDropIndicator();
+    draggedCard = null;
+    draggedCardId = null;
 }
 
-function getDragAfterElement(container, y) {
-    const draggableElements = [...container.querySelectorAll('.card:not(.dragging)')];
+listsContainer.addEventListener('dragover', (e) => {
+    const container = e.target.closest('.cards-container');
+    if (!container || !draggedCardId) return;
+    e.preventDefault();
+    const listId = parseInt(container.dataset.listId);
+    const y = e.clientY - container.getBoundingClientRect().top + container.scrollTop;
+    boardRenderer.showDropIndicator(listId, boardRenderer.dropIndex(listId, y));
+});
+
+listsContainer.addEventListener('drop', async (e) => {
+    const container = e.target.closest('.cards-container');
+    if (!container) return;
+    e.preventDefault();
+    if (!draggedCardId) return;
+    
+    const newListId = container.dataset.listId;
+    const cardId = draggedCardId;
+    endDrag();
     
-    return draggableElements.reduce((closest, child) => {
-        const box = child.getBoundingClientRect();
-        const offset = y - box.top - box.height / 2;
+    try {
+        await apiRequest(`/api/cards/${cardId}`, {
+            method: 'PUT',
+            body: JSON.stringify({ list_id: parseInt(newListId) })
+        });
         
-        if (offset < 0 && offset > closest.offset) {
-            return { offset: offset, element: child };
-        } else {
-            return closest;
-        }
-    }, { offset: Number.NEGATIVE_INFINITY }).element;
-}
+        await loadBoard();
+    } catch (error) {
+        showNotification(error.message, 'error');
+        await loadBoard(); // Reload to reset
+    }
+});
 
 // Open card modal
 async function openCardModal(cardId) {
@@ -258,6 +292,7 @@ async function openCardModal(cardId) {
         renderChecklistItems();
         renderAttachments();
         renderAssignedUsers();
+        renderCardLabels();
         
         openModal('cardModal');
     } catch (error) {
@@ -268,6 +303,8 @@ async function openCardModal(cardId) {
 // Render checklist items
 function renderChecklistItems() {
     const container = document.getElementById('checklistItems');
+    const completeAllBtn = document.getElementById('completeAllChecklistBtn');
+    completeAllBtn.style.display = currentCard.checklists && currentCard.checklists.length ? '' : 'none';
     
     if (!currentCard.checklists || currentCard.checklists.length === 0) {
         container.innerHTML = '<p style="color: var(--text-secondary); font-size: 0.875rem;">No items yet</p>';
@@ -275,26 +312,36 @@ function renderChecklistItems() {
     }
     
     container.innerHTML = currentCard.checklists.map(item => `
-        <div class="checklist-item ${item.completed ? 'completed' : ''}">
+        <div class="checklist-item ${item.completed ? 'completed' : ''}" draggable="true" data-item-id="${item.id}">
             <input type="checkbox" id="check-${item.id}" ${item.completed ? 'checked' : ''} 
                    onchange="toggleChecklistItem(${item.id}, this.checked)">
             <label for="check-${item.id}">${escapeHtml(item.title)}</label>
             <span class="delete-btn" onclick="deleteChecklistItem(${item.id})">✕</span>
         </div>
     `).join('');
+    
+    const allDone = currentCard.checklists.every(item => item.completed);
+    completeAllBtn.textContent = allDone ? 'Uncomplete all' : 'Complete all';
+    completeAllBtn.dataset.completed = !allDone;
+}
+
+// Apply a change to the open card and fetch the card as it then is, in one round trip
+async function changeCurrentCard(method, path, body) {
+    const cardPath = `/api/cards/${currentCard.id}`;
+    const [, card] = await apiBatch([
+        { method, path: cardPath + path, body },
+        { method: 'GET', path: cardPath }
+    ], { atomic: true });
+    
+    currentCard = card;
+    updateBoardCard(card);
 }
 
 // Toggle checklist item
 async function toggleChecklistItem(itemId, completed) {
     try {
-        await apiRequest(`/api/cards/${currentCard.id}/checklist/${itemId}`, {
-            method: 'PUT',
-            body: JSON.stringify({ completed })
-        });
-        
-        currentCard = await apiRequest(`/api/cards/${currentCard.id}`);
+        await changeCurrentCard('PUT', `/checklist/${itemId}`, { completed });
         renderChecklistItems();
-        await loadBoard(); // Refresh board to update badges
     } catch (error) {
         showNotification(error.message, 'error');
     }
@@ -303,13 +350,8 @@ async function toggleChecklistItem(itemId, completed) {
 // Delete checklist item
 async function deleteChecklistItem(itemId) {
     try {
-        await apiRequest(`/api/cards/${currentCard.id}/checklist/${itemId}`, {
-            method: 'DELETE'
-        });
-        
-        currentCard = await apiRequest(`/api/cards/${currentCard.id}`);
+        await changeCurrentCard('DELETE', `/checklist/${itemId}`);
         renderChecklistItems();
-        await loadBoard();
     } catch (error) {
         showNotification(error.message, 'error');
     }
@@ -323,20 +365,74 @@ document.getElementById('addChecklistBtn').addEventListener('click', async () =>
     if (!title) return;
     
     try {
-        await apiRequest(`/api/cards/${currentCard.id}/checklist`, {
-            method: 'POST',
-            body: JSON.stringify({ title })
-        });
+        await changeCurrentCard('POST', '/checklist', { title });
         
         input.value = '';
-        currentCard = await apiRequest(`/api/cards/${currentCard.id}`);
         renderChecklistItems();
-        await loadBoard();
     } catch (error) {
         showNotification(error.message, 'error');
     }
 });
 
+// Paste a multi-line checklist: every line becomes an item, in one request
+document.getElementById('newChecklistItem').addEventListener('paste', async (e) => {
+    const text = e.clipboardData.getData('text');
+    if (!text.includes('\n')) return;
+    
+    e.preventDefault();
+    try {
+        await changeCurrentCard('POST', '/checklist/bulk', { text });
+        renderChecklistItems();
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+});
+
+// Complete or reopen every checklist item at once
+document.getElementById('completeAllChecklistBtn').addEventListener('click', async (e) => {
+    try {
+        await changeCurrentCard('POST', '/checklist/complete', { completed: e.target.dataset.completed === 'true' });
+        renderChecklistItems();
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+});
+
+// Reorder checklist items by dragging; the new order is saved in one request
+const checklistContainer = document.getElementById('checklistItems');
+let draggedChecklistItem = null;
+
+checklistContainer.addEventListener('dragstart', (e) => {
+    draggedChecklistItem = e.target.closest('.checklist-item');
+    e.stopPropagation();
+});
+
+checklistContainer.addEventListener('dragover', (e) => {
+    const target = e.target.closest('.checklist-item');
+    if (!draggedChecklistItem || !target || target === draggedChecklistItem) return;
+    
+    e.preventDefault();
+    const rect = target.getBoundingClientRect();
+    const after = e.clientY > rect.top + rect.height / 2;
+    checklistContainer.insertBefore(draggedChecklistItem, after ? target.nextSibling : target);
+});
+
+checklistContainer.addEventListener('dragend', async () => {
+    if (!draggedChecklistItem) return;
+    draggedChecklistItem = null;
+    
+    const itemIds = [...checklistContainer.querySelectorAll('.checklist-item')]
+        .map(el => parseInt(el.dataset.itemId));
+    if (itemIds.every((id, i) => id === currentCard.checklists[i].id)) return;
+    
+    try {
+        await changeCurrentCard('PUT', '/checklist/order', { item_ids: itemIds });
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+    renderChecklistItems();
+});
+
 // Render attachments
 function renderAttachments() {
     const container = document.getElementById('attachmentsList');
@@ -379,7 +475,7 @@ document.getElementById('fileInput').addEventListener('change', async (e) => {
         
         currentCard = await apiRequest(`/api/cards/${currentCard.id}`);
         renderAttachments();
-        await loadBoard();
+        updateBoardCard(currentCard);
         showNotification('File uploaded', 'success');
     } catch (error) {
         showNotification(error.message, 'error');
@@ -391,13 +487,8 @@ document.getElementById('fileInput').addEventListener('change', async (e) => {
 // Delete attachment
 async function deleteAttachment(attachmentId) {
     try {
-        await apiRequest(`/api/cards/${currentCard.id}/attachments/${attachmentId}`, {
-            method: 'DELETE'
-        });
-        
-        currentCard = await apiRequest(`/api/cards/${currentCard.id}`);
+        await changeCurrentCard('DELETE', `/attachments/${attachmentId}`);
         renderAttachments();
-        await loadBoard();
         showNotification('Attachment deleted', 'success');
     } catch (error) {
         showNotification(error.message, 'error');
@@ -421,6 +512,55 @@ function renderAssignedUsers() {
     `).join('');
 }
 
+// Render the board's labels in the card modal, the card's own ones selected
+function renderCardLabels() {
+    const container = document.getElementById('cardLabels');
+    const labels = boardData.labels || [];
+    
+    if (labels.length === 0) {
+        container.innerHTML = '<p style="color: var(--text-secondary); font-size: 0.875rem;">No labels yet</p>';
+        return;
+    }
+    
+    const selected = new Set(currentCard.label_bits || []);
+    container.innerHTML = labels.map(label => `
+        <span class="card-label label-option ${selected.has(label.bit) ? 'selected' : ''}"
+              style="background: ${label.color}" onclick="toggleCardLabel(${label.id}, ${!selected.has(label.bit)})">
+            ${escapeHtml(label.name)}
+        </span>
+    `).join('');
+}
+
+// Put a label on the open card or take it off
+async function toggleCardLabel(labelId, on) {
+    try {
+        await changeCurrentCard(on ? 'POST' : 'DELETE', `/labels/${labelId}`);
+        renderCardLabels();
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+}
+
+// Create a board label and put it on the open card
+document.getElementById('addLabelBtn').addEventListener('click', async () => {
+    const input = document.getElementById('newLabelName');
+    const name = input.value.trim();
+    
+    if (!name) return;
+    
+    try {
+        const label = await apiRequest(`/api/boards/${boardId}/labels`, {
+            method: 'POST',
+            body: JSON.stringify({ name, color: document.getElementById('newLabelColor').value })
+        });
+        boardData.labels = (boardData.labels || []).concat([label]);
+        input.value = '';
+        await toggleCardLabel(label.id, true);
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+});
+
 // Search users
 let searchTimeout;
 document.getElementById('searchUsers').addEventListener('input', async (e) => {
@@ -451,14 +591,8 @@ document.getElementById('searchUsers').addEventListener('input', async (e) => {
 // Assign user
 async function assignUser(userId, username) {
     try {
-        await apiRequest(`/api/cards/${currentCard.id}/assignments`, {
-            method: 'POST',
-            body: JSON.stringify({ user_id: userId })
-        });
-        
-        currentCard = await apiRequest(`/api/cards/${currentCard.id}`);
+        await changeCurrentCard('POST', '/assignments', { user_id: userId });
         renderAssignedUsers();
-        await loadBoard();
         document.getElementById('searchUsers').value = '';
         document.getElementById('userSearchResults').innerHTML = '';
         showNotification(`Assigned ${username}`, 'success');
@@ -470,13 +604,8 @@ async function assignUser(userId, username) {
 // Unassign user
 async function unassignUser(assignmentId) {
     try {
-        await apiRequest(`/api/cards/${currentCard.id}/assignments/${assignmentId}`, {
-            method: 'DELETE'
-        });
-        
-        currentCard = await apiRequest(`/api/cards/${currentCard.id}`);
+        await changeCurrentCard('DELETE', `/assignments/${assignmentId}`);
         renderAssignedUsers();
-        await loadBoard();
         showNotification('User unassigned', 'success');
     } catch (error) {
         showNotification(error.message, 'error');
@@ -497,19 +626,26 @@ document.getElementById('saveCardBtn').addEventListener('click', async () => {
     const updates = {
         title,
         description,
-        due_date: dueDateValue || null
+        due_date: dueDateValue || null,
+        expected_version: currentCard.version
     };
     
     try {
-        await apiRequest(`/api/cards/${currentCard.id}`, {
+        const card = await apiRequest(`/api/cards/${currentCard.id}`, {
             method: 'PUT',
             body: JSON.stringify(updates)
         });
         
         closeModal('cardModal');
-        await loadBoard();
+        updateBoardCard(card);
         showNotification('Card updated', 'success');
     } catch (error) {
+        if (error.status === 409) {
+            // Someone saved first: show their version rather than overwrite it
+            await openCardModal(currentCard.id);
+            showNotification(`${error.message}; the latest version is shown`, 'error');
+            return;
+        }
         showNotification(error.message, 'error');
     }
 });
@@ -518,19 +654,120 @@ document.getElementById('saveCardBtn').addEventListener('click', async () => {
 document.getElementById('deleteCardBtn').addEventListener('click', async () => {
     if (!confirm('Delete this card?')) return;
     
+    const cardId = currentCard.id;
     try {
-        await apiRequest(`/api/cards/${currentCard.id}`, {
+        await apiRequest(`/api/cards/${cardId}`, {
             method: 'DELETE'
         });
         
         closeModal('cardModal');
         await loadBoard();
-        showNotification('Card deleted', 'success');
+        showUndoNotification('Card deleted', async () => {
+            await apiRequest(`/api/cards/${cardId}/restore`, { method: 'POST' });
+            await loadBoard();
+        });
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+});
+
+// Archive card
+document.getElementById('archiveCardBtn').addEventListener('click', async () => {
+    try {
+        await apiRequest(`/api/cards/${currentCard.id}/archive`, {
+            method: 'POST'
+        });
+        
+        closeModal('cardModal');
+        await loadBoard();
+        showNotification('Card archived', 'success');
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+});
+
+// Browse archived cards and lists
+let archivedType = 'cards';
+let archivedCursor = null;
+
+async function loadArchived(reset = true) {
+    const container = document.getElementById('archivedList');
+    const moreBtn = document.getElementById('archivedMoreBtn');
+    
+    if (reset) {
+        archivedCursor = null;
+        container.innerHTML = '';
+    }
+    
+    const params = new URLSearchParams({ type: archivedType });
+    if (archivedCursor) params.set('after', archivedCursor);
+    
+    try {
+        const page = await apiRequest(`/api/boards/${boardId}/archived?${params}`);
+        
+        if (reset && page.items.length === 0) {
+            container.innerHTML = '<p style="color: var(--text-secondary); padding: 1rem;">Nothing archived</p>';
+        }
+        
+        container.insertAdjacentHTML('beforeend', page.items.map(item => `
+            <div class="member-item">
+                <span>${escapeHtml(item.title)}</span>
+                <button class="btn btn-sm btn-secondary" onclick="unarchiveItem('${archivedType}', ${item.id})">Restore</button>
+            </div>
+        `).join(''));
+        
+        archivedCursor = page.next_cursor;
+        moreBtn.style.display = archivedCursor ? 'inline-block' : 'none';
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+}
+
+async function unarchiveItem(type, itemId) {
+    try {
+        await apiRequest(`/api/${type}/${itemId}/unarchive`, { method: 'POST' });
+        await loadArchived();
+        await loadBoard();
+        showNotification('Restored from archive', 'success');
     } catch (error) {
         showNotification(error.message, 'error');
     }
+}
+
+// One filter option per board label
+function renderLabelFilters() {
+    const select = document.getElementById('cardFilter');
+    select.querySelectorAll('.label-filter').forEach(option => option.remove());
+    (boardData.labels || []).forEach(label => {
+        const option = document.createElement('option');
+        option.className = 'label-filter';
+        option.value = `labels=${label.id}`;
+        option.textContent = `Label: ${label.name}`;
+        select.appendChild(option);
+    });
+    select.value = cardFilter;
+}
+
+document.getElementById('cardFilter').addEventListener('change', (e) => {
+    cardFilter = e.target.value;
+    loadBoard();
+});
+
+document.getElementById('showArchivedBtn').addEventListener('click', async () => {
+    archivedType = 'cards';
+    await loadArchived();
+    openModal('archivedModal');
 });
 
+document.querySelectorAll('.archived-tab').forEach(tab => {
+    tab.addEventListener('click', () => {
+        archivedType = tab.dataset.type;
+        loadArchived();
+    });
+});
+
+document.getElementById('archivedMoreBtn').addEventListener('click', () => loadArchived(false));
+
 // Add list
 document.getElementById('addListBtn').addEventListener('click', () => {
     document.getElementById('addListBtn').style.display = 'none';
@@ -659,6 +896,28 @@ function escapeHtml(text) {
 
 // Initialize
 loadBoard();
+// Copy board or save it as a template
+document.getElementById('copyBoardBtn').addEventListener('click', async () => {
+    const title = prompt('Title for the copy:', `Copy of ${boardData.title}`);
+    if (!title) return;
+    
+    const asTemplate = confirm('Save the copy as a reusable template?');
+    
+    try {
+        const newBoard = await apiRequest(`/api/boards/${boardId}/copy`, {
+            method: 'POST',
+            body: JSON.stringify({ title, as_template: asTemplate })
+        });
+        
+        showNotification(asTemplate ? 'Template saved' : 'Board copied', 'success');
+        setTimeout(() => {
+            window.location.href = `/board/${newBoard.id}`;
+        }, 500);
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
+});
+
 // Delete board
 document.getElementById('deleteBoardBtn').addEventListener('click', async () => {
     if (!confirm('Are you sure you want to delete this board? This action cannot be undone.')) return;
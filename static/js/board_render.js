@@ -0,0 +1,320 @@
+// Keyed board rendering: lists and cards are matched to their elements by
+// id, so a re-render only touches the lists and cards whose content changed.
+// Long lists are windowed: only the cards in view are mounted, between two
+// spacers that keep the scroll height, and card offsets are kept so drag
+// and drop never has to ask the browser for layout.
+// Elements are built with createElement, which also lets
+// benchmarks/board_render.js run this file under Node with a stub DOM.
+
+// Lists with more cards than this are windowed
+const WINDOW_AFTER = 100;
+// Cards mounted beyond each edge of the visible area
+const OVERSCAN = 10;
+// .card margin-bottom, which offsetHeight leaves out
+const CARD_GAP = 8;
+// Height of a card's row of label chips
+const LABEL_ROW = 22;
+
+// Build an element: attrs may hold text, className, dataset or plain attributes
+function h(tag, attrs = {}, children = []) {
+    const el = document.createElement(tag);
+    for (const [name, value] of Object.entries(attrs)) {
+        if (name === 'text') {
+            el.textContent = value;
+        } else if (name === 'className') {
+            el.className = value;
+        } else if (name === 'dataset') {
+            Object.assign(el.dataset, value);
+        } else {
+            el.setAttribute(name, value);
+        }
+    }
+    children.forEach(child => el.appendChild(child));
+    return el;
+}
+
+// How a due date is flagged: '', 'completed', 'overdue' or 'due-soon'
+function dueState(card, now) {
+    if (card.completed) return 'completed';
+    const due = Date.parse(card.due_date);
+    if (due < now) return 'overdue';
+    if (due - now < 86400000) return 'due-soon'; // 24 hours
+    return '';
+}
+
+// The badges a card shows, as [className, text] pairs
+function cardBadges(card, now) {
+    const badges = [];
+
+    if (card.due_date) {
+        const state = dueState(card, now);
+        badges.push([`badge ${state}`.trim(), `Due: ${new Date(card.due_date).toLocaleDateString()}`]);
+    }
+
+    if (card.assignee_ids && card.assignee_ids.length > 0) {
+        badges.push(['badge', `Assigned: ${card.assignee_ids.length}`]);
+    }
+
+    if (card.attachment_count > 0) {
+        badges.push(['badge', `Attachments: ${card.attachment_count}`]);
+    }
+
+    if (card.checklist_total > 0) {
+        badges.push(['badge', `Checklist: ${card.checklist_done}/${card.checklist_total}`]);
+    }
+
+    return badges;
+}
+
+// Height of a card not yet measured: one line of title, plus a row of badges if it has any
+function estimateHeight(card) {
+    const hasBadges = card.due_date || (card.assignee_ids && card.assignee_ids.length) ||
+        card.attachment_count > 0 || card.checklist_total > 0;
+    const hasLabels = card.label_bits && card.label_bits.length > 0;
+    return (hasBadges ? 76 : 48) + (hasLabels ? LABEL_ROW : 0) + CARD_GAP;
+}
+
+function fillCard(el, card, badges, labels) {
+    el.textContent = '';
+    if (labels.length > 0) {
+        el.appendChild(h('div', { className: 'card-labels' }, labels.map(label =>
+            h('span', { className: 'card-label', text: label.name, style: `background: ${label.color}` }))));
+    }
+    el.appendChild(h('div', { className: 'card-title', text: card.title }));
+    if (badges.length > 0) {
+        el.appendChild(h('div', { className: 'card-badges' },
+            badges.map(([className, text]) => h('span', { className, text }))));
+    }
+}
+
+function buildList(list) {
+    const title = h('h3', { className: 'list-title' });
+    const count = h('span', { className: 'list-count' });
+    const top = h('div', { className: 'card-spacer' });
+    const bottom = h('div', { className: 'card-spacer' });
+    const cards = h('div', { className: 'cards-container', dataset: { listId: list.id } }, [top, bottom]);
+    const el = h('div', { className: 'list', dataset: { listId: list.id } }, [
+        h('div', { className: 'list-header' }, [
+            title,
+            count,
+            h('div', { className: 'list-actions' }, [
+                h('button', { className: 'btn-icon archive-completed', dataset: { listId: list.id },
+                              title: 'Archive completed cards', text: '✓' }),
+                h('button', { className: 'btn-icon archive-list', dataset: { listId: list.id },
+                              title: 'Archive list', text: '⇩' }),
+                h('button', { className: 'btn-icon delete-list', dataset: { listId: list.id },
+                              title: 'Delete list', text: '×' }),
+            ]),
+        ]),
+        cards,
+        h('button', { className: 'add-card-btn', dataset: { listId: list.id }, text: '+ Add a card' }),
+        h('div', { className: 'add-card-form', dataset: { listId: list.id }, style: 'display: none;' }, [
+            h('textarea', { placeholder: 'Enter card title...' }),
+            h('div', { className: 'add-card-actions' }, [
+                h('button', { className: 'btn btn-primary save-card', text: 'Add Card' }),
+                h('button', { className: 'btn btn-secondary cancel-card', text: 'Cancel' }),
+            ]),
+        ]),
+    ]);
+    el.parts = { title, count, cards, top, bottom };
+    return el;
+}
+
+// Put `elements` into `parent` in order and detach every other child. Nodes
+// that are not wanted are dropped as they are met, and a node that merely
+// sits one place early is stepped over, so moving one element costs one move.
+function placeChildren(parent, elements) {
+    const wanted = new Set(elements);
+    let cursor = parent.firstChild;
+    for (const el of elements) {
+        while (cursor && !wanted.has(cursor)) {
+            const next = cursor.nextSibling;
+            parent.removeChild(cursor);
+            cursor = next;
+        }
+        if (cursor && cursor !== el && cursor.nextSibling === el) {
+            cursor = el; // the old cursor is moved when its own turn comes
+        }
+        if (el === cursor) {
+            cursor = cursor.nextSibling;
+        } else {
+            parent.insertBefore(el, cursor);
+        }
+    }
+    while (cursor) {
+        const next = cursor.nextSibling;
+        parent.removeChild(cursor);
+        cursor = next;
+    }
+}
+
+function setHeight(spacer, px) {
+    if (spacer.px !== px) {
+        spacer.setAttribute('style', `height: ${px}px`);
+        spacer.px = px;
+    }
+}
+
+// The first index whose value is above `target`, in an ascending array
+function upperBound(values, target) {
+    let low = 0;
+    let high = values.length;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (values[mid] <= target) low = mid + 1; else high = mid;
+    }
+    return low;
+}
+
+// options.measure(el): a mounted card's height in px, without its margin
+// options.viewport(cardsContainer): { top, height } of its visible area
+// options.labels(): the board's labels; cards only carry their label bits
+function createBoardRenderer(container, options = {}) {
+    const measure = options.measure || null;
+    const viewport = options.viewport || (() => ({ top: 0, height: Infinity }));
+    const boardLabels = options.labels || (() => []);
+    let labelsByBit = new Map();
+    let labelsSignature = '';
+    const listElements = new Map(); // list id -> .list element
+    const cardElements = new Map(); // card id -> .card element, mounted cards only
+    const heights = new Map(); // card id -> measured height, margin included
+    const signatures = new WeakMap(); // element -> what it was last rendered from
+    const indicator = h('div', { className: 'drop-indicator' });
+
+    function cardElement(card, now) {
+        // Everything the card's content depends on, cheap enough to compute for every card
+        const signature = [
+            card.title, card.due_date, card.due_date && dueState(card, now),
+            card.assignee_ids ? card.assignee_ids.length : 0, card.attachment_count,
+            card.checklist_done, card.checklist_total,
+            card.label_bits ? card.label_bits.join(',') : '', labelsSignature,
+        ].join('\u0000');
+        let el = cardElements.get(card.id);
+        if (!el) {
+            el = h('div', { className: 'card', draggable: 'true', dataset: { cardId: card.id } });
+            cardElements.set(card.id, el);
+        }
+        if (signatures.get(el) !== signature) {
+            const labels = (card.label_bits || []).map(bit => labelsByBit.get(bit)).filter(Boolean);
+            fillCard(el, card, cardBadges(card, now), labels);
+            signatures.set(el, signature);
+            heights.delete(card.id);
+        }
+        return el;
+    }
+
+    // Mount the cards of a list that are in view, and remember every card's offset
+    function layoutList(el, now) {
+        const cards = el.cards;
+        const offsets = new Float64Array(cards.length + 1);
+        for (let i = 0; i < cards.length; i++) {
+            offsets[i + 1] = offsets[i] + (heights.get(cards[i].id) ?? estimateHeight(cards[i]));
+        }
+        el.offsets = offsets;
+
+        let first = 0;
+        let last = cards.length;
+        if (cards.length > WINDOW_AFTER) {
+            const { top, height } = viewport(el.parts.cards);
+            first = Math.max(0, upperBound(offsets, top) - 1 - OVERSCAN);
+            last = Math.min(cards.length, upperBound(offsets, top + height) + OVERSCAN);
+        }
+
+        const visible = cards.slice(first, last);
+        const elements = visible.map(card => cardElement(card, now));
+        setHeight(el.parts.top, offsets[first]);
+        setHeight(el.parts.bottom, offsets[cards.length] - offsets[last]);
+        placeChildren(el.parts.cards, [el.parts.top, ...elements, el.parts.bottom]);
+
+        // Forget cards that scrolled out, unless another list has since taken them
+        const mounted = new Set(visible.map(card => card.id));
+        for (const id of el.mounted || []) {
+            if (!mounted.has(id) && cardElements.has(id) && !cardElements.get(id).parentNode) {
+                cardElements.delete(id);
+            }
+        }
+        el.mounted = mounted;
+
+        if (measure) {
+            visible.forEach((card, i) => {
+                if (!heights.has(card.id)) heights.set(card.id, measure(elements[i]) + CARD_GAP);
+            });
+        }
+    }
+
+    function listElement(list, now) {
+        let el = listElements.get(list.id);
+        if (!el) {
+            el = buildList(list);
+            listElements.set(list.id, el);
+        }
+        const cards = list.cards || [];
+        const signature = JSON.stringify([list.title, list.card_count ?? cards.length]);
+        if (signatures.get(el) !== signature) {
+            el.parts.title.textContent = list.title;
+            el.parts.count.textContent = list.card_count ?? cards.length;
+            signatures.set(el, signature);
+        }
+        el.parts.cards.dataset.nextCursor = list.next_cursor || '';
+        el.cards = cards;
+        layoutList(el, now);
+        return el;
+    }
+
+    // Re-window a list after it scrolled
+    function scrollList(listId) {
+        const el = listElements.get(listId);
+        if (el && el.cards.length > WINDOW_AFTER) layoutList(el, Date.now());
+    }
+
+    // Where a card dropped `y` px below the top of a list's content would land
+    function dropIndex(listId, y) {
+        const offsets = listElements.get(listId).offsets;
+        let low = 0;
+        let high = offsets.length - 1;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if ((offsets[mid] + offsets[mid + 1]) / 2 <= y) low = mid + 1; else high = mid;
+        }
+        return low;
+    }
+
+    // Draw the insertion line above the card at `index` of a list
+    function showDropIndicator(listId, index) {
+        const el = listElements.get(listId);
+        indicator.setAttribute('style', `top: ${el.offsets[index]}px`);
+        if (indicator.parentNode !== el.parts.cards) el.parts.cards.appendChild(indicator);
+    }
+
+    function hideDropIndicator() {
+        if (indicator.parentNode) indicator.parentNode.removeChild(indicator);
+    }
+
+    // Bring the DOM in line with `lists`, reusing every element whose list or card is still there
+    function render(lists) {
+        const now = Date.now();
+        const labels = boardLabels() || [];
+        labelsByBit = new Map(labels.map(label => [label.bit, label]));
+        labelsSignature = JSON.stringify(labels.map(label => [label.bit, label.name, label.color]));
+        const listIds = new Set(lists.map(list => list.id));
+        const cardIds = new Set(lists.flatMap(list => (list.cards || []).map(card => card.id)));
+
+        placeChildren(container, lists.map(list => listElement(list, now)));
+
+        for (const id of listElements.keys()) {
+            if (!listIds.has(id)) listElements.delete(id);
+        }
+        for (const id of cardElements.keys()) {
+            if (!cardIds.has(id)) cardElements.delete(id);
+        }
+        for (const id of heights.keys()) {
+            if (!cardIds.has(id)) heights.delete(id);
+        }
+    }
+
+    return { render, scrollList, dropIndex, showDropIndicator, hideDropIndicator, cardElements, listElements };
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { createBoardRenderer };
+}
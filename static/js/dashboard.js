@@ -1,11 +1,20 @@
 // Dashboard functionality
 
 let boards = [];
+let nextCursor = null;
 
-// Load boards
-async function loadBoards() {
+const BOARD_PAGE_SIZE = 50;
+
+// Load boards, most recently active first; `more` appends the next page
+async function loadBoards(more = false) {
     try {
-        boards = await apiRequest('/api/boards');
+        let url = `/api/boards?limit=${BOARD_PAGE_SIZE}&summary=1`;
+        if (more && nextCursor) {
+            url += `&after=${encodeURIComponent(nextCursor)}`;
+        }
+        const page = await apiRequest(url);
+        boards = more ? boards.concat(page.boards) : page.boards;
+        nextCursor = page.next_cursor;
         console.log('Loaded boards:', boards);
         renderBoards();
     } catch (error) {
@@ -43,10 +52,46 @@ function renderBoards() {
             <h3>${escapeHtml(board.title)}</h3>
             <p>${escapeHtml(board.description || 'No description')}</p>
             <div style="font-size: 0.75rem; color: var(--text-secondary); margin-top: 0.5rem;">
-                ${board.owner_id ? 'Owner' : 'Member'}
+                ${board.is_template ? 'Template' : board.owner_id ? 'Owner' : 'Member'}
             </div>
+            ${board.summary ? `
+            <div style="font-size: 0.75rem; color: var(--text-secondary); margin-top: 0.25rem;">
+                ${board.summary.open_cards} open
+                ${board.summary.overdue_cards ? `· <span style="color: var(--danger-color);">${board.summary.overdue_cards} overdue</span>` : ''}
+                · ${board.summary.members} ${board.summary.members === 1 ? 'member' : 'members'}
+            </div>` : ''}
+            ${board.is_template ? `<button class="btn btn-sm btn-primary use-template" data-board-id="${board.id}">Use template</button>` : ''}
         </a>
-    `).join('');
+    `).join('') + (nextCursor ? `
+        <div style="grid-column: 1/-1; text-align: center;">
+            <button id="loadMoreBoards" class="btn btn-secondary">Load more boards</button>
+        </div>
+    ` : '');
+    
+    const loadMore = document.getElementById('loadMoreBoards');
+    if (loadMore) {
+        loadMore.addEventListener('click', () => loadBoards(true));
+    }
+    
+    boardsGrid.querySelectorAll('.use-template').forEach(btn => {
+        btn.addEventListener('click', (e) => {
+            e.preventDefault();
+            useTemplate(btn.dataset.boardId);
+        });
+    });
+}
+
+// Create a board from a template
+async function useTemplate(templateId) {
+    try {
+        const newBoard = await apiRequest(`/api/boards/${templateId}/copy`, {
+            method: 'POST',
+            body: JSON.stringify({})
+        });
+        window.location.href = `/board/${newBoard.id}`;
+    } catch (error) {
+        showNotification(error.message, 'error');
+    }
 }
 
 // Create board
@@ -67,7 +112,7 @@ document.getElementById('createBoardForm').addEventListener('submit', async (e)
             body: JSON.stringify({ title, description })
         });
         
-        boards.push(newBoard);
+        boards.unshift(newBoard);
         renderBoards();
         closeModal('createBoardModal');
         
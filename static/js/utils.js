@@ -14,7 +14,10 @@ async function apiRequest(url, options = {}) {
         const data = await response.json();
         
         if (!response.ok) {
-            throw new Error(data.error || 'Request failed');
+            const error = new Error(data.error || 'Request failed');
+            error.status = response.status;
+            error.data = data;
+            throw error;
         }
         
         return data;
@@ -24,6 +27,25 @@ async function apiRequest(url, options = {}) {
     }
 }
 
+// Several API calls in one round trip; resolves to their bodies in order,
+// or throws like apiRequest for the first one that failed
+async function apiBatch(requests, { atomic = false } = {}) {
+    const result = await apiRequest('/api/batch', {
+        method: 'POST',
+        body: JSON.stringify({ atomic, requests })
+    });
+    
+    const failed = result.responses.find(response => response.status >= 400);
+    if (failed) {
+        const error = new Error((failed.body && failed.body.error) || 'Request failed');
+        error.status = failed.status;
+        error.data = failed.body;
+        throw error;
+    }
+    
+    return result.responses.map(response => response.body);
+}
+
 // Modal helper
 function openModal(modalId) {
     const modal = document.getElementById(modalId);
@@ -106,6 +128,47 @@ function showNotification(message, type = 'info') {
     }, 3000);
 }
 
+// Show notification with an undo action
+function showUndoNotification(message, onUndo, duration = 8000) {
+    const notification = document.createElement('div');
+    notification.className = 'notification notification-success';
+    notification.style.cssText = `
+        position: fixed;
+        top: 20px;
+        right: 20px;
+        padding: 1rem 1.5rem;
+        background: #61bd4f;
+        color: white;
+        border-radius: 4px;
+        box-shadow: 0 3px 6px rgba(0,0,0,0.16);
+        z-index: 10000;
+        animation: slideInRight 0.3s;
+        display: flex;
+        gap: 1rem;
+        align-items: center;
+    `;
+    
+    const text = document.createElement('span');
+    text.textContent = message;
+    const undoBtn = document.createElement('button');
+    undoBtn.className = 'btn btn-sm btn-secondary';
+    undoBtn.textContent = 'Undo';
+    notification.append(text, undoBtn);
+    
+    const dismiss = () => {
+        notification.style.animation = 'slideOutRight 0.3s';
+        setTimeout(() => notification.remove(), 300);
+    };
+    
+    undoBtn.addEventListener('click', async () => {
+        dismiss();
+        await onUndo();
+    });
+    
+    document.body.appendChild(notification);
+    setTimeout(dismiss, duration);
+}
+
 // Logout function
 async function logout() {
     try {
@@ -1,8 +1,14 @@
 import os
 import tempfile
+from contextlib import contextmanager
 import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
 from app import create_app, db
 from config import Config
+import passwords
+import schema
+import sessions
 
 class TestConfig(Config):
     """Test configuration"""
@@ -10,21 +16,44 @@ class TestConfig(Config):
     WTF_CSRF_ENABLED = False
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    RUN_JOBS_INLINE = True
+    N_PLUS_ONE_MODE = 'raise'
+    N_PLUS_ONE_THRESHOLD = 2
+    PASSWORD_HASH_WORKERS = 0
+    AUTO_CREATE_SCHEMA = True
+    UPLOAD_FOLDER = tempfile.mkdtemp(prefix='boardify-uploads-')
 
-@pytest.fixture(scope='module')
-def app():
-    """Create and configure a new app instance for each test module."""
-    # Create the app with test configuration
+@pytest.fixture(scope='session')
+def cached_app():
+    """Build the app once per test run; most of create_app is compiling URL rules."""
     app = create_app(TestConfig)
+    return app, dict(app.config)
+
+@pytest.fixture(scope='session')
+def testuser_password_hash():
+    """Hash the test user's password once instead of once per module."""
+    return generate_password_hash('testpass', TestConfig.PASSWORD_HASH_METHOD)
+
+@pytest.fixture(scope='module')
+def app(cached_app, testuser_password_hash):
+    """Hand each test module the shared app with fresh config, state and database."""
+    app, config = cached_app
+    app.config.clear()
+    app.config.update(config)
     
-    # Create the database and load test data
     with app.app_context():
-        db.create_all()
+        # Disposing the pool drops the old in-memory database along with its connection
+        db.session.remove()
+        db.engine.dispose()
+        schema.ensure_schema()
+        
+        # Start from an empty rate limiter, user cache and session touch buffer
+        passwords.init_app(app)
+        sessions.init_app(app)
         
         # Create a test user
         from models import User
-        user = User(username='testuser', email='test@example.com')
-        user.set_password('testpass')
+        user = User(username='testuser', email='test@example.com', password_hash=testuser_password_hash)
         db.session.add(user)
         db.session.commit()
     
@@ -32,7 +61,8 @@ def app():
     
     # Clean up the database after the test
     with app.app_context():
-        db.drop_all()
+        db.session.remove()
+        db.engine.dispose()
 
 @pytest.fixture
 def client(app):
@@ -58,3 +88,44 @@ class AuthActions:
 def auth(client):
     """Fixture for handling authentication in tests."""
     return AuthActions(client)
+
+@pytest.fixture
+def api_login(client):
+    """Log a user in through the JSON API."""
+    def login(username='testuser', password='testpass'):
+        return client.post('/auth/login', json={'username': username, 'password': password})
+    return login
+
+@pytest.fixture
+def detect_n_plus_one(app):
+    """Fail on repeated lazy loads inside a block of non-request code.
+    
+    Route tests are covered already: TestConfig sets N_PLUS_ONE_MODE = 'raise'.
+    """
+    import n_plus_one
+    return n_plus_one.detect
+
+@pytest.fixture
+def count_statements(app):
+    """Collect the SQL statements run against the test database inside a block."""
+    @contextmanager
+    def count():
+        statements = []
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+    return count
+
+@pytest.fixture
+def allow_n_plus_one(app):
+    """Turn off N+1 detection for one test."""
+    mode = app.config['N_PLUS_ONE_MODE']
+    app.config['N_PLUS_ONE_MODE'] = 'off'
+    yield
+    app.config['N_PLUS_ONE_MODE'] = mode
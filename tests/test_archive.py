@@ -0,0 +1,110 @@
+import pytest
+from flask import json
+from models import db, User, Board, List, Card
+
+def test_archive_card_hides_it_from_board(client, api_login, archive_board):
+    """Test that an archived card leaves the board snapshot."""
+    api_login()
+
+    response = client.post(f"/api/cards/{archive_board['card_ids'][0]}/archive")
+    assert response.status_code == 200
+    assert json.loads(response.data)['archived_at'] is not None
+
+    data = json.loads(client.get(f"/api/boards/{archive_board['board_id']}").data)
+    titles = [c['title'] for c in data['lists'][0]['cards']]
+    assert 'Task 0' not in titles
+
+    paged = json.loads(client.get(f"/api/boards/{archive_board['board_id']}?card_limit=10").data)
+    assert paged['lists'][0]['card_count'] == 3
+
+def test_unarchive_card_restores_it(client, api_login, archive_board):
+    """Test that unarchiving a card puts it back on the board."""
+    api_login()
+    card_id = archive_board['card_ids'][1]
+
+    client.post(f'/api/cards/{card_id}/archive')
+    response = client.post(f'/api/cards/{card_id}/unarchive')
+    assert response.status_code == 200
+
+    page = json.loads(client.get(f"/api/lists/{archive_board['list_id']}/cards").data)
+    assert card_id in [c['id'] for c in page['cards']]
+
+def test_archive_list_hides_list(client, api_login, archive_board):
+    """Test archiving and restoring a whole list."""
+    api_login()
+
+    client.post(f"/api/lists/{archive_board['list_id']}/archive")
+    data = json.loads(client.get(f"/api/boards/{archive_board['board_id']}").data)
+    assert data['lists'] == []
+
+    client.post(f"/api/lists/{archive_board['list_id']}/unarchive")
+    data = json.loads(client.get(f"/api/boards/{archive_board['board_id']}").data)
+    assert len(data['lists']) == 1
+
+def test_archive_completed_cards(client, api_login, app, archive_board):
+    """Test that only completed cards are archived in bulk."""
+    api_login()
+
+    response = client.post(f"/api/lists/{archive_board['list_id']}/archive-completed")
+    assert response.status_code == 200
+    assert json.loads(response.data)['archived'] == 2
+
+    with app.app_context():
+        remaining = Card.query.filter_by(list_id=archive_board['list_id'], archived_at=None).all()
+        assert all(not card.completed for card in remaining)
+        assert len(remaining) == 2
+
+def test_archived_items_are_paginated(client, api_login, archive_board):
+    """Test browsing archived cards newest first across pages."""
+    api_login()
+
+    for card_id in archive_board['card_ids']:
+        client.post(f'/api/cards/{card_id}/archive')
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"/api/boards/{archive_board['board_id']}/archived?type=cards&limit=3"
+        if cursor:
+            url += f'&after={cursor}'
+        response = client.get(url)
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        seen.extend(item['id'] for item in page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(archive_board['card_ids'])
+    assert len(seen) == len(set(seen))
+
+def test_archived_items_rejects_unknown_type(client, api_login, archive_board):
+    """Test that only cards and lists can be browsed."""
+    api_login()
+
+    response = client.get(f"/api/boards/{archive_board['board_id']}/archived?type=boards")
+    assert response.status_code == 400
+
+# Fixtures
+@pytest.fixture
+def archive_board(app):
+    """Create a board with a list of four cards, two of them completed."""
+    with app.app_context():
+        user = User.query.filter_by(username='testuser').first()
+        board = Board(title='Archive Board', owner_id=user.id)
+        list_item = List(title='Done', board=board, position=0)
+        db.session.add_all([board, list_item])
+        db.session.flush()
+
+        cards = [
+            Card(title=f'Task {i}', list_id=list_item.id, position=i, completed=i % 2 == 0)
+            for i in range(4)
+        ]
+        db.session.add_all(cards)
+        db.session.commit()
+
+        return {
+            'board_id': board.id,
+            'list_id': list_item.id,
+            'card_ids': [card.id for card in cards]
+        }
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+import pytest
+from sqlalchemy import event
+from tests.conftest import TestConfig
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('asgiref')
+
+from asgi import AsyncApp
+
+async def call(asgi_app, method, path, query=b'', cookie=None):
+    headers = [(b'host', b'localhost')]
+    if cookie:
+        headers.append((b'cookie', f'session={cookie}'.encode()))
+    scope = {'type': 'http', 'method': method, 'path': path, 'raw_path': path.encode(), 'root_path': '',
+             'query_string': query, 'headers': headers, 'http_version': '1.1', 'scheme': 'http',
+             'server': ('localhost', 80), 'client': ('127.0.0.1', 5000)}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi_app(scope, receive, send)
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return messages[0]['status'], body
+
+def test_read_endpoints_match_wsgi(async_env):
+    """Test that async endpoints answer like the WSGI app and query through the async engine."""
+    app, asgi_app, client, sid, board_id = async_env
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(asgi_app.engine.sync_engine, 'before_cursor_execute', listener)
+
+    async def run():
+        results = {}
+        for path, query in (('/api/boards', b''), (f'/api/boards/{board_id}', b''),
+                            (f'/api/boards/{board_id}', b'card_limit=1'),
+                            (f'/api/boards/{board_id}/activities', b''),
+                            ('/api/users/me/tasks', b''), ('/api/users/me/calendar', b'month=1&year=2024')):
+            results[(path, query)] = await call(asgi_app, 'GET', path, query, sid)
+        return results
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        event.remove(asgi_app.engine.sync_engine, 'before_cursor_execute', listener)
+
+    for (path, query), (status, body) in results.items():
+        expected = client.get(path, query_string=query.decode())
+        assert status == expected.status_code == 200
+        assert json.loads(body) == expected.get_json()
+    assert len(json.loads(results[('/api/users/me/tasks', b'')][1])) == 6
+    assert len(statements) >= len(results)
+
+def test_auth_and_fallthrough(async_env):
+    """Test that async endpoints need a session and other routes go to the WSGI app."""
+    app, asgi_app, client, sid, board_id = async_env
+
+    async def run():
+        return (await call(asgi_app, 'GET', '/api/boards'),
+                await call(asgi_app, 'GET', '/auth/me', cookie=sid),
+                await call(asgi_app, 'GET', '/api/boards/999999', cookie=sid))
+
+    anonymous, me, missing = asyncio.run(run())
+    assert anonymous[0] == 401
+    assert me[0] == 200 and b'asyncuser' in me[1]
+    assert missing[0] == 404
+
+def test_session_writes_stay_off_the_loop(async_env):
+    """Test that the sliding-expiry write of an async request goes through the async engine."""
+    from models import db
+    app, asgi_app, client, sid, board_id = async_env
+    interface = app.session_interface
+    sync_statements, async_statements = [], []
+
+    def recorder(statements):
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        return listener
+
+    with app.app_context():
+        sync_engine = db.engine
+    listeners = [(sync_engine, recorder(sync_statements)), (asgi_app.engine.sync_engine, recorder(async_statements))]
+    for engine, listener in listeners:
+        event.listen(engine, 'before_cursor_execute', listener)
+    touch_interval, interface.touch_interval = interface.touch_interval, 0
+    try:
+        status, _ = asyncio.run(call(asgi_app, 'GET', '/api/boards', cookie=sid))
+    finally:
+        interface.touch_interval = touch_interval
+        for engine, listener in listeners:
+            event.remove(engine, 'before_cursor_execute', listener)
+
+    assert status == 200
+    assert sync_statements == []
+    assert any(statement.startswith('UPDATE sessions') for statement in async_statements)
+
+def test_db_concurrency_is_bounded(async_env):
+    """Test that no more than ASYNC_DB_CONCURRENCY requests use the database at once."""
+    app, asgi_app, client, sid, board_id = async_env
+    dispatch = asgi_app.dispatch
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def counting_dispatch(*args):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            return dispatch(*args)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    asgi_app.dispatch = counting_dispatch
+
+    async def run():
+        asgi_app.db_slots = asyncio.Semaphore(2)
+        return await asyncio.gather(*[call(asgi_app, 'GET', f'/api/boards/{board_id}', cookie=sid)
+                                      for _ in range(8)])
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        asgi_app.dispatch = dispatch
+    assert all(status == 200 for status, _ in responses)
+    assert peak[0] <= 2
+
+# Fixtures
+
+@pytest.fixture(scope='module')
+def async_env(tmp_path_factory):
+    """An app on a SQLite file (the async engine cannot share an in-memory one), logged in"""
+    from app import create_app
+    from models import db
+
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('asgi') / 'asgi.db'}"
+
+    app = create_app(FileConfig)
+    client = app.test_client()
+    client.post('/auth/register', json={'username': 'asyncuser', 'email': 'async@example.com', 'password': 'pw'})
+    client.post('/auth/login', json={'username': 'asyncuser', 'password': 'pw'})
+    user_id = client.get('/auth/me').get_json()['id']
+    board_id = client.post('/api/boards', json={'title': 'Async board'}).get_json()['id']
+    for title in ('Todo', 'Done'):
+        list_id = client.post('/api/lists', json={'title': title, 'board_id': board_id}).get_json()['id']
+        for n in range(3):
+            card = client.post('/api/cards', json={'title': f'{title} {n}', 'list_id': list_id,
+                                                   'due_date': '2024-01-15T00:00:00'}).get_json()
+            client.post(f"/api/cards/{card['id']}/assignments", json={'user_id': user_id})
+    asgi_app = AsyncApp(app)
+    yield app, asgi_app, client, client.get_cookie('session').value, board_id
+    asyncio.run(asgi_app.aclose())
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
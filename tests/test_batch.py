@@ -0,0 +1,138 @@
+import pytest
+from models import db, Board, User
+
+def test_batch_runs_modal_flow(client, api_login, batch_board):
+    """Test that a mutation and the card refresh come back from one request."""
+    api_login()
+    card_id = batch_board['card_id']
+
+    response = client.post('/api/batch', json={'requests': [
+        {'method': 'POST', 'path': f'/api/cards/{card_id}/checklist', 'body': {'title': 'Step'}},
+        {'method': 'GET', 'path': f'/api/cards/{card_id}'},
+        {'method': 'GET', 'path': f"/api/boards/{batch_board['board_id']}?card_limit=10"},
+    ]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['committed'] is True
+    assert [r['status'] for r in data['responses']] == [201, 200, 200]
+
+    card = data['responses'][1]['body']
+    assert [item['title'] for item in card['checklists']] == ['Step']
+    assert card['checklist_total'] == 1
+    assert data['responses'][1]['headers']['ETag'] == f"\"{card['version']}\""
+    assert data['responses'][2]['body']['lists'][0]['cards'][0]['checklist_total'] == 1
+
+def test_atomic_batch_rolls_back(client, api_login, batch_board):
+    """Test that a failing sub-request undoes the whole atomic batch and stops it."""
+    api_login()
+    card_id = batch_board['card_id']
+
+    response = client.post('/api/batch', json={'atomic': True, 'requests': [
+        {'method': 'POST', 'path': f'/api/cards/{card_id}/checklist', 'body': {'title': 'Undone'}},
+        {'method': 'PUT', 'path': f'/api/cards/{card_id}', 'body': {'title': 'Stale', 'expected_version': 99}},
+        {'method': 'GET', 'path': f'/api/cards/{card_id}'},
+    ]})
+    data = response.get_json()
+    assert data['committed'] is False
+    assert [r['status'] for r in data['responses']] == [201, 409]
+
+    card = client.get(f'/api/cards/{card_id}').get_json()
+    assert card['checklists'] == []
+    assert card['checklist_total'] == 0
+    assert card['title'] == 'Edit me'
+
+    response = client.post('/api/batch', json={'atomic': True, 'requests': [
+        {'method': 'POST', 'path': f'/api/cards/{card_id}/checklist', 'body': {'title': 'Kept'}},
+        {'method': 'PUT', 'path': f'/api/cards/{card_id}', 'body': {'title': 'Renamed', 'expected_version': 1}},
+    ]})
+    assert response.get_json()['committed'] is True
+    card = client.get(f'/api/cards/{card_id}').get_json()
+    assert [item['title'] for item in card['checklists']] == ['Kept']
+    assert card['title'] == 'Renamed'
+
+def test_plain_batch_keeps_going(client, api_login, batch_board):
+    """Test that without atomic each sub-request stands on its own."""
+    api_login()
+    card_id = batch_board['card_id']
+
+    response = client.post('/api/batch', json={'requests': [
+        {'method': 'PUT', 'path': f'/api/cards/{card_id}', 'body': {'title': 'Stale', 'expected_version': 99}},
+        {'method': 'PUT', 'path': f'/api/cards/{card_id}', 'body': {'description': 'Written'},
+         'headers': {'If-Match': '"1"'}},
+        {'method': 'GET', 'path': '/api/cards/999999'},
+        {'method': 'DELETE', 'path': '/api/nothing-here'},
+    ]})
+    assert [r['status'] for r in response.get_json()['responses']] == [409, 200, 404, 404]
+    assert client.get(f'/api/cards/{card_id}').get_json()['description'] == 'Written'
+
+def test_crashing_subrequest_fails_alone(client, api_login, app, batch_board, monkeypatch):
+    """Test that an unexpected error in one view becomes a 500 sub-response."""
+    api_login()
+    card_id = batch_board['card_id']
+    def crash(card_id):
+        raise KeyError('boom')
+    monkeypatch.setitem(app.view_functions, 'cards.get_card', crash)
+
+    response = client.post('/api/batch', json={'requests': [
+        {'method': 'POST', 'path': f'/api/cards/{card_id}/checklist', 'body': {'title': 'Kept'}},
+        {'method': 'GET', 'path': f'/api/cards/{card_id}'},
+        {'method': 'GET', 'path': f"/api/boards/{batch_board['board_id']}?card_limit=10"},
+    ]})
+    assert response.status_code == 200
+    assert [r['status'] for r in response.get_json()['responses']] == [201, 500, 200]
+
+    response = client.post('/api/batch', json={'atomic': True, 'requests': [
+        {'method': 'POST', 'path': f'/api/cards/{card_id}/checklist', 'body': {'title': 'Undone'}},
+        {'method': 'GET', 'path': f'/api/cards/{card_id}'},
+    ]})
+    data = response.get_json()
+    assert data['committed'] is False
+    assert [r['status'] for r in data['responses']] == [201, 500]
+
+    monkeypatch.undo()
+    card = client.get(f'/api/cards/{card_id}').get_json()
+    assert [item['title'] for item in card['checklists']] == ['Kept']
+
+def test_batch_shares_login_and_access(client, api_login, batch_board):
+    """Test that sub-requests run as the caller and are refused what the caller is."""
+    api_login('outsider', 'outsiderpass')
+    response = client.post('/api/batch', json={'requests': [
+        {'method': 'GET', 'path': '/api/boards'},
+        {'method': 'GET', 'path': f"/api/cards/{batch_board['card_id']}"},
+        {'method': 'PUT', 'path': f"/api/boards/{batch_board['board_id']}", 'body': {'title': 'Mine'}},
+    ]})
+    responses = response.get_json()['responses']
+    assert responses[0]['body'] == []
+    assert [r['status'] for r in responses[1:]] == [403, 403]
+
+def test_batch_validation(client, api_login, app):
+    """Test that malformed batches are refused before anything runs."""
+    assert client.post('/api/batch', json={'requests': [{'path': '/api/boards'}]}).status_code == 401
+
+    api_login()
+    assert client.post('/api/batch', json={}).status_code == 400
+    assert client.post('/api/batch', json={'requests': [{'path': '/auth/logout'}]}).status_code == 400
+    assert client.post('/api/batch', json={'requests': [{'path': '/api/batch'}]}).status_code == 400
+    assert client.post('/api/batch', json={'requests': [{'path': '/api/boards', 'method': 'TRACE'}]}).status_code == 400
+    too_many = [{'path': '/api/boards'}] * (app.config['BATCH_MAX_REQUESTS'] + 1)
+    assert client.post('/api/batch', json={'requests': too_many}).status_code == 400
+
+# Fixtures
+
+@pytest.fixture
+def batch_board(client, api_login, app):
+    """A fresh board with one list and one card, and a user who is not a member"""
+    api_login()
+    board_id = client.post('/api/boards', json={'title': 'Batches'}).get_json()['id']
+    list_id = client.post('/api/lists', json={'title': 'Todo', 'board_id': board_id}).get_json()['id']
+    card_id = client.post('/api/cards', json={'title': 'Edit me', 'list_id': list_id}).get_json()['id']
+    client.post('/auth/logout')
+    client.post('/auth/register', json={'username': 'outsider', 'email': 'outsider@example.com',
+                                        'password': 'outsiderpass'})
+    client.post('/auth/logout')
+    yield {'board_id': board_id, 'list_id': list_id, 'card_id': card_id}
+
+    with app.app_context():
+        User.query.filter_by(username='outsider').delete()
+        db.session.delete(db.session.get(Board, board_id))
+        db.session.commit()
@@ -0,0 +1,134 @@
+import pytest
+from datetime import datetime
+from flask import json
+from models import db, User, Board, BoardMember, List, Card, CardAssignment, ChecklistItem, Activity
+
+def test_copy_board_remaps_children(client, api_login, app, source_board):
+    """Test that lists, cards and checklists land on the new board with new ids."""
+    api_login()
+
+    response = client.post(f"/api/boards/{source_board['board_id']}/copy", json={'title': 'Sprint 2'})
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert data['title'] == 'Sprint 2'
+    assert data['copied'] == {'lists': 2, 'cards': 3, 'checklist_items': 2, 'assignments': 0}
+
+    with app.app_context():
+        lists = List.query.filter_by(board_id=data['id']).order_by(List.position).all()
+        assert [l.title for l in lists] == ['To Do', 'Done']
+        assert not set(l.id for l in lists) & set(source_board['list_ids'])
+
+        todo_cards = Card.query.filter_by(list_id=lists[0].id).order_by(Card.position).all()
+        assert [c.title for c in todo_cards] == ['Write spec', 'Review']
+        assert [i.title for i in todo_cards[0].checklists] == ['Outline', 'Draft']
+        assert todo_cards[0].checklists[1].completed is True
+        assert todo_cards[0].assignments == []
+
+        done_cards = Card.query.filter_by(list_id=lists[1].id).all()
+        assert [c.title for c in done_cards] == ['Ship']
+
+        activities = Activity.query.filter_by(board_id=data['id']).all()
+        assert len(activities) == 1
+        assert activities[0].action == 'copied'
+
+def test_copy_skips_archived_and_deleted(client, api_login, app, source_board):
+    """Test that archived and deleted cards are not copied."""
+    api_login()
+
+    with app.app_context():
+        card = db.session.get(Card, source_board['card_ids'][1])
+        card.archived_at = datetime.utcnow()
+        card = db.session.get(Card, source_board['card_ids'][2])
+        card.deleted_at = datetime.utcnow()
+        db.session.commit()
+
+    response = client.post(f"/api/boards/{source_board['board_id']}/copy", json={})
+    data = json.loads(response.data)
+    assert data['title'] == 'Copy of Sprint Board'
+    assert data['copied']['cards'] == 1
+
+def test_copy_with_assignments(client, api_login, app, source_board):
+    """Test that assignments and memberships are copied on request."""
+    api_login()
+
+    response = client.post(
+        f"/api/boards/{source_board['board_id']}/copy",
+        json={'include_assignments': True}
+    )
+    data = json.loads(response.data)
+    assert data['copied']['assignments'] == 1
+
+    with app.app_context():
+        assignment = CardAssignment.query.join(Card).join(List)\
+            .filter(List.board_id == data['id']).one()
+        assert assignment.user_id == source_board['member_id']
+        assert BoardMember.query.filter_by(board_id=data['id'], user_id=source_board['member_id']).count() == 1
+
+def test_template_round_trip(client, api_login, source_board):
+    """Test saving a board as a template and instantiating it."""
+    api_login()
+
+    response = client.post(
+        f"/api/boards/{source_board['board_id']}/copy",
+        json={'title': 'Sprint Template', 'as_template': True, 'include_cards': False}
+    )
+    template = json.loads(response.data)
+    assert template['is_template'] is True
+    assert template['copied']['cards'] == 0
+
+    response = client.post(f"/api/boards/{template['id']}/copy", json={})
+    board = json.loads(response.data)
+    assert board['is_template'] is False
+    assert board['title'] == 'Sprint Template'
+    assert board['copied']['lists'] == 2
+
+def test_copy_requires_access(client, app, source_board):
+    """Test that outsiders cannot copy a board."""
+    with app.app_context():
+        outsider = User(username='copyoutsider', email='copyoutsider@example.com')
+        outsider.set_password('testpass')
+        db.session.add(outsider)
+        db.session.commit()
+
+    client.post('/auth/login', json={'username': 'copyoutsider', 'password': 'testpass'})
+    response = client.post(f"/api/boards/{source_board['board_id']}/copy", json={})
+    assert response.status_code == 403
+
+# Fixtures
+@pytest.fixture
+def source_board(app):
+    """Create a sprint board with two lists, three cards, checklists and an assignment."""
+    with app.app_context():
+        owner = User.query.filter_by(username='testuser').first()
+        member = User.query.filter_by(username='copymember').first()
+        if member is None:
+            member = User(username='copymember', email='copymember@example.com', password_hash='x')
+            db.session.add(member)
+            db.session.flush()
+
+        board = Board(title='Sprint Board', owner_id=owner.id)
+        todo = List(title='To Do', board=board, position=0)
+        done = List(title='Done', board=board, position=1)
+        db.session.add_all([board, todo, done])
+        db.session.flush()
+        db.session.add(BoardMember(board_id=board.id, user_id=member.id))
+
+        spec = Card(title='Write spec', list_id=todo.id, position=0)
+        review = Card(title='Review', list_id=todo.id, position=1)
+        ship = Card(title='Ship', list_id=done.id, position=0, completed=True)
+        db.session.add_all([spec, review, ship])
+        db.session.flush()
+
+        db.session.add_all([
+            ChecklistItem(card_id=spec.id, title='Outline', position=0),
+            ChecklistItem(card_id=spec.id, title='Draft', position=1, completed=True),
+            CardAssignment(card_id=spec.id, user_id=member.id),
+        ])
+        db.session.commit()
+
+        return {
+            'board_id': board.id,
+            'list_ids': [todo.id, done.id],
+            'card_ids': [spec.id, review.id, ship.id],
+            'member_id': member.id
+        }
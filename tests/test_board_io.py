@@ -0,0 +1,140 @@
+import io
+import os
+import pytest
+from flask import json
+from models import db, User, Board, List, Card, ChecklistItem, Job
+import board_io
+import jobs
+
+def test_export_ndjson(client, api_login, io_board):
+    """Test that a board streams out as one JSON record per line."""
+    api_login()
+
+    response = client.get(f"/api/boards/{io_board['board_id']}/export")
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+
+    records = [json.loads(line) for line in response.data.decode().splitlines()]
+    types = [r['record_type'] for r in records]
+    assert types == ['board', 'list', 'list', 'card', 'card', 'card', 'checklist_item', 'checklist_item']
+    assert records[0]['title'] == 'Exported Board'
+    assert 'Deleted' not in [r.get('title') for r in records]
+
+def test_export_csv(client, api_login, io_board):
+    """Test the CSV export header and row count."""
+    api_login()
+
+    response = client.get(f"/api/boards/{io_board['board_id']}/export?format=csv")
+    assert response.status_code == 200
+    lines = response.data.decode().splitlines()
+    assert lines[0] == ','.join(board_io.CSV_FIELDS)
+    assert len(lines) == 9
+
+def test_export_rejects_unknown_format(client, api_login, io_board):
+    """Test that only ndjson and csv can be exported."""
+    api_login()
+
+    response = client.get(f"/api/boards/{io_board['board_id']}/export?format=xml")
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'csv'])
+def test_export_import_round_trip(client, api_login, app, io_board, fmt):
+    """Test that importing an export recreates the board."""
+    api_login()
+
+    exported = client.get(f"/api/boards/{io_board['board_id']}/export?format={fmt}").data
+    response = client.post(
+        '/api/boards/import',
+        data={'file': (io.BytesIO(exported), f'backup.{fmt}')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 202
+    status_url = json.loads(response.data)['status_url']
+    assert response.headers['Location'] == status_url == f"/api/jobs/{json.loads(response.data)['id']}"
+
+    job = json.loads(client.get(status_url).data)
+    assert job['status'] == 'succeeded'
+    assert job['progress'] == 100
+    assert job['result']['cards'] == 3
+    assert job['result']['checklist_items'] == 2
+
+    with app.app_context():
+        board = db.session.get(Board, job['result']['board_id'])
+        assert board.title == 'Exported Board'
+        lists = List.query.filter_by(board_id=board.id).order_by(List.position).all()
+        assert [l.title for l in lists] == ['To Do', 'Done']
+        cards = Card.query.filter_by(list_id=lists[0].id).order_by(Card.position).all()
+        assert [c.title for c in cards] == ['First', 'Second']
+        assert [i.title for i in cards[0].checklists] == ['Step 1', 'Step 2']
+        assert cards[0].checklists[1].completed is True
+        assert cards[0].due_date is not None
+
+def test_import_in_small_batches(app, io_board):
+    """Test that the importer remaps ids across batch boundaries."""
+    with app.app_context():
+        board = db.session.get(Board, io_board['board_id'])
+        lines = list(board_io.export_ndjson(board_io.iter_board_records(board, batch_size=1)))
+        owner_id = board.owner_id
+
+        path = f"{app.config['UPLOAD_FOLDER']}/batch_test_{board.id}.ndjson"
+        with open(path, 'w') as f:
+            f.writelines(lines)
+
+        job = jobs.enqueue('board_import', {
+            'path': path, 'fmt': 'ndjson', 'owner_id': owner_id, 'title': 'Batched', 'batch_size': 1
+        }, user_id=owner_id)
+        db.session.commit()
+        assert jobs.run_job(job.id)
+
+        job = db.session.get(Job, job.id)
+        assert job.status == 'succeeded'
+        result = json.loads(job.result)
+        assert ChecklistItem.query.join(Card).join(List)\
+            .filter(List.board_id == result['board_id']).count() == 2
+        assert not os.path.exists(path)
+
+def test_failed_import_is_reported(client, api_login, app):
+    """Test that a bad file fails the job and leaves no live board behind."""
+    api_login()
+
+    content = b'{"record_type": "board", "title": "Broken"}\n{"record_type": "card", "list_id": 99}\n'
+    response = client.post(
+        '/api/boards/import',
+        data={'file': (io.BytesIO(content), 'broken.ndjson')},
+        content_type='multipart/form-data'
+    )
+    job = json.loads(client.get(json.loads(response.data)['status_url']).data)
+    assert job['status'] == 'failed'
+    assert 'unknown list' in job['error']
+
+    boards = json.loads(client.get('/api/boards').data)
+    assert 'Broken' not in [b['title'] for b in boards]
+
+# Fixtures
+@pytest.fixture
+def io_board(app):
+    """Create a board with two lists, three cards, a deleted card and a checklist."""
+    with app.app_context():
+        from datetime import datetime
+        user = User.query.filter_by(username='testuser').first()
+        board = Board(title='Exported Board', description='Backup me', owner_id=user.id)
+        todo = List(title='To Do', board=board, position=0)
+        done = List(title='Done', board=board, position=1)
+        db.session.add_all([board, todo, done])
+        db.session.flush()
+
+        first = Card(title='First', list_id=todo.id, position=0, due_date=datetime(2030, 1, 2, 3, 4))
+        second = Card(title='Second', list_id=todo.id, position=1)
+        third = Card(title='Third', list_id=done.id, position=0, completed=True)
+        deleted = Card(title='Deleted', list_id=done.id, position=1, deleted_at=datetime.utcnow())
+        db.session.add_all([first, second, third, deleted])
+        db.session.flush()
+
+        db.session.add_all([
+            ChecklistItem(card_id=first.id, title='Step 1', position=0),
+            ChecklistItem(card_id=first.id, title='Step 2', position=1, completed=True),
+        ])
+        db.session.commit()
+
+        return {'board_id': board.id}
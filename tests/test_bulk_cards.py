@@ -0,0 +1,159 @@
+import pytest
+from models import db, Activity, Board, Card, User
+
+def test_bulk_assign_and_unassign(client, api_login, app, bulk_board):
+    """Test that one call assigns a user to many cards and logs one activity."""
+    api_login()
+    card_ids = bulk_board['todo'][:3]
+    user_id = client.get('/auth/me').get_json()['id']
+
+    response = client.post('/api/cards/bulk', json={'action': 'assign', 'card_ids': card_ids, 'user_id': user_id})
+    assert response.status_code == 200
+    assert response.get_json()['card_ids'] == card_ids
+
+    # Already assigned cards are left alone
+    response = client.post('/api/cards/bulk', json={'action': 'assign', 'card_ids': bulk_board['todo'],
+                                                    'user_id': user_id})
+    assert response.get_json()['card_ids'] == bulk_board['todo'][3:]
+
+    with app.app_context():
+        cards = Card.query.filter(Card.id.in_(bulk_board['todo'])).all()
+        assert {card.assignee_ids for card in cards} == {str(user_id)}
+        descriptions = [a.description for a in Activity.query.filter_by(board_id=bulk_board['board_id'],
+                                                                        action='assigned')]
+        assert descriptions == ['assigned testuser to 3 cards', 'assigned testuser to 2 cards']
+
+    response = client.post('/api/cards/bulk', json={'action': 'unassign', 'card_ids': card_ids, 'user_id': user_id})
+    assert response.get_json()['card_ids'] == card_ids
+    card = client.get(f'/api/cards/{card_ids[0]}').get_json()
+    assert card['assignee_ids'] == []
+    assert card['assignments'] == []
+
+def test_bulk_complete_and_due_date(client, api_login, bulk_board):
+    """Test that completing and dating cards bumps their versions."""
+    api_login()
+    card_ids = bulk_board['todo']
+
+    response = client.post('/api/cards/bulk', json={'action': 'complete', 'card_ids': card_ids})
+    assert response.get_json()['card_ids'] == card_ids
+    response = client.post('/api/cards/bulk', json={'action': 'complete', 'card_ids': card_ids[:2],
+                                                    'completed': False})
+    assert response.get_json()['card_ids'] == card_ids[:2]
+
+    response = client.post('/api/cards/bulk', json={'action': 'due_date', 'card_ids': card_ids,
+                                                    'due_date': '2030-05-01T12:00:00Z'})
+    assert response.status_code == 200
+
+    card = client.get(f'/api/cards/{card_ids[0]}').get_json()
+    assert (card['completed'], card['version']) == (False, 4)
+    assert card['due_date'].startswith('2030-05-01')
+    assert card['updated_at'] > card['created_at']
+    assert client.get(f'/api/cards/{card_ids[-1]}').get_json()['completed'] is True
+
+    response = client.post('/api/cards/bulk', json={'action': 'due_date', 'card_ids': card_ids, 'due_date': None})
+    assert client.get(f'/api/cards/{card_ids[0]}').get_json()['due_date'] is None
+    assert client.post('/api/cards/bulk', json={'action': 'due_date', 'card_ids': card_ids,
+                                                'due_date': 'soon'}).status_code == 400
+
+def test_bulk_move_appends_in_order(client, api_login, bulk_board):
+    """Test that moved cards land at the end of the list in the order given."""
+    api_login()
+    moved = [bulk_board['todo'][2], bulk_board['todo'][0]]
+
+    response = client.post('/api/cards/bulk', json={'action': 'move', 'card_ids': moved,
+                                                    'list_id': bulk_board['done_id']})
+    assert response.get_json()['card_ids'] == moved
+
+    cards = client.get(f"/api/lists/{bulk_board['done_id']}/cards").get_json()['cards']
+    assert [card['id'] for card in cards] == bulk_board['done'] + moved
+    card = client.get(f'/api/cards/{moved[0]}').get_json()
+    assert card['updated_at'] > card['created_at']
+
+    response = client.post('/api/cards/bulk', json={'action': 'move', 'card_ids': moved,
+                                                    'list_id': bulk_board['other_list_id']})
+    assert response.status_code == 400
+
+def test_bulk_delete_and_restore(client, api_login, bulk_board):
+    """Test that bulk deleted cards can still be restored one at a time, with a new version."""
+    api_login()
+    card_ids = bulk_board['todo'][:2]
+    version = client.get(f'/api/cards/{card_ids[0]}').get_json()['version']
+
+    response = client.post('/api/cards/bulk', json={'action': 'delete', 'card_ids': card_ids})
+    assert response.status_code == 200
+    assert 'undo_until' in response.get_json()
+    assert client.get(f'/api/cards/{card_ids[0]}').status_code == 404
+
+    assert client.post(f'/api/cards/{card_ids[0]}/restore').status_code == 200
+    assert client.get(f'/api/cards/{card_ids[0]}').status_code == 200
+    assert client.get(f'/api/cards/{card_ids[1]}').status_code == 404
+
+    # An edit based on the card as it was before the delete conflicts
+    response = client.put(f'/api/cards/{card_ids[0]}', json={'title': 'Stale'}, headers={'If-Match': f'"{version}"'})
+    assert response.status_code == 409
+
+def test_bulk_checks_every_card(client, api_login, bulk_board):
+    """Test that one unknown or foreign card refuses the whole request."""
+    api_login()
+    card_ids = bulk_board['todo'][:2]
+
+    response = client.post('/api/cards/bulk', json={'action': 'complete', 'card_ids': card_ids + [999999]})
+    assert response.status_code == 404
+    assert response.get_json()['card_ids'] == [999999]
+
+    response = client.post('/api/cards/bulk', json={'action': 'complete',
+                                                    'card_ids': card_ids + [bulk_board['other_card_id']]})
+    assert response.status_code == 403
+    assert client.get(f'/api/cards/{card_ids[0]}').get_json()['completed'] is False
+
+    assert client.post('/api/cards/bulk', json={'action': 'archive', 'card_ids': card_ids}).status_code == 400
+    assert client.post('/api/cards/bulk', json={'action': 'complete', 'card_ids': []}).status_code == 400
+    assert client.post('/api/cards/bulk', json={'action': 'complete', 'card_ids': ['1']}).status_code == 400
+    assert client.post('/api/cards/bulk', json={'action': 'assign', 'card_ids': card_ids,
+                                                'user_id': 999999}).status_code == 404
+
+def test_bulk_statement_count_is_flat(client, api_login, count_statements, bulk_board):
+    """Test that the statements run do not grow with the number of cards."""
+    api_login()
+    user_id = client.get('/auth/me').get_json()['id']
+
+    def statements(action, card_ids, **extra):
+        with count_statements() as executed:
+            response = client.post('/api/cards/bulk', json=dict(extra, action=action, card_ids=card_ids))
+        assert response.status_code == 200
+        return len(executed)
+
+    for action, extra in (('assign', {'user_id': user_id}), ('complete', {}),
+                          ('move', {'list_id': bulk_board['done_id']})):
+        assert statements(action, bulk_board['todo'][:1], **extra) == \
+            statements(action, bulk_board['todo'][1:], **extra)
+
+# Fixtures
+
+@pytest.fixture
+def bulk_board(client, api_login, app):
+    """A board with five cards in Todo and two in Done, and a card on someone else's board"""
+    client.post('/auth/register', json={'username': 'bulkother', 'email': 'bulkother@example.com',
+                                        'password': 'otherpass'})
+    api_login('bulkother', 'otherpass')
+    board_id = client.post('/api/boards', json={'title': 'Theirs'}).get_json()['id']
+    other_list_id = client.post('/api/lists', json={'title': 'Theirs', 'board_id': board_id}).get_json()['id']
+    other_card_id = client.post('/api/cards', json={'title': 'Theirs', 'list_id': other_list_id}).get_json()['id']
+    client.post('/auth/logout')
+
+    api_login()
+    ids = {'other_board_id': board_id, 'other_list_id': other_list_id, 'other_card_id': other_card_id}
+    ids['board_id'] = client.post('/api/boards', json={'title': 'Bulk'}).get_json()['id']
+    for name in ('todo', 'done'):
+        list_id = client.post('/api/lists', json={'title': name, 'board_id': ids['board_id']}).get_json()['id']
+        ids[f'{name}_id'] = list_id
+        ids[name] = [client.post('/api/cards', json={'title': f'{name} {i}', 'list_id': list_id}).get_json()['id']
+                     for i in range(5 if name == 'todo' else 2)]
+    client.post('/auth/logout')
+    yield ids
+
+    with app.app_context():
+        for board in Board.query.filter(Board.id.in_([ids['board_id'], ids['other_board_id']])):
+            db.session.delete(board)
+        User.query.filter_by(username='bulkother').delete()
+        db.session.commit()
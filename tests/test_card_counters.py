@@ -0,0 +1,101 @@
+import io
+import pytest
+from models import db, User, Card, ChecklistItem
+import card_counters
+
+def test_write_paths_keep_counters(client, api_login, app, counted_card):
+    """Test that checklist, attachment and assignment routes update the card's badges."""
+    api_login()
+    card_id = counted_card['card_id']
+
+    items = [client.post(f'/api/cards/{card_id}/checklist', json={'title': f'Step {i}'}).get_json()['id']
+             for i in range(3)]
+    for item_id in items[:2]:
+        client.put(f'/api/cards/{card_id}/checklist/{item_id}', json={'completed': True})
+    client.put(f'/api/cards/{card_id}/checklist/{items[0]}', json={'completed': True})  # no change
+    client.delete(f'/api/cards/{card_id}/checklist/{items[1]}')
+
+    response = client.post(f'/api/cards/{card_id}/attachments',
+                           data={'file': (io.BytesIO(b'notes'), 'notes.txt')}, content_type='multipart/form-data')
+    attachment_id = response.get_json()['id']
+    client.post(f'/api/cards/{card_id}/attachments',
+                data={'file': (io.BytesIO(b'more'), 'more.txt')}, content_type='multipart/form-data')
+    client.delete(f'/api/cards/{card_id}/attachments/{attachment_id}')
+
+    assignment = client.post(f'/api/cards/{card_id}/assignments', json={'user_id': counted_card['other_id']})
+    client.post(f'/api/cards/{card_id}/assignments', json={'user_id': counted_card['user_id']})
+
+    card = card_badges(client, counted_card)
+    assert (card['checklist_total'], card['checklist_done'], card['attachment_count']) == (2, 1, 1)
+    assert card['assignee_ids'] == [counted_card['other_id'], counted_card['user_id']]
+    assert not {'checklists', 'attachments', 'assignments'} & set(card)
+
+    client.delete(f"/api/cards/{card_id}/assignments/{assignment.get_json()['id']}")
+    assert card_badges(client, counted_card)['assignee_ids'] == [counted_card['user_id']]
+
+    # The card's own endpoint still carries the full collections
+    detail = client.get(f'/api/cards/{card_id}').get_json()
+    assert len(detail['checklists']) == 2
+    assert len(detail['attachments']) == 1
+    assert [a['user']['username'] for a in detail['assignments']] == ['testuser']
+
+    client.delete(f"/api/cards/{card_id}/attachments/{detail['attachments'][0]['id']}")
+    assert card_badges(client, counted_card)['attachment_count'] == 0
+
+def test_repair_recomputes_drifted_counters(app, counted_card):
+    """Test that the repair command fixes counters written around the routes."""
+    with app.app_context():
+        db.session.add_all([ChecklistItem(card_id=counted_card['card_id'], title=f'Raw {i}', completed=i == 0)
+                            for i in range(3)])
+        db.session.commit()
+        updated_at = db.session.get(Card, counted_card['card_id']).updated_at
+
+    result = app.test_cli_runner().invoke(args=['repair-card-counters', '--batch-size', '1'])
+    assert result.exit_code == 0
+    assert 'Repaired counters on 1 cards' in result.output
+
+    with app.app_context():
+        card = db.session.get(Card, counted_card['card_id'])
+        assert (card.checklist_total, card.checklist_done) == (3, 1)
+        assert card.updated_at == updated_at
+        assert card_counters.repair() == 0
+
+def test_board_copy_carries_counters(client, api_login, app, counted_card):
+    """Test that copied cards keep checklist counts but not assignees unless asked."""
+    api_login()
+    card_id = counted_card['card_id']
+    item_id = client.post(f'/api/cards/{card_id}/checklist', json={'title': 'Copied'}).get_json()['id']
+    client.put(f'/api/cards/{card_id}/checklist/{item_id}', json={'completed': True})
+    client.post(f'/api/cards/{card_id}/assignments', json={'user_id': counted_card['user_id']})
+
+    for include_assignments, assignees in ((False, []), (True, [counted_card['user_id']])):
+        response = client.post(f"/api/boards/{counted_card['board_id']}/copy",
+                               json={'include_assignments': include_assignments})
+        board = client.get(f"/api/boards/{response.get_json()['id']}").get_json()
+        card = board['lists'][0]['cards'][0]
+        assert (card['checklist_total'], card['checklist_done'], card['attachment_count']) == (1, 1, 0)
+        assert card['assignee_ids'] == assignees
+
+# Fixtures
+
+def card_badges(client, counted_card):
+    board = client.get(f"/api/boards/{counted_card['board_id']}").get_json()
+    return next(card for card in board['lists'][0]['cards'] if card['id'] == counted_card['card_id'])
+
+@pytest.fixture
+def counted_card(client, api_login, app):
+    """A fresh board with one list and one card, plus a second registered user"""
+    api_login()
+    board_id = client.post('/api/boards', json={'title': 'Counters'}).get_json()['id']
+    list_id = client.post('/api/lists', json={'title': 'Todo', 'board_id': board_id}).get_json()['id']
+    card_id = client.post('/api/cards', json={'title': 'Badge', 'list_id': list_id}).get_json()['id']
+    with app.app_context():
+        other = User.query.filter_by(username='counter_other').first()
+        if other is None:
+            other = User(username='counter_other', email='counter_other@example.com', password_hash='x')
+            db.session.add(other)
+            db.session.commit()
+        user_id = User.query.filter_by(username='testuser').first().id
+        other_id = other.id
+    client.get('/auth/logout')
+    return {'board_id': board_id, 'list_id': list_id, 'card_id': card_id, 'user_id': user_id, 'other_id': other_id}
@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime, timedelta
+from models import db, Board
+import card_filters
+
+NOW = datetime(2030, 5, 10, 15, 30)
+
+def test_parse_filters():
+    """Test that filter expressions become user ids, UTC datetimes and search terms."""
+    filters = card_filters.parse({'assignee': 'me, 7,none,me', 'due_before': '+7d', 'due_after': 'today',
+                                  'completed': 'False', 'q': '  "release notes"  v2 '}, 3, now=NOW)
+    assert filters == {
+        'assignee': [3, 7, None],
+        'due_before': datetime(2030, 5, 17, 15, 30),
+        'due_after': datetime(2030, 5, 10),
+        'completed': False,
+        'q': ['release notes', 'v2'],
+    }
+    assert card_filters.parse({'due_before': '2030-06-01T12:00:00+02:00'}, 3) == \
+        {'due_before': datetime(2030, 6, 1, 10)}
+    assert card_filters.parse({'due_after': '-2w', 'q': ' '}, 3, now=NOW) == {'due_after': datetime(2030, 4, 26, 15, 30)}
+
+    for args in ({'assignee': 'someone'}, {'due_before': 'soon'}, {'completed': 'maybe'}, {'q': 'a ' * 11}):
+        with pytest.raises(ValueError):
+            card_filters.parse(args, 3)
+
+def test_filter_board_cards(client, api_login, filter_board):
+    """Test that each filter narrows the cards and lists keep their board shape."""
+    api_login()
+    url = f"/api/boards/{filter_board['board_id']}/cards"
+
+    def titles(**args):
+        response = client.get(url, query_string=args)
+        assert response.status_code == 200
+        return {lst['title']: [card['title'] for card in lst['cards']] for lst in response.get_json()['lists']}
+
+    assert titles() == {'Todo': ['Write spec', 'Fix 100% bug', 'Plan launch'], 'Done': ['Ship v1']}
+    assert titles(assignee='me') == {'Todo': ['Write spec'], 'Done': ['Ship v1']}
+    assert titles(assignee='none') == {'Todo': ['Fix 100% bug', 'Plan launch'], 'Done': []}
+    assert titles(due_before='now', completed='false') == {'Todo': ['Write spec'], 'Done': []}
+    assert titles(due_after='now', due_before='+30d') == {'Todo': ['Fix 100% bug'], 'Done': []}
+    assert titles(completed='true') == {'Todo': [], 'Done': ['Ship v1']}
+    assert titles(q='SPEC') == {'Todo': ['Write spec'], 'Done': []}
+    assert titles(q='100%') == {'Todo': ['Fix 100% bug'], 'Done': []}
+    assert titles(q='"launch plan"') == {'Todo': [], 'Done': []}
+
+    card = client.get(url, query_string={'q': 'spec'}).get_json()['lists'][0]['cards'][0]
+    assert 'checklists' not in card and card['assignee_ids']
+
+    assert client.get(url, query_string={'due_before': 'later'}).status_code == 400
+
+def test_filter_pages_each_list(client, api_login, filter_board):
+    """Test that a list with more matches than card_limit continues from its cursor."""
+    api_login()
+    url = f"/api/boards/{filter_board['board_id']}/cards"
+
+    def after(card):
+        return f"{card['position']}:{card['id']}"
+
+    todo = client.get(url, query_string={'card_limit': 2}).get_json()['lists'][0]
+    assert ([card['title'] for card in todo['cards']], todo['card_count']) == (['Write spec', 'Fix 100% bug'], 3)
+
+    page = client.get(url, query_string={'card_limit': 2, 'list_id': todo['id'],
+                                         'after': todo['next_cursor']}).get_json()
+    assert [lst['id'] for lst in page['lists']] == [todo['id']]
+    assert [card['title'] for card in page['lists'][0]['cards']] == ['Plan launch']
+    assert page['lists'][0]['next_cursor'] is None
+
+    # The count is the whole list's, whichever page it comes with
+    middle = client.get(url, query_string={'card_limit': 1, 'list_id': todo['id'],
+                                           'after': after(todo['cards'][0])}).get_json()['lists'][0]
+    assert ([card['title'] for card in middle['cards']], middle['card_count']) == (['Fix 100% bug'], 3)
+    assert middle['next_cursor'] == todo['next_cursor']
+    assert page['lists'][0]['card_count'] == 3
+    last = client.get(url, query_string={'list_id': todo['id'],
+                                         'after': after(page['lists'][0]['cards'][0])}).get_json()['lists'][0]
+    assert (last['cards'], last['card_count'], last['next_cursor']) == ([], 3, None)
+
+def test_filter_needs_board_access(client, api_login, filter_board):
+    """Test that only people on the board can filter its cards."""
+    client.post('/auth/register', json={'username': 'filterother', 'email': 'filterother@example.com',
+                                        'password': 'otherpass'})
+    api_login('filterother', 'otherpass')
+    assert client.get(f"/api/boards/{filter_board['board_id']}/cards").status_code == 403
+    assert client.get('/api/boards/999999/cards').status_code == 404
+
+# Fixtures
+
+@pytest.fixture
+def filter_board(client, api_login, app):
+    """A board with an assigned overdue card, a card due next week, an undated card and a completed one"""
+    api_login()
+    user_id = client.get('/auth/me').get_json()['id']
+    board_id = client.post('/api/boards', json={'title': 'Filters'}).get_json()['id']
+    todo = client.post('/api/lists', json={'title': 'Todo', 'board_id': board_id}).get_json()['id']
+    done = client.post('/api/lists', json={'title': 'Done', 'board_id': board_id}).get_json()['id']
+
+    spec = client.post('/api/cards', json={'title': 'Write spec', 'list_id': todo,
+                                           'due_date': '2000-01-01T00:00:00Z'}).get_json()['id']
+    client.post('/api/cards', json={'title': 'Fix 100% bug', 'list_id': todo,
+                                    'due_date': (datetime.utcnow() + timedelta(days=7)).isoformat()})
+    client.post('/api/cards', json={'title': 'Plan launch', 'list_id': todo})
+    ship = client.post('/api/cards', json={'title': 'Ship v1', 'list_id': done}).get_json()['id']
+    client.post('/api/cards/bulk', json={'action': 'assign', 'card_ids': [spec, ship], 'user_id': user_id})
+    client.post('/api/cards/bulk', json={'action': 'complete', 'card_ids': [ship]})
+    client.post('/auth/logout')
+    yield {'board_id': board_id}
+
+    with app.app_context():
+        db.session.delete(db.session.get(Board, board_id))
+        db.session.commit()
@@ -0,0 +1,135 @@
+import pytest
+from flask import json
+from models import db, User, Board, List, Card
+
+def test_board_card_limit(client, api_login, paged_board):
+    """Test that a board snapshot caps the cards returned per list."""
+    api_login()
+
+    response = client.get(f"/api/boards/{paged_board['board_id']}?card_limit=5")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+
+    big, small = data['lists']
+    assert big['card_count'] == 12
+    assert [c['title'] for c in big['cards']] == [f'Card {i}' for i in range(5)]
+    assert big['next_cursor'] is not None
+
+    assert small['card_count'] == 2
+    assert len(small['cards']) == 2
+    assert small['next_cursor'] is None
+
+def test_board_without_card_limit_returns_everything(client, api_login, paged_board):
+    """Test that the full snapshot is still served when no limit is given."""
+    api_login()
+
+    response = client.get(f"/api/boards/{paged_board['board_id']}")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert len(data['lists'][0]['cards']) == 12
+    assert 'card_count' not in data['lists'][0]
+
+def test_list_cards_follow_cursor(client, api_login, paged_board):
+    """Test walking a list page by page with the continuation cursor."""
+    api_login()
+
+    titles = []
+    cursor = ''
+    while True:
+        response = client.get(
+            f"/api/lists/{paged_board['big_list_id']}/cards?after={cursor}&limit=5"
+        )
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        titles.extend(card['title'] for card in page['cards'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert titles == [f'Card {i}' for i in range(12)]
+
+def test_list_cards_ties_on_position(client, api_login, app, paged_board):
+    """Test that cards sharing a position are neither skipped nor repeated."""
+    api_login()
+
+    with app.app_context():
+        Card.query.filter_by(list_id=paged_board['big_list_id']).update({'position': 0})
+        db.session.commit()
+
+    response = client.get(f"/api/lists/{paged_board['big_list_id']}/cards?limit=7")
+    first = json.loads(response.data)
+    response = client.get(
+        f"/api/lists/{paged_board['big_list_id']}/cards?after={first['next_cursor']}&limit=7"
+    )
+    second = json.loads(response.data)
+
+    ids = [c['id'] for c in first['cards'] + second['cards']]
+    assert len(ids) == 12
+    assert len(set(ids)) == 12
+    assert second['next_cursor'] is None
+
+def test_list_cards_rejects_bad_cursor(client, api_login, paged_board):
+    """Test that a malformed cursor is a client error."""
+    api_login()
+
+    response = client.get(f"/api/lists/{paged_board['big_list_id']}/cards?after=abc")
+    assert response.status_code == 400
+
+def test_cursor_needs_card_id(client, api_login, app, paged_board):
+    """Test that a bare position, which cannot tell tied cards apart, is rejected."""
+    api_login()
+
+    with app.app_context():
+        Card.query.filter_by(list_id=paged_board['big_list_id']).update({'position': 0})
+        db.session.commit()
+
+    response = client.get(f"/api/lists/{paged_board['big_list_id']}/cards?after=0&limit=5")
+    assert response.status_code == 400
+    response = client.get(f"/api/boards/{paged_board['board_id']}/cards",
+                          query_string={'list_id': paged_board['big_list_id'], 'after': '0'})
+    assert response.status_code == 400
+
+    # The filtered board endpoint walks the tie with full cursors
+    ids, cursor = [], None
+    while True:
+        response = client.get(f"/api/boards/{paged_board['board_id']}/cards",
+                              query_string={'list_id': paged_board['big_list_id'], 'card_limit': 5,
+                                            **({'after': cursor} if cursor else {})})
+        page = json.loads(response.data)['lists'][0]
+        ids.extend(card['id'] for card in page['cards'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert len(ids) == len(set(ids)) == 12
+
+def test_list_cards_requires_access(client, app, paged_board):
+    """Test that other users cannot page through a list."""
+    with app.app_context():
+        outsider = User(username='pageoutsider', email='pageoutsider@example.com')
+        outsider.set_password('testpass')
+        db.session.add(outsider)
+        db.session.commit()
+
+    client.post('/auth/login', json={'username': 'pageoutsider', 'password': 'testpass'})
+    response = client.get(f"/api/lists/{paged_board['big_list_id']}/cards")
+    assert response.status_code == 403
+
+# Fixtures
+@pytest.fixture
+def paged_board(app):
+    """Create a board with one long list and one short list."""
+    with app.app_context():
+        user = User.query.filter_by(username='testuser').first()
+        board = Board(title='Paged Board', owner_id=user.id)
+        big = List(title='Done', board=board, position=0)
+        small = List(title='Doing', board=board, position=1)
+        db.session.add_all([board, big, small])
+        db.session.flush()
+
+        for i in range(12):
+            db.session.add(Card(title=f'Card {i}', list_id=big.id, position=i))
+        for i in range(2):
+            db.session.add(Card(title=f'Small {i}', list_id=small.id, position=i))
+        db.session.commit()
+
+        return {'board_id': board.id, 'big_list_id': big.id, 'small_list_id': small.id}
@@ -0,0 +1,87 @@
+import pytest
+from models import db, Board
+from routes.cards import checklist_lines
+
+def test_checklist_lines():
+    """Test that pasted bullets, numbers and checkboxes are stripped from item titles."""
+    text = '- [ ] Write spec\n\n* [x] Review\n3. Ship it\n  • Celebrate  \n[X] Done already\n2024 budget'
+    assert checklist_lines(text) == [
+        {'title': 'Write spec', 'completed': False},
+        {'title': 'Review', 'completed': True},
+        {'title': 'Ship it', 'completed': False},
+        {'title': 'Celebrate', 'completed': False},
+        {'title': 'Done already', 'completed': True},
+        {'title': '2024 budget', 'completed': False},
+    ]
+
+def test_paste_checklist(client, api_login, count_statements, checklist_card):
+    """Test that pasted text becomes items in one INSERT, after the existing ones."""
+    api_login()
+    client.post(f'/api/cards/{checklist_card}/checklist', json={'title': 'First'})
+
+    with count_statements() as statements:
+        response = client.post(f'/api/cards/{checklist_card}/checklist/bulk',
+                               json={'text': '- [ ] Second\n- [x] Third\n\n- Fourth'})
+    assert response.status_code == 201
+    assert len([s for s in statements if s.startswith('INSERT INTO checklist_items')]) == 1
+    assert [item['position'] for item in response.get_json()['items']] == [1, 2, 3]
+
+    response = client.post(f'/api/cards/{checklist_card}/checklist/bulk', json={'titles': ['Fifth', ' ', 'Sixth']})
+    assert [item['title'] for item in response.get_json()['items']] == ['Fifth', 'Sixth']
+
+    card = client.get(f'/api/cards/{checklist_card}').get_json()
+    assert [item['title'] for item in card['checklists']] == ['First', 'Second', 'Third', 'Fourth', 'Fifth', 'Sixth']
+    assert (card['checklist_total'], card['checklist_done']) == (6, 1)
+
+    assert client.post(f'/api/cards/{checklist_card}/checklist/bulk', json={'text': '\n \n'}).status_code == 400
+    assert client.post(f'/api/cards/{checklist_card}/checklist/bulk', json={'titles': 'x'}).status_code == 400
+
+def test_reorder_checklist(client, api_login, checklist_card):
+    """Test that a full ordering is applied and a stale one is refused."""
+    api_login()
+    items = client.post(f'/api/cards/{checklist_card}/checklist/bulk',
+                        json={'titles': ['A', 'B', 'C']}).get_json()['items']
+    ids = [item['id'] for item in items]
+
+    response = client.put(f'/api/cards/{checklist_card}/checklist/order', json={'item_ids': ids[::-1]})
+    assert response.status_code == 200
+    card = client.get(f'/api/cards/{checklist_card}').get_json()
+    assert [item['title'] for item in card['checklists']] == ['C', 'B', 'A']
+    # Positions are not versioned
+    assert {item['version'] for item in card['checklists']} == {1}
+
+    assert client.put(f'/api/cards/{checklist_card}/checklist/order', json={'item_ids': ids[:2]}).status_code == 409
+    assert client.put(f'/api/cards/{checklist_card}/checklist/order',
+                      json={'item_ids': ids + [ids[0]]}).status_code == 400
+
+def test_complete_all_checklist_items(client, api_login, checklist_card):
+    """Test that one call completes or reopens every item and fixes the counter."""
+    api_login()
+    client.post(f'/api/cards/{checklist_card}/checklist/bulk', json={'text': '[x] A\n[ ] B\n[ ] C'})
+
+    response = client.post(f'/api/cards/{checklist_card}/checklist/complete')
+    assert response.get_json() == {'updated': 2, 'checklist_done': 3, 'checklist_total': 3}
+
+    response = client.post(f'/api/cards/{checklist_card}/checklist/complete', json={'completed': False})
+    assert response.get_json() == {'updated': 3, 'checklist_done': 0, 'checklist_total': 3}
+
+    card = client.get(f'/api/cards/{checklist_card}').get_json()
+    assert not any(item['completed'] for item in card['checklists'])
+    assert client.post(f'/api/cards/{checklist_card}/checklist/complete',
+                       json={'completed': 'yes'}).status_code == 400
+
+# Fixtures
+
+@pytest.fixture
+def checklist_card(client, api_login, app):
+    """A fresh card with an empty checklist"""
+    api_login()
+    board_id = client.post('/api/boards', json={'title': 'Checklists'}).get_json()['id']
+    list_id = client.post('/api/lists', json={'title': 'Todo', 'board_id': board_id}).get_json()['id']
+    card_id = client.post('/api/cards', json={'title': 'Spec', 'list_id': list_id}).get_json()['id']
+    client.post('/auth/logout')
+    yield card_id
+
+    with app.app_context():
+        db.session.delete(db.session.get(Board, board_id))
+        db.session.commit()
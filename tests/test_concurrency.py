@@ -0,0 +1,98 @@
+import pytest
+from models import db, Card, ChecklistItem
+import concurrency
+
+def test_card_put_with_expected_version(client, api_login, versioned_board):
+    """Test that a PUT against the current version applies and bumps it."""
+    api_login()
+    card_id = versioned_board['card_id']
+
+    card = client.get(f'/api/cards/{card_id}')
+    assert card.headers['ETag'] == '"1"'
+
+    response = client.put(f'/api/cards/{card_id}', json={'title': 'Renamed', 'expected_version': 1})
+    assert response.status_code == 200
+    assert response.get_json()['version'] == 2
+    assert response.headers['ETag'] == '"2"'
+
+    # Writes without a version still go through, and still bump it
+    response = client.put(f'/api/cards/{card_id}', json={'description': 'Blind write'})
+    assert response.get_json()['version'] == 3
+    assert response.get_json()['title'] == 'Renamed'
+
+def test_stale_version_conflicts(client, api_login, versioned_board):
+    """Test that stale versions get 409 with the current entity, and nothing is written."""
+    api_login()
+    card_id = versioned_board['card_id']
+    client.put(f'/api/cards/{card_id}', json={'title': 'First'})
+
+    response = client.put(f'/api/cards/{card_id}', json={'title': 'Second', 'expected_version': 1})
+    assert response.status_code == 409
+    assert response.get_json()['current']['title'] == 'First'
+    assert response.get_json()['current']['version'] == 2
+
+    response = client.put(f'/api/cards/{card_id}', json={'title': 'Third'}, headers={'If-Match': '"1"'})
+    assert response.status_code == 409
+    assert client.put(f'/api/cards/{card_id}', json={'title': 'Fourth'},
+                      headers={'If-Match': '"2"'}).status_code == 200
+    assert client.put(f'/api/cards/{card_id}', json={'expected_version': 'x'}).status_code == 400
+
+    response = client.put(f"/api/lists/{versioned_board['list_id']}", json={'title': 'Stale', 'expected_version': 7})
+    assert response.status_code == 409
+    assert response.get_json()['current']['title'] == 'Todo'
+
+    response = client.put(f"/api/boards/{versioned_board['board_id']}", json={'title': 'Stale'},
+                          headers={'If-Match': '"7"'})
+    assert response.status_code == 409
+    assert client.put(f"/api/boards/{versioned_board['board_id']}", json={'title': 'Fresh'},
+                      headers={'If-Match': '"1"'}).get_json()['version'] == 2
+
+def test_write_racing_another_writer(app, versioned_board):
+    """Test that the conditional UPDATE itself refuses a row changed after it was read."""
+    with app.app_context():
+        card = db.session.get(Card, versioned_board['card_id'])
+        assert card.version == 1
+        # Another writer commits between our read and our write
+        with db.engine.begin() as conn:
+            conn.execute(db.update(Card).where(Card.id == card.id).values(title='Theirs', version=2))
+        assert not concurrency.conditional_update(card, {'title': 'Ours'}, expected=1)
+        db.session.rollback()
+        assert (card.title, card.version) == ('Theirs', 2)
+
+        assert concurrency.conditional_update(card, {'title': 'Ours'}, expected=2)
+        db.session.commit()
+        assert (card.title, card.version) == ('Ours', 3)
+
+def test_checklist_toggle_keeps_counter_on_conflict(client, api_login, app, versioned_board):
+    """Test that a toggle racing another toggle is refused instead of double counting."""
+    api_login()
+    card_id = versioned_board['card_id']
+    item = client.post(f'/api/cards/{card_id}/checklist', json={'title': 'Step'}).get_json()
+
+    with app.app_context():
+        db.session.execute(db.update(ChecklistItem).where(ChecklistItem.id == item['id'])
+                           .values(completed=True, version=ChecklistItem.version + 1))
+        db.session.execute(db.update(Card).where(Card.id == card_id).values(checklist_done=1))
+        db.session.commit()
+
+    response = client.put(f"/api/cards/{card_id}/checklist/{item['id']}",
+                          json={'completed': True, 'expected_version': item['version']})
+    assert response.status_code == 409
+    response = client.put(f"/api/cards/{card_id}/checklist/{item['id']}", json={'completed': False})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"3"'
+
+    with app.app_context():
+        assert db.session.get(Card, card_id).checklist_done == 0
+
+# Fixtures
+
+@pytest.fixture
+def versioned_board(client, api_login):
+    """A fresh board with one list and one card"""
+    api_login()
+    board_id = client.post('/api/boards', json={'title': 'Versions'}).get_json()['id']
+    list_id = client.post('/api/lists', json={'title': 'Todo', 'board_id': board_id}).get_json()['id']
+    card_id = client.post('/api/cards', json={'title': 'Edit me', 'list_id': list_id}).get_json()['id']
+    client.get('/auth/logout')
+    return {'board_id': board_id, 'list_id': list_id, 'card_id': card_id}
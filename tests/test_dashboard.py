@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime, timedelta
+from models import db, User, Board, BoardMember, List, Card
+from passwords import hash_password
+
+def test_boards_ordered_by_activity_and_paged(client, api_login, count_statements, dashboard):
+    """Test that owned and member boards come back newest activity first, page by page."""
+    api_login('dash_user', 'dashpass')
+
+    with count_statements() as statements:
+        everything = client.get('/api/boards').get_json()
+    assert [b['title'] for b in everything] == dashboard['titles']
+    assert len([s for s in statements if 'FROM boards' in s]) == 1
+
+    titles = []
+    cursor = ''
+    while True:
+        response = client.get(f'/api/boards?limit=2&after={cursor}')
+        assert response.status_code == 200
+        page = response.get_json()
+        titles += [b['title'] for b in page['boards']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert titles == dashboard['titles']
+
+    assert client.get('/api/boards?limit=2&after=nonsense').status_code == 400
+
+def test_board_summaries(client, api_login, dashboard):
+    """Test the per-board open, overdue and member counts."""
+    api_login('dash_user', 'dashpass')
+
+    boards = client.get('/api/boards?limit=10&summary=1').get_json()['boards']
+    summaries = {b['title']: b['summary'] for b in boards}
+    assert summaries['Dash 0'] == {'open_cards': 2, 'overdue_cards': 1, 'members': 2}
+    assert summaries['Dash 1'] == {'open_cards': 0, 'overdue_cards': 0, 'members': 1}
+    assert 'summary' not in client.get('/api/boards').get_json()[0]
+
+def test_activity_moves_board_to_top(client, api_login, app, dashboard):
+    """Test that logged activity bumps a board, at most once per resolution window."""
+    api_login('dash_user', 'dashpass')
+    oldest = dashboard['board_ids'][-1]
+
+    list_id = client.post('/api/lists', json={'title': 'Bumped', 'board_id': oldest}).get_json()['id']
+    boards = client.get('/api/boards').get_json()
+    assert boards[0]['id'] == oldest
+    bumped_at = boards[0]['last_activity_at']
+
+    client.post('/api/cards', json={'title': 'Soon after', 'list_id': list_id})
+    assert client.get('/api/boards').get_json()[0]['last_activity_at'] == bumped_at
+
+# Fixtures
+
+@pytest.fixture
+def dashboard(app):
+    """A user owning two boards and a member of one, plus a board they cannot see"""
+    with app.app_context():
+        user = User(username='dash_user', email='dash@example.com', password_hash=hash_password('dashpass'))
+        stranger = User(username='dash_stranger', email='dash_stranger@example.com', password_hash='x')
+        db.session.add_all([user, stranger])
+        db.session.flush()
+
+        now = datetime.utcnow()
+        boards = [
+            Board(title='Dash 0', owner_id=user.id, last_activity_at=now - timedelta(hours=1)),
+            Board(title='Dash 1', owner_id=user.id, last_activity_at=now - timedelta(hours=2)),
+            Board(title='Dash 2', owner_id=stranger.id, last_activity_at=now - timedelta(hours=3)),
+        ]
+        hidden = Board(title='Hidden', owner_id=stranger.id, last_activity_at=now)
+        deleted = Board(title='Deleted', owner_id=user.id, last_activity_at=now, deleted_at=now)
+        db.session.add_all(boards + [hidden, deleted])
+        db.session.flush()
+        db.session.add(BoardMember(board_id=boards[0].id, user_id=stranger.id))
+        db.session.add(BoardMember(board_id=boards[2].id, user_id=user.id))
+
+        todo = List(title='Todo', board_id=boards[0].id, position=0)
+        db.session.add(todo)
+        db.session.flush()
+        db.session.add_all([
+            Card(title='Late', list_id=todo.id, position=0, due_date=now - timedelta(days=1)),
+            Card(title='Later', list_id=todo.id, position=1, due_date=now + timedelta(days=1)),
+            Card(title='Done', list_id=todo.id, position=2, due_date=now - timedelta(days=1), completed=True),
+            Card(title='Shelved', list_id=todo.id, position=3, archived_at=now),
+        ])
+        db.session.commit()
+        board_ids = [board.id for board in boards]
+
+    yield {'board_ids': board_ids, 'titles': ['Dash 0', 'Dash 1', 'Dash 2']}
+
+    with app.app_context():
+        for board in Board.query.filter(Board.title.in_(['Dash 0', 'Dash 1', 'Dash 2', 'Hidden', 'Deleted'])):
+            db.session.delete(board)
+        User.query.filter(User.username.in_(['dash_user', 'dash_stranger'])).delete()
+        db.session.commit()
@@ -0,0 +1,75 @@
+import os
+import pytest
+from app import create_app
+from models import db, User, Board, List, Card
+from tests.conftest import TestConfig
+
+def test_server_timing_header(client, api_login, timed_board):
+    """Test that API responses report DB, serialization and total time."""
+    api_login()
+
+    response = client.get(f'/api/boards/{timed_board}')
+    assert response.status_code == 200
+
+    timing = response.headers['Server-Timing']
+    parts = dict(part.split(';', 1)[0:2] for part in timing.split(', '))
+    assert set(parts) == {'db', 'serialize', 'json', 'total'}
+    queries = int(timing.split('desc="', 1)[1].split(' ', 1)[0])
+    assert queries > 0
+
+def test_metrics_endpoint(client, api_login, app, timed_board):
+    """Test the Prometheus text exposition."""
+    api_login()
+    client.get(f'/api/boards/{timed_board}')
+
+    app.config['METRICS_TOKEN'] = 'scrape-me'
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+    text = response.data.decode()
+    assert '# TYPE boardify_request_duration_seconds histogram' in text
+    assert 'boardify_request_duration_seconds_bucket{blueprint="boards",le="+Inf"}' in text
+    assert 'boardify_requests_total{blueprint="boards",method="GET",status="200"}' in text
+    assert 'boardify_request_db_statements_count{blueprint="boards"}' in text
+
+def test_metrics_need_token(client, app):
+    """Test that /metrics is hidden without a token and refuses a wrong one."""
+    app.config['METRICS_TOKEN'] = None
+    assert client.get('/metrics').status_code == 404
+
+    app.config['METRICS_TOKEN'] = 'scrape-me'
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'}).status_code == 200
+
+def test_slow_requests_are_profiled(tmp_path):
+    """Test that sampled requests over the threshold write a profile."""
+    class ProfileConfig(TestConfig):
+        PROFILE_MODE = 'cprofile'
+        PROFILE_SAMPLE_RATE = 1.0
+        PROFILE_THRESHOLD_MS = 0
+        PROFILE_DIR = str(tmp_path)
+
+    app = create_app(ProfileConfig)
+    response = app.test_client().get('/auth/login')
+    assert response.status_code == 200
+
+    profiles = os.listdir(tmp_path)
+    assert len(profiles) == 1
+    assert profiles[0].endswith('.prof')
+    assert 'auth.login' in profiles[0]
+
+# Fixtures
+@pytest.fixture
+def timed_board(app):
+    """Create a board with a list of cards."""
+    with app.app_context():
+        user = User.query.filter_by(username='testuser').first()
+        board = Board(title='Timed Board', owner_id=user.id)
+        list_item = List(title='Doing', board=board, position=0)
+        db.session.add_all([board, list_item])
+        db.session.flush()
+        db.session.add_all([Card(title=f'Card {i}', list_id=list_item.id, position=i) for i in range(5)])
+        db.session.commit()
+        return board.id
@@ -0,0 +1,164 @@
+import pytest
+from datetime import datetime, timedelta
+from flask import json
+from sqlalchemy.exc import OperationalError
+from models import db, User, Job
+import jobs
+
+calls = []
+
+@jobs.handler('test_echo')
+def echo_job(job_id, value):
+    calls.append(value)
+    return {'value': value}
+
+@jobs.handler('test_flaky', max_attempts=2)
+def flaky_job(job_id):
+    raise RuntimeError('boom')
+
+@jobs.handler('test_periodic', every='TEST_PERIODIC_INTERVAL')
+def periodic_job(job_id):
+    return None
+
+def test_job_runs_and_stores_result(app):
+    """Test the enqueue, claim and execute cycle."""
+    with app.app_context():
+        job = jobs.enqueue('test_echo', {'value': 42})
+        db.session.commit()
+
+        assert jobs.run_job(job.id)
+        job = db.session.get(Job, job.id)
+        assert job.status == 'succeeded'
+        assert job.attempts == 1
+        assert job.locked_by is None
+        assert job.to_dict()['result'] == {'value': 42}
+
+def test_enqueue_unknown_kind(app):
+    """Test that jobs without a handler are refused."""
+    with app.app_context():
+        with pytest.raises(ValueError):
+            jobs.enqueue('no_such_job')
+
+def test_failed_job_retries_with_backoff(app):
+    """Test that a failing job is requeued with a delay, then fails for good."""
+    with app.app_context():
+        app.config['JOBS_RETRY_BASE_DELAY'] = 30
+        job = jobs.enqueue('test_flaky')
+        db.session.commit()
+
+        assert not jobs.run_job(job.id)
+        job = db.session.get(Job, job.id)
+        assert job.status == 'queued'
+        assert job.error == 'boom'
+        assert job.run_at > datetime.utcnow() + timedelta(seconds=20)
+
+        # Not due yet
+        assert jobs.claim('worker-a', job_id=job.id) is None
+
+        later = datetime.utcnow() + timedelta(minutes=1)
+        assert jobs.claim('worker-a', job_id=job.id, now=later) == job.id
+        jobs.execute(job.id, 'worker-a')
+        db.session.expire_all()
+        job = db.session.get(Job, job.id)
+        assert job.status == 'failed'
+        assert job.attempts == 2
+
+def test_idempotency_key_deduplicates(app):
+    """Test that enqueueing twice with one key yields one job."""
+    with app.app_context():
+        first = jobs.enqueue('test_echo', {'value': 1}, idempotency_key='echo-once')
+        db.session.commit()
+        second = jobs.enqueue('test_echo', {'value': 2}, idempotency_key='echo-once')
+        db.session.commit()
+
+        assert first.id == second.id
+        assert Job.query.filter_by(idempotency_key='echo-once').count() == 1
+
+def test_job_is_claimed_once(app):
+    """Test that a leased job is not handed to a second worker."""
+    with app.app_context():
+        job = jobs.enqueue('test_echo', {'value': 3})
+        db.session.commit()
+
+        assert jobs.claim('worker-a', job_id=job.id) == job.id
+        assert jobs.claim('worker-b', job_id=job.id) is None
+
+def test_expired_lease_is_reclaimed(app):
+    """Test that a job whose worker died is picked up again, and the old worker loses it."""
+    with app.app_context():
+        job = jobs.enqueue('test_echo', {'value': 4})
+        db.session.commit()
+        jobs.claim('worker-a', job_id=job.id)
+
+        after_lease = datetime.utcnow() + timedelta(seconds=app.config['JOBS_LEASE_SECONDS'] + 1)
+        assert jobs.claim('worker-b', job_id=job.id, now=after_lease) == job.id
+        assert jobs.execute(job.id, 'worker-b')
+
+        db.session.expire_all()
+        job = db.session.get(Job, job.id)
+        assert job.status == 'succeeded'
+        assert job.attempts == 2
+
+def test_periodic_jobs_are_scheduled_once_per_slot(app):
+    """Test that many workers scheduling the same slot create one job."""
+    with app.app_context():
+        app.config['TEST_PERIODIC_INTERVAL'] = 60
+        jobs.schedule_periodic(now=6000)
+        jobs.schedule_periodic(now=6030)
+        jobs.schedule_periodic(now=6060)
+        assert Job.query.filter_by(kind='test_periodic').count() == 2
+
+def test_thread_worker_drains_queue(app):
+    """Test a burst worker pool running queued jobs."""
+    with app.app_context():
+        ids = []
+        for value in ('a', 'b', 'c'):
+            ids.append(jobs.enqueue('test_echo', {'value': value}).id)
+        db.session.commit()
+
+    worker = jobs.Worker(app, concurrency=1, mode='thread', poll_interval=0.01, burst=True)
+    worker.start()
+    worker.join(timeout=10)
+
+    with app.app_context():
+        statuses = [db.session.get(Job, job_id).status for job_id in ids]
+        assert statuses == ['succeeded'] * 3
+    assert {'a', 'b', 'c'} <= set(calls)
+
+def test_worker_survives_failed_bookkeeping(app, monkeypatch):
+    """Test that a worker whose job outcome cannot be written goes on to the next job."""
+    with app.app_context():
+        ids = [jobs.enqueue('test_echo', {'value': value}).id for value in ('locked', 'after')]
+        db.session.commit()
+
+    finish, failures = jobs._finish, [OperationalError('UPDATE jobs', {}, Exception('database is locked'))]
+
+    def flaky_finish(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return finish(*args, **kwargs)
+
+    monkeypatch.setattr(jobs, '_finish', flaky_finish)
+    worker = jobs.Worker(app, concurrency=1, mode='thread', poll_interval=0.01, burst=True)
+    worker.start()
+    worker.join(timeout=10)
+
+    with app.app_context():
+        assert [db.session.get(Job, job_id).status for job_id in ids] == ['running', 'succeeded']
+
+def test_job_status_endpoint(client, api_login, app):
+    """Test that users can only see their own jobs."""
+    api_login()
+
+    with app.app_context():
+        user = User.query.filter_by(username='testuser').first()
+        mine = jobs.enqueue('test_echo', {'value': 5}, user_id=user.id)
+        theirs = jobs.enqueue('test_echo', {'value': 6})
+        db.session.commit()
+        mine_id, theirs_id = mine.id, theirs.id
+
+    response = client.get(f'/api/jobs/{mine_id}')
+    assert response.status_code == 200
+    assert json.loads(response.data)['status'] == 'queued'
+
+    assert client.get(f'/api/jobs/{theirs_id}').status_code == 404
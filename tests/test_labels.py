@@ -0,0 +1,134 @@
+import pytest
+from models import db, Board, Card, mask_bits
+import labels
+
+def test_masks_are_signed_64_bit():
+    """Test that masks round-trip every bit, bit 63 included, as signed BIGINT values."""
+    assert labels.mask_of([0, 2]) == 5
+    assert labels.mask_of([63]) == labels.bit_value(63) == -(1 << 63)
+    assert mask_bits(labels.mask_of(range(64))) == list(range(64))
+    assert labels.mask_of(range(64)) == -1
+
+def test_label_cards(client, api_login, label_board):
+    """Test that labels go on and off cards and are served once per board snapshot."""
+    api_login()
+    bug, ui, urgent = label_board['labels']
+    card_ids = label_board['cards']
+    assert [label['bit'] for label in label_board['labels']] == [0, 1, 2]
+
+    response = client.post(f"/api/cards/{card_ids[0]}/labels/{ui['id']}")
+    assert response.status_code == 200
+    assert response.get_json()['label_bits'] == [0, 1]
+    # Adding a label twice changes nothing, the version included
+    version = response.get_json()['version']
+    assert client.post(f"/api/cards/{card_ids[0]}/labels/{ui['id']}").get_json()['version'] == version
+
+    assert client.delete(f"/api/cards/{card_ids[0]}/labels/{bug['id']}").get_json()['label_bits'] == [1]
+
+    for url in (f"/api/boards/{label_board['board_id']}", f"/api/boards/{label_board['board_id']}?card_limit=10"):
+        board = client.get(url).get_json()
+        assert [label['name'] for label in board['labels']] == ['bug', 'ui', 'urgent']
+        cards = board['lists'][0]['cards']
+        assert [card['label_bits'] for card in cards] == [[1], [0], [0, 2], []]
+
+    response = client.put(f"/api/boards/{label_board['board_id']}/labels/{ui['id']}", json={'color': '#0079bf'})
+    assert response.get_json()['color'] == '#0079bf'
+    assert client.put(f"/api/boards/{label_board['board_id']}/labels/{ui['id']}",
+                      json={'color': 'blue'}).status_code == 400
+
+def test_filter_by_labels(client, api_login, label_board):
+    """Test that labels=a,b,-c keeps the cards with a and b but not c."""
+    api_login()
+    bug, ui, urgent = label_board['labels']
+    url = f"/api/boards/{label_board['board_id']}/cards"
+
+    def titles(expression):
+        response = client.get(url, query_string={'labels': expression})
+        assert response.status_code == 200
+        return [card['title'] for card in response.get_json()['lists'][0]['cards']]
+
+    assert titles(f"{bug['id']}") == ['Crash', 'Slow', 'Outage']
+    assert titles(f"{bug['id']},{urgent['id']}") == ['Outage']
+    assert titles(f"{bug['id']},-{urgent['id']}") == ['Crash', 'Slow']
+    assert titles(f"-{bug['id']}") == ['Idea']
+
+    assert client.get(url, query_string={'labels': '999999'}).status_code == 400
+    assert client.get(url, query_string={'labels': 'bug'}).status_code == 400
+
+def test_delete_label_clears_bit(client, api_login, app, label_board):
+    """Test that a deleted label's bit is cleared, so the next label starts on no card."""
+    api_login()
+    bug = label_board['labels'][0]
+    board_url = f"/api/boards/{label_board['board_id']}/labels"
+
+    assert client.delete(f"{board_url}/{bug['id']}").status_code == 200
+    with app.app_context():
+        masks = [db.session.get(Card, card_id).label_mask for card_id in label_board['cards']]
+    assert masks == [0, 0, 4, 0]
+
+    label = client.post(board_url, json={'name': 'docs'}).get_json()
+    assert label['bit'] == 0
+    assert client.get(f"/api/boards/{label_board['board_id']}/cards",
+                      query_string={'labels': label['id']}).get_json()['lists'][0]['cards'] == []
+
+def test_create_label_retries_taken_bit(client, api_login, label_board, monkeypatch):
+    """Test that a create losing the race for a bit moves on to the next free one."""
+    api_login()
+    board_url = f"/api/boards/{label_board['board_id']}/labels"
+    free_bit = labels.free_bit
+    answers = iter([0])
+    # As if a concurrent create had read the labels before bug took bit 0
+    monkeypatch.setattr(labels, 'free_bit', lambda board_id: next(answers, free_bit(board_id)))
+
+    response = client.post(board_url, json={'name': 'racing'})
+    assert response.status_code == 201
+    assert response.get_json()['bit'] == 3
+
+    monkeypatch.setattr(labels, 'free_bit', lambda board_id: 0)
+    assert client.post(board_url, json={'name': 'always late'}).status_code == 409
+    assert [label['name'] for label in client.get(board_url).get_json()] == ['bug', 'ui', 'urgent', 'racing']
+
+def test_label_limit_and_copy(client, api_login, label_board):
+    """Test that a board holds 64 labels and a copy keeps labels on its cards."""
+    api_login()
+    board_url = f"/api/boards/{label_board['board_id']}/labels"
+    for i in range(3, 64):
+        assert client.post(board_url, json={'name': f'label {i}'}).status_code == 201
+    assert client.post(board_url, json={'name': 'one too many'}).status_code == 409
+    assert client.post(board_url, json={'name': ' '}).status_code == 400
+
+    last = client.get(board_url).get_json()[-1]
+    assert last['bit'] == 63
+    card_id = label_board['cards'][3]
+    assert client.post(f"/api/cards/{card_id}/labels/{last['id']}").get_json()['label_bits'] == [63]
+    cards = client.get(f"/api/boards/{label_board['board_id']}/cards",
+                       query_string={'labels': last['id']}).get_json()['lists'][0]['cards']
+    assert [card['id'] for card in cards] == [card_id]
+
+    copy = client.post(f"/api/boards/{label_board['board_id']}/copy", json={'title': 'Copy'}).get_json()
+    board = client.get(f"/api/boards/{copy['id']}").get_json()
+    assert len(board['labels']) == 64
+    assert [card['label_bits'] for card in board['lists'][0]['cards']] == [[0], [0], [0, 2], [63]]
+
+# Fixtures
+
+@pytest.fixture
+def label_board(client, api_login, app):
+    """A board with labels bug, ui and urgent on cards Crash (bug), Slow (bug), Outage (bug, urgent) and Idea"""
+    api_login()
+    board_id = client.post('/api/boards', json={'title': 'Labels'}).get_json()['id']
+    list_id = client.post('/api/lists', json={'title': 'Todo', 'board_id': board_id}).get_json()['id']
+    card_ids = [client.post('/api/cards', json={'title': title, 'list_id': list_id}).get_json()['id']
+                for title in ('Crash', 'Slow', 'Outage', 'Idea')]
+    board_labels = [client.post(f'/api/boards/{board_id}/labels', json={'name': name, 'color': color}).get_json()
+                    for name, color in (('bug', '#eb5a46'), ('ui', '#c377e0'), ('urgent', '#ff9f1a'))]
+    for card_id in card_ids[:3]:
+        client.post(f"/api/cards/{card_id}/labels/{board_labels[0]['id']}")
+    client.post(f"/api/cards/{card_ids[2]}/labels/{board_labels[2]['id']}")
+    client.post('/auth/logout')
+    yield {'board_id': board_id, 'cards': card_ids, 'labels': board_labels}
+
+    with app.app_context():
+        for board in Board.query.filter(Board.title.in_(['Labels', 'Copy'])):
+            db.session.delete(board)
+        db.session.commit()
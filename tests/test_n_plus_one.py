@@ -0,0 +1,103 @@
+import logging
+import pytest
+from flask import json
+from sqlalchemy.orm import selectinload
+from models import db, User, Board, List, Card, CardAssignment
+from n_plus_one import NPlusOneError, detect
+import card_counters
+
+def test_lazy_loads_in_a_loop_raise(app, detect_n_plus_one, crowded_board):
+    """Test that looping over a lazy relationship is caught."""
+    with app.app_context():
+        cards = Card.query.filter_by(list_id=crowded_board['list_id']).all()
+        with pytest.raises(NPlusOneError) as excinfo:
+            with detect_n_plus_one(threshold=2):
+                for card in cards:
+                    card.assignments
+        assert 'lazy load from Card ran 3 times' in str(excinfo.value)
+        assert 'card_assignments' in str(excinfo.value)
+
+def test_eager_loading_passes(app, detect_n_plus_one, crowded_board):
+    """Test that the same loop with selectinload issues no lazy loads."""
+    with app.app_context():
+        with detect_n_plus_one(threshold=0) as scope:
+            cards = Card.query.filter_by(list_id=crowded_board['list_id'])\
+                .options(selectinload(Card.assignments)).all()
+            for card in cards:
+                card.assignments
+        assert scope.violations() == {}
+
+def test_warn_mode_logs_once(app, crowded_board, caplog):
+    """Test that warn mode logs the offending statement and keeps going."""
+    with app.app_context():
+        cards = Card.query.filter_by(list_id=crowded_board['list_id']).all()
+        with caplog.at_level(logging.WARNING):
+            with detect(threshold=1, mode='warn') as scope:
+                for card in cards:
+                    card.checklists
+        messages = [r.getMessage() for r in caplog.records if 'N+1 query' in r.getMessage()]
+        assert len(messages) == 1
+        assert 'test_n_plus_one.py' in messages[0]
+        assert list(scope.violations().values()) == [len(cards)]
+
+def test_board_detail_has_no_n_plus_one(client, api_login, crowded_board):
+    """Test that a full board load serves assignee badges and the card loads assignments and users."""
+    api_login()
+
+    response = client.get(f"/api/boards/{crowded_board['board_id']}")
+    assert response.status_code == 200
+    cards = json.loads(response.data)['lists'][0]['cards']
+    assert len(cards) == 6
+    assert cards[0]['assignee_ids'] == [crowded_board['user_id']]
+    assert 'assignments' not in cards[0]
+
+    response = client.get(f"/api/cards/{cards[0]['id']}")
+    assert response.status_code == 200
+    assert json.loads(response.data)['assignments'][0]['user']['username'] == 'testuser'
+
+def test_my_tasks_has_no_n_plus_one(client, api_login, crowded_board):
+    """Test that the task list loads cards with their lists and boards in bulk."""
+    api_login()
+
+    response = client.get('/api/users/me/tasks')
+    assert response.status_code == 200
+    titles = [task['title'] for task in json.loads(response.data)]
+    assert sum(title.startswith('Crowded') for title in titles) >= 6
+
+def test_allow_n_plus_one(client, api_login, app, monkeypatch, crowded_board, allow_n_plus_one):
+    """Test that the opt-out fixture lets a request with an N+1 loop through."""
+    def lazy_board(board_id):
+        cards = Card.query.filter_by(list_id=crowded_board['list_id']).all()
+        return json.jsonify([len(card.assignments) for card in cards])
+    monkeypatch.setitem(app.view_functions, 'boards.get_board', lazy_board)
+    api_login()
+
+    app.config['N_PLUS_ONE_MODE'] = 'raise'
+    with pytest.raises(NPlusOneError):
+        client.get(f"/api/boards/{crowded_board['board_id']}")
+
+    app.config['N_PLUS_ONE_MODE'] = 'off'
+    response = client.get(f"/api/boards/{crowded_board['board_id']}")
+    assert response.status_code == 200
+    assert json.loads(response.data) == [1] * 6
+
+# Fixtures
+@pytest.fixture
+def crowded_board(app):
+    """Create a board with six cards, each assigned to the test user."""
+    with app.app_context():
+        user = User.query.filter_by(username='testuser').first()
+        board = Board(title='Crowded Board', owner_id=user.id)
+        list_item = List(title='Busy', board=board, position=0)
+        db.session.add_all([board, list_item])
+        db.session.flush()
+
+        cards = [Card(title=f'Crowded {i}', list_id=list_item.id, position=i) for i in range(6)]
+        db.session.add_all(cards)
+        db.session.flush()
+        db.session.add_all([CardAssignment(card_id=card.id, user_id=user.id) for card in cards])
+        db.session.flush()
+        card_counters.recount(card.id for card in cards)
+        db.session.commit()
+
+        return {'board_id': board.id, 'list_id': list_item.id, 'user_id': user.id}
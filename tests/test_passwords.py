@@ -0,0 +1,133 @@
+import pytest
+import time
+from werkzeug.security import generate_password_hash
+from models import db, User
+import passwords
+from passwords import LoginRateLimiter, PasswordHasherBusy
+from tests.conftest import TestConfig
+
+def test_hash_uses_configured_method(app):
+    """Test that new hashes follow PASSWORD_HASH_METHOD."""
+    with app.app_context():
+        app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+        try:
+            password_hash = passwords.hash_password('secret')
+            assert password_hash.startswith('pbkdf2:sha256:1000$')
+            assert passwords.verify_password(password_hash, 'secret')
+            assert not passwords.verify_password(password_hash, 'wrong')
+            assert not passwords.needs_rehash(password_hash)
+        finally:
+            app.config['PASSWORD_HASH_METHOD'] = 'scrypt:32768:8:1'
+
+def test_login_rehashes_outdated_hash(client, app):
+    """Test that logging in upgrades a hash made with old parameters."""
+    with app.app_context():
+        user = User(username='oldhash', email='oldhash@example.com',
+                    password_hash=generate_password_hash('secret', 'pbkdf2:sha256:1000'))
+        db.session.add(user)
+        db.session.commit()
+
+    response = client.post('/auth/login', json={'username': 'oldhash', 'password': 'secret'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        user = User.query.filter_by(username='oldhash').first()
+        assert user.password_hash.startswith('scrypt:32768:8:1$')
+        assert not passwords.needs_rehash(user.password_hash)
+
+def test_failed_logins_are_throttled(client, app):
+    """Test that repeated failures lock the username out with 429."""
+    with app.app_context():
+        user = User(username='guessme', email='guessme@example.com',
+                    password_hash=generate_password_hash('secret', 'pbkdf2:sha256:1000'))
+        db.session.add(user)
+        db.session.commit()
+
+    for _ in range(app.config['LOGIN_MAX_ATTEMPTS']):
+        response = client.post('/auth/login', json={'username': 'guessme', 'password': 'nope'})
+        assert response.status_code == 401
+
+    response = client.post('/auth/login', json={'username': 'GuessMe', 'password': 'secret'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+    # Other accounts from the same address are still below the IP limit
+    response = client.post('/auth/login', json={'username': 'testuser', 'password': 'testpass'})
+    assert response.status_code == 200
+
+def test_ip_limit_behind_proxy():
+    """Test that behind a trusted proxy the per-IP limit applies to the forwarded client address."""
+    from app import create_app
+
+    class ProxiedConfig(TestConfig):
+        PROXY_FIX_X_FOR = 1
+        LOGIN_MAX_ATTEMPTS_PER_IP = 3
+
+    client = create_app(ProxiedConfig).test_client()
+
+    def login(client_addr, username):
+        return client.post('/auth/login', json={'username': username, 'password': 'nope'},
+                           headers={'X-Forwarded-For': client_addr}, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+
+    for n in range(3):
+        assert login('203.0.113.5', f'nobody{n}').status_code == 401
+    assert login('203.0.113.5', 'nobody3').status_code == 429
+    # Another client through the same proxy is unaffected
+    assert login('198.51.100.7', 'nobody3').status_code == 401
+
+def test_rate_limiter_window():
+    """Test that failures expire after the window and that success resets the user count."""
+    limiter = LoginRateLimiter(max_per_user=2, max_per_ip=3, window=60)
+    limiter.record_failure('alice', '10.0.0.1', now=100)
+    limiter.record_failure('alice', '10.0.0.1', now=110)
+    assert limiter.retry_after('alice', '10.0.0.2', now=120) == 41
+    assert limiter.retry_after('alice', '10.0.0.2', now=161) == 0
+
+    limiter.record_failure('bob', '10.0.0.1', now=130)
+    assert limiter.retry_after('carol', '10.0.0.1', now=131) > 0
+
+    limiter.reset('alice')
+    assert limiter.retry_after('alice', '10.0.0.9', now=131) == 0
+
+def test_hashing_in_process_pool(app):
+    """Test hashing through the process pool and the bounded queue."""
+    with app.app_context():
+        app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0,
+                          PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+        try:
+            password_hash = passwords.hash_password('secret')
+            assert passwords.verify_password(password_hash, 'secret')
+
+            executor, slots = passwords._pool.get(1, 0)
+            slots.acquire()
+            with pytest.raises(PasswordHasherBusy):
+                passwords.hash_password('secret')
+            slots.release()
+        finally:
+            app.config.update(PASSWORD_HASH_WORKERS=0, PASSWORD_HASH_QUEUE=16,
+                              PASSWORD_HASH_METHOD='scrypt:32768:8:1')
+            passwords._pool.shutdown()
+
+def test_slow_hash_is_busy_and_keeps_its_slot(app):
+    """Test that a hash outrunning the timeout reports busy and holds its slot until it finishes."""
+    with app.app_context():
+        app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0, PASSWORD_HASH_TIMEOUT=0.01,
+                          PASSWORD_HASH_METHOD='pbkdf2:sha256:500000')
+        try:
+            with pytest.raises(PasswordHasherBusy):
+                passwords.hash_password('secret')
+            with pytest.raises(PasswordHasherBusy):
+                passwords.hash_password('secret')
+
+            executor, slots = passwords._pool.get(1, 0)
+            deadline = time.monotonic() + 30
+            while not slots.acquire(timeout=0.1):
+                assert time.monotonic() < deadline
+            slots.release()
+
+            app.config.update(PASSWORD_HASH_TIMEOUT=30, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+            assert passwords.verify_password(passwords.hash_password('secret'), 'secret')
+        finally:
+            app.config.update(PASSWORD_HASH_WORKERS=0, PASSWORD_HASH_QUEUE=16, PASSWORD_HASH_TIMEOUT=10,
+                              PASSWORD_HASH_METHOD='scrypt:32768:8:1')
+            passwords._pool.shutdown()
@@ -0,0 +1,104 @@
+import sqlite3
+from contextlib import closing
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from models import db, Board
+from replicas import ReplicaSet, make_engine
+from tests.conftest import TestConfig
+
+def test_reads_use_replica_until_client_writes(replica_env):
+    """Test that board reads come from the replica, except right after the client's own write."""
+    app, client, board_id, primary, replica = replica_env
+    replicate(primary, replica)
+    engine = app.extensions['replicas'].engines[0]
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    response = client.put(f'/api/boards/{board_id}', json={'title': 'Renamed'})
+    assert response.status_code == 200
+    assert client.get_cookie('boardify_primary') is not None
+    assert not statements
+
+    # Pinned to the primary: the client sees its own write
+    assert client.get(f'/api/boards/{board_id}').get_json()['title'] == 'Renamed'
+    assert not statements
+
+    # Once the pin expires, reads come from the (lagging) replica
+    client.delete_cookie('boardify_primary')
+    assert client.get(f'/api/boards/{board_id}').get_json()['title'] == 'Replicated'
+    assert statements
+    assert client.get_cookie('boardify_primary') is None
+
+    replicate(primary, replica)
+    assert client.get(f'/api/boards/{board_id}').get_json()['title'] == 'Renamed'
+
+    # Endpoints outside REPLICA_ENDPOINTS never touch the replica
+    statements.clear()
+    assert client.get(f'/api/boards/{board_id}/members').status_code == 200
+    assert not statements
+
+def test_first_write_moves_request_to_primary(replica_env):
+    """Test that a flush inside a replica-routed request sends later reads to the primary."""
+    app, client, board_id, primary, replica = replica_env
+    replicate(primary, replica)
+    engine = app.extensions['replicas'].engines[0]
+    with app.test_request_context(f'/api/boards/{board_id}'):
+        from flask import g
+
+        g.replica = engine
+        select = db.select(Board).where(Board.id == board_id)
+        assert db.session.get_bind(clause=select) is engine
+
+        board = db.session.execute(db.select(Board).where(Board.id == board_id)).scalar_one()
+        board.description = 'changed'
+        db.session.flush()
+        assert g.db_wrote
+        assert db.session.get_bind(clause=select) is db.engine
+        db.session.rollback()
+
+def test_replicas_are_read_only_and_skipped_when_down(replica_env, tmp_path):
+    """Test that SQLite replicas refuse writes and that a failing replica is taken out of rotation."""
+    app, client, board_id, primary, replica = replica_env
+    replicate(primary, replica)
+    with app.app_context():
+        with pytest.raises(OperationalError):
+            with app.extensions['replicas'].engines[0].begin() as conn:
+                conn.exec_driver_sql("UPDATE boards SET title = 'nope'")
+
+        broken = make_engine(app, f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        replicas = ReplicaSet([broken], retry_seconds=30)
+        assert replicas.pick() is broken
+        with pytest.raises(OperationalError):
+            broken.connect()
+        assert replicas.pick() is None
+
+# Fixtures
+
+def replicate(primary, replica):
+    """Stand-in for streaming replication: copy the primary's current state to the replica"""
+    with closing(sqlite3.connect(primary)) as source, closing(sqlite3.connect(replica)) as target:
+        source.backup(target)
+
+@pytest.fixture
+def replica_env(tmp_path):
+    """A primary and a replica SQLite file, a logged-in client and a board titled 'Replicated'"""
+    from app import create_app
+
+    primary, replica = str(tmp_path / 'primary.db'), str(tmp_path / 'replica.db')
+
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{primary}'
+        REPLICA_DATABASE_URIS = [f'sqlite:///{replica}']
+
+    app = create_app(ReplicaConfig)
+    client = app.test_client()
+    client.post('/auth/register', json={'username': 'reader', 'email': 'reader@example.com', 'password': 'pw'})
+    client.post('/auth/login', json={'username': 'reader', 'password': 'pw'})
+    board_id = client.post('/api/boards', json={'title': 'Replicated'}).get_json()['id']
+    client.delete_cookie('boardify_primary')
+    yield app, client, board_id, primary, replica
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    app.extensions['replicas'].dispose()
@@ -0,0 +1,162 @@
+import sqlite3
+from datetime import datetime
+import pytest
+from models import db, Board, List, Card, ChecklistItem
+from tests.conftest import TestConfig
+import labels
+import schema
+
+# The tables as the first release created them, before any column was added to them
+BASELINE_SCHEMA = """
+CREATE TABLE users (id INTEGER NOT NULL, username VARCHAR(80) NOT NULL, email VARCHAR(120) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL, created_at DATETIME, PRIMARY KEY (id), UNIQUE (username), UNIQUE (email));
+CREATE TABLE boards (id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, description TEXT, owner_id INTEGER NOT NULL,
+    created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id), FOREIGN KEY(owner_id) REFERENCES users (id));
+CREATE TABLE board_members (id INTEGER NOT NULL, board_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+    role VARCHAR(20), joined_at DATETIME, PRIMARY KEY (id), CONSTRAINT _board_user_uc UNIQUE (board_id, user_id),
+    FOREIGN KEY(board_id) REFERENCES boards (id), FOREIGN KEY(user_id) REFERENCES users (id));
+CREATE TABLE lists (id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, board_id INTEGER NOT NULL, position INTEGER,
+    created_at DATETIME, PRIMARY KEY (id), FOREIGN KEY(board_id) REFERENCES boards (id));
+CREATE TABLE activities (id INTEGER NOT NULL, board_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+    action VARCHAR(50) NOT NULL, entity_type VARCHAR(50) NOT NULL, entity_id INTEGER, description TEXT NOT NULL,
+    created_at DATETIME, PRIMARY KEY (id), FOREIGN KEY(board_id) REFERENCES boards (id),
+    FOREIGN KEY(user_id) REFERENCES users (id));
+CREATE TABLE cards (id INTEGER NOT NULL, title VARCHAR(200) NOT NULL, description TEXT, list_id INTEGER NOT NULL,
+    position INTEGER, due_date DATETIME, completed BOOLEAN, created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(list_id) REFERENCES lists (id));
+CREATE TABLE card_assignments (id INTEGER NOT NULL, card_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+    assigned_at DATETIME, PRIMARY KEY (id), CONSTRAINT _card_user_uc UNIQUE (card_id, user_id),
+    FOREIGN KEY(card_id) REFERENCES cards (id), FOREIGN KEY(user_id) REFERENCES users (id));
+CREATE TABLE attachments (id INTEGER NOT NULL, card_id INTEGER NOT NULL, filename VARCHAR(255) NOT NULL,
+    filepath VARCHAR(500) NOT NULL, file_size INTEGER, uploaded_at DATETIME, PRIMARY KEY (id),
+    FOREIGN KEY(card_id) REFERENCES cards (id));
+CREATE TABLE checklist_items (id INTEGER NOT NULL, card_id INTEGER NOT NULL, title VARCHAR(200) NOT NULL,
+    completed BOOLEAN, position INTEGER, created_at DATETIME, PRIMARY KEY (id),
+    FOREIGN KEY(card_id) REFERENCES cards (id));
+CREATE TABLE notifications (id INTEGER NOT NULL, user_id INTEGER NOT NULL, title VARCHAR(200) NOT NULL,
+    message TEXT NOT NULL, type VARCHAR(50), related_board_id INTEGER, related_card_id INTEGER, is_read BOOLEAN,
+    created_at DATETIME, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id),
+    FOREIGN KEY(related_board_id) REFERENCES boards (id), FOREIGN KEY(related_card_id) REFERENCES cards (id));
+
+INSERT INTO users VALUES (1, 'olduser', 'old@example.com', '-', '2024-01-01 09:00:00');
+INSERT INTO boards VALUES (1, 'Old board', NULL, 1, '2024-01-01 09:00:00', '2024-01-02 09:00:00');
+INSERT INTO lists VALUES (1, 'Todo', 1, 0, '2024-01-01 09:00:00');
+INSERT INTO cards VALUES (1, 'Planned', NULL, 1, 0, NULL, 0, '2024-01-01 09:00:00', '2024-01-01 09:00:00');
+INSERT INTO cards VALUES (2, 'Filed', NULL, 1, 1, NULL, 0, '2024-01-01 09:00:00', '2024-01-01 09:00:00');
+INSERT INTO checklist_items VALUES (1, 1, 'Step 1', 1, 0, '2024-01-01 09:00:00');
+INSERT INTO checklist_items VALUES (2, 1, 'Step 2', 0, 1, '2024-01-01 09:00:00');
+INSERT INTO attachments VALUES (1, 2, 'notes.txt', 'notes.txt', 5, '2024-01-01 09:00:00');
+INSERT INTO card_assignments VALUES (1, 1, 1, '2024-01-01 09:00:00');
+INSERT INTO activities VALUES (1, 1, 1, 'created', 'card', 2, 'Created card', '2024-01-03 09:00:00');
+"""
+
+def test_health_probes(client):
+    """Test the liveness and readiness probes."""
+    assert client.get('/healthz').get_json() == {'status': 'ok'}
+
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ready'
+    assert response.get_json()['startup_seconds'] > 0
+
+def test_schema_is_created_by_cli_only():
+    """Test that create_app leaves the schema alone and `flask init-db` creates it."""
+    from app import create_app
+
+    class NoSchemaConfig(TestConfig):
+        AUTO_CREATE_SCHEMA = False
+
+    app = create_app(NoSchemaConfig)
+    client = app.test_client()
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'unavailable'
+
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0
+    assert 'Database ready' in result.output
+    assert client.get('/readyz').status_code == 200
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+def test_schema_check_is_skipped_when_version_matches(tmp_path):
+    """Test that a database stamped with the current schema version skips create_all."""
+    from app import create_app
+
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'schema.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        assert schema.stored_version() == schema.schema_version()
+        assert schema.ensure_schema() is False
+
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('PRAGMA user_version = 0')
+        assert schema.ensure_schema() is True
+        assert schema.stored_version() == schema.schema_version()
+        db.engine.dispose()
+
+def test_init_db_upgrades_baseline_database(baseline_app):
+    """Test that `flask init-db` adds what a first-release database lacks before stamping it current."""
+    result = baseline_app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+
+    with baseline_app.app_context():
+        assert schema.stored_version() == schema.schema_version()
+        with db.engine.connect() as conn:
+            assert schema.missing(conn) == ([], [], [])
+        assert [card.title for card in Card.query.order_by(Card.position)] == ['Planned', 'Filed']
+
+        # Badge counters are counted from the existing checklists, attachments and assignments
+        assert [(card.checklist_total, card.checklist_done, card.attachment_count, card.assignee_ids)
+                for card in Card.query.order_by(Card.id)] == [(2, 1, 0, '1'), (0, 0, 1, '')]
+
+        # Nothing that existed before archiving is archived
+        assert [lst.archived_at for lst in List.query] == [None]
+        assert [card.archived_at for card in Card.query] == [None, None]
+        # ...or deleted
+        assert [row.deleted_at for model in (Board, List, Card) for row in model.query] == [None] * 4
+        # Dashboards order old boards by their latest activity; none of them is a template
+        board = db.session.get(Board, 1)
+        assert (board.last_activity_at, board.is_template) == (datetime(2024, 1, 3, 9), False)
+        # Existing rows start at version 1, so If-Match on an upgraded database works at once
+        assert {row.version for model in (Board, List, Card, ChecklistItem) for row in model.query} == {1}
+        # Old cards carry no labels, and the board can take its first one
+        assert [card.label_mask for card in Card.query] == [0, 0]
+        assert labels.create(1, 'bug', '#eb5a46').bit == 0
+        db.session.commit()
+
+def test_unfinished_upgrade_is_not_stamped(baseline_app, monkeypatch):
+    """Test that a database still missing columns after the upgrade fails loudly and stays unstamped."""
+    add_column = schema._add_column
+    monkeypatch.setattr(schema, '_add_column',
+                        lambda conn, column: column.name == 'label_mask' or add_column(conn, column))
+    with baseline_app.app_context():
+        with pytest.raises(RuntimeError, match='cards.label_mask'):
+            schema.ensure_schema(force=True)
+        assert schema.stored_version() == 0
+
+# Fixtures
+
+@pytest.fixture
+def baseline_app(tmp_path):
+    """An app on a SQLite file holding a few rows in the first release's schema"""
+    from app import create_app
+
+    path = tmp_path / 'baseline.db'
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    conn.close()
+
+    class BaselineConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        AUTO_CREATE_SCHEMA = False
+
+    app = create_app(BaselineConfig)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
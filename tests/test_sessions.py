@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime, timedelta
+from models import db, UserSession
+from sessions import FileStore, SessionStore, _key
+
+def test_session_lives_server_side(client, app, api_login):
+    """Test that the cookie holds only an id and logout deletes the stored session."""
+    api_login()
+    sid = client.get_cookie('session').value
+    assert '.' not in sid
+
+    with app.app_context():
+        record = db.session.get(UserSession, _key(sid))
+        assert record is not None
+        assert 'testuser' in record.data
+
+    assert client.post('/auth/logout').status_code == 200
+    with app.app_context():
+        assert db.session.get(UserSession, _key(sid)) is None
+
+    # Replaying the old cookie does not bring the session back
+    client.set_cookie('session', sid)
+    assert client.get('/auth/me').status_code == 401
+
+def test_logout_all_revokes_other_devices(app, api_login):
+    """Test that /auth/logout-all ends sessions held by other clients."""
+    laptop, phone = app.test_client(), app.test_client()
+    for device in (laptop, phone):
+        assert device.post('/auth/login', json={'username': 'testuser', 'password': 'testpass'}).status_code == 200
+        assert device.get('/auth/me').status_code == 200
+
+    response = laptop.post('/auth/logout-all')
+    assert response.status_code == 200
+    assert response.get_json()['sessions'] >= 2
+    assert phone.get('/auth/me').status_code == 401
+    assert laptop.get('/auth/me').status_code == 401
+
+def test_session_id_changes_on_login(client):
+    """Test that logging in issues a new session id."""
+    with client.session_transaction() as sess:
+        sess['theme'] = 'dark'
+    before = client.get_cookie('session').value
+
+    client.post('/auth/login', json={'username': 'testuser', 'password': 'testpass'})
+    assert client.get_cookie('session').value != before
+    with client.session_transaction() as sess:
+        assert sess['theme'] == 'dark'
+
+def test_expiry_slides_in_batches(client, app, api_login):
+    """Test that activity pushes the expiry back through one batched write, and expired sessions end."""
+    api_login()
+    key = _key(client.get_cookie('session').value)
+    interface = app.session_interface
+    lifetime = app.permanent_session_lifetime
+
+    with app.app_context():
+        stale = datetime.utcnow() + lifetime - timedelta(seconds=interface.touch_interval * 2)
+        db.session.execute(db.update(UserSession).where(UserSession.id == key).values(expires_at=stale))
+        db.session.commit()
+
+        assert client.get('/auth/me').status_code == 200
+        assert key in interface.pending
+        assert db.session.get(UserSession, key).expires_at == stale
+
+        interface.flush(force=True)
+        db.session.expire_all()
+        assert db.session.get(UserSession, key).expires_at > stale
+        assert not interface.pending
+
+        db.session.execute(db.update(UserSession).where(UserSession.id == key)
+                           .values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+    assert client.get('/auth/me').status_code == 401
+
+def test_current_user_is_cached(client, app, api_login, count_statements):
+    """Test that /auth/me reads the user from the process cache after the first request."""
+    api_login()
+    app.extensions['user_cache'].entries.clear()
+    with count_statements() as statements:
+        first = client.get('/auth/me')
+        second = client.get('/auth/me')
+    user_queries = [s for s in statements if 'FROM users' in s]
+
+    assert first.get_json() == second.get_json()
+    assert second.get_json()['username'] == 'testuser'
+    assert len(user_queries) == 1
+
+def test_file_store(tmp_path):
+    """Test the file-backed store end to end."""
+    store = FileStore(str(tmp_path))
+    now = datetime.utcnow().replace(microsecond=0)
+    store.save('a', 1, '{"user_id": 1}', now + timedelta(hours=1))
+    store.save('b', 1, '{"user_id": 1}', now + timedelta(hours=1))
+    store.save('c', 2, '{"user_id": 2}', now - timedelta(hours=1))
+
+    user_id, data, expires_at = store.load('a')
+    assert (user_id, data, expires_at) == (1, '{"user_id": 1}', now + timedelta(hours=1))
+
+    store.touch({'a': now + timedelta(hours=2)})
+    assert store.load('a')[2] == now + timedelta(hours=2)
+
+    assert store.prune(now) == 1
+    assert store.load('c') is None
+    assert store.delete_user(1) == 2
+    assert store.load('a') is None and store.load('b') is None
+
+def test_store_must_implement_every_method():
+    """Test that a store missing any SessionStore method cannot be created."""
+    class LoadOnly(SessionStore):
+        def load(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnly()
@@ -0,0 +1,136 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from flask import json
+from models import db, User, Board, List, Card, ChecklistItem, Attachment, Activity
+from purge import purge_tombstones
+
+def test_delete_board_is_soft(client, api_login, app, doomed_board):
+    """Test that deleting a board only tombstones it."""
+    api_login()
+
+    response = client.delete(f"/api/boards/{doomed_board['board_id']}")
+    assert response.status_code == 200
+    assert 'undo_until' in json.loads(response.data)
+
+    assert client.get(f"/api/boards/{doomed_board['board_id']}").status_code == 404
+    boards = json.loads(client.get('/api/boards').data)
+    assert doomed_board['board_id'] not in [b['id'] for b in boards]
+
+    with app.app_context():
+        assert db.session.get(Board, doomed_board['board_id']).deleted_at is not None
+        assert Card.query.filter_by(list_id=doomed_board['list_id']).count() == 3
+
+def test_restore_board_within_window(client, api_login, doomed_board):
+    """Test undoing a board deletion."""
+    api_login()
+
+    client.delete(f"/api/boards/{doomed_board['board_id']}")
+    response = client.post(f"/api/boards/{doomed_board['board_id']}/restore")
+    assert response.status_code == 200
+    assert client.get(f"/api/boards/{doomed_board['board_id']}").status_code == 200
+
+def test_restore_after_window_expires(client, api_login, app, doomed_board):
+    """Test that a deletion cannot be undone once the window has passed."""
+    api_login()
+
+    client.delete(f"/api/boards/{doomed_board['board_id']}")
+    with app.app_context():
+        board = db.session.get(Board, doomed_board['board_id'])
+        board.deleted_at = datetime.utcnow() - timedelta(days=1)
+        db.session.commit()
+
+    response = client.post(f"/api/boards/{doomed_board['board_id']}/restore")
+    assert response.status_code == 410
+
+def test_deleted_list_hides_its_cards(client, api_login, doomed_board):
+    """Test that cards of a deleted list are unreachable until it is restored."""
+    api_login()
+    card_id = doomed_board['card_ids'][0]
+
+    client.delete(f"/api/lists/{doomed_board['list_id']}")
+    assert client.get(f'/api/cards/{card_id}').status_code == 404
+    data = json.loads(client.get(f"/api/boards/{doomed_board['board_id']}").data)
+    assert data['lists'] == []
+
+    assert client.post(f"/api/lists/{doomed_board['list_id']}/restore").status_code == 200
+    assert client.get(f'/api/cards/{card_id}').status_code == 200
+
+def test_delete_and_restore_card(client, api_login, doomed_board):
+    """Test undoing a card deletion."""
+    api_login()
+    card_id = doomed_board['card_ids'][1]
+
+    client.delete(f'/api/cards/{card_id}')
+    assert client.get(f'/api/cards/{card_id}').status_code == 404
+    assert client.post(f'/api/cards/{card_id}/restore').status_code == 200
+    assert client.get(f'/api/cards/{card_id}').status_code == 200
+
+def test_purge_removes_board_tree_and_files(client, api_login, app, doomed_board):
+    """Test that the purger hard-deletes a board with its children and blobs."""
+    api_login()
+    client.delete(f"/api/boards/{doomed_board['board_id']}")
+
+    with app.app_context():
+        # Still inside the undo window: nothing is purged
+        purge_tombstones()
+        assert db.session.get(Board, doomed_board['board_id']) is not None
+
+        purged = purge_tombstones(batch_size=2, now=datetime.utcnow() + timedelta(days=1))
+        assert purged['cards'] >= 3
+
+        assert db.session.get(Board, doomed_board['board_id']) is None
+        assert List.query.filter_by(board_id=doomed_board['board_id']).count() == 0
+        assert Card.query.filter(Card.id.in_(doomed_board['card_ids'])).count() == 0
+        assert ChecklistItem.query.filter(ChecklistItem.card_id.in_(doomed_board['card_ids'])).count() == 0
+        assert Activity.query.filter_by(board_id=doomed_board['board_id']).count() == 0
+
+    assert not os.path.exists(doomed_board['blob_path'])
+
+def test_purge_leaves_live_cards_alone(client, api_login, app, doomed_board):
+    """Test that purging a deleted card does not touch its siblings."""
+    api_login()
+    client.delete(f"/api/cards/{doomed_board['card_ids'][0]}")
+
+    with app.app_context():
+        purge_tombstones(now=datetime.utcnow() + timedelta(days=1))
+        assert db.session.get(Card, doomed_board['card_ids'][0]) is None
+        assert Card.query.filter(Card.id.in_(doomed_board['card_ids'])).count() == 2
+
+# Fixtures
+@pytest.fixture
+def doomed_board(app):
+    """Create a board with one list, three cards, a checklist item and an attachment."""
+    with app.app_context():
+        user = User.query.filter_by(username='testuser').first()
+        board = Board(title='Doomed Board', owner_id=user.id)
+        list_item = List(title='Backlog', board=board, position=0)
+        db.session.add_all([board, list_item])
+        db.session.flush()
+
+        cards = [Card(title=f'Card {i}', list_id=list_item.id, position=i) for i in range(3)]
+        db.session.add_all(cards)
+        db.session.flush()
+
+        blob_name = f'purge_test_{board.id}.txt'
+        blob_path = os.path.join(app.config['UPLOAD_FOLDER'], blob_name)
+        with open(blob_path, 'w') as f:
+            f.write('attachment')
+
+        db.session.add(ChecklistItem(card_id=cards[0].id, title='Step', position=0))
+        db.session.add(Attachment(card_id=cards[0].id, filename='a.txt', filepath=blob_name, file_size=10))
+        db.session.add(Activity(board_id=board.id, user_id=user.id, action='created',
+                                entity_type='board', entity_id=board.id, description='created'))
+        db.session.commit()
+
+        data = {
+            'board_id': board.id,
+            'list_id': list_item.id,
+            'card_ids': [card.id for card in cards],
+            'blob_path': blob_path
+        }
+
+    yield data
+
+    if os.path.exists(data['blob_path']):
+        os.remove(data['blob_path'])
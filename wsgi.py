@@ -0,0 +1,40 @@
+"""Production WSGI entry point.
+
+    flask --app app init-db                    # once per deployment
+    gunicorn -c gunicorn.conf.py wsgi:app
+    python wsgi.py                             # waitress, where gunicorn is unavailable (Windows)
+
+With gunicorn's preload_app the import and warm-up below run once in the
+master, and workers are forked from the warmed-up process.
+"""
+import time
+
+_started = time.perf_counter()
+
+import os
+from sqlalchemy.orm import configure_mappers
+from app import create_app
+from models import db
+
+def warm_up(app):
+    """Do the one-off work a first request would otherwise pay for"""
+    # Backrefs and relationship loaders are only set up when the mappers are configured
+    configure_mappers()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    with app.app_context():
+        # Connections opened here must not be shared with forked workers
+        db.engine.dispose()
+        if 'replicas' in app.extensions:
+            app.extensions['replicas'].dispose()
+
+app = create_app()
+warm_up(app)
+app.extensions['startup_seconds'] = round(time.perf_counter() - _started, 4)
+app.logger.info('Application loaded in %.0f ms', app.extensions['startup_seconds'] * 1000)
+
+if __name__ == '__main__':
+    from waitress import serve
+
+    serve(app, host=os.environ.get('HOST', '0.0.0.0'), port=int(os.environ.get('PORT', 5000)),
+          threads=int(os.environ.get('THREADS', 8)))